@@ -12,6 +12,7 @@ from typing import Any, Dict, Iterable, Iterator, List, Optional
 
 import chess
 from scenarios import detect_scenarios
+from utils.run_archive import ARCHIVE_SUFFIX, RunArchiveReader, iter_archive_runs
 
 try:
     # rpy2 is optional; only needed for RDS export
@@ -32,10 +33,11 @@ def stream_runs(
     Parameters
     ----------
     path:
-        Directory containing run JSON files.
+        Directory containing run JSON files and/or run archives
+        (``*.crun``, see :mod:`utils.run_archive`).
     sample_size, seed:
         Optional sampling parameters.  When *sample_size* is provided, a
-        deterministic subset of files is chosen using *seed*.
+        deterministic subset of games is chosen using *seed*.
 
     Yields
     ------
@@ -50,8 +52,23 @@ def stream_runs(
         raise FileNotFoundError(f"Directory not found: {path}")
 
     files = sorted(base_path.glob("*.json"))
-
-    if sample_size is not None and sample_size < len(files):
+    archives = sorted(base_path.glob(f"*{ARCHIVE_SUFFIX}"))
+    archive_picks: Dict[Path, Optional[set]] = {a: None for a in archives}
+
+    if archives and sample_size is not None:
+        pool: List[Any] = list(files)
+        for archive in archives:
+            with RunArchiveReader(archive) as reader:
+                pool.extend((archive, i) for i in range(len(reader)))
+        if sample_size < len(pool):
+            rng = random.Random(seed)
+            picked = rng.sample(pool, sample_size)
+            files = [p for p in picked if isinstance(p, Path)]
+            archive_picks = {a: set() for a in archives}
+            for p in picked:
+                if isinstance(p, tuple):
+                    archive_picks[p[0]].add(p[1])
+    elif sample_size is not None and sample_size < len(files):
         rng = random.Random(seed)
         files = rng.sample(files, sample_size)
 
@@ -75,6 +92,11 @@ def stream_runs(
             "date": datetime.fromtimestamp(file.stat().st_mtime).isoformat(),
         }
 
+    for archive, picks in archive_picks.items():
+        if picks is not None and not picks:
+            continue
+        yield from iter_archive_runs(archive, picks)
+
 
 def load_runs(path: str) -> List[Dict[str, Any]]:
     """Load run JSON files from *path*.
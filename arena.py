@@ -23,13 +23,18 @@ import json
 from datetime import datetime
 
 from chess_ai.bot_agent import make_agent, get_agent_names
+from utils.run_archive import ARCHIVE_NAME, RunArchiveWriter
 from core.pst_trainer import update_from_board, update_from_history
 from main import annotated_board
 
 # ---------- Налаштування ----------
-# Можна налаштувати через змінні середовища: GAMES, WHITE_AGENT, BLACK_AGENT, RUNS_DIR
+# Можна налаштувати через змінні середовища: GAMES, WHITE_AGENT, BLACK_AGENT, RUNS_DIR, RUN_FORMAT
 GAMES = int(os.environ.get("GAMES", "2"))
 
+# Формат запису ігор: "json" (runs/<ts>.json) або "archive" (runs/games.crun,
+# див. utils.run_archive — 16-бітні коди ходів, словник модулів/причин).
+RUN_FORMAT = os.environ.get("RUN_FORMAT", "json").lower()
+
 # Default internal vs internal. Override to pit against external engine.
 WHITE_AGENT = os.environ.get("WHITE_AGENT", "DynamicBot")
 BLACK_AGENT = os.environ.get("BLACK_AGENT", "FortifyBot")
@@ -192,6 +197,9 @@ def play_games(games: int) -> Tuple[int, int, int]:
     white_agent = make_agent(WHITE_AGENT, chess.WHITE)
     black_agent = make_agent(BLACK_AGENT, chess.BLACK)
 
+    runs_dir = os.environ.get("RUNS_DIR", "runs")
+    archive = RunArchiveWriter(os.path.join(runs_dir, ARCHIVE_NAME)) if RUN_FORMAT == "archive" else None
+
     for n in range(1, games + 1):
         start_game = time.time()
         board = chess.Board()
@@ -385,9 +393,21 @@ def play_games(games: int) -> Tuple[int, int, int]:
             avg_L2 = l2_sum / pos_count
             logger.info(f"PERF: avg L={avg_L:.1f} | avg L^2={avg_L2:.1f} over {pos_count} positions")
 
-        runs_dir = os.environ.get("RUNS_DIR", "runs")
-        os.makedirs(runs_dir, exist_ok=True)
         ts = datetime.now().strftime("%Y%m%d_%H%M%S_%f")
+        if archive is not None:
+            archive.append_game(
+                board.move_stack,
+                modules_w,
+                modules_b,
+                res,
+                game_id=ts,
+                duration_ms=int(total_time * 1000),
+            )
+            # Один чанк на гру: зігране не губиться, якщо процес впаде.
+            archive.flush()
+            continue
+
+        os.makedirs(runs_dir, exist_ok=True)
         run_path = os.path.join(runs_dir, f"{ts}.json")
         with open(run_path, "w", encoding="utf-8") as f:
             json.dump(
@@ -403,6 +423,8 @@ def play_games(games: int) -> Tuple[int, int, int]:
                 indent=2,
             )
 
+    if archive is not None:
+        archive.close()
     return wins, losses, draws
 
 # ---------- Запуск ----------
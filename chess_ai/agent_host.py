@@ -0,0 +1,271 @@
+"""Run a tournament agent in its own process with hard time limits.
+
+A thread that overruns its move budget cannot be stopped in Python; it keeps
+running and holding the GIL while the tournament moves on.  An
+:class:`AgentHost` instead owns a child process that builds the agent with
+:func:`chess_ai.bot_agent.make_agent` and answers move requests over a
+:func:`multiprocessing.Pipe`.  When a request exceeds its wall-clock limit
+the child is killed and a fresh one is spawned lazily for the next request,
+so a flag-fall costs the rest of the run nothing.
+
+The agent lives for the whole game, so any state it keeps between moves
+survives.  The child mirrors the game: each request carries only the moves
+played since the previous one (the root FEN and full move list are sent
+after a reset or respawn).
+
+Protocol (tuples pickled over the pipe)::
+
+    parent -> child   ("new", fen, [uci, ...])     reset the game
+                      ("go", [uci, ...], cpu_s)    push moves, then choose
+                      ("quit",)
+    child -> parent   ("ok", uci | None)
+                      ("error", "ExcType: message")
+                      ("cpu", None)                CPU limit exceeded
+
+On POSIX systems the child additionally enforces a per-move CPU limit with
+``RLIMIT_CPU``; exceeding it is reported as a timeout.
+
+The child is not daemonic, so agents may start processes of their own
+(Lazy-SMP search, DynamicBot's agent pool).  It runs in its own process
+group there, and killing a host kills the whole group.  Hosts still alive
+at interpreter exit are closed by :func:`shutdown_hosts`.
+"""
+
+from __future__ import annotations
+
+import atexit
+import logging
+logger = logging.getLogger(__name__)
+
+import math
+import multiprocessing as mp
+import os
+import signal
+import time
+import weakref
+from typing import List, Optional, Tuple
+
+import chess
+
+try:  # POSIX only
+    import resource
+except ImportError:  # pragma: no cover - Windows
+    resource = None  # type: ignore
+
+
+class _CpuLimitExceeded(BaseException):
+    pass
+
+
+def _on_sigxcpu(signum, frame):
+    raise _CpuLimitExceeded()
+
+
+def _cpu_used() -> float:
+    usage = resource.getrusage(resource.RUSAGE_SELF)
+    return usage.ru_utime + usage.ru_stime
+
+
+def _set_cpu_limit(cpu_s: Optional[float]) -> None:
+    if resource is None:
+        return
+    _, hard = resource.getrlimit(resource.RLIMIT_CPU)
+    if cpu_s is None:
+        soft = hard
+    else:
+        soft = math.ceil(_cpu_used() + cpu_s)
+        if hard != resource.RLIM_INFINITY:
+            soft = min(soft, hard)
+    resource.setrlimit(resource.RLIMIT_CPU, (soft, hard))
+
+
+def _host_main(conn, parent_end, agent_name: str, color: bool) -> None:
+    """Child process loop: build the agent and answer move requests."""
+    from .bot_agent import make_agent
+
+    # Drop the inherited parent end so a dead parent shows up as EOF.
+    parent_end.close()
+    if hasattr(os, "setpgrp"):
+        os.setpgrp()
+    if resource is not None and hasattr(signal, "SIGXCPU"):
+        signal.signal(signal.SIGXCPU, _on_sigxcpu)
+    agent = make_agent(agent_name, color)
+    board = chess.Board()
+    while True:
+        try:
+            msg = conn.recv()
+        except EOFError:
+            break
+        kind = msg[0]
+        if kind == "quit":
+            break
+        try:
+            if kind == "new":
+                board = chess.Board(msg[1])
+                moves = msg[2]
+                cpu_s = None
+            else:
+                moves, cpu_s = msg[1], msg[2]
+            for uci in moves:
+                board.push_uci(uci)
+            if kind == "new":
+                continue
+            _set_cpu_limit(cpu_s)
+            try:
+                move = agent.choose_move(board.copy())
+            finally:
+                _set_cpu_limit(None)
+            conn.send(("ok", move.uci() if move is not None else None))
+        except _CpuLimitExceeded:
+            _set_cpu_limit(None)
+            conn.send(("cpu", None))
+        except Exception as exc:
+            conn.send(("error", f"{type(exc).__name__}: {exc}"))
+
+
+class AgentHost:
+    """One agent running in a dedicated, killable child process.
+
+    Parameters
+    ----------
+    agent_name:
+        Name understood by :func:`chess_ai.bot_agent.make_agent`.
+    color:
+        Colour the agent plays.
+    cpu_factor:
+        Per-move CPU limit as a multiple of the wall-clock limit (POSIX
+        only).  ``None`` disables the CPU limit.
+    """
+
+    def __init__(self, agent_name: str, color: bool, *, cpu_factor: Optional[float] = 1.0) -> None:
+        self.agent_name = agent_name
+        self.color = color
+        self.cpu_factor = cpu_factor
+        self.restarts = 0
+        self._proc: Optional[mp.process.BaseProcess] = None
+        self._conn = None
+        # Moves of the current game the child has already seen.
+        self._synced: List[chess.Move] = []
+        self._root_fen: Optional[str] = None
+
+    # ------------------------------------------------------------------
+    def _spawn(self) -> None:
+        ctx = mp.get_context()
+        parent_conn, child_conn = ctx.Pipe()
+        self._proc = ctx.Process(
+            target=_host_main,
+            args=(child_conn, parent_conn, self.agent_name, self.color),
+            name=f"agent-host-{self.agent_name}",
+        )
+        self._proc.start()
+        child_conn.close()
+        self._conn = parent_conn
+        self._synced = []
+        self._root_fen = None
+        _HOSTS.add(self)
+
+    def _kill(self) -> None:
+        if self._proc is not None:
+            if hasattr(os, "killpg"):
+                try:
+                    # Takes the agent's own helper processes down as well.
+                    os.killpg(self._proc.pid, signal.SIGKILL)
+                except (ProcessLookupError, PermissionError):
+                    pass  # group not created yet or already gone
+            if self._proc.is_alive():
+                self._proc.kill()
+            self._proc.join(timeout=1.0)
+        if self._conn is not None:
+            self._conn.close()
+        self._proc = None
+        self._conn = None
+
+    def _sync_message(self, board: chess.Board, cpu_s: Optional[float]) -> Tuple:
+        stack = board.move_stack
+        root_fen = board.root().fen()
+        n = len(self._synced)
+        if root_fen == self._root_fen and stack[:n] == self._synced:
+            return ("go", [m.uci() for m in stack[n:]], cpu_s)
+        self._conn.send(("new", root_fen, [m.uci() for m in stack]))
+        self._root_fen = root_fen
+        return ("go", [], cpu_s)
+
+    # ------------------------------------------------------------------
+    def choose_move(
+        self, board: chess.Board, timeout_s: Optional[float] = None
+    ) -> Tuple[Optional[chess.Move], float, str, Optional[str]]:
+        """Ask the agent for a move on ``board``.
+
+        Returns ``(move, elapsed_s, kind, error)`` where ``kind`` is
+        ``"ok"``, ``"timeout"`` or ``"agent_error"``.  On a wall-clock
+        timeout the child is killed and respawned on the next call.
+        """
+        if self._proc is None or not self._proc.is_alive():
+            if self._proc is not None:
+                self.restarts += 1
+                self._kill()
+            self._spawn()
+
+        cpu_s = None
+        if timeout_s is not None and self.cpu_factor is not None:
+            cpu_s = max(1.0, timeout_s * self.cpu_factor)
+        t0 = time.monotonic()
+        try:
+            self._conn.send(self._sync_message(board, cpu_s))
+            ready = self._conn.poll(timeout_s)
+        except (BrokenPipeError, EOFError, OSError) as exc:
+            self._kill()
+            return None, time.monotonic() - t0, "agent_error", f"{type(exc).__name__}: {exc}"
+        if not ready:
+            elapsed = time.monotonic() - t0
+            logger.warning("Agent %s exceeded %.2fs; restarting its host", self.agent_name, timeout_s)
+            self._kill()
+            self.restarts += 1
+            return None, elapsed, "timeout", None
+        try:
+            status, payload = self._conn.recv()
+        except EOFError:  # child died mid-move
+            self._kill()
+            return None, time.monotonic() - t0, "agent_error", "agent host exited"
+        elapsed = time.monotonic() - t0
+        self._synced = list(board.move_stack)
+        if status == "ok":
+            return (chess.Move.from_uci(payload) if payload else None), elapsed, "ok", None
+        if status == "cpu":
+            self._kill()
+            self.restarts += 1
+            return None, elapsed, "timeout", None
+        return None, elapsed, "agent_error", payload
+
+    def close(self) -> None:
+        """Stop the child process."""
+        if self._conn is not None:
+            try:
+                self._conn.send(("quit",))
+            except (BrokenPipeError, OSError):
+                pass
+        if self._proc is not None:
+            self._proc.join(timeout=1.0)
+        self._kill()
+        _HOSTS.discard(self)
+
+    def __enter__(self) -> "AgentHost":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+
+_HOSTS: "weakref.WeakSet[AgentHost]" = weakref.WeakSet()
+
+
+def shutdown_hosts() -> None:
+    """Close every live :class:`AgentHost`."""
+    for host in list(_HOSTS):
+        host.close()
+
+
+atexit.register(shutdown_hosts)
+
+
+__all__ = ["AgentHost", "shutdown_hosts"]
@@ -0,0 +1,283 @@
+"""Worker processes running :class:`~chess_ai.dynamic_bot.DynamicBot` sub-agents.
+
+The sub-agents are pure Python and CPU bound, so threads would serialise on
+the GIL.  :class:`AgentPool` instead keeps a fixed number of persistent
+worker processes (by default one per agent).  Agents are dealt round-robin
+to the workers, and each worker is pre-warmed with its own copy of its agents
+(and a reusable :class:`~core.evaluator.Evaluator`).  :meth:`AgentPool.run`
+hands every worker the current position at once; a worker runs its agents in
+turn and answers after each one, and an agent's deadline runs from the moment
+its worker starts on it.  A worker that misses a deadline cannot be
+interrupted cooperatively; it is killed and replaced by a fresh one, which
+carries on with the agents still waiting, so a runaway agent never delays
+the next move.
+
+Boards travel as the root FEN plus the moves played since so that repetition
+history survives the trip.  Agent instances are inherited by ``fork`` or
+pickled for ``spawn``; either way each worker has its own copy, so agent
+state mutated while choosing a move is not shared with the parent.
+
+Protocol (tuples pickled over a :func:`multiprocessing.Pipe`)::
+
+    parent -> worker   ("go", fen, [uci, ...], context, debug, [name, ...])
+                       ("quit",)
+    worker -> parent   (name, uci | None, confidence, latency_ms, error | None)
+                       once per requested agent, in order
+"""
+
+from __future__ import annotations
+
+import atexit
+import logging
+logger = logging.getLogger(__name__)
+
+import multiprocessing as mp
+import time
+import weakref
+from dataclasses import dataclass
+from multiprocessing.connection import wait
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import chess
+
+from core.evaluator import Evaluator
+
+
+@dataclass
+class AgentResult:
+    """Outcome of one sub-agent for one move."""
+
+    name: str
+    move: Optional[chess.Move]
+    confidence: float
+    latency_ms: float
+    late: bool = False
+    error: Optional[str] = None
+
+
+def _run_agent(agent, evaluator: Evaluator, fen: str, moves: List[str], context, debug: bool):
+    """Return ``(uci, confidence, latency_ms, error)`` for one move."""
+    start = time.perf_counter()
+    try:
+        board = chess.Board(fen)
+        for uci in moves:
+            board.push_uci(uci)
+        evaluator.board = board
+        if debug:
+            move, conf = agent.choose_move(board, context=context, evaluator=evaluator, debug=True)
+        else:
+            move, conf = agent.choose_move(board, context=context, evaluator=evaluator)
+        uci = move.uci() if move is not None else None
+        return uci, float(conf or 0.0), (time.perf_counter() - start) * 1000, None
+    except Exception as exc:  # report instead of killing the worker
+        return None, 0.0, (time.perf_counter() - start) * 1000, repr(exc)
+
+
+def _worker_main(conn, parent_end, agents) -> None:
+    """Worker loop: answer move requests for the agents it owns."""
+    # Drop the inherited parent end so a dead parent shows up as EOF.
+    parent_end.close()
+    evaluator = Evaluator(chess.Board())
+    by_name = {name: agent for agent, name in agents}
+    while True:
+        try:
+            msg = conn.recv()
+        except EOFError:
+            break
+        if msg[0] == "quit":
+            break
+        _, fen, moves, context, debug, names = msg
+        for name in names:
+            try:
+                conn.send((name,) + _run_agent(by_name[name], evaluator, fen, moves, context, debug))
+            except Exception as exc:  # unpicklable result, ...
+                conn.send((name, None, 0.0, 0.0, repr(exc)))
+
+
+class _Worker:
+    """Killable child process owning a group of agents."""
+
+    def __init__(self, agents: Sequence[Tuple[object, str]], index: int) -> None:
+        self.agents = list(agents)
+        self.names = [name for _, name in agents]
+        self.index = index
+        self.proc: Optional[mp.process.BaseProcess] = None
+        self.conn = None
+
+    def alive(self) -> bool:
+        return self.proc is not None and self.proc.is_alive()
+
+    def spawn(self) -> None:
+        ctx = mp.get_context()
+        parent_conn, child_conn = ctx.Pipe()
+        # Not daemonic: agents may start processes of their own.
+        self.proc = ctx.Process(
+            target=_worker_main,
+            args=(child_conn, parent_conn, self.agents),
+            name=f"dynamic-agent-{self.index}-{'+'.join(self.names)}",
+        )
+        self.proc.start()
+        child_conn.close()
+        self.conn = parent_conn
+
+    def kill(self) -> None:
+        if self.proc is not None:
+            if self.proc.is_alive():
+                self.proc.kill()
+            self.proc.join(timeout=1.0)
+        if self.conn is not None:
+            self.conn.close()
+        self.proc = None
+        self.conn = None
+
+    def stop(self) -> None:
+        if self.conn is not None:
+            try:
+                self.conn.send(("quit",))
+            except (BrokenPipeError, OSError):
+                pass
+        if self.proc is not None:
+            self.proc.join(timeout=1.0)
+        self.kill()
+
+
+class AgentPool:
+    """Persistent worker processes running pre-warmed sub-agents.
+
+    ``workers`` caps the number of processes (default and maximum: one per
+    agent); agents are dealt to them round-robin.  ``restarts`` counts
+    workers replaced after missing a deadline or exiting unexpectedly.
+    """
+
+    def __init__(self, agents: Sequence[Tuple[object, str]], workers: Optional[int] = None) -> None:
+        if not agents:
+            raise ValueError("AgentPool needs at least one agent")
+        self.names = [name for _, name in agents]
+        self.restarts = 0
+        n = len(agents) if workers is None else max(1, min(int(workers), len(agents)))
+        self._workers = [_Worker(agents[i::n], i) for i in range(n)]
+        for worker in self._workers:
+            worker.spawn()
+        self._closed = False
+        _POOLS.add(self)
+
+    @property
+    def workers(self) -> int:
+        return len(self._workers)
+
+    def _replace(self, worker: _Worker) -> None:
+        worker.kill()
+        worker.spawn()
+        self.restarts += 1
+
+    def run(
+        self,
+        board: chess.Board,
+        context=None,
+        *,
+        timeouts: Dict[str, float],
+        default_timeout: float,
+        debug: bool = False,
+    ) -> Dict[str, AgentResult]:
+        """Run every agent on ``board`` and return their results by name.
+
+        ``timeouts`` maps agent names to deadlines in seconds, measured from
+        the moment the agent's worker starts on it (when the position is sent
+        or the worker's previous agent answers); agents without an entry use
+        ``default_timeout``.  Late agents are returned with ``late=True`` and
+        no move, and their worker is restarted to run its remaining agents.
+        """
+        if self._closed:
+            raise RuntimeError("AgentPool is closed")
+
+        fen = board.root().fen()
+        moves = [m.uci() for m in board.move_stack]
+        results: Dict[str, AgentResult] = {}
+        # conn -> (worker, agents still to answer, start and deadline of the first)
+        pending: Dict[object, Tuple[_Worker, List[str], float, float]] = {}
+
+        def deadline_for(name: str, start: float) -> float:
+            return start + timeouts.get(name, default_timeout)
+
+        def dispatch(worker: _Worker, names: List[str]) -> None:
+            if not names:
+                return
+            if not worker.alive():
+                self._replace(worker)
+            try:
+                worker.conn.send(("go", fen, moves, context, debug, names))
+            except (BrokenPipeError, OSError) as exc:
+                self._replace(worker)
+                for name in names:
+                    results[name] = AgentResult(name, None, 0.0, 0.0, error=repr(exc))
+                return
+            start = time.monotonic()
+            pending[worker.conn] = (worker, names, start, deadline_for(names[0], start))
+
+        for worker in self._workers:
+            dispatch(worker, list(worker.names))
+
+        while pending:
+            now = time.monotonic()
+            for conn, (worker, names, start, deadline) in list(pending.items()):
+                if deadline <= now and not conn.poll():
+                    del pending[conn]
+                    name = names[0]
+                    results[name] = AgentResult(name, None, 0.0, (now - start) * 1000, late=True)
+                    logger.warning("DynamicBot agent %s missed its %.0f ms deadline; restarting its worker",
+                                   name, (deadline - start) * 1000)
+                    self._replace(worker)
+                    dispatch(worker, names[1:])
+            if not pending:
+                break
+            next_deadline = min(deadline for _, _, _, deadline in pending.values())
+            for conn in wait(list(pending), timeout=max(0.0, next_deadline - time.monotonic())):
+                worker, names, start, _ = pending.pop(conn)
+                name = names[0]
+                try:
+                    _, uci, conf, latency_ms, error = conn.recv()
+                except (EOFError, OSError):  # worker died mid-move
+                    uci, conf, latency_ms = None, 0.0, (time.monotonic() - start) * 1000
+                    error = "agent worker exited"
+                    self._replace(worker)
+                    dispatch(worker, names[1:])
+                else:
+                    rest = names[1:]
+                    if rest:
+                        now = time.monotonic()
+                        pending[conn] = (worker, rest, now, deadline_for(rest[0], now))
+                if error is not None:
+                    logger.warning("DynamicBot agent %s failed: %s", name, error)
+                move = chess.Move.from_uci(uci) if uci is not None else None
+                results[name] = AgentResult(name, move, conf, latency_ms, error=error)
+        return results
+
+    def close(self) -> None:
+        """Stop the worker processes, killing any that are still busy."""
+        if self._closed:
+            return
+        self._closed = True
+        for worker in self._workers:
+            worker.stop()
+        _POOLS.discard(self)
+
+    def __enter__(self) -> "AgentPool":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+
+_POOLS: "weakref.WeakSet[AgentPool]" = weakref.WeakSet()
+
+
+def shutdown_pools() -> None:
+    """Close every live :class:`AgentPool`."""
+    for pool in list(_POOLS):
+        pool.close()
+
+
+atexit.register(shutdown_pools)
+
+
+__all__ = ["AgentPool", "AgentResult", "shutdown_pools"]
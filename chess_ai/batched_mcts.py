@@ -12,15 +12,16 @@ sufficient for unit tests and simple experimentation.
 
 from __future__ import annotations
 
-from dataclasses import dataclass, field
-import math
 import logging
 logger = logging.getLogger(__name__)
 
 import random
-from typing import Dict, Iterable, List, Optional, Tuple
+from typing import List, Optional, Tuple
 
 import chess
+import numpy as np
+
+from .mcts_tree import TreeNode
 
 
 # ---------------------------------------------------------------------------
@@ -37,26 +38,9 @@ def _dirichlet(alpha: float, size: int) -> List[float]:
     return [v / s for v in samples]
 
 
-@dataclass
-class Node:
-    """Node in the search tree."""
-
-    board: chess.Board
-    parent: Optional["Node"] = None
-    prior: float = 0.0
-    children: Dict[chess.Move, "Node"] = field(default_factory=dict)
-    n: int = 0  # visit count
-    w: float = 0.0  # total value
-
-    # ------------------------------------------------------------------
-    def q(self) -> float:
-        return self.w / self.n if self.n else 0.0
-
-    # ------------------------------------------------------------------
-    def u(self, c_puct: float) -> float:
-        if self.parent is None:
-            return self.q()
-        return self.q() + c_puct * self.prior * math.sqrt(self.parent.n) / (1 + self.n)
+# The tree is array backed (see :mod:`chess_ai.mcts_tree`); ``Node(board)``
+# creates a new tree and returns a view of its root.
+Node = TreeNode
 
 
 # ---------------------------------------------------------------------------
@@ -73,14 +57,17 @@ class BatchedMCTS:
         c_puct: float = 1.4,
         dirichlet_alpha: float = 0.3,
         epsilon: float = 0.25,
+        virtual_loss: float = 1.0,
     ) -> None:
         self.net = net
         self.c_puct = c_puct
         self.dirichlet_alpha = dirichlet_alpha
         self.epsilon = epsilon
+        # Value charged per pending visit while a batch is being collected.
+        self.virtual_loss = virtual_loss
 
     # ------------------------------------------------------------------
-    def _expand(self, node: Node, board: chess.Board, add_dirichlet: bool) -> None:
+    def _expand(self, node: Node, board: chess.Board) -> None:
         """Expand ``node`` using network policy on ``board``."""
         legal = list(board.legal_moves)
         if not legal:
@@ -92,15 +79,7 @@ class BatchedMCTS:
             priors = [1.0 / len(legal)] * len(legal)
         else:
             priors = [p / total for p in priors]
-        if add_dirichlet:
-            noise = _dirichlet(self.dirichlet_alpha, len(legal))
-            priors = [
-                (1 - self.epsilon) * p + self.epsilon * n for p, n in zip(priors, noise)
-            ]
-        for move, prior in zip(legal, priors):
-            nb = board.copy()
-            nb.push(move)
-            node.children[move] = Node(nb, node, prior)
+        node.tree.expand(node.idx, legal, priors)
 
     # ------------------------------------------------------------------
     def search_batch(
@@ -114,7 +93,9 @@ class BatchedMCTS:
         """Run MCTS starting from ``root``.
 
         Returns the selected move from ``root`` and the root itself.  ``root``
-        must already contain the current board state.
+        must already contain the current board state.  Calling this again
+        with the same root continues the search; use :meth:`advance` to reuse
+        the tree after a move has been played.
         """
 
         logger.info(
@@ -125,44 +106,52 @@ class BatchedMCTS:
             temperature,
             self.c_puct,
         )
-        board = root.board
+        tree = root.tree
+        tree.virtual_loss = self.virtual_loss
+        board = tree.board
         legal = list(board.legal_moves)
         if not legal:
             return None, root
         # Expand root on first call
-        if not root.children:
-            self._expand(root, board, add_dirichlet)
+        if not tree.is_expanded(0):
+            self._expand(root, board)
+        # Root priors are rebuilt from the clean network priors on every
+        # call, so a reused root gets fresh noise instead of none (or the
+        # noise of an earlier search).
+        start, end = tree.child_range(0)
+        if add_dirichlet:
+            noise = np.asarray(_dirichlet(self.dirichlet_alpha, end - start))
+            tree.prior[start:end] = (1 - self.epsilon) * tree.prior_raw[start:end] + self.epsilon * noise
+        else:
+            tree.prior[start:end] = tree.prior_raw[start:end]
 
         sims_done = 0
         while sims_done < n_simulations:
-            batch: List[Node] = []
             batch_boards: List[chess.Board] = []
-            batch_paths: List[List[Node]] = []
+            batch_paths: List[List[int]] = []
             # ----------------------------------------------------------
             while (
-                len(batch) < batch_size
-                and sims_done + len(batch) < n_simulations
+                len(batch_paths) < batch_size
+                and sims_done + len(batch_paths) < n_simulations
             ):
-                node = root
+                node = 0
                 b = board.copy()
                 path = [node]
-                # Selection
-                while node.children:
-                    move, node = max(
-                        node.children.items(), key=lambda kv: kv[1].u(self.c_puct)
-                    )
-                    b.push(move)
+                # Selection: replay moves from the root onto ``b``
+                while tree.is_expanded(node):
+                    node = tree.select_child(node, self.c_puct)
+                    b.push(tree.move(node))
                     path.append(node)
-                batch.append(node)
+                tree.add_virtual_loss(path)
                 batch_boards.append(b)
                 batch_paths.append(path)
             # ----------------------------------------------------------
             policies_values = self.net.predict_many(batch_boards)
-            for leaf, (policy, value), path, b in zip(
-                batch, policies_values, batch_paths, batch_boards
-            ):
-                # Expansion of leaf
-                if not b.is_game_over():
+            for (policy, value), path, b in zip(policies_values, batch_paths, batch_boards):
+                tree.revert_virtual_loss(path)
+                leaf = path[-1]
+                # Expansion of leaf (once, even if the batch selected it twice)
+                if not tree.is_expanded(leaf) and not b.is_game_over():
                     legal_moves = list(b.legal_moves)
                     priors = [policy.get(m, 0.0) for m in legal_moves]
                     tot = sum(priors)
@@ -170,28 +159,36 @@ class BatchedMCTS:
                         priors = [1.0 / len(legal_moves)] * len(legal_moves)
                     else:
                         priors = [p / tot for p in priors]
-                    for m, p in zip(legal_moves, priors):
-                        nb = b.copy()
-                        nb.push(m)
-                        leaf.children[m] = Node(nb, leaf, p)
-                # Backup
-                for node in reversed(path):
-                    node.n += 1
-                    node.w += value
-                    value = -value
-            sims_done += len(batch)
+                    tree.expand(leaf, legal_moves, priors)
+                tree.backup(path, value)
+            sims_done += len(batch_paths)
 
         # --------------------------------------------------------------
         # Choose move from root based on visit counts
+        start, end = tree.child_range(0)
+        moves = [m for m, _ in tree.children(0)]
+        visits = tree.visits[start:end]
         if temperature <= 1e-3:
-            move = max(root.children.items(), key=lambda kv: kv[1].n)[0]
+            move = moves[int(np.argmax(visits))]
         else:
-            visits = [child.n ** (1.0 / temperature) for child in root.children.values()]
-            s = sum(visits)
-            probs = [v / s for v in visits]
-            move = random.choices(list(root.children.keys()), weights=probs, k=1)[0]
+            weights = visits.astype(np.float64) ** (1.0 / temperature)
+            if weights.sum() > 0:
+                move = random.choices(moves, weights=weights.tolist(), k=1)[0]
+            else:
+                move = random.choice(moves)
         return move, root
 
+    # ------------------------------------------------------------------
+    @staticmethod
+    def advance(root: Node, move: chess.Move) -> Node:
+        """Re-root the tree of ``root`` at the child reached by ``move``.
+
+        Statistics of that subtree are kept for the next :meth:`search_batch`
+        call; the rest of the tree is discarded.
+        """
+        root.tree.reroot(move)
+        return Node(tree=root.tree)
+
 
 # ---------------------------------------------------------------------------
 # One-shot helper
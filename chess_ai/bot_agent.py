@@ -9,26 +9,21 @@ bot_agent.py
 """
 
 from __future__ import annotations
-from typing import Optional, Tuple, Dict, Any, List, Callable, Set
+from typing import Optional, Tuple, Dict, Any, List, Callable, Set, TYPE_CHECKING
+from dataclasses import dataclass
+import importlib
 import random
 import os
+import sys
+import time
 import chess
 
 import logging
 logger = logging.getLogger(__name__)
 
-from core.evaluator import Evaluator
-from utils import GameContext
-
-try:
-    from .hybrid_bot import HybridOrchestrator  # type: ignore
-except Exception:  # pragma: no cover - optional dependency
-    HybridOrchestrator = None  # type: ignore
-
-try:
-    from .enhanced_dynamic_bot import EnhancedDynamicBot  # type: ignore
-except Exception:  # pragma: no cover - optional dependency
-    EnhancedDynamicBot = None  # type: ignore
+if TYPE_CHECKING:  # runtime imports are deferred to first use
+    from core.evaluator import Evaluator
+    from utils import GameContext
 
 __all__ = [
     "BotAgent",
@@ -51,104 +46,87 @@ __all__ = [
 ]
 
 
-# ---------- Fallback-и на випадок відсутності реальних модулів ----------
-try:
-    from .chess_bot import ChessBot  # type: ignore
-except Exception:
-    class ChessBot:
-        def __init__(self, color: bool):
-            self.color = color
-
-        def choose_move(
-            self,
-            board: chess.Board,
-            context: GameContext | None = None,
-            evaluator: Evaluator | None = None,
-            debug: bool = True,
-        ):
-            moves = list(board.legal_moves)
-            m = random.choice(moves) if moves else None
-            return m, "CENTER | ChessBot(STUB): random"
-
-try:
-    from .endgame_bot import EndgameBot  # type: ignore
-except Exception:
-    class EndgameBot:
-        def __init__(self, color: bool):
-            self.color = color
-
-        def choose_move(
-            self,
-            board: chess.Board,
-            context: GameContext | None = None,
-            evaluator: Evaluator | None = None,
-            debug: bool = True,
-        ):
-            moves = list(board.legal_moves)
-            m = random.choice(moves) if moves else None
-            return m, "ENDGAME | EndgameBot(STUB): random"
-
-try:
-    from .random_bot import RandomBot  # type: ignore
-except Exception:
-    class RandomBot:
-        def __init__(self, color: bool):
-            self.color = color
-
-        def choose_move(
-            self,
-            board: chess.Board,
-            context: GameContext | None = None,
-            evaluator: Evaluator | None = None,
-            debug: bool = True,
-        ):
-            moves = list(board.legal_moves)
-            m = random.choice(moves) if moves else None
-            return m, "LOW | RandomBot(STUB): random"
-
-try:
-    from .piece_mate_bot import PieceMateBot, HeatmapManipulator  # type: ignore
-except Exception:
-    class PieceMateBot:
-        def __init__(self, color: bool, **kwargs):
-            self.color = color
-        def choose_move(
-            self,
-            board: chess.Board,
-            context: GameContext | None = None,
-            evaluator: Evaluator | None = None,
-            debug: bool = True,
-        ):
-            moves = list(board.legal_moves)
-            m = random.choice(moves) if moves else None
-            return m, "PIECE_MATE(STUB): random"
-
-try:
-    from .king_value_bot import KingValueBot  # type: ignore
-except Exception:  # pragma: no cover - optional dependency
-    class KingValueBot(ChessBot):
-        def choose_move(
-            self,
-            board: chess.Board,
-            context: GameContext | None = None,
-            evaluator: Evaluator | None = None,
-            debug: bool = True,
-        ):
-            return super().choose_move(board, context, evaluator, debug)
-
-# Optional UCI engine-backed bot (Stockfish)
-try:
-    from .stockfish_bot import StockfishBot  # type: ignore
-except Exception:  # pragma: no cover - environments without engine
-    class StockfishBot(ChessBot):  # type: ignore
-        def choose_move(
-            self,
-            board: chess.Board,
-            context: GameContext | None = None,
-            evaluator: Evaluator | None = None,
-            debug: bool = True,
-        ):
-            return super().choose_move(board, context, evaluator, debug)
+# ---------- Ліниві імпорти ботів з окремих модулів ----------
+# Модулі ботів (і їхні numpy/matplotlib/R-залежності) імпортуються лише при
+# першому зверненні до імені: через ``_lazy(name)`` у цьому файлі або як
+# атрибут модуля (``from chess_ai.bot_agent import ChessBot``).  Якщо модуль
+# недоступний — підставляється заглушка з ``_FALLBACKS``.
+_LAZY_EXPORTS: Dict[str, Tuple[str, str]] = {
+    "HybridOrchestrator": (".hybrid_bot", "HybridOrchestrator"),
+    "EnhancedDynamicBot": (".enhanced_dynamic_bot", "EnhancedDynamicBot"),
+    "ChessBot":           (".chess_bot", "ChessBot"),
+    "EndgameBot":         (".endgame_bot", "EndgameBot"),
+    "RandomBot":          (".random_bot", "RandomBot"),
+    "PieceMateBot":       (".piece_mate_bot", "PieceMateBot"),
+    "HeatmapManipulator": (".piece_mate_bot", "HeatmapManipulator"),
+    "KingValueBot":       (".king_value_bot", "KingValueBot"),
+    "StockfishBot":       (".stockfish_bot", "StockfishBot"),
+}
+
+
+class _RandomStub:
+    """Заглушка: випадковий легальний хід з позначкою в reason."""
+    reason = "STUB: random"
+
+    def __init__(self, color: bool, **kwargs):
+        self.color = color
+
+    def choose_move(
+        self,
+        board: chess.Board,
+        context: GameContext | None = None,
+        evaluator: Evaluator | None = None,
+        debug: bool = True,
+    ):
+        moves = list(board.legal_moves)
+        m = random.choice(moves) if moves else None
+        return m, self.reason
+
+
+def _stub(reason: str) -> type:
+    return type("Stub", (_RandomStub,), {"reason": reason})
+
+
+_FALLBACKS: Dict[str, Callable[[], Any]] = {
+    "HybridOrchestrator": lambda: None,
+    "EnhancedDynamicBot": lambda: None,
+    "ChessBot":           lambda: _stub("CENTER | ChessBot(STUB): random"),
+    "EndgameBot":         lambda: _stub("ENDGAME | EndgameBot(STUB): random"),
+    "RandomBot":          lambda: _stub("LOW | RandomBot(STUB): random"),
+    "PieceMateBot":       lambda: _stub("PIECE_MATE(STUB): random"),
+    "HeatmapManipulator": lambda: _stub("PIECE_MATE(STUB): random"),
+    # як і раніше: без власного модуля ці боти грають як ChessBot
+    "KingValueBot":       lambda: _lazy("ChessBot"),
+    "StockfishBot":       lambda: _lazy("ChessBot"),
+}
+
+# Час (с) і кількість нових модулів sys.modules для кожного лінивого імпорту.
+IMPORT_TIMES: Dict[str, Tuple[float, int]] = {}
+
+
+def _lazy(name: str) -> Any:
+    """Повернути клас ``name``, імпортувавши його модуль при першому виклику."""
+    try:
+        return globals()[name]
+    except KeyError:
+        pass
+    module, attr = _LAZY_EXPORTS[name]
+    before = len(sys.modules)
+    t0 = time.perf_counter()
+    try:
+        obj = getattr(importlib.import_module(module, __package__), attr)
+    except Exception as exc:
+        logger.debug("Lazy import of %s failed (%s); using fallback", name, exc)
+        obj = _FALLBACKS[name]()
+    IMPORT_TIMES[name] = (time.perf_counter() - t0, len(sys.modules) - before)
+    globals()[name] = obj
+    return obj
+
+
+def __getattr__(name: str) -> Any:
+    if name in _LAZY_EXPORTS:
+        return _lazy(name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 
 class HybridBot:
@@ -163,10 +141,11 @@ class HybridBot:
         lam: float = 0.5,
     ) -> None:
         self.color = color
-        if HybridOrchestrator is None:
+        orchestrator = _lazy("HybridOrchestrator")
+        if orchestrator is None:
             self.impl = None
         else:
-            self.impl = HybridOrchestrator(
+            self.impl = orchestrator(
                 color,
                 ab_depth=ab_depth,
                 mcts_simulations=mcts_simulations,
@@ -784,9 +763,9 @@ class DynamicBot:
       8) Center
     """
     def __init__(self, color: bool):
-        self.center   = ChessBot(color)
-        self.endgame  = EndgameBot(color)
-        self.random   = RandomBot(color)
+        self.center   = _lazy("ChessBot")(color)
+        self.endgame  = _lazy("EndgameBot")(color)
+        self.random   = _lazy("RandomBot")(color)
         self.aggressive = AggressiveBot(color)
         self.fortify  = FortifyBot(color)
         self.cow      = CowOpeningPlanner(color)
@@ -802,6 +781,9 @@ class DynamicBot:
         evaluator: Evaluator | None = None,
         debug: bool = False,
     ):
+        from core.evaluator import Evaluator
+        from utils import GameContext
+
         evaluator = evaluator or self._evaluator
         if evaluator is None:
             evaluator = self._evaluator = Evaluator(board)
@@ -991,7 +973,7 @@ def _just_move(ret):
 class BotAgent:
     """Відповідає «CenterBot (новий)» у вашому UI — центр-стратегія."""
     def __init__(self, color: bool, **kwargs):
-        self.impl = ChessBot(color)
+        self.impl = _lazy("ChessBot")(color)
     def choose_move(self, board: chess.Board):
         return _just_move(self.impl.choose_move(board, debug=False))
 
@@ -1002,21 +984,21 @@ class BotAgentLegacy:
             from .legacy_bot import LegacyBot  # type: ignore
             self.impl = LegacyBot(color)
         except Exception:
-            self.impl = ChessBot(color)
+            self.impl = _lazy("ChessBot")(color)
     def choose_move(self, board: chess.Board):
         return _just_move(self.impl.choose_move(board, debug=False))
 
 class BotAgentRandom:
     """RandomBot у UI."""
     def __init__(self, color: bool, **kwargs):
-        self.impl = RandomBot(color)
+        self.impl = _lazy("RandomBot")(color)
     def choose_move(self, board: chess.Board):
         return _just_move(self.impl.choose_move(board, debug=False))
 
 class BotAgentEndgame:
     """EndgameBot у UI."""
     def __init__(self, color: bool, **kwargs):
-        self.impl = EndgameBot(color)
+        self.impl = _lazy("EndgameBot")(color)
     def choose_move(self, board: chess.Board):
         return _just_move(self.impl.choose_move(board, debug=False))
 
@@ -1052,28 +1034,52 @@ class _MoveOnlyAdapter:
     def get_last_reason(self) -> str:
         return self._last_reason
 
-def _factory(cls) -> Callable[[bool], _MoveOnlyAdapter]:
-    return lambda color: _MoveOnlyAdapter(cls(color))
-
-AGENT_FACTORY_BY_EXPORT: Dict[str, Callable[[bool], object]] = {
-    "BotAgent":          lambda color: BotAgent(color),
-    "BotAgentLegacy":    lambda color: BotAgentLegacy(color),
-    "BotAgentRandom":    lambda color: BotAgentRandom(color),
-    "BotAgentEndgame":   lambda color: BotAgentEndgame(color),
-    "BotAgentDynamic":   lambda color: BotAgentDynamic(color),
-    "DynamicBot":        _factory(DynamicBot),
-    "EnhancedDynamicBot": _factory(EnhancedDynamicBot) if EnhancedDynamicBot else _factory(DynamicBot),
-    "FortifyBot":        _factory(FortifyBot),
-    "AggressiveBot":     _factory(AggressiveBot),
-    "PieceMateBot":      _factory(PieceMateBot),
-    "HybridBot":         _factory(HybridBot),
-    "KingValueBot":     _factory(KingValueBot),
-    "StockfishBot":      _factory(StockfishBot),
-    "ChessBot":          _factory(ChessBot),
-    "EndgameBot":        _factory(EndgameBot),
-    "RandomBot":         _factory(RandomBot),
-    "HeatmapManipulator": _factory(HeatmapManipulator),
-}
+@dataclass(frozen=True)
+class AgentEntryPoint:
+    """Лінива точка входу агента: модуль бота імпортується лише в ``load()``.
+
+    ``target`` — ім’я класу (з ``_LAZY_EXPORTS`` або визначеного тут);
+    ``adapt`` — обгорнути у :class:`_MoveOnlyAdapter`; ``fallback`` — клас
+    на випадок, коли ``target`` недоступний (резолвиться в ``None``).
+    """
+    name: str
+    target: str
+    adapt: bool = True
+    fallback: Optional[str] = None
+
+    def load(self) -> Callable[[bool], Any]:
+        cls = _lazy(self.target) if self.target in _LAZY_EXPORTS else globals()[self.target]
+        if cls is None and self.fallback:
+            cls = globals()[self.fallback]
+        return cls
+
+    def __call__(self, color: bool):
+        bot = self.load()(color)
+        return _MoveOnlyAdapter(bot) if self.adapt else bot
+
+
+AGENT_REGISTRY: Dict[str, AgentEntryPoint] = {ep.name: ep for ep in (
+    AgentEntryPoint("BotAgent", "BotAgent", adapt=False),
+    AgentEntryPoint("BotAgentLegacy", "BotAgentLegacy", adapt=False),
+    AgentEntryPoint("BotAgentRandom", "BotAgentRandom", adapt=False),
+    AgentEntryPoint("BotAgentEndgame", "BotAgentEndgame", adapt=False),
+    AgentEntryPoint("BotAgentDynamic", "BotAgentDynamic", adapt=False),
+    AgentEntryPoint("DynamicBot", "DynamicBot"),
+    AgentEntryPoint("EnhancedDynamicBot", "EnhancedDynamicBot", fallback="DynamicBot"),
+    AgentEntryPoint("FortifyBot", "FortifyBot"),
+    AgentEntryPoint("AggressiveBot", "AggressiveBot"),
+    AgentEntryPoint("PieceMateBot", "PieceMateBot"),
+    AgentEntryPoint("HybridBot", "HybridBot"),
+    AgentEntryPoint("KingValueBot", "KingValueBot"),
+    AgentEntryPoint("StockfishBot", "StockfishBot"),
+    AgentEntryPoint("ChessBot", "ChessBot"),
+    AgentEntryPoint("EndgameBot", "EndgameBot"),
+    AgentEntryPoint("RandomBot", "RandomBot"),
+    AgentEntryPoint("HeatmapManipulator", "HeatmapManipulator"),
+)}
+
+# Сумісність: точки входу самі є фабриками ``color -> agent``.
+AGENT_FACTORY_BY_EXPORT: Dict[str, Callable[[bool], object]] = AGENT_REGISTRY
 
 def get_agent_names() -> List[str]:
     """Список назв для випадашок (рівно як у __all__)."""
@@ -1085,3 +1091,86 @@ def make_agent(name: str, color: bool):
     if factory is None:
         return _MoveOnlyAdapter(DynamicBot(color))
     return factory(color)
+
+
+# ---------- Профіль імпорту (--import-profile) ----------
+_PROFILE_SNIPPET = """
+import json, sys, time
+t0 = time.perf_counter()
+import chess_ai.bot_agent as ba
+t1 = time.perf_counter()
+n0 = len(sys.modules)
+ep = ba.AGENT_REGISTRY[sys.argv[1]]
+ep.load()
+t2 = time.perf_counter()
+n1 = len(sys.modules)
+ep(True)
+t3 = time.perf_counter()
+print(json.dumps({"base_ms": (t1 - t0) * 1e3, "import_ms": (t2 - t1) * 1e3,
+                  "modules": n1 - n0, "create_ms": (t3 - t2) * 1e3}))
+"""
+
+
+def import_profile(names: Optional[List[str]] = None) -> List[Dict[str, Any]]:
+    """Виміряти вартість імпорту кожного агента у свіжому інтерпретаторі.
+
+    Для кожного імені: час імпорту ``chess_ai.bot_agent`` (``base_ms``),
+    імпорту модуля агента (``import_ms``, ``modules`` — скільки модулів
+    додалося) і створення екземпляра (``create_ms``) — саме це платить
+    кожен процес-воркер турніру.
+    """
+    import json
+    import subprocess
+    from pathlib import Path
+
+    root = str(Path(__file__).resolve().parents[1])
+    env = dict(os.environ)
+    env["PYTHONPATH"] = os.pathsep.join(filter(None, [root, env.get("PYTHONPATH")]))
+    rows: List[Dict[str, Any]] = []
+    for name in names or list(AGENT_REGISTRY):
+        proc = subprocess.run(
+            [sys.executable, "-c", _PROFILE_SNIPPET, name],
+            cwd=root, env=env, capture_output=True, text=True,
+        )
+        row: Dict[str, Any] = {"agent": name}
+        try:
+            row.update(json.loads(proc.stdout.strip().splitlines()[-1]))
+        except (IndexError, ValueError):
+            row["error"] = (proc.stderr.strip().splitlines() or ["no output"])[-1]
+        rows.append(row)
+    return rows
+
+
+def format_import_profile(rows: List[Dict[str, Any]]) -> str:
+    """Таблиця для друку результату :func:`import_profile`."""
+    lines = [f"{'agent':<20} {'base ms':>8} {'import ms':>10} {'modules':>8} {'create ms':>10}"]
+    for row in sorted(rows, key=lambda r: -r.get("import_ms", float("inf"))):
+        if "error" in row:
+            lines.append(f"{row['agent']:<20} ERROR: {row['error']}")
+            continue
+        lines.append(
+            f"{row['agent']:<20} {row['base_ms']:>8.1f} {row['import_ms']:>10.1f} "
+            f"{row['modules']:>8d} {row['create_ms']:>10.1f}"
+        )
+    return "\n".join(lines)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Agent registry tools")
+    parser.add_argument("--import-profile", action="store_true",
+                        help="Report per-agent import cost, each agent in a fresh interpreter")
+    parser.add_argument("--agents", type=str, default="",
+                        help="Comma-separated agent names (default: all)")
+    args = parser.parse_args(argv)
+    if args.import_profile:
+        names = [a.strip() for a in args.agents.split(",") if a.strip()] or None
+        print(format_import_profile(import_profile(names)))
+        return 0
+    print("\n".join(get_agent_names()))
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
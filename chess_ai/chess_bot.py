@@ -6,7 +6,7 @@ import chess
 from core.evaluator import Evaluator
 from utils import GameContext
 from .risk_analyzer import RiskAnalyzer
-from .piece_values import dynamic_piece_value
+from .piece_values import dynamic_piece_value_at
 from core.shallow_search import ShallowSearch
 
 
@@ -43,17 +43,33 @@ def calculate_king_value(board: chess.Board, color: chess.Color | None = None) -
     if color is None:
         color = board.turn
 
-    value = (
-        8 * len(board.pieces(chess.PAWN, color))
-        + 2 * len(board.pieces(chess.BISHOP, color))
-        + 2 * len(board.pieces(chess.KNIGHT, color))
-        + 2 * len(board.pieces(chess.ROOK, color))
-        + len(board.pieces(chess.QUEEN, color))
+    return king_value_from_counts(
+        chess.popcount(board.pieces_mask(chess.PAWN, color)),
+        chess.popcount(board.pieces_mask(chess.KNIGHT, color)),
+        chess.popcount(board.pieces_mask(chess.BISHOP, color)),
+        chess.popcount(board.pieces_mask(chess.ROOK, color)),
+        chess.popcount(board.pieces_mask(chess.QUEEN, color)),
+        bool(board.pieces_mask(chess.QUEEN, not color)),
     )
 
-    if not board.pieces(chess.QUEEN, not color):
-        value = int(value * 0.85)
 
+def king_value_from_counts(
+    pawns: int,
+    knights: int,
+    bishops: int,
+    rooks: int,
+    queens: int,
+    opponent_has_queen: bool,
+) -> int:
+    """:func:`calculate_king_value` from allied piece counts.
+
+    Evaluators that already track piece counts call this instead of
+    recounting the board.
+    """
+
+    value = 8 * pawns + 2 * bishops + 2 * knights + 2 * rooks + queens
+    if not opponent_has_queen:
+        value = int(value * 0.85)
     return value
 
 class ChessBot:
@@ -260,11 +276,11 @@ class ChessBot:
                 if target_piece.piece_type == chess.KING:
                     target_val = calculate_king_value(board, target_piece.color)
                 else:
-                    target_val = dynamic_piece_value(target_piece, board)
+                    target_val = dynamic_piece_value_at(move.to_square, target_piece, board)
                 if from_piece.piece_type == chess.KING:
                     from_val = calculate_king_value(board, from_piece.color)
                 else:
-                    from_val = dynamic_piece_value(from_piece, board)
+                    from_val = dynamic_piece_value_at(move.from_square, from_piece, board)
                 gain = target_val - from_val
                 score += gain
                 if context and context.material_diff < 0:
@@ -11,9 +11,9 @@ logger = logging.getLogger(__name__)
 import chess
 import time
 
-from core.quiescence import quiescence
+from core.quiescence import ordered_captures, quiescence
 from .risk_analyzer import RiskAnalyzer
-from .piece_values import dynamic_piece_value
+from .piece_values import dynamic_piece_value_at, dynamic_piece_values
 
 
 class DecisionEngine:
@@ -22,6 +22,10 @@ class DecisionEngine:
     The Monte Carlo equivalent lives in :class:`chess_ai.batched_mcts.BatchedMCTS`.
     """
 
+    # Captures and checks extend the search by one ply, at most this many
+    # times per line, so forcing sequences cannot keep the depth from falling.
+    MAX_EXTENSIONS = 1
+
     def __init__(self, base_depth: int = 2, material_weight: int = 2):
         """Create a new decision engine.
 
@@ -43,15 +47,25 @@ class DecisionEngine:
     def _evaluate(self, board: chess.Board) -> int:
         """Проста матеріальна оцінка позиції з точки зору гравця, який ходить."""
         score = 0
-        for _, piece in board.piece_map().items():
-            val = dynamic_piece_value(piece, board)
-            score += val if piece.color == board.turn else -val
+        for sq, val in dynamic_piece_values(board).items():
+            score += val if board.color_at(sq) == board.turn else -val
         return score * self.material_weight
 
+    @staticmethod
+    def _ordered_moves(board: chess.Board) -> list[chess.Move]:
+        """Captures first (most valuable victim, least valuable attacker), then quiet moves."""
+        captures = ordered_captures(board)
+        capture_set = set(captures)
+        return captures + [m for m in board.legal_moves if m not in capture_set]
+
     def search(self, board: chess.Board, depth: int,
                alpha: int = -float("inf"), beta: int = float("inf"),
-               deadline: float | None = None) -> int:
-        """Alpha-beta negamax search with simple selective extensions and deadline."""
+               deadline: float | None = None, extensions: int = 0) -> int:
+        """Alpha-beta negamax search with simple selective extensions and deadline.
+
+        ``extensions`` counts the extensions already spent on the current
+        line (see :attr:`MAX_EXTENSIONS`).
+        """
         if deadline is not None and time.monotonic() >= deadline:
             return self._evaluate(board)
 
@@ -63,12 +77,15 @@ class DecisionEngine:
             return quiescence(board, scaled_alpha, scaled_beta) * self.material_weight
 
         best = float("inf") * -1
-        for move in board.legal_moves:
+        for move in self._ordered_moves(board):
             if deadline is not None and time.monotonic() >= deadline:
                 break
-            extension = 1 if board.is_capture(move) or board.gives_check(move) else 0
+            extension = 0
+            if extensions < self.MAX_EXTENSIONS and (board.is_capture(move) or board.gives_check(move)):
+                extension = 1
             board.push(move)
-            score = -self.search(board, depth - 1 + extension, -beta, -alpha, deadline)
+            score = -self.search(board, depth - 1 + extension, -beta, -alpha, deadline,
+                                 extensions + extension)
             board.pop()
 
             if score > best:
@@ -138,21 +155,22 @@ class DecisionEngine:
 
         annotated: list[tuple[int, int, bool, bool, int, bool, chess.Move]] = []
         # (score, capture_val, gives_check, is_capture, attack_cnt, repeats, move)
-        for move in moves_to_consider:
+        for move in moves:
             if deadline is not None and time.monotonic() >= deadline:
                 break
             extension = 1 if board.is_capture(move) or board.gives_check(move) else 0
             capture_val = 0
             if board.is_capture(move):
                 target = board.piece_at(move.to_square)
-                capture_val = dynamic_piece_value(target, board) if target else 0
+                capture_val = dynamic_piece_value_at(move.to_square, target, board) if target else 0
             board.push(move)
             # split remaining time across moves
             sub_deadline = None
             if deadline is not None:
                 remaining = max(0.0, deadline - time.monotonic())
-                sub_deadline = time.monotonic() + remaining / max(1, len(moves_to_consider))
-            score = -self.search(board, self.base_depth + extension, deadline=sub_deadline)
+                sub_deadline = time.monotonic() + remaining / max(1, len(moves))
+            score = -self.search(board, self.base_depth + extension, deadline=sub_deadline,
+                                 extensions=extension)
             rep = board.is_repetition(3)
             gives_check = board.is_check()
             board.pop()
@@ -165,7 +183,7 @@ class DecisionEngine:
             # fallback: best legal move by static eval within time
             best_mv = None
             best_sc = float("-inf")
-            for mv in legal_moves:
+            for mv in moves:
                 tmp = board.copy(stack=False)
                 tmp.push(mv)
                 sc = self._evaluate(tmp)
@@ -10,8 +10,9 @@ from typing import Dict, List, Tuple, Optional
 import chess
 import os
 
+from .agent_pool import AgentPool, AgentResult
 from .decision_engine import DecisionEngine
-from core.move_object import MoveObject, MovePhase, EvaluationStep, MoveStatus, move_evaluation_manager
+from core.move_object import MoveObject, MovePhase, EvaluationStep, MoveStatus, TrackingLevel, move_evaluation_manager
 from ui.decision_roadmap import decision_roadmap
 
 from .aggressive_bot import AggressiveBot
@@ -38,6 +39,19 @@ else:  # R evaluation disabled
     _r_eval_board = None  # type: ignore
 
 
+def _env_tracking_level() -> TrackingLevel:
+    value = os.getenv("CHESS_MOVE_TRACKING", "counters")
+    try:
+        return TrackingLevel(value.strip().lower())
+    except ValueError:
+        logger.warning("Unknown CHESS_MOVE_TRACKING=%r (expected off, counters or full); using counters", value)
+        return TrackingLevel.COUNTERS
+
+
+# Tracking level used in automatic mode while no viewer is attached.
+_DEFAULT_TRACKING = _env_tracking_level()
+
+
 class _RBoardEvaluator:
     """Lightweight wrapper around the optional R-based evaluator."""
 
@@ -84,6 +98,21 @@ class DynamicBot:
     not provide a confident choice.  For a Monte Carlo tree search counterpart
     see :class:`chess_ai.batched_mcts.BatchedMCTS`.  Both engines are showcased
     together in ``tests/run_hybrid_demo.py``.
+
+    With ``parallel_agents`` (or ``CHESS_DYNAMIC_PARALLEL``) set above one the
+    sub-agents run concurrently in an :class:`~chess_ai.agent_pool.AgentPool`
+    of that many worker processes (at most one per agent; a worker with
+    several agents runs them in turn).  Each agent gets a deadline (``agent_timeouts``
+    per name, else ``agent_timeout_s``); agents that miss it are left out of
+    the vote and their worker is restarted.  The latency of every agent for the last
+    move is kept in :attr:`agent_latency_ms`.
+
+    ``tracking_level`` selects the move-evaluation bookkeeping (see
+    :class:`~core.move_object.TrackingLevel`).  ``enable_move_tracking=True``
+    / ``False`` is shorthand for ``FULL`` / ``OFF``.  When neither is given
+    the level is chosen per move: ``FULL`` while a viewer is attached to
+    :data:`~core.move_object.move_evaluation_manager`, otherwise
+    ``CHESS_MOVE_TRACKING`` (default ``counters``).
     """
 
     def __init__(
@@ -99,7 +128,12 @@ class DynamicBot:
         enable_bandit: bool | None = None,
         bandit_alpha: float | None = None,
         # Move tracking options
-        enable_move_tracking: bool = True,
+        enable_move_tracking: bool | None = None,
+        tracking_level: TrackingLevel | str | None = None,
+        # Parallel sub-agent execution
+        parallel_agents: int | None = None,
+        agent_timeout_s: float | None = None,
+        agent_timeouts: Optional[Dict[str, float]] = None,
     ) -> None:
         self.color = color
         # Registered sub-agents as (impl, name)
@@ -165,9 +199,27 @@ class DynamicBot:
         self._original_weights = self.base_weights.copy()
         
         # Move tracking for visualization
-        self.enable_move_tracking = enable_move_tracking
+        # ``None`` selects the level automatically on every move.
+        self.tracking_level: TrackingLevel | None = None
+        if tracking_level is not None:
+            self.tracking_level = TrackingLevel(tracking_level)
+        elif enable_move_tracking is not None:
+            self.enable_move_tracking = enable_move_tracking
         self.current_move_object: Optional[MoveObject] = None
 
+        # Parallel sub-agent execution; the pool is created on first use.
+        self.parallel_agents: int = (
+            int(os.getenv("CHESS_DYNAMIC_PARALLEL", "0"))
+            if parallel_agents is None else int(parallel_agents)
+        )
+        self.agent_timeout_s: float = (
+            float(os.getenv("CHESS_DYNAMIC_AGENT_TIMEOUT_S", "2.0"))
+            if agent_timeout_s is None else float(agent_timeout_s)
+        )
+        self.agent_timeouts: Dict[str, float] = dict(agent_timeouts or {})
+        self.agent_latency_ms: Dict[str, float] = {}
+        self._agent_pool: AgentPool | None = None
+
         # Register default agents with provided weights (fallback → 1.0).
         # RandomBot is disabled by default and must be explicitly enabled via
         # ``weights={'random': <value>}`` to avoid unnecessary randomness.
@@ -207,12 +259,49 @@ class DynamicBot:
         if name is None:
             name = f"custom_{len(self.agents)}"
         self.agents.append((agent, name))
+        # Workers hold copies of the agents, so rebuild the pool on next use.
+        self.close()
         if weight is not None:
             try:
                 self.base_weights[name] = float(weight)
             except Exception:
                 self.base_weights[name] = 1.0
 
+    @property
+    def enable_move_tracking(self) -> bool:
+        """``True`` when moves are currently tracked in full."""
+        return self._tracking_level() is TrackingLevel.FULL
+
+    @enable_move_tracking.setter
+    def enable_move_tracking(self, enabled: bool) -> None:
+        self.tracking_level = TrackingLevel.FULL if enabled else TrackingLevel.OFF
+
+    def _tracking_level(self) -> TrackingLevel:
+        if self.tracking_level is not None:
+            return self.tracking_level
+        if move_evaluation_manager.viewer_attached:
+            return TrackingLevel.FULL
+        return _DEFAULT_TRACKING
+
+    def close(self) -> None:
+        """Shut down the parallel agent pool, if any."""
+        if self._agent_pool is not None:
+            self._agent_pool.close()
+            self._agent_pool = None
+
+    def _run_agents_parallel(
+        self, board: chess.Board, context: GameContext, debug: bool
+    ) -> Dict[str, AgentResult]:
+        if self._agent_pool is None:
+            self._agent_pool = AgentPool(self.agents, workers=self.parallel_agents)
+        return self._agent_pool.run(
+            board,
+            context,
+            timeouts=self.agent_timeouts,
+            default_timeout=self.agent_timeout_s,
+            debug=debug,
+        )
+
     # ---- Weight resolution & context buckets --------------------------------
     def _resolve_phase_weight(self, phase: str, agent_name: str) -> float:
         by_phase = self.weights_by_phase.get(phase)
@@ -330,8 +419,13 @@ class DynamicBot:
         and break ties.
         """
         
+        level = self._tracking_level()
+        full = level is TrackingLevel.FULL
+        move_start_time = time.perf_counter()
+
         # Initialize move tracking if enabled
-        if self.enable_move_tracking:
+        self.current_move_object = None
+        if full:
             self.current_move_object = move_evaluation_manager.create_move_evaluation(
                 move=None,  # Will be set after selection
                 board=board,
@@ -364,7 +458,7 @@ class DynamicBot:
             self._boost_endgame_weights(board, evaluator)
             
         # Track phase information
-        if self.enable_move_tracking and self.current_move_object:
+        if full and self.current_move_object:
             self.current_move_object.metadata['phase'] = phase
             self.current_move_object.metadata['position_bucket'] = self._position_bucket(board, evaluator)
 
@@ -400,9 +494,14 @@ class DynamicBot:
         # Track per-agent best move for diversity bonus and bandit credit
         agent_best: Dict[str, Tuple[chess.Move, float]] = {}
 
+        parallel_results: Dict[str, AgentResult] | None = None
+        if self.parallel_agents > 1 and len(self.agents) > 1:
+            parallel_results = self._run_agents_parallel(board, context, debug)
+        late_agents: List[str] = []
+
         for agent, agent_name in self.agents:
             # Track agent evaluation start
-            if self.enable_move_tracking and self.current_move_object:
+            if full and self.current_move_object:
                 step = EvaluationStep(
                     method_name=f"{agent_name}_evaluation",
                     bot_name=agent_name,
@@ -416,21 +515,36 @@ class DynamicBot:
                     }
                 )
                 self.current_move_object.add_evaluation_step(step)
-                step_start_time = time.time()
-            
-            if debug:
-                move, conf = agent.choose_move(
-                    board, context=context, evaluator=evaluator, debug=True
-                )
+
+            failed = False
+            if parallel_results is not None:
+                res = parallel_results.get(agent_name)
+                if res is None:
+                    res = AgentResult(agent_name, None, 0.0, 0.0, error="no result")
+                move, conf, latency_ms = res.move, res.confidence, res.latency_ms
+                failed = res.late or res.error is not None
+                if res.late:
+                    late_agents.append(agent_name)
             else:
-                move, conf = agent.choose_move(
-                    board, context=context, evaluator=evaluator
-                )
-            
+                step_start_time = time.perf_counter()
+                if debug:
+                    move, conf = agent.choose_move(
+                        board, context=context, evaluator=evaluator, debug=True
+                    )
+                else:
+                    move, conf = agent.choose_move(
+                        board, context=context, evaluator=evaluator
+                    )
+                latency_ms = (time.perf_counter() - step_start_time) * 1000
+            self.agent_latency_ms[agent_name] = latency_ms
+
             # Track agent evaluation completion
-            if self.enable_move_tracking and self.current_move_object:
-                step.duration_ms = (time.time() - step_start_time) * 1000
-                step.status = MoveStatus.COMPLETED if move else MoveStatus.REJECTED
+            if full and self.current_move_object:
+                step.duration_ms = latency_ms
+                if failed:
+                    step.status = MoveStatus.ERROR
+                else:
+                    step.status = MoveStatus.COMPLETED if move else MoveStatus.REJECTED
                 step.confidence = conf
                 step.output_data = {
                     'move': move.uci() if move else None,
@@ -450,7 +564,7 @@ class DynamicBot:
             agent_best[agent_name] = (move, conf)
             
             # Track move scoring
-            if self.enable_move_tracking and self.current_move_object:
+            if full and self.current_move_object:
                 self.current_move_object.contributing_factors[f"{agent_name}_score"] = score
                 
             if debug:
@@ -546,7 +660,7 @@ class DynamicBot:
             logger.debug(f"DynamicBot selected {move} with score {total:.3f} (p(win)={win_prob:.3f})")
         
         # Finalize move tracking
-        if self.enable_move_tracking and self.current_move_object:
+        if full and self.current_move_object:
             self.current_move_object.move = move
             self.current_move_object.san_notation = board.san(move) if board.is_legal(move) else str(move)
             self.current_move_object.final_score = float(total)
@@ -565,7 +679,9 @@ class DynamicBot:
                 'phase': phase,
                 'position_bucket': position_bucket,
                 'diversity_enabled': self.enable_diversity,
-                'bandit_enabled': self.enable_bandit
+                'bandit_enabled': self.enable_bandit,
+                'agent_latency_ms': dict(self.agent_latency_ms),
+                'late_agents': late_agents,
             })
             
             # Store contributing agents info
@@ -582,7 +698,12 @@ class DynamicBot:
             
             # Update decision roadmap
             decision_roadmap.update_from_manager()
-            
+        elif level is TrackingLevel.COUNTERS:
+            move_evaluation_manager.count_move(
+                [name for _, name in self.agents if name not in late_agents],
+                (time.perf_counter() - move_start_time) * 1000,
+            )
+
         # Preserve numeric compatibility: return a score; callers that want
         # probability can derive or read debug logs. We return the same 'total'
         # to avoid changing tests, but downstream wrappers may surface rationale.
@@ -3,9 +3,10 @@
 This module implements a reasonably strong alpha-beta search routine used by
 the hybrid bot.  The search incorporates a number of well known techniques
 including Principal Variation Search (PVS), late move reductions (LMR),
-null-move pruning, fail-soft behaviour, a transposition table, a simple
-quiescence search and various move ordering heuristics (hash move, MVV-LVA,
-killer moves and history heuristics).
+null-move pruning, fail-soft behaviour, a fixed-size transposition table
+(see :mod:`.transposition`) that persists across moves, the shared bounded
+quiescence search of :mod:`core.quiescence` and various move ordering
+heuristics (hash move, MVV-LVA, killer moves and history heuristics).
 
 Two hooks – :func:`generate_moves` and :func:`order_moves` – are provided so
 that experiments with move generation or ordering can be easily plugged in.
@@ -18,20 +19,29 @@ performance inspection.
 
 from __future__ import annotations
 
-from dataclasses import dataclass
 import cProfile
 import logging
 logger = logging.getLogger(__name__)
 
 import io
+import os
 import pstats
 import time
 from typing import Dict, Iterable, List, Optional, Tuple
 
 import chess
 
-from .evaluation import evaluate_position
-from ..utils.profile_stats import STATS, plot_profile_stats
+from core.quiescence import quiescence as _qsearch
+from .evaluation import IncrementalEvaluator
+from .transposition import (
+    DEFAULT_TT_MB,
+    EXACT,
+    LOWERBOUND,
+    UPPERBOUND,
+    TranspositionTable,
+    position_key,
+)
+from ..utils.profile_stats import STATS, record_search
 
 
 INF = 10 ** 9
@@ -99,51 +109,69 @@ def order_moves(
 
 
 # ---------------------------------------------------------------------------
-#  Quiescence Search
+#  Time control
 # ---------------------------------------------------------------------------
 
+# Shared abort flag (anything with a ``value`` attribute, e.g. a
+# ``multiprocessing.RawValue``).  Lazy-SMP workers install one so the parent
+# can stop helpers once the main search has finished.
+_STOP = None
 
-def quiescence(board: chess.Board, alpha: float, beta: float, deadline: float | None = None) -> float:
-    """Capture-only search to avoid the horizon effect."""
 
-    if deadline is not None and time.monotonic() >= deadline:
-        return evaluate_position(board)
+def _time_up(deadline: float | None) -> bool:
+    if _STOP is not None and _STOP.value:
+        return True
+    return deadline is not None and time.monotonic() >= deadline
 
-    stand_pat = evaluate_position(board)
-    if stand_pat >= beta:
-        return stand_pat  # fail-soft: return the actual score
-    if alpha < stand_pat:
-        alpha = stand_pat
 
-    for move in generate_moves(board):
-        if not board.is_capture(move):
-            continue
-        board.push(move)
-        score = -quiescence(board, -beta, -alpha, deadline)
-        board.pop()
-        if score >= beta:
-            return score
-        if score > alpha:
-            alpha = score
-    return alpha
+# ---------------------------------------------------------------------------
+#  Quiescence Search
+# ---------------------------------------------------------------------------
+
+
+def quiescence(
+    board: chess.Board,
+    alpha: float,
+    beta: float,
+    deadline: float | None = None,
+    ev: IncrementalEvaluator | None = None,
+) -> float:
+    """Resolve captures with the shared :func:`core.quiescence.quiescence`.
+
+    ``ev`` is the incremental evaluator tracking ``board``; a fresh one is
+    built when omitted.
+    """
+
+    if ev is None:
+        ev = IncrementalEvaluator(board)
+    return _qsearch(
+        board,
+        alpha,
+        beta,
+        evaluate=ev.evaluate,
+        push=ev.push,
+        pop=ev.pop,
+        stop=lambda: _time_up(deadline),
+    )
 
 
 # ---------------------------------------------------------------------------
 #  Transposition table support
 # ---------------------------------------------------------------------------
 
-EXACT, LOWERBOUND, UPPERBOUND = 0, 1, 2
+TT = TranspositionTable(float(os.getenv("CHESS_TT_MB", DEFAULT_TT_MB)))
 
 
-@dataclass
-class TTEntry:
-    depth: int
-    flag: int
-    value: float
-    move: Optional[chess.Move]
+def configure_tt(size_mb: float) -> TranspositionTable:
+    """Replace the shared transposition table with one of ``size_mb`` MB."""
+    global TT
+    TT = TranspositionTable(size_mb)
+    return TT
 
 
-TT: Dict[int, TTEntry] = {}
+def clear_tt() -> None:
+    """Forget all stored positions, e.g. between unrelated games."""
+    TT.clear()
 
 
 # ---------------------------------------------------------------------------
@@ -159,8 +187,13 @@ def ab_search(
     allow_null: bool = True,
     ply: int = 0,
     deadline: float | None = None,
+    ev: IncrementalEvaluator | None = None,
 ) -> Tuple[float, Optional[chess.Move]]:
-    """Negamax alpha-beta search with numerous enhancements."""
+    """Negamax alpha-beta search with numerous enhancements.
+
+    ``ev`` is the :class:`IncrementalEvaluator` carried down the search
+    stack; it is created from ``board`` when omitted.
+    """
 
     # Start profiling at the root if not already active
     if ply == 0 and STATS.start_time == 0.0:
@@ -175,55 +208,41 @@ def ab_search(
         )
     STATS.nodes += 1
 
-    if deadline is not None and time.monotonic() >= deadline:
-        return evaluate_position(board), None
+    if ev is None:
+        ev = IncrementalEvaluator(board)
+
+    if _time_up(deadline):
+        return ev.evaluate(board), None
 
     alpha_orig = alpha
 
-    # Transposition table lookup (compatible across python-chess versions)
-    def _coerce_key(value) -> int:
-        if isinstance(value, int):
-            return value
-        if isinstance(value, (str, bytes, bytearray)):
-            return hash(value)
-        try:
-            return hash(tuple(value))
-        except TypeError:
-            return hash(repr(value))
-
-    def _position_key(b: chess.Board) -> int:
-        tk = getattr(b, "transposition_key", None)
-        if tk is not None:
-            return _coerce_key(tk() if callable(tk) else tk)
-        priv = getattr(b, "_transposition_key", None)
-        if priv is not None:
-            return _coerce_key(priv())
-        return hash(b.fen())
-
-    key = _position_key(board)
+    # Transposition table lookup
+    key = position_key(board)
     tt_move: Optional[chess.Move] = None
-    entry = TT.get(key)
-    if entry and entry.depth >= depth:
-        tt_move = entry.move
-        STATS.tt_hits += 1
-        if entry.flag == EXACT:
-            return entry.value, tt_move
-        if entry.flag == LOWERBOUND and entry.value > alpha:
-            alpha = entry.value
-        elif entry.flag == UPPERBOUND and entry.value < beta:
-            beta = entry.value
-        if alpha >= beta:
-            return entry.value, tt_move
+    STATS.tt_probes += 1
+    entry = TT.probe(key)
+    if entry is not None:
+        e_depth, e_flag, e_value, tt_move = entry
+        if e_depth >= depth:
+            STATS.tt_hits += 1
+            if e_flag == EXACT:
+                return e_value, tt_move
+            if e_flag == LOWERBOUND and e_value > alpha:
+                alpha = e_value
+            elif e_flag == UPPERBOUND and e_value < beta:
+                beta = e_value
+            if alpha >= beta:
+                return e_value, tt_move
 
     if depth == 0 or board.is_game_over():
-        return quiescence(board, alpha, beta, deadline), None
+        return quiescence(board, alpha, beta, deadline, ev), None
 
     # Null move pruning
     if allow_null and depth >= 3 and not board.checkers():
-        board.push(chess.Move.null())
-        score, _ = ab_search(board, depth - 1 - 2, -beta, -beta + 1, False, ply + 1, deadline)
+        ev.push(board, chess.Move.null())
+        score, _ = ab_search(board, depth - 1 - 2, -beta, -beta + 1, False, ply + 1, deadline, ev)
         score = -score
-        board.pop()
+        ev.pop(board)
         if score >= beta:
             return score, None
 
@@ -235,9 +254,9 @@ def ab_search(
 
     first = True
     for idx, move in enumerate(moves):
-        if deadline is not None and time.monotonic() >= deadline:
+        if _time_up(deadline):
             break
-        board.push(move)
+        ev.push(board, move)
 
         # Late move reductions for quiet moves
         reduce = 0
@@ -246,17 +265,17 @@ def ab_search(
             STATS.lmr_reductions += 1
 
         if first:
-            score, _ = ab_search(board, depth - 1, -beta, -alpha, True, ply + 1, deadline)
+            score, _ = ab_search(board, depth - 1, -beta, -alpha, True, ply + 1, deadline, ev)
             score = -score
             first = False
         else:
-            score, _ = ab_search(board, depth - 1 - reduce, -alpha - 1, -alpha, True, ply + 1, deadline)
+            score, _ = ab_search(board, depth - 1 - reduce, -alpha - 1, -alpha, True, ply + 1, deadline, ev)
             score = -score
             if alpha < score < beta:
-                score, _ = ab_search(board, depth - 1, -beta, -score, True, ply + 1, deadline)
+                score, _ = ab_search(board, depth - 1, -beta, -score, True, ply + 1, deadline, ev)
                 score = -score
 
-        board.pop()
+        ev.pop(board)
 
         if score > best_val:
             best_val = score
@@ -274,17 +293,20 @@ def ab_search(
             HISTORY[key_hist] = HISTORY.get(key_hist, 0) + depth * depth
             break
 
-    # Store to TT
-    flag = EXACT
-    if best_val <= alpha_orig:
-        flag = UPPERBOUND
-    elif best_val >= beta:
-        flag = LOWERBOUND
-    TT[key] = TTEntry(depth, flag, best_val, best_move)
+    # Store to TT unless the deadline cut this node short
+    if not _time_up(deadline):
+        flag = EXACT
+        if best_val <= alpha_orig:
+            flag = UPPERBOUND
+        elif best_val >= beta:
+            flag = LOWERBOUND
+        if TT.store(key, depth, flag, best_val, best_move):
+            STATS.tt_collisions += 1
     if ply == 0:
+        STATS.tt_fill = TT.fill()
         STATS.stop()
         logger.info("Alpha-beta: %s", STATS.summary())
-        plot_profile_stats(STATS, filename="ab_profile.png")
+        record_search(STATS, "alpha_beta")
 
     return best_val, best_move
 
@@ -294,13 +316,149 @@ KILLERS: Dict[int, List[chess.Move]] = {}
 HISTORY: Dict[Tuple[int, int, int], int] = {}
 
 
-def search(board: chess.Board, depth: int, deadline: float | None = None) -> Tuple[float, Optional[chess.Move]]:
-    """Convenience wrapper around :func:`ab_search` with fresh tables."""
-    STATS.start()
+# Iterative deepening parameters
+ASPIRATION_WINDOW = 50  # centipawns around the previous iteration's score
+ASPIRATION_MIN_DEPTH = 3  # shallower iterations always use a full window
+ASPIRATION_MAX_RETRIES = 3  # widen this many times before opening fully
+ID_MIN_GROWTH = 2.0  # assumed lower bound on time growth per extra ply
+ID_MAX_GROWTH = 8.0
 
-    TT.clear()
+
+def _search_root(
+    board: chess.Board,
+    moves: List[chess.Move],
+    depth: int,
+    alpha: float,
+    beta: float,
+    deadline: float | None,
+    ev: IncrementalEvaluator | None = None,
+) -> Tuple[float, Optional[chess.Move], bool]:
+    """Search all root ``moves`` to ``depth`` inside ``(alpha, beta)``.
+
+    Returns ``(score, move, completed)`` where ``completed`` is ``False`` if
+    the deadline interrupted the iteration.
+    """
+    if ev is None:
+        ev = IncrementalEvaluator(board)
+    best_score, best_move = -INF, None
+    for move in moves:
+        if _time_up(deadline):
+            return best_score, best_move, False
+        ev.push(board, move)
+        score, _ = ab_search(board, depth - 1, -beta, -alpha, True, 1, deadline, ev)
+        score = -score
+        ev.pop(board)
+        if score > best_score:
+            best_score, best_move = score, move
+        if score > alpha:
+            alpha = score
+        if alpha >= beta:
+            break
+    return best_score, best_move, not _time_up(deadline)
+
+
+def _prepare_search() -> None:
+    """Reset killer moves and age history scores for a new root search."""
     KILLERS.clear()
-    HISTORY.clear()
+    for k in HISTORY:
+        HISTORY[k] //= 2
+
+
+def _iterative_deepening(
+    board: chess.Board,
+    depth: int,
+    deadline: float | None,
+) -> Tuple[float, Optional[chess.Move]]:
+    """Search depths ``1..depth`` and return the deepest completed result."""
+    best_score, best_move = -INF, None
+    moves = order_moves(board, generate_moves(board), KILLERS, HISTORY, 0, None)
+    ev = IncrementalEvaluator(board)
+    prev_time = 0.0
+
+    for d in range(1, max(1, depth) + 1):
+        iter_start = time.monotonic()
+        window = ASPIRATION_WINDOW
+        if d >= ASPIRATION_MIN_DEPTH and best_move is not None:
+            alpha, beta = best_score - window, best_score + window
+        else:
+            alpha, beta = -INF, INF
+
+        retries = 0
+        while True:
+            score, move, completed = _search_root(board, moves, d, alpha, beta, deadline, ev)
+            if not completed:
+                break
+            if score <= alpha and alpha > -INF:
+                STATS.aspiration_fails += 1
+                retries += 1
+                window *= 2
+                alpha = -INF if retries > ASPIRATION_MAX_RETRIES else score - window
+                continue
+            if score >= beta and beta < INF:
+                STATS.aspiration_fails += 1
+                retries += 1
+                window *= 2
+                beta = INF if retries > ASPIRATION_MAX_RETRIES else score + window
+                continue
+            break
+
+        if not completed:
+            if best_move is None:
+                # Not even depth 1 finished: take what the partial pass found.
+                best_score, best_move = score, move if move is not None else next(iter(moves), None)
+            break
+
+        best_score, best_move = score, move
+        STATS.depth_reached = d
+        if move is not None:
+            moves.remove(move)
+            moves.insert(0, move)
+
+        iter_time = time.monotonic() - iter_start
+        if deadline is not None and d < depth:
+            growth = iter_time / prev_time if prev_time > 0 else ID_MIN_GROWTH
+            growth = min(ID_MAX_GROWTH, max(ID_MIN_GROWTH, growth))
+            if time.monotonic() + iter_time * growth > deadline:
+                break
+        prev_time = iter_time
+
+    return best_score, best_move
+
+
+def search(
+    board: chess.Board,
+    depth: int,
+    deadline: float | None = None,
+    workers: int = 1,
+) -> Tuple[float, Optional[chess.Move]]:
+    """Iterative-deepening driver around :func:`ab_search`.
+
+    Depths ``1..depth`` are searched in turn.  Each iteration searches the
+    previous principal variation move first and, from
+    ``ASPIRATION_MIN_DEPTH`` on, opens an aspiration window around the
+    previous score which is widened on fail-low/fail-high.  An iteration that
+    the ``deadline`` interrupts is discarded and the result of the deepest
+    completed iteration is returned.  A new iteration is only started when
+    the time the last one took, scaled by the observed growth factor, still
+    fits before the deadline.
+
+    Killer moves are reset and history scores halved for every call, while the
+    transposition table only advances its age so entries from earlier moves
+    of the same game remain available.
+
+    With ``workers > 1`` the search runs in Lazy-SMP mode: that many worker
+    processes search the root concurrently and share a transposition table
+    held in shared memory (see :mod:`.lazy_smp`).
+    """
+    if workers > 1:
+        from .lazy_smp import smp_search
+
+        return smp_search(board, depth, deadline, workers)
+
+    STATS.start()
+
+    TT.new_search()
+    _prepare_search()
 
     try:
         n_moves = len(list(board.legal_moves))
@@ -313,25 +471,12 @@ def search(board: chess.Board, depth: int, deadline: float | None = None) -> Tup
         str(deadline is not None),
     )
 
-    alpha, beta = -INF, INF
-    best_score, best_move = -INF, None
-
-    moves = order_moves(board, generate_moves(board), KILLERS, HISTORY, 0, None)
-    for move in moves:
-        if deadline is not None and time.monotonic() >= deadline:
-            break
-        board.push(move)
-        score, _ = ab_search(board, depth - 1, -beta, -alpha, True, 1, deadline)
-        score = -score
-        board.pop()
-        if score > best_score:
-            best_score, best_move = score, move
-        if score > alpha:
-            alpha = score
+    best_score, best_move = _iterative_deepening(board, depth, deadline)
 
+    STATS.tt_fill = TT.fill()
     STATS.stop()
     logger.info("Alpha-beta: %s", STATS.summary())
-    plot_profile_stats(STATS, filename="ab_profile.png")
+    record_search(STATS, "alpha_beta")
 
     return best_score, best_move
 
@@ -361,6 +506,8 @@ __all__ = [
     "search",
     "search_one_shot",
     "ab_search",
+    "configure_tt",
+    "clear_tt",
     "generate_moves",
     "order_moves",
 ]
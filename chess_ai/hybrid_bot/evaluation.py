@@ -1,4 +1,9 @@
-"""Material based evaluation with dynamic king value."""
+"""Material based evaluation with dynamic king value.
+
+:func:`evaluate_position` scores a single board (with a small LRU cache),
+while :class:`IncrementalEvaluator` keeps the same terms up to date as the
+searches push and pop moves.
+"""
 
 from __future__ import annotations
 
@@ -9,7 +14,8 @@ from typing import Tuple
 import logging
 logger = logging.getLogger(__name__)
 
-from ..chess_bot import calculate_king_value
+from ..chess_bot import king_value_from_counts
+from .transposition import position_key
 
 # Basic piece values in centipawns.  The king's base value is determined
 # dynamically at evaluation time.
@@ -41,45 +47,106 @@ def _cache_put(key: Tuple[int, bool], value: float) -> None:
         _EVAL_CACHE.popitem(last=False)
 
 
+_MATERIAL_TYPES = (chess.PAWN, chess.KNIGHT, chess.BISHOP, chess.ROOK, chess.QUEEN)
+
+
+class IncrementalEvaluator:
+    """Material and dynamic king-value evaluation updated move by move.
+
+    The evaluator keeps per-side piece counts and the white-minus-black
+    material balance.  :meth:`push` and :meth:`pop` wrap ``board.push`` /
+    ``board.pop`` and apply the material delta of the move (captures,
+    en passant and promotions), so :meth:`evaluate` is O(1).  The king value
+    is :func:`~chess_ai.chess_bot.king_value_from_counts` of the same counts,
+    i.e. :func:`~chess_ai.chess_bot.calculate_king_value` without recounting.  Scores are identical to :func:`evaluate_position`.
+    """
+
+    __slots__ = ("counts", "material", "_stack")
+
+    def __init__(self, board: chess.Board | None = None) -> None:
+        self.counts = ([0] * 7, [0] * 7)  # indexed [color][piece_type]
+        self.material = 0
+        self._stack: list[tuple] = []
+        if board is not None:
+            self.reset(board)
+
+    def reset(self, board: chess.Board) -> None:
+        """Recompute all terms from scratch for ``board``."""
+        self.material = 0
+        self._stack.clear()
+        for color in (chess.BLACK, chess.WHITE):
+            counts = self.counts[color]
+            sign = 1 if color == chess.WHITE else -1
+            for pt in _MATERIAL_TYPES:
+                n = chess.popcount(board.pieces_mask(pt, color))
+                counts[pt] = n
+                self.material += sign * n * PIECE_VALUES[pt]
+
+    def copy(self) -> "IncrementalEvaluator":
+        """Return an evaluator with the same terms and an empty move stack."""
+        other = IncrementalEvaluator()
+        other.counts[chess.WHITE][:] = self.counts[chess.WHITE]
+        other.counts[chess.BLACK][:] = self.counts[chess.BLACK]
+        other.material = self.material
+        return other
+
+    def king_value(self, color: chess.Color) -> int:
+        c = self.counts[color]
+        return king_value_from_counts(
+            c[chess.PAWN],
+            c[chess.KNIGHT],
+            c[chess.BISHOP],
+            c[chess.ROOK],
+            c[chess.QUEEN],
+            bool(self.counts[not color][chess.QUEEN]),
+        )
+
+    def evaluate(self, board: chess.Board) -> float:
+        """Score from the perspective of the side to move on ``board``."""
+        score = float(
+            self.material + self.king_value(chess.WHITE) - self.king_value(chess.BLACK)
+        )
+        return score if board.turn == chess.WHITE else -score
+
+    def _apply(self, color: chess.Color, pt: int, delta: int) -> None:
+        self.counts[color][pt] += delta
+        val = PIECE_VALUES[pt] * delta
+        self.material += val if color == chess.WHITE else -val
+
+    def push(self, board: chess.Board, move: chess.Move) -> None:
+        """Apply the material delta of ``move`` and push it on ``board``."""
+        changes: tuple = ()
+        if move:
+            mover = board.turn
+            if board.is_en_passant(move):
+                changes = ((not mover, chess.PAWN, -1),)
+            else:
+                victim = board.piece_type_at(move.to_square)
+                if victim is not None and board.color_at(move.to_square) != mover:
+                    changes = ((not mover, victim, -1),)
+            if move.promotion:
+                changes += ((mover, chess.PAWN, -1), (mover, move.promotion, 1))
+            for color, pt, delta in changes:
+                self._apply(color, pt, delta)
+        self._stack.append(changes)
+        board.push(move)
+
+    def pop(self, board: chess.Board) -> chess.Move:
+        """Undo the last :meth:`push` on both the evaluator and ``board``."""
+        for color, pt, delta in self._stack.pop():
+            self._apply(color, pt, -delta)
+        return board.pop()
+
+
 def evaluate_position(board: chess.Board) -> float:
     """Evaluate ``board`` from the side to move perspective with caching."""
 
-    # Version-tolerant position key
-    def _coerce_key(value) -> int:
-        if isinstance(value, int):
-            return value
-        if isinstance(value, (str, bytes, bytearray)):
-            return hash(value)
-        try:
-            return hash(tuple(value))
-        except TypeError:
-            return hash(repr(value))
-
-    def _position_key(b: chess.Board) -> int:
-        tk = getattr(b, "transposition_key", None)
-        if tk is not None:
-            return _coerce_key(tk() if callable(tk) else tk)
-        priv = getattr(b, "_transposition_key", None)
-        if priv is not None:
-            return _coerce_key(priv())
-        return hash(b.fen())
-
-    key: Tuple[int, bool] = (_position_key(board), board.turn)
+    key: Tuple[int, bool] = (position_key(board), board.turn)
     cached = _cache_get(key)
     if cached is not None:
         return cached
 
-    score = 0.0
-    wking = calculate_king_value(board, chess.WHITE)
-    bking = calculate_king_value(board, chess.BLACK)
-
-    for _, piece in board.piece_map().items():
-        val = PIECE_VALUES[piece.piece_type]
-        if piece.piece_type == chess.KING:
-            val = wking if piece.color == chess.WHITE else bking
-        score += val if piece.color == chess.WHITE else -val
-
-    score = score if board.turn == chess.WHITE else -score
+    score = IncrementalEvaluator(board).evaluate(board)
     _cache_put(key, score)
     return score
 
@@ -0,0 +1,260 @@
+"""Lazy-SMP mode for the hybrid alpha-beta search.
+
+Python threads cannot run the search in parallel because of the GIL, so
+Lazy-SMP is implemented with worker processes.  All workers search the same
+root position with the regular iterative-deepening driver of
+:mod:`.alpha_beta` and communicate only through a transposition table that
+lives in a :class:`multiprocessing.shared_memory.SharedMemory` block.  Odd
+numbered helpers aim one ply deeper than requested, which staggers the
+iterations and lets them fill the table ahead of the main worker.
+
+Worker 0 is the main search.  As soon as it reports, the parent raises a
+shared stop flag, collects the helpers' deepest completed iterations and
+returns the deepest result (worker 0 wins ties).
+
+Pools are persistent: :func:`smp_search` keeps one :class:`LazySMPPool` per
+worker count so the processes and the shared table – and therefore the
+search knowledge – survive across the moves of a game.
+
+Entries are written field by field without locking.  A torn write can at
+worst produce a wrong bound or a hash move that is not legal in the probing
+position; the search only uses hash moves for ordering, so the latter is
+harmless and the former is accepted as in other Lazy-SMP engines.
+"""
+
+from __future__ import annotations
+
+import atexit
+import logging
+logger = logging.getLogger(__name__)
+
+import multiprocessing as mp
+import os
+import queue
+import time
+from multiprocessing import shared_memory
+from typing import Dict, Optional, Tuple
+
+import chess
+
+from . import alpha_beta
+from .transposition import DEFAULT_TT_MB, TranspositionTable, buckets_for_mb, buffer_size
+from ..utils.profile_stats import STATS, record_search
+
+
+# How long the parent waits for helpers to notice the stop flag.
+_HELPER_GRACE_S = 5.0
+
+
+def _worker_main(
+    index: int,
+    shm_name: str,
+    n_buckets: int,
+    stop,
+    tasks,
+    results,
+) -> None:
+    """Worker process loop: search every task with the shared table."""
+    shm = shared_memory.SharedMemory(name=shm_name)
+    tt = TranspositionTable(n_buckets=n_buckets, buffer=shm.buf)
+    alpha_beta.TT = tt
+    alpha_beta._STOP = stop
+    try:
+        while True:
+            task = tasks.get()
+            if task is None:
+                break
+            search_id, fen, moves, depth, budget, age = task
+            try:
+                board = chess.Board(fen)
+                for uci in moves:
+                    board.push_uci(uci)
+                deadline = time.monotonic() + budget if budget is not None else None
+                STATS.start()
+                tt.age = age
+                alpha_beta._prepare_search()
+                score, move = alpha_beta._iterative_deepening(board, depth, deadline)
+                STATS.stop()
+                results.put((
+                    search_id,
+                    index,
+                    score,
+                    move.uci() if move is not None else None,
+                    STATS.depth_reached,
+                    STATS.nodes,
+                    STATS.cutoffs,
+                    STATS.tt_probes,
+                    STATS.tt_hits,
+                    STATS.tt_collisions,
+                    None,
+                ))
+            except Exception as exc:  # report instead of hanging the parent
+                results.put((search_id, index, 0.0, None, 0, 0, 0, 0, 0, 0, repr(exc)))
+    finally:
+        tt.release()
+        shm.close()
+
+
+class LazySMPPool:
+    """Persistent set of search processes sharing one transposition table."""
+
+    def __init__(self, workers: int, tt_mb: float = DEFAULT_TT_MB) -> None:
+        if workers < 1:
+            raise ValueError("workers must be >= 1")
+        self.workers = workers
+        self.n_buckets = buckets_for_mb(tt_mb)
+        self._shm = shared_memory.SharedMemory(create=True, size=buffer_size(self.n_buckets))
+        self._shm.buf[:] = bytes(self._shm.size)
+        # Parent-side view, used for the table age and fill statistics.
+        self.tt = TranspositionTable(n_buckets=self.n_buckets, buffer=self._shm.buf)
+
+        ctx = mp.get_context()
+        self._stop = ctx.RawValue("b", 0)
+        self._results = ctx.Queue()
+        self._tasks = [ctx.Queue() for _ in range(workers)]
+        self._procs = [
+            ctx.Process(
+                target=_worker_main,
+                args=(i, self._shm.name, self.n_buckets, self._stop, self._tasks[i], self._results),
+                daemon=True,
+                name=f"lazy-smp-{i}",
+            )
+            for i in range(workers)
+        ]
+        for proc in self._procs:
+            proc.start()
+        self._search_id = 0
+        self._closed = False
+
+    def search(
+        self,
+        board: chess.Board,
+        depth: int,
+        deadline: float | None = None,
+    ) -> Tuple[float, Optional[chess.Move]]:
+        """Run one Lazy-SMP search of ``board`` and return ``(score, move)``."""
+        if self._closed:
+            raise RuntimeError("LazySMPPool is closed")
+
+        STATS.start()
+        self.tt.new_search()
+        self._search_id += 1
+        self._stop.value = 0
+
+        root = board.root()
+        fen = root.fen()
+        moves = [m.uci() for m in board.move_stack]
+        budget = None if deadline is None else max(0.0, deadline - time.monotonic())
+        for i, tasks in enumerate(self._tasks):
+            tasks.put((self._search_id, fen, moves, depth + (i % 2), budget, self.tt.age))
+
+        results: Dict[int, tuple] = {}
+        wait_until: float | None = None
+        while len(results) < self.workers:
+            if 0 in results and wait_until is None:
+                self._stop.value = 1
+                wait_until = time.monotonic() + _HELPER_GRACE_S
+            timeout = 0.1
+            try:
+                res = self._results.get(timeout=timeout)
+            except queue.Empty:
+                dead = [p.name for p in self._procs if not p.is_alive()]
+                if dead:
+                    self.close()
+                    raise RuntimeError(f"Lazy-SMP workers died: {', '.join(dead)}")
+                if wait_until is not None and time.monotonic() > wait_until:
+                    logger.warning("Lazy-SMP: helpers did not stop in time; ignoring them")
+                    break
+                continue
+            if res[0] != self._search_id:
+                continue  # late result of an earlier, abandoned search
+            if res[-1] is not None:
+                logger.warning("Lazy-SMP worker %d failed: %s", res[1], res[-1])
+            results[res[1]] = res
+        self._stop.value = 1
+
+        usable = [r for r in results.values() if r[3] is not None and r[-1] is None]
+        if usable:
+            # Deepest completed iteration wins; prefer the main worker on ties.
+            best = max(usable, key=lambda r: (r[4], r[1] == 0))
+            score, move, depth_reached = best[2], chess.Move.from_uci(best[3]), best[4]
+        else:
+            score, move, depth_reached = -alpha_beta.INF, next(iter(board.legal_moves), None), 0
+
+        STATS.worker_nodes = [results[i][5] if i in results else 0 for i in range(self.workers)]
+        STATS.nodes = sum(STATS.worker_nodes)
+        for r in results.values():
+            STATS.cutoffs += r[6]
+            STATS.tt_probes += r[7]
+            STATS.tt_hits += r[8]
+            STATS.tt_collisions += r[9]
+        STATS.depth_reached = depth_reached
+        STATS.tt_fill = self.tt.sample_fill()
+        STATS.stop()
+        logger.info("Alpha-beta (lazy-smp x%d): %s", self.workers, STATS.summary())
+        record_search(STATS, "alpha_beta_smp")
+        return score, move
+
+    def close(self) -> None:
+        """Stop the workers and free the shared table."""
+        if self._closed:
+            return
+        self._closed = True
+        self._stop.value = 1
+        for tasks in self._tasks:
+            try:
+                tasks.put(None)
+            except Exception:
+                pass
+        for proc in self._procs:
+            proc.join(timeout=2.0)
+            if proc.is_alive():
+                proc.terminate()
+                proc.join(timeout=1.0)
+        self.tt.release()
+        self._shm.close()
+        try:
+            self._shm.unlink()
+        except FileNotFoundError:
+            pass
+
+    def __enter__(self) -> "LazySMPPool":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+
+_POOLS: Dict[int, LazySMPPool] = {}
+
+
+def get_pool(workers: int) -> LazySMPPool:
+    """Return the shared pool for ``workers`` processes, creating it lazily."""
+    pool = _POOLS.get(workers)
+    if pool is None or pool._closed:
+        pool = LazySMPPool(workers, float(os.getenv("CHESS_TT_MB", DEFAULT_TT_MB)))
+        _POOLS[workers] = pool
+    return pool
+
+
+def shutdown_pools() -> None:
+    """Close every pool created through :func:`get_pool`."""
+    for pool in list(_POOLS.values()):
+        pool.close()
+    _POOLS.clear()
+
+
+atexit.register(shutdown_pools)
+
+
+def smp_search(
+    board: chess.Board,
+    depth: int,
+    deadline: float | None = None,
+    workers: int = 2,
+) -> Tuple[float, Optional[chess.Move]]:
+    """Lazy-SMP search of ``board`` using the shared pool for ``workers``."""
+    return get_pool(workers).search(board, depth, deadline)
+
+
+__all__ = ["LazySMPPool", "get_pool", "shutdown_pools", "smp_search"]
@@ -2,15 +2,17 @@
 
 from __future__ import annotations
 
-import math
 import random
 import logging
 logger = logging.getLogger(__name__)
 
 import chess
+import numpy as np
 import time
-from .evaluation import evaluate_positions
-from ..utils.profile_stats import STATS, plot_profile_stats
+from typing import Callable
+from .evaluation import IncrementalEvaluator
+from ..mcts_tree import MCTSTree, TreeNode
+from ..utils.profile_stats import STATS, record_search
 
 
 def _dirichlet(alpha: float, size: int) -> list[float]:
@@ -19,27 +21,37 @@ def _dirichlet(alpha: float, size: int) -> list[float]:
     return [v / s for v in samples]
 
 
-class Node:
-    def __init__(self, board: chess.Board, parent: 'Node | None' = None, prior: float = 0.0):
-        self.board = board
-        self.parent = parent
-        self.prior = prior
-        self.children: dict[chess.Move, Node] = {}
-        self.n = 0
-        self.w = 0.0
-
-    def q(self) -> float:
-        return self.w / self.n if self.n else 0.0
-
-    def u(self, c_puct: float) -> float:
-        if self.parent is None:
-            return self.q()
-        return self.q() + c_puct * self.prior * math.sqrt(self.parent.n) / (1 + self.n)
+# Search trees are array backed; ``Node`` is kept as the public view type.
+Node = TreeNode
 
 
 class BatchMCTS:
-    def __init__(self, c_puct: float = 1.4):
+    def __init__(
+        self,
+        c_puct: float = 1.4,
+        evaluate_fn: Callable[[list[chess.Board]], list[float]] | None = None,
+        reuse_tree: bool = True,
+        virtual_loss: float = 100.0,
+    ):
         self.c_puct = c_puct
+        # Pending-visit penalty while a batch is collected (values are in
+        # centipawns, so one pawn per pending visit).
+        self.virtual_loss = virtual_loss
+        # Optional batch evaluator (e.g. a network's ``predict_many`` wrapper);
+        # by default leaves are scored by the incremental material evaluator.
+        self.evaluate_fn = evaluate_fn
+        # Keep the subtree of the moves actually played for the next search.
+        self.reuse_tree = reuse_tree
+        self._tree: MCTSTree | None = None
+
+    def _tree_for(self, board: chess.Board) -> MCTSTree:
+        if self.reuse_tree and self._tree is not None and self._tree.advance(board):
+            return self._tree
+        if self._tree is None:
+            self._tree = MCTSTree(board)
+        else:
+            self._tree.reset(board)
+        return self._tree
 
     def search(
         self,
@@ -50,12 +62,14 @@ class BatchMCTS:
         epsilon: float = 0.25,
         batch_size: int = 1,
         deadline: float | None = None,
-    ) -> tuple[chess.Move | None, Node]:
+    ) -> tuple[chess.Move | None, TreeNode]:
         """Run MCTS and return a move and the search tree.
 
         The search collects up to ``batch_size`` leaf nodes before evaluation.
-        All gathered boards are then evaluated in a single call to the
-        evaluation routine, allowing, for example, a neural network's
+        By default each leaf is scored in O(1) by an
+        :class:`IncrementalEvaluator` carried along its selection path.  When
+        ``evaluate_fn`` was given, all gathered boards are instead evaluated
+        in a single call, allowing, for example, a neural network's
         ``predict_many`` implementation to process them efficiently.  Setting
         ``batch_size`` to ``1`` reproduces standard, non-batched MCTS
         behaviour.
@@ -69,80 +83,80 @@ class BatchMCTS:
             batch_size,
             str(deadline is not None),
         )
-        root = Node(board.copy())
+        tree = self._tree_for(board)
+        tree.virtual_loss = self.virtual_loss
+        root = TreeNode(tree=tree)
         legal = list(board.legal_moves)
         if not legal:
             return None, root
-        priors = [1 / len(legal)] * len(legal)
-        noise = _dirichlet(dirichlet_alpha, len(legal))
-        priors = [(1 - epsilon) * p + epsilon * n for p, n in zip(priors, noise)]
-        for m, p in zip(legal, priors):
-            b = board.copy()
-            b.push(m)
-            root.children[m] = Node(b, root, p)
+        if not tree.is_expanded(0):
+            tree.expand(0, legal, [1 / len(legal)] * len(legal))
+        # Fresh exploration noise on top of the clean priors, so a reused
+        # root does not accumulate the noise of earlier searches.
+        start, end = tree.child_range(0)
+        noise = np.asarray(_dirichlet(dirichlet_alpha, end - start))
+        tree.prior[start:end] = (1 - epsilon) * tree.prior_raw[start:end] + epsilon * noise
 
         STATS.start()
 
+        root_ev = IncrementalEvaluator(board)
         sims_done = 0
         while sims_done < n_simulations:
             if deadline is not None and time.monotonic() >= deadline:
                 break
-            batch_nodes: list[Node] = []
             batch_boards: list[chess.Board] = []
-            batch_paths: list[list[Node]] = []
+            batch_evs: list[IncrementalEvaluator] = []
+            batch_paths: list[list[int]] = []
             while (
-                len(batch_nodes) < batch_size
-                and sims_done + len(batch_nodes) < n_simulations
+                len(batch_paths) < batch_size
+                and sims_done + len(batch_paths) < n_simulations
             ):
                 if deadline is not None and time.monotonic() >= deadline:
                     break
-                node = root
+                node = 0
                 b = board.copy()
+                ev = root_ev.copy()
                 path = [node]
-                # Selection
-                while node.children:
-                    move, node = max(
-                        node.children.items(), key=lambda kv: kv[1].u(self.c_puct)
-                    )
-                    b.push(move)
+                # Selection: replay moves from the root onto ``b``
+                while tree.is_expanded(node):
+                    node = tree.select_child(node, self.c_puct)
+                    ev.push(b, tree.move(node))
                     path.append(node)
                 # Expansion
                 if not b.is_game_over():
                     moves = list(b.legal_moves)
-                    pri = [1 / len(moves)] * len(moves)
-                    for m, p in zip(moves, pri):
-                        nb = b.copy()
-                        nb.push(m)
-                        node.children[m] = Node(nb, node, p)
-                batch_nodes.append(node)
+                    tree.expand(node, moves, [1 / len(moves)] * len(moves))
+                tree.add_virtual_loss(path)
                 batch_boards.append(b)
+                batch_evs.append(ev)
                 batch_paths.append(path)
                 STATS.nodes += len(path)
 
-            # Evaluate all boards in a single call
-            values = evaluate_positions(batch_boards) if batch_boards else []
+            # Evaluate all leaves of the batch
+            if self.evaluate_fn is not None:
+                values = self.evaluate_fn(batch_boards) if batch_boards else []
+            else:
+                values = [e.evaluate(b) for e, b in zip(batch_evs, batch_boards)]
 
             # Backup each result along its path
             for path, value in zip(batch_paths, values):
-                v = value
-                for cur in reversed(path):
-                    cur.n += 1
-                    cur.w += v
-                    v = -v
-            sims_done += len(batch_nodes)
+                tree.revert_virtual_loss(path)
+                tree.backup(path, value)
+            sims_done += len(batch_paths)
 
         # Choose move from root
-        if root.children:
-            if temperature <= 1e-3:
-                move = max(root.children.items(), key=lambda kv: kv[1].n)[0]
-            else:
-                visits = [child.n ** (1 / temperature) for child in root.children.values()]
-                s = sum(visits)
-                probs = [v / s for v in visits]
-                move = random.choices(list(root.children.keys()), weights=probs, k=1)[0]
+        start, end = tree.child_range(0)
+        moves = [m for m, _ in tree.children(0)]
+        visits = tree.visits[start:end]
+        if temperature <= 1e-3:
+            move = moves[int(np.argmax(visits))]
         else:
-            move = legal[0] if legal else None
+            weights = visits.astype(np.float64) ** (1 / temperature)
+            if weights.sum() > 0:
+                move = random.choices(moves, weights=weights.tolist(), k=1)[0]
+            else:
+                move = random.choice(moves)
         STATS.stop()
         logger.info("MCTS: %s", STATS.summary())
-        plot_profile_stats(STATS, filename="mcts_profile.png")
+        record_search(STATS, "mcts")
         return move, root
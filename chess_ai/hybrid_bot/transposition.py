@@ -0,0 +1,250 @@
+"""Fixed-capacity transposition table for the hybrid alpha-beta search.
+
+The table is sized in megabytes and stored as a handful of flat typed arrays
+(one per field) carved out of a single byte buffer instead of a dictionary of
+entry objects.  Memory therefore stays constant no matter how many nodes are
+searched, and the buffer can later be handed to other processes.
+
+Entries are grouped in buckets of two slots:
+
+* slot 0 is *depth-preferred* – it is only overwritten by a deeper (or equal)
+  search of any position, by the same position, or when its entry is stale;
+* slot 1 is *always-replace* – it receives everything slot 0 rejected.
+
+Each slot carries the search generation ("age") that wrote it.  Calling
+:meth:`TranspositionTable.new_search` bumps the generation so knowledge from
+previous moves of the same game is kept but gradually recycled.
+"""
+
+from __future__ import annotations
+
+import logging
+logger = logging.getLogger(__name__)
+
+from typing import Optional, Tuple
+
+import chess
+
+from core.eval_cache import position_key as stable_position_key
+
+
+EXACT, LOWERBOUND, UPPERBOUND = 0, 1, 2
+
+# key (Q) + value (d) + move (H) + depth (b) + flag (B) + age (B)
+SLOT_BYTES = 8 + 8 + 2 + 1 + 1 + 1
+BUCKET_SLOTS = 2
+DEFAULT_TT_MB = 16
+
+
+def position_key(board: chess.Board) -> int:
+    """Return a 64-bit unsigned key for ``board`` (never ``0``).
+
+    Delegates to :func:`core.eval_cache.position_key`, so the key does not
+    depend on ``PYTHONHASHSEED`` and Lazy-SMP helpers sharing the buffer
+    agree on it.
+    """
+    return stable_position_key(board) or 1
+
+
+def encode_move(move: Optional[chess.Move]) -> int:
+    """Pack ``move`` into 15 bits: ``from | to << 6 | promotion << 12``."""
+    if move is None or not move:
+        return 0
+    return move.from_square | (move.to_square << 6) | ((move.promotion or 0) << 12)
+
+
+def decode_move(code: int) -> Optional[chess.Move]:
+    """Inverse of :func:`encode_move`."""
+    if not code:
+        return None
+    promo = code >> 12
+    return chess.Move(code & 63, (code >> 6) & 63, promo or None)
+
+
+def buffer_size(n_buckets: int) -> int:
+    """Number of bytes needed to back a table with ``n_buckets`` buckets."""
+    return n_buckets * BUCKET_SLOTS * SLOT_BYTES
+
+
+def buckets_for_mb(size_mb: float) -> int:
+    """Return the bucket count that fits into ``size_mb`` megabytes."""
+    return max(1, int(size_mb * 1024 * 1024) // (BUCKET_SLOTS * SLOT_BYTES))
+
+
+class TranspositionTable:
+    """Bucketed, fixed-size transposition table.
+
+    Parameters
+    ----------
+    size_mb:
+        Approximate memory budget.  Ignored when ``n_buckets`` is given.
+    n_buckets:
+        Explicit number of two-slot buckets.
+    buffer:
+        Optional writable buffer (``bytearray``, ``memoryview`` or a shared
+        memory block's ``buf``) of at least :func:`buffer_size` bytes.  When
+        omitted a private ``bytearray`` is allocated.
+    """
+
+    def __init__(
+        self,
+        size_mb: float = DEFAULT_TT_MB,
+        *,
+        n_buckets: int | None = None,
+        buffer=None,
+    ) -> None:
+        self.n_buckets = n_buckets if n_buckets is not None else buckets_for_mb(size_mb)
+        self.n_slots = self.n_buckets * BUCKET_SLOTS
+        nbytes = buffer_size(self.n_buckets)
+        if buffer is None:
+            buffer = bytearray(nbytes)
+        mv = memoryview(buffer)
+        if mv.nbytes < nbytes:
+            raise ValueError(f"buffer too small: {mv.nbytes} < {nbytes} bytes")
+        self._mv = mv.cast("B")[:nbytes]
+
+        n = self.n_slots
+        off = 0
+        self._keys = self._mv[off:off + 8 * n].cast("Q")
+        off += 8 * n
+        self._values = self._mv[off:off + 8 * n].cast("d")
+        off += 8 * n
+        self._moves = self._mv[off:off + 2 * n].cast("H")
+        off += 2 * n
+        self._depths = self._mv[off:off + n].cast("b")
+        off += n
+        self._flags = self._mv[off:off + n]
+        off += n
+        self._ages = self._mv[off:off + n]
+
+        self.age = 0
+        self.used = 0
+        self.probes = 0
+        self.hits = 0
+        self.stores = 0
+        self.collisions = 0
+
+    # ------------------------------------------------------------------
+    #  Housekeeping
+    # ------------------------------------------------------------------
+    @property
+    def size_bytes(self) -> int:
+        return self._mv.nbytes
+
+    def clear(self) -> None:
+        """Drop every entry and reset the generation and counters."""
+        self._mv[:] = bytes(self._mv.nbytes)
+        self.age = 0
+        self.used = 0
+        self.reset_counters()
+
+    def reset_counters(self) -> None:
+        self.probes = 0
+        self.hits = 0
+        self.stores = 0
+        self.collisions = 0
+
+    def new_search(self) -> None:
+        """Start a new search generation; older entries become replaceable."""
+        self.age = (self.age + 1) & 0xFF
+        self.reset_counters()
+
+    def fill(self) -> float:
+        """Fraction of slots holding an entry."""
+        return self.used / self.n_slots if self.n_slots else 0.0
+
+    def sample_fill(self, n: int = 1000) -> float:
+        """Estimate the fill ratio from the first ``n`` slots.
+
+        Unlike :meth:`fill` this reads the table itself, so it is also correct
+        when several processes write to a shared buffer.
+        """
+        n = min(n, self.n_slots)
+        if not n:
+            return 0.0
+        keys = self._keys
+        return sum(1 for i in range(n) if keys[i]) / n
+
+    # ------------------------------------------------------------------
+    #  Probe / store
+    # ------------------------------------------------------------------
+    def probe(self, key: int) -> Optional[Tuple[int, int, float, Optional[chess.Move]]]:
+        """Return ``(depth, flag, value, move)`` for ``key`` or ``None``."""
+        self.probes += 1
+        idx = (key % self.n_buckets) * BUCKET_SLOTS
+        keys = self._keys
+        if keys[idx] != key:
+            idx += 1
+            if keys[idx] != key:
+                return None
+        self.hits += 1
+        return (
+            self._depths[idx],
+            self._flags[idx],
+            self._values[idx],
+            decode_move(self._moves[idx]),
+        )
+
+    def store(
+        self,
+        key: int,
+        depth: int,
+        flag: int,
+        value: float,
+        move: Optional[chess.Move],
+    ) -> bool:
+        """Store an entry and return ``True`` if a different position was evicted."""
+        self.stores += 1
+        base = (key % self.n_buckets) * BUCKET_SLOTS
+        keys = self._keys
+        old = keys[base]
+        if keys[base + 1] == key and old != key:
+            idx = base + 1
+            old = key
+        elif (
+            old == 0
+            or old == key
+            or depth >= self._depths[base]
+            or self._ages[base] != self.age
+        ):
+            idx = base
+        else:
+            idx = base + 1
+            old = keys[idx]
+
+        move_code = encode_move(move)
+        if old == key and not move_code:
+            # Keep the previously known best move for ordering.
+            move_code = self._moves[idx]
+        if old == 0:
+            self.used += 1
+        collided = old != 0 and old != key
+        if collided:
+            self.collisions += 1
+
+        keys[idx] = key
+        self._values[idx] = value
+        self._moves[idx] = move_code
+        self._depths[idx] = max(-128, min(127, depth))
+        self._flags[idx] = flag
+        self._ages[idx] = self.age
+        return collided
+
+    def release(self) -> None:
+        """Release the views onto the backing buffer."""
+        for view in (self._keys, self._values, self._moves, self._depths, self._flags, self._ages, self._mv):
+            view.release()
+
+
+__all__ = [
+    "EXACT",
+    "LOWERBOUND",
+    "UPPERBOUND",
+    "DEFAULT_TT_MB",
+    "TranspositionTable",
+    "position_key",
+    "encode_move",
+    "decode_move",
+    "buffer_size",
+    "buckets_for_mb",
+]
@@ -0,0 +1,277 @@
+"""Batching inference broker shared by concurrent searches.
+
+Every :class:`~chess_ai.batched_mcts.BatchedMCTS` or
+:class:`~chess_ai.neural_bot.NeuralBot` instance calls ``net.predict_many``
+on its own, so several games running side by side each pay the per-call
+overhead of the network for batches of a handful of boards.  The
+:class:`InferenceBroker` sits in front of one network and coalesces requests
+from any number of threads into larger batches.  A batch is flushed as soon
+as ``max_batch`` boards are queued or the oldest request has waited
+``max_latency_ms`` milliseconds, whichever comes first.
+
+:meth:`InferenceBroker.submit` returns a :class:`concurrent.futures.Future`;
+:meth:`InferenceBroker.predict_many` blocks on it, so a broker can be passed
+anywhere a network is expected.
+
+Searches running in other processes can share the same broker through a
+local socket: :meth:`InferenceBroker.serve` accepts connections on an
+address and :class:`RemoteNet` is the matching client exposing
+``predict_many``.  Connections unpickle what they receive, so both sides
+require an authkey; by default the ``multiprocessing`` authkey of the
+current process, which child processes inherit.
+
+The broker is agnostic of the network type and does not import ``torch``.
+"""
+
+from __future__ import annotations
+
+import logging
+logger = logging.getLogger(__name__)
+
+import multiprocessing as mp
+import os
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future
+from multiprocessing.connection import Client, Listener
+from typing import Any, Deque, Dict, List, Optional, Sequence, Tuple
+
+import chess
+
+Prediction = Tuple[Dict[chess.Move, float], float]
+
+DEFAULT_MAX_BATCH = int(os.getenv("CHESS_BROKER_MAX_BATCH", "64"))
+DEFAULT_MAX_LATENCY_MS = float(os.getenv("CHESS_BROKER_LATENCY_MS", "2.0"))
+
+
+def _pack(boards: Sequence[chess.Board]) -> List[Tuple[str, List[str]]]:
+    # ``chess.Board`` does not survive pickling with its move stack intact, so
+    # boards travel as the root FEN plus the moves played since.
+    return [(b.root().fen(), [m.uci() for m in b.move_stack]) for b in boards]
+
+
+def _unpack(packed: Sequence[Tuple[str, List[str]]]) -> List[chess.Board]:
+    boards = []
+    for fen, moves in packed:
+        board = chess.Board(fen)
+        for uci in moves:
+            board.push_uci(uci)
+        boards.append(board)
+    return boards
+
+
+class InferenceBroker:
+    """Coalesce ``predict_many`` calls from many searches into one batch.
+
+    Parameters
+    ----------
+    net:
+        Object providing ``predict_many(boards)``, e.g. a
+        :class:`~chess_ai.nn.torch_net.TorchNet`.
+    max_batch:
+        Flush once this many boards are queued.  Single requests larger than
+        this are still evaluated in one call.
+    max_latency_ms:
+        Flush a partial batch after the oldest request waited this long.
+    """
+
+    def __init__(
+        self,
+        net: Any,
+        max_batch: int = DEFAULT_MAX_BATCH,
+        max_latency_ms: float = DEFAULT_MAX_LATENCY_MS,
+    ) -> None:
+        self.net = net
+        self.max_batch = max(1, int(max_batch))
+        self.max_latency = max(0.0, float(max_latency_ms)) / 1000.0
+        # Aggregate counters (boards evaluated, network calls made).
+        self.boards = 0
+        self.batches = 0
+        self._queue: Deque[Tuple[float, List[chess.Board], Future]] = deque()
+        self._queued = 0
+        self._cond = threading.Condition()
+        self._closed = False
+        self._listener: Optional[Listener] = None
+        self._authkey: bytes = b""
+        self._worker = threading.Thread(target=self._run, name="inference-broker", daemon=True)
+        self._worker.start()
+
+    # ------------------------------------------------------------------
+    #  Client API
+    # ------------------------------------------------------------------
+    def submit(self, boards: Sequence[chess.Board]) -> "Future[List[Prediction]]":
+        """Queue ``boards`` and return a future for their predictions.
+
+        A request whose future is cancelled before its batch is taken is
+        skipped and its boards are not evaluated.
+        """
+        fut: "Future[List[Prediction]]" = Future()
+        boards = list(boards)
+        if not boards:
+            fut.set_result([])
+            return fut
+        with self._cond:
+            if self._closed:
+                raise RuntimeError("InferenceBroker is closed")
+            self._queue.append((time.monotonic(), boards, fut))
+            self._queued += len(boards)
+            self._cond.notify()
+        return fut
+
+    def predict_many(self, boards: Sequence[chess.Board]) -> List[Prediction]:
+        """Blocking drop-in replacement for ``net.predict_many``."""
+        return self.submit(boards).result()
+
+    @property
+    def mean_batch(self) -> float:
+        return self.boards / self.batches if self.batches else 0.0
+
+    # ------------------------------------------------------------------
+    #  Batching loop
+    # ------------------------------------------------------------------
+    def _take_batch(self) -> List[Tuple[float, List[chess.Board], Future]]:
+        """Wait until a batch is due and pop its requests (empty on close)."""
+        with self._cond:
+            while True:
+                if self._queue:
+                    oldest = self._queue[0][0]
+                    wait = oldest + self.max_latency - time.monotonic()
+                    if self._queued >= self.max_batch or wait <= 0 or self._closed:
+                        break
+                    self._cond.wait(wait)
+                elif self._closed:
+                    return []
+                else:
+                    self._cond.wait()
+            taken = []
+            n = 0
+            while self._queue and (not taken or n + len(self._queue[0][1]) <= self.max_batch):
+                req = self._queue.popleft()
+                taken.append(req)
+                n += len(req[1])
+            self._queued -= n
+            return taken
+
+    def _run(self) -> None:
+        while True:
+            taken = self._take_batch()
+            if not taken:
+                return
+            # Drop cancelled requests; the rest can no longer be cancelled,
+            # so setting their result below cannot raise InvalidStateError.
+            taken = [req for req in taken if req[2].set_running_or_notify_cancel()]
+            if not taken:
+                continue
+            boards = [b for _, req_boards, _ in taken for b in req_boards]
+            try:
+                results = self.net.predict_many(boards)
+            except Exception as exc:  # propagate to every waiting caller
+                logger.warning("InferenceBroker: batch of %d failed: %s", len(boards), exc)
+                for _, _, fut in taken:
+                    fut.set_exception(exc)
+                continue
+            self.boards += len(boards)
+            self.batches += 1
+            pos = 0
+            for _, req_boards, fut in taken:
+                fut.set_result(list(results[pos:pos + len(req_boards)]))
+                pos += len(req_boards)
+
+    # ------------------------------------------------------------------
+    #  Cross-process access
+    # ------------------------------------------------------------------
+    def serve(self, address: Any = ("127.0.0.1", 0), authkey: bytes | None = None) -> Tuple[Any, bytes]:
+        """Accept :class:`RemoteNet` clients on ``address``.
+
+        Each connection is handled by its own thread which forwards requests
+        into this broker, so boards from several processes share batches.
+        Clients must authenticate with ``authkey`` (default: this process's
+        ``multiprocessing`` authkey); an empty key is refused.  Returns
+        ``(address, authkey)`` – the bound address is useful with port ``0``.
+        """
+        if self._listener is not None:
+            return self._listener.address, self._authkey
+        self._authkey = _require_authkey(authkey)
+        self._listener = Listener(address, authkey=self._authkey)
+        threading.Thread(target=self._accept_loop, name="inference-broker-accept", daemon=True).start()
+        logger.info("InferenceBroker: serving on %s", self._listener.address)
+        return self._listener.address, self._authkey
+
+    def _accept_loop(self) -> None:
+        listener = self._listener
+        while listener is not None and not self._closed:
+            try:
+                conn = listener.accept()
+            except (OSError, EOFError):
+                return
+            except Exception as exc:  # e.g. authentication failure
+                logger.warning("InferenceBroker: rejected client: %s", exc)
+                continue
+            threading.Thread(target=self._handle_client, args=(conn,), daemon=True).start()
+
+    def _handle_client(self, conn) -> None:
+        with conn:
+            while True:
+                try:
+                    boards = _unpack(conn.recv())
+                except (EOFError, OSError):
+                    return
+                try:
+                    conn.send(("ok", self.predict_many(boards)))
+                except Exception as exc:
+                    conn.send(("error", repr(exc)))
+
+    # ------------------------------------------------------------------
+    def close(self) -> None:
+        """Flush pending requests and stop the worker and the listener."""
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+        if self._listener is not None:
+            try:
+                self._listener.close()
+            except OSError:
+                pass
+            self._listener = None
+        self._worker.join()
+
+    def __enter__(self) -> "InferenceBroker":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+
+def _require_authkey(authkey: bytes | None) -> bytes:
+    key = bytes(mp.current_process().authkey if authkey is None else authkey)
+    if not key:
+        raise ValueError("InferenceBroker connections require a non-empty authkey")
+    return key
+
+
+class RemoteNet:
+    """``predict_many`` client for a broker served by :meth:`InferenceBroker.serve`.
+
+    ``authkey`` is the key returned by ``serve``; it defaults to this
+    process's ``multiprocessing`` authkey, which matches the broker's default
+    in its child processes.
+    """
+
+    def __init__(self, address: Any, authkey: bytes | None = None) -> None:
+        self._conn = Client(address, authkey=_require_authkey(authkey))
+        self._lock = threading.Lock()
+
+    def predict_many(self, boards: Sequence[chess.Board]) -> List[Prediction]:
+        with self._lock:
+            self._conn.send(_pack(boards))
+            status, payload = self._conn.recv()
+        if status != "ok":
+            raise RuntimeError(f"remote inference failed: {payload}")
+        return payload
+
+    def close(self) -> None:
+        self._conn.close()
+
+
+__all__ = ["InferenceBroker", "RemoteNet"]
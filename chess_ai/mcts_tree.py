@@ -0,0 +1,323 @@
+"""Array-backed search tree shared by the MCTS implementations.
+
+Instead of one Python object holding a :class:`chess.Board` copy per node,
+the tree keeps its statistics in a struct-of-arrays layout (NumPy arrays for
+visit count ``N``, total value ``W``, prior, parent, first child, child count
+and a 16-bit move code).  ``prior_raw`` keeps the priors passed to
+:meth:`MCTSTree.expand`, so root exploration noise can be re-mixed into
+``prior`` on every search without compounding.  The children of a node are allocated as one
+contiguous block when it is expanded, so their statistics can be read with a
+single slice, and PUCT selection is one NumPy expression plus an argmax.
+Only the root board is stored; boards for deeper nodes are rebuilt by
+replaying moves from the root while descending.
+
+Batched searches apply a *virtual loss* to every node on a selected path
+until its leaf has been evaluated: each pending visit counts as a visit with
+value ``-virtual_loss``.  Further selections in the same batch are thereby
+steered to other branches instead of collapsing onto a single path.
+
+:meth:`MCTSTree.reroot` keeps the subtree below a played move so statistics
+can be reused by the next search.  :class:`TreeNode` offers a small
+object-style view (``n``, ``w``, ``prior``, ``children``, ``q()``) for callers
+that inspect the tree after a search.
+"""
+
+from __future__ import annotations
+
+import logging
+logger = logging.getLogger(__name__)
+
+import math
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import chess
+import numpy as np
+
+
+def _encode(move: chess.Move) -> int:
+    return move.from_square | (move.to_square << 6) | ((move.promotion or 0) << 12)
+
+
+def _decode(code: int) -> chess.Move:
+    promo = code >> 12
+    return chess.Move(code & 63, (code >> 6) & 63, promo or None)
+
+
+class MCTSTree:
+    """Struct-of-arrays MCTS tree rooted at ``board``."""
+
+    def __init__(self, board: chess.Board, capacity: int = 256, virtual_loss: float = 1.0) -> None:
+        capacity = max(1, capacity)
+        self.virtual_loss = virtual_loss
+        self.pending = np.zeros(capacity, dtype=np.int32)
+        self.visits = np.zeros(capacity, dtype=np.int32)
+        self.value_sum = np.zeros(capacity, dtype=np.float64)
+        self.prior = np.zeros(capacity, dtype=np.float64)
+        # Priors as given to expand(); ``prior`` may carry root noise on top.
+        self.prior_raw = np.zeros(capacity, dtype=np.float64)
+        self.parent = np.full(capacity, -1, dtype=np.int32)
+        self.first_child = np.full(capacity, -1, dtype=np.int32)
+        self.num_children = np.zeros(capacity, dtype=np.int32)
+        self.move_code = np.zeros(capacity, dtype=np.uint16)
+        self.board = board.copy()
+        self.size = 1
+
+    # ------------------------------------------------------------------
+    #  Storage
+    # ------------------------------------------------------------------
+    _FIELDS = ("visits", "value_sum", "prior", "prior_raw", "parent", "first_child", "num_children", "move_code", "pending")
+    _FILL = {"parent": -1, "first_child": -1}
+
+    @property
+    def capacity(self) -> int:
+        return len(self.visits)
+
+    @property
+    def nbytes(self) -> int:
+        return sum(getattr(self, f).nbytes for f in self._FIELDS)
+
+    def _ensure(self, extra: int) -> None:
+        need = self.size + extra
+        if need <= self.capacity:
+            return
+        new_cap = max(need, 2 * self.capacity)
+        for name in self._FIELDS:
+            old = getattr(self, name)
+            arr = np.full(new_cap, self._FILL.get(name, 0), dtype=old.dtype)
+            arr[: self.size] = old[: self.size]
+            setattr(self, name, arr)
+
+    def reset(self, board: chess.Board) -> None:
+        """Drop all nodes and start a fresh tree at ``board``."""
+        self.board = board.copy()
+        self.size = 1
+        self.pending[0] = 0
+        self.visits[0] = 0
+        self.value_sum[0] = 0.0
+        self.prior[0] = 0.0
+        self.prior_raw[0] = 0.0
+        self.parent[0] = -1
+        self.first_child[0] = -1
+        self.num_children[0] = 0
+        self.move_code[0] = 0
+
+    # ------------------------------------------------------------------
+    #  Structure
+    # ------------------------------------------------------------------
+    def is_expanded(self, idx: int) -> bool:
+        return self.first_child[idx] >= 0
+
+    def child_range(self, idx: int) -> Tuple[int, int]:
+        start = int(self.first_child[idx])
+        if start < 0:
+            return 0, 0
+        return start, start + int(self.num_children[idx])
+
+    def move(self, idx: int) -> chess.Move:
+        """Return the move leading from the parent of ``idx`` to ``idx``."""
+        return _decode(int(self.move_code[idx]))
+
+    def children(self, idx: int) -> List[Tuple[chess.Move, int]]:
+        start, end = self.child_range(idx)
+        return [(_decode(int(c)), start + i) for i, c in enumerate(self.move_code[start:end])]
+
+    def expand(self, idx: int, moves: Sequence[chess.Move], priors: Sequence[float]) -> int:
+        """Allocate a contiguous child block for ``idx``; return its start."""
+        k = len(moves)
+        self._ensure(k)
+        start = self.size
+        end = start + k
+        self.visits[start:end] = 0
+        self.pending[start:end] = 0
+        self.value_sum[start:end] = 0.0
+        self.prior[start:end] = priors
+        self.prior_raw[start:end] = self.prior[start:end]
+        self.parent[start:end] = idx
+        self.first_child[start:end] = -1
+        self.num_children[start:end] = 0
+        self.move_code[start:end] = [_encode(m) for m in moves]
+        self.first_child[idx] = start
+        self.num_children[idx] = k
+        self.size = end
+        return start
+
+    def path_moves(self, idx: int) -> List[chess.Move]:
+        """Moves from the root to ``idx``."""
+        moves: List[chess.Move] = []
+        while self.parent[idx] >= 0:
+            moves.append(self.move(idx))
+            idx = int(self.parent[idx])
+        moves.reverse()
+        return moves
+
+    def board_at(self, idx: int) -> chess.Board:
+        """Rebuild the board of node ``idx`` by replaying from the root."""
+        board = self.board.copy()
+        for move in self.path_moves(idx):
+            board.push(move)
+        return board
+
+    # ------------------------------------------------------------------
+    #  Statistics
+    # ------------------------------------------------------------------
+    def q(self, idx: int) -> float:
+        n = self.visits[idx]
+        return float(self.value_sum[idx] / n) if n else 0.0
+
+    def select_child(self, idx: int, c_puct: float) -> int:
+        """Return the child of ``idx`` maximising the PUCT score.
+
+        Pending (virtual) visits count as visits with value
+        ``-virtual_loss``.
+        """
+        start, end = self.child_range(idx)
+        pending = self.pending[start:end]
+        n = self.visits[start:end] + pending
+        w = self.value_sum[start:end] - self.virtual_loss * pending
+        q = np.divide(w, n, out=np.zeros(end - start), where=n > 0)
+        parent_n = self.visits[idx] + self.pending[idx]
+        u = q + c_puct * self.prior[start:end] * math.sqrt(parent_n) / (1 + n)
+        return start + int(np.argmax(u))
+
+    def add_virtual_loss(self, path: Sequence[int]) -> None:
+        """Mark ``path`` as pending evaluation."""
+        self.pending[list(path)] += 1
+
+    def revert_virtual_loss(self, path: Sequence[int]) -> None:
+        self.pending[list(path)] -= 1
+
+    def backup(self, path: Sequence[int], value: float) -> None:
+        """Add ``value`` along ``path`` (leaf last), flipping sign each ply."""
+        idx = np.asarray(path, dtype=np.intp)
+        signs = (-1.0) ** np.arange(len(idx) - 1, -1, -1)
+        self.visits[idx] += 1
+        self.value_sum[idx] += value * signs
+
+    # ------------------------------------------------------------------
+    #  Tree reuse
+    # ------------------------------------------------------------------
+    def reroot(self, move: chess.Move) -> bool:
+        """Make the child reached by ``move`` the new root.
+
+        The subtree below that child is compacted to the front of the arrays;
+        everything else is discarded.  Returns ``False`` (and starts an empty
+        tree) if the child does not exist.
+        """
+        self.board.push(move)
+        code = _encode(move)
+        start, end = self.child_range(0)
+        hits = np.nonzero(self.move_code[start:end] == code)[0]
+        if not len(hits):
+            self.reset(self.board)
+            return False
+
+        old_root = start + int(hits[0])
+        fields = {name: getattr(self, name) for name in self._FIELDS}
+        new = {
+            name: np.full(self.capacity, self._FILL.get(name, 0), dtype=arr.dtype)
+            for name, arr in fields.items()
+        }
+        for name in ("visits", "value_sum", "prior", "prior_raw", "move_code", "pending"):
+            new[name][0] = fields[name][old_root]
+        new["parent"][0] = -1
+
+        size = 1
+        queue = [(old_root, 0)]
+        while queue:
+            old, ni = queue.pop()
+            o_start = int(fields["first_child"][old])
+            if o_start < 0:
+                continue
+            k = int(fields["num_children"][old])
+            n_start = size
+            for name in ("visits", "value_sum", "prior", "prior_raw", "move_code", "pending"):
+                new[name][n_start:n_start + k] = fields[name][o_start:o_start + k]
+            new["parent"][n_start:n_start + k] = ni
+            new["first_child"][ni] = n_start
+            new["num_children"][ni] = k
+            size += k
+            queue.extend((o_start + i, n_start + i) for i in range(k))
+
+        for name, arr in new.items():
+            setattr(self, name, arr)
+        self.size = size
+        return True
+
+    def advance(self, board: chess.Board) -> bool:
+        """Re-root the tree at ``board`` if it continues the current root.
+
+        Returns ``True`` when statistics were kept, ``False`` when the tree
+        had to be reset because ``board`` is not reachable from the root via
+        the moves in its move stack.
+        """
+        old_stack = self.board.move_stack
+        new_stack = board.move_stack
+        n_old = len(old_stack)
+        if (
+            len(new_stack) < n_old
+            or new_stack[:n_old] != old_stack
+            or board.root().fen() != self.board.root().fen()
+        ):
+            self.reset(board)
+            return False
+        kept = True
+        for move in new_stack[n_old:]:
+            if not self.reroot(move):
+                kept = False
+        return kept
+
+
+class TreeNode:
+    """Lightweight object view of one node of an :class:`MCTSTree`.
+
+    ``TreeNode(board)`` creates a new tree and returns a view of its root.
+    """
+
+    __slots__ = ("tree", "idx")
+
+    def __init__(self, board: chess.Board | None = None, *, tree: MCTSTree | None = None, idx: int = 0) -> None:
+        if tree is None:
+            if board is None:
+                raise ValueError("TreeNode needs a board or an existing tree")
+            tree = MCTSTree(board)
+        self.tree = tree
+        self.idx = idx
+
+    @property
+    def board(self) -> chess.Board:
+        if self.idx == 0:
+            return self.tree.board
+        return self.tree.board_at(self.idx)
+
+    @property
+    def parent(self) -> Optional["TreeNode"]:
+        p = int(self.tree.parent[self.idx])
+        return None if p < 0 else TreeNode(tree=self.tree, idx=p)
+
+    @property
+    def n(self) -> int:
+        return int(self.tree.visits[self.idx])
+
+    @property
+    def w(self) -> float:
+        return float(self.tree.value_sum[self.idx])
+
+    @property
+    def prior(self) -> float:
+        return float(self.tree.prior[self.idx])
+
+    @property
+    def children(self) -> Dict[chess.Move, "TreeNode"]:
+        return {m: TreeNode(tree=self.tree, idx=i) for m, i in self.tree.children(self.idx)}
+
+    def q(self) -> float:
+        return self.tree.q(self.idx)
+
+    def u(self, c_puct: float) -> float:
+        p = int(self.tree.parent[self.idx])
+        if p < 0:
+            return self.q()
+        return self.q() + c_puct * self.prior * math.sqrt(self.tree.visits[p]) / (1 + self.n)
+
+
+__all__ = ["MCTSTree", "TreeNode"]
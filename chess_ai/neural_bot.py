@@ -12,6 +12,7 @@ and maintains API compatibility with other agents.
 
 import chess
 import math
+import os
 
 from core.evaluator import Evaluator
 from utils import GameContext
@@ -47,6 +48,11 @@ class NeuralBot:
                 from .nn import TorchNet
 
                 _SHARED_NET = TorchNet.from_config()
+                if os.getenv("CHESS_NN_BROKER", "0") not in ("", "0"):
+                    # Coalesce requests from concurrently running games.
+                    from .inference_broker import InferenceBroker
+
+                    _SHARED_NET = InferenceBroker(_SHARED_NET)
             except Exception:  # ImportError or config issues
                 class _StubNet:
                     def predict_many(self, boards):
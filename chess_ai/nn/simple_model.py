@@ -8,10 +8,14 @@ small and meant for tests and prototyping rather than playing strength.
 from __future__ import annotations
 
 import chess
+import numpy as np
 import torch
 import logging
 logger = logging.getLogger(__name__)
 
+import threading
+from typing import Sequence
+
 import torch.nn as nn
 import torch.nn.functional as F
 
@@ -23,24 +27,74 @@ POLICY_DIM = 64 * 64  # from-square x to-square
 # Board encoding
 # ---------------------------------------------------------------------------
 
+# Bit positions 0..63 for unpacking bitboards; plane ``p`` of the encoding
+# holds piece type ``p % 6 + 1`` of colour white (``p < 6``) or black.
+_SQUARE_BITS = np.arange(64, dtype=np.uint64)
+
+
+def encode_boards(boards: Sequence[chess.Board], out: np.ndarray | None = None) -> np.ndarray:
+    """Encode ``boards`` into a ``(len(boards), INPUT_DIM)`` float32 array.
+
+    The twelve piece planes are unpacked from python-chess bitboards with
+    NumPy shifts instead of iterating over ``piece_map()``.  When ``out`` is
+    given the rows are written into it (it must have at least
+    ``len(boards)`` rows) and the filled view is returned.
+    """
+    n = len(boards)
+    if out is None:
+        out = np.empty((n, INPUT_DIM), dtype=np.float32)
+    out = out[:n]
+    masks = np.empty((n, 12), dtype=np.uint64)
+    extras = np.empty((n, 5), dtype=np.float32)
+    for i, board in enumerate(boards):
+        white, black = board.occupied_co[chess.WHITE], board.occupied_co[chess.BLACK]
+        for j, bb in enumerate(
+            (board.pawns, board.knights, board.bishops, board.rooks, board.queens, board.kings)
+        ):
+            masks[i, j] = bb & white
+            masks[i, j + 6] = bb & black
+        extras[i] = (
+            board.turn == chess.WHITE,
+            board.has_kingside_castling_rights(chess.WHITE),
+            board.has_queenside_castling_rights(chess.WHITE),
+            board.has_kingside_castling_rights(chess.BLACK),
+            board.has_queenside_castling_rights(chess.BLACK),
+        )
+    bits = (masks[:, :, None] >> _SQUARE_BITS) & np.uint64(1)
+    out[:, : 12 * 64] = bits.reshape(n, 12 * 64)
+    out[:, 12 * 64:] = extras
+    return out
+
+
+class BatchEncoder:
+    """Reusable :func:`encode_boards` buffer, one per thread.
+
+    A network (and its encoder) is shared process-wide, while web workers
+    and threaded tournament games call ``predict_many`` concurrently; each
+    thread therefore gets its own buffer, grown to the largest batch it has
+    seen.  On CPU the returned tensor aliases that buffer, so it is only
+    valid until the same thread's next :meth:`encode`.
+    """
+
+    def __init__(self, capacity: int = 64) -> None:
+        self._capacity = max(1, capacity)
+        self._local = threading.local()
+
+    def _buffer(self, n: int) -> np.ndarray:
+        buf = getattr(self._local, "buf", None)
+        if buf is None or n > len(buf):
+            size = self._capacity if buf is None else 2 * len(buf)
+            buf = np.zeros((max(n, size), INPUT_DIM), dtype=np.float32)
+            self._local.buf = buf
+        return buf
+
+    def encode(self, boards: Sequence[chess.Board]) -> torch.Tensor:
+        return torch.from_numpy(encode_boards(boards, self._buffer(len(boards))))
+
+
 def board_to_tensor(board: chess.Board) -> torch.Tensor:
     """Encode ``board`` into a flat tensor of size :data:`INPUT_DIM`."""
-    planes = torch.zeros(12, 8, 8, dtype=torch.float32)
-    for square, piece in board.piece_map().items():
-        idx = piece.piece_type - 1 + (0 if piece.color == chess.WHITE else 6)
-        planes[idx, square // 8, square % 8] = 1.0
-    flat = planes.view(-1)
-    extras = torch.tensor(
-        [
-            1.0 if board.turn == chess.WHITE else 0.0,
-            1.0 if board.has_kingside_castling_rights(chess.WHITE) else 0.0,
-            1.0 if board.has_queenside_castling_rights(chess.WHITE) else 0.0,
-            1.0 if board.has_kingside_castling_rights(chess.BLACK) else 0.0,
-            1.0 if board.has_queenside_castling_rights(chess.BLACK) else 0.0,
-        ],
-        dtype=torch.float32,
-    )
-    return torch.cat([flat, extras])
+    return torch.from_numpy(encode_boards([board])[0])
 
 
 # ---------------------------------------------------------------------------
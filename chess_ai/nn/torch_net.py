@@ -7,18 +7,21 @@ from disk based on a configuration file.
 
 from __future__ import annotations
 
+from collections import OrderedDict
 from typing import Dict, Iterable, List, Tuple, Optional
 
 import logging
 logger = logging.getLogger(__name__)
 
 import chess
+import numpy as np
 import torch
 import yaml
 
+from ..hybrid_bot.transposition import position_key
 from .simple_model import (
+    BatchEncoder,
     SimpleChessModel,
-    board_to_tensor,
     load_dummy_weights,
 )
 
@@ -40,6 +43,7 @@ class TorchNet:
         self._cache: Optional["_LRUCache"] = None
         self._use_half: bool = False
         self._quantized: bool = False
+        self._encoder = BatchEncoder()
 
     # ------------------------------------------------------------------
     @classmethod
@@ -85,29 +89,38 @@ class TorchNet:
 
     # ------------------------------------------------------------------
     def predict_many(self, boards: Iterable[chess.Board]) -> List[Tuple[Dict[chess.Move, float], float]]:
-        """Evaluate a batch of boards returning policy and value for each."""
+        """Evaluate a batch of boards returning policy and value for each.
+
+        Legal moves are generated once per board and addressed by their
+        ``from * 64 + to`` index into the policy head.  The softmax over legal
+        moves is computed for the whole batch at once on the ``(B, 4096)``
+        logits.  Cached entries are compact ``(move_index, prob)`` arrays keyed
+        by the board's position hash.
+        """
         boards_list = list(boards)
         if not boards_list:
             return []
+        legal_lists = [list(b.legal_moves) for b in boards_list]
+        index_arrays = [
+            np.fromiter((m.from_square * 64 + m.to_square for m in legal), dtype=np.int64, count=len(legal))
+            for legal in legal_lists
+        ]
+
         # Try cache first
         cache = self._cache
-        cached_indices: List[int] = []
-        cached_values: Dict[int, Tuple[Dict[str, float], float]] = {}
+        keys: List[int] = []
+        entries: List[Optional[_PolicyEntry]] = [None] * len(boards_list)
         if cache is not None:
-            for i, b in enumerate(boards_list):
-                fen = b.fen()
-                got = cache.get(fen)
-                if got is not None:
-                    cached_indices.append(i)
-                    cached_values[i] = got
-
-        # Prepare tensors for uncached boards
-        to_eval_indices: List[int] = [i for i in range(len(boards_list)) if i not in cached_indices]
-        eval_boards: List[chess.Board] = [boards_list[i] for i in to_eval_indices]
-        results_pairs: Dict[int, Tuple[Dict[str, float], float]] = {}
-
-        if eval_boards:
-            batch = torch.stack([board_to_tensor(b) for b in eval_boards]).to(self.device)
+            keys = [position_key(b) for b in boards_list]
+            for i, key in enumerate(keys):
+                got = cache.get(key)
+                if got is not None and np.array_equal(got[0], index_arrays[i]):
+                    entries[i] = got
+
+        to_eval = [i for i, e in enumerate(entries) if e is None]
+        if to_eval:
+            eval_boards = [boards_list[i] for i in to_eval]
+            batch = self._encoder.encode(eval_boards).to(self.device)
             # Ensure dtype matches model
             try:
                 param_dtype = next(self.model.parameters()).dtype
@@ -118,46 +131,76 @@ class TorchNet:
 
             with torch.inference_mode():
                 policy_logits, values = self.model(batch)
+                probs = self._legal_softmax(policy_logits, [index_arrays[i] for i in to_eval])
+            values_list = values.float().cpu().tolist()
 
-            temp = max(1e-3, float(self.policy_temperature))
-            for j, (b, logits, v) in enumerate(zip(eval_boards, policy_logits, values)):
-                legal = list(b.legal_moves)
-                policy_ucis: Dict[str, float] = {}
-                if legal:
-                    idx = torch.tensor([m.from_square * 64 + m.to_square for m in legal], device=logits.device)
-                    sel = logits[idx] / temp
-                    probs = torch.softmax(sel, dim=0).cpu().tolist()
-                    policy_ucis = {m.uci(): p for m, p in zip(legal, probs)}
-                val = float(v.item())
-                val = self.value_scale * val + self.value_bias
+            pos = 0
+            for j, i in enumerate(to_eval):
+                k = len(index_arrays[i])
+                val = self.value_scale * float(values_list[j]) + self.value_bias
                 if self.clamp_value:
                     val = max(-1.0, min(1.0, val))
-                global_index = to_eval_indices[j]
-                results_pairs[global_index] = (policy_ucis, val)
+                entry = (index_arrays[i], probs[pos:pos + k].copy(), val)
+                pos += k
+                entries[i] = entry
                 if cache is not None:
-                    cache.set(b.fen(), (policy_ucis, val))
+                    cache.set(keys[i], entry)
 
-        # Assemble final results in original order
         results: List[Tuple[Dict[chess.Move, float], float]] = []
-        for i, b in enumerate(boards_list):
-            if i in cached_values:
-                policy_ucis, val = cached_values[i]
-            else:
-                policy_ucis, val = results_pairs[i]
-            # Map back to Move objects and filter to legal only
-            legal = set(b.legal_moves)
-            policy: Dict[chess.Move, float] = {}
-            if policy_ucis:
-                for uci, p in policy_ucis.items():
-                    try:
-                        mv = chess.Move.from_uci(uci)
-                    except Exception:
-                        continue
-                    if mv in legal:
-                        policy[mv] = p
-            results.append((policy, float(val)))
+        for legal, (_, move_probs, val) in zip(legal_lists, entries):
+            results.append((dict(zip(legal, move_probs.tolist())), float(val)))
         return results
 
+    def _legal_softmax(self, logits: torch.Tensor, index_arrays: List[np.ndarray]) -> np.ndarray:
+        """Softmax of ``logits`` restricted to each row's legal move indices.
+
+        Returns the probabilities of all legal moves concatenated in board
+        order.  Promotions to different pieces share a policy index; each
+        still counts separately in the normalisation.
+        """
+        counts = [len(a) for a in index_arrays]
+        if not sum(counts):
+            return np.zeros(0, dtype=np.float32)
+        device = logits.device
+        rows = torch.from_numpy(np.repeat(np.arange(len(index_arrays)), counts)).to(device)
+        cols = torch.from_numpy(np.concatenate(index_arrays)).to(device)
+        temp = max(1e-3, float(self.policy_temperature))
+        scaled = logits.float() / temp
+        mult = torch.zeros_like(scaled)
+        mult.index_put_((rows, cols), torch.ones_like(rows, dtype=scaled.dtype), accumulate=True)
+        masked = scaled.masked_fill(mult == 0, float("-inf"))
+        row_max = masked.max(dim=1, keepdim=True).values.clamp_min(-1e30)
+        exp = torch.exp(masked - row_max)
+        denom = (exp * mult).sum(dim=1, keepdim=True).clamp_min(1e-30)
+        return (exp / denom)[rows, cols].cpu().numpy()
+
+
+# Cached policy: legal move indices, their probabilities and the value.
+_PolicyEntry = Tuple[np.ndarray, np.ndarray, float]
+
+
+class _LRUCache:
+    """Small least-recently-used mapping for :meth:`TorchNet.predict_many`."""
+
+    def __init__(self, capacity: int) -> None:
+        self.capacity = max(1, int(capacity))
+        self._data: "OrderedDict[int, _PolicyEntry]" = OrderedDict()
+
+    def get(self, key: int) -> Optional[_PolicyEntry]:
+        entry = self._data.get(key)
+        if entry is not None:
+            self._data.move_to_end(key)
+        return entry
+
+    def set(self, key: int, value: _PolicyEntry) -> None:
+        self._data[key] = value
+        self._data.move_to_end(key)
+        if len(self._data) > self.capacity:
+            self._data.popitem(last=False)
+
+    def __len__(self) -> int:
+        return len(self._data)
+
 
 # ---------------------------------------------------------------------------
 # CLI helper
@@ -0,0 +1,506 @@
+"""
+Precomputed feature vectors for AdvancedPatternMatcher.
+
+Every pattern is encoded once, when it is first added, into one row of a
+contiguous float matrix (the numeric features the similarity functions of
+``AdvancedPatternMatcher`` compare) plus one row of an ``int8`` piece-placement
+matrix.  A query board is encoded the same way, and every similarity is then a
+single broadcast expression over the whole matrix instead of re-parsing the
+pattern FEN and rerunning feature extraction per pattern.
+
+The scoring functions below reproduce the per-pattern formulas of
+``AdvancedPatternMatcher`` exactly; they are plain functions over arrays so a
+shard of the matrix can be scored anywhere.
+
+For large catalogues an optional random-hyperplane LSH index narrows a top-k
+query to the buckets nearest the query before exact scoring.
+
+The matrix can be saved next to the pattern catalogue (``<catalogue>.features.npz``)
+and reloaded, so features are not recomputed at start-up.
+"""
+
+from __future__ import annotations
+
+import logging
+import threading
+from collections import deque
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Deque, Dict, Iterable, List, Optional, Tuple, Union
+
+import chess
+import numpy as np
+
+from chess_ai.enhanced_chess_pattern_detector import ChessPatternEnhanced, PatternCategory
+
+logger = logging.getLogger(__name__)
+
+INDEX_SUFFIX = ".features.npz"
+FORMAT_VERSION = 1
+# Row changes remembered for incremental copies; older copies reload in full
+JOURNAL_LIMIT = 65536
+
+MOTIFS = ('forks', 'pins', 'skewers', 'discovered_attacks')
+COLORS = ('white', 'black')
+MATERIAL_PIECES = (chess.PAWN, chess.KNIGHT, chess.BISHOP, chess.ROOK, chess.QUEEN)
+
+# Column layout of the feature matrix.
+FEATURE_COLUMNS = (
+    ['material_balance']
+    + [f'{name}_{color}' for name in ('king_safety', 'piece_activity', 'center_control') for color in COLORS]
+    + list(MOTIFS)
+    + [f'threats_{color}' for color in COLORS]
+    + [f'space_control_{color}' for color in COLORS]
+    + ['piece_count']
+    + [f'{chess.piece_name(pt)}_{color}' for color in COLORS for pt in MATERIAL_PIECES]
+)
+POSITIONAL = slice(0, 7)      # material balance, king safety, piece activity, center control
+MOTIF_COUNTS = slice(7, 11)
+THREATS = slice(11, 13)
+SPACE = slice(13, 15)
+PIECE_COUNT = 15
+MATERIAL = slice(16, 26)
+N_FEATURES = len(FEATURE_COLUMNS)
+
+# Divisors that turn a column difference into a [0, 1] dissimilarity.
+POSITIONAL_SCALE = np.array([1000.0, 1.0, 1.0, 1.0, 1.0, 1.0, 1.0])
+THREAT_SCALE = 10.0
+
+# Rough per-column spread, used only to balance columns for LSH bucketing.
+_LSH_SCALE = np.array(
+    [1000.0] + [1.0] * 6 + [4.0] * 4 + [10.0] * 2 + [1.0] * 2 + [32.0] + [8.0, 2.0, 2.0, 2.0, 1.0] * 2
+)
+
+
+@dataclass
+class BoardEncoding:
+    """Compact encoding of one position: feature vector and piece codes."""
+
+    features: np.ndarray   # float64[N_FEATURES]
+    placement: np.ndarray  # int8[64]; 0 empty, 1-6 white P..K, 7-12 black P..K
+
+
+def _placement(board: chess.Board) -> np.ndarray:
+    codes = np.zeros(64, dtype=np.int8)
+    for sq, piece in board.piece_map().items():
+        codes[sq] = piece.piece_type + (0 if piece.color == chess.WHITE else 6)
+    return codes
+
+
+def encode_board(board: chess.Board, extractor) -> BoardEncoding:
+    """Encode ``board`` using ``extractor`` (a ``TacticalFeatureExtractor``).
+
+    Exceptions from feature extraction propagate; callers decide whether a
+    failure skips the position or aborts the query.
+    """
+    vec = np.zeros(N_FEATURES, dtype=np.float64)
+    _fill_structure(vec, board)
+    _fill_extracted(vec, extractor.extract_features(board))
+    return BoardEncoding(vec, _placement(board))
+
+
+def _fill_extracted(vec: np.ndarray, features: Dict[str, Any]) -> None:
+    """Fill the columns taken from ``TacticalFeatureExtractor`` output."""
+    vec[0] = features['material_balance']
+    col = 1
+    for name in ('king_safety', 'piece_activity', 'center_control'):
+        for color in COLORS:
+            vec[col] = features[name][color]
+            col += 1
+    for i, motif in enumerate(MOTIFS):
+        vec[MOTIF_COUNTS.start + i] = len(features['tactical_motifs'].get(motif, []))
+    for i, color in enumerate(COLORS):
+        vec[THREATS.start + i] = features['threats'][color]
+
+
+def _fill_structure(vec: np.ndarray, board: chess.Board) -> None:
+    """Fill the columns that need only the piece layout."""
+    for i, color in enumerate((chess.WHITE, chess.BLACK)):
+        controlled = chess.SquareSet()
+        for sq in chess.SquareSet(board.occupied_co[color]):
+            controlled |= board.attacks(sq)
+        vec[SPACE.start + i] = len(controlled) / 64.0
+        for j, piece_type in enumerate(MATERIAL_PIECES):
+            vec[MATERIAL.start + i * len(MATERIAL_PIECES) + j] = len(board.pieces(piece_type, color))
+    vec[PIECE_COUNT] = len(board.piece_map())
+
+
+# ---------------------------------------------------------------------------
+# Vectorised similarity kernels.  ``F``/``P`` are row blocks of the feature
+# and placement matrices, ``q`` a ``BoardEncoding``; each returns float64[n].
+# ---------------------------------------------------------------------------
+
+def _ratio_similarity(a: np.ndarray, b: np.ndarray) -> np.ndarray:
+    """``1 - |a - b| / max(1, a, b)`` elementwise."""
+    return 1.0 - np.abs(a - b) / np.maximum(1.0, np.maximum(a, b))
+
+
+def feature_similarity(F: np.ndarray, q: BoardEncoding) -> np.ndarray:
+    """Vector form of ``AdvancedPatternMatcher._calculate_feature_similarity``."""
+    diff = np.abs(F[:, POSITIONAL] - q.features[POSITIONAL]) / POSITIONAL_SCALE
+    return np.maximum(0.0, 1.0 - diff).sum(axis=1) / diff.shape[1]
+
+
+def tactical_similarity(F: np.ndarray, q: BoardEncoding) -> np.ndarray:
+    """Vector form of ``AdvancedPatternMatcher._calculate_tactical_similarity``."""
+    motifs = _ratio_similarity(F[:, MOTIF_COUNTS], q.features[MOTIF_COUNTS])
+    threats = np.maximum(0.0, 1.0 - np.abs(F[:, THREATS] - q.features[THREATS]) / THREAT_SCALE)
+    return (motifs.sum(axis=1) + threats.sum(axis=1)) / (motifs.shape[1] + threats.shape[1])
+
+
+def positional_similarity(F: np.ndarray, P: np.ndarray, q: BoardEncoding) -> np.ndarray:
+    """Vector form of ``AdvancedPatternMatcher._calculate_positional_similarity``."""
+    occupied, q_occupied = P != 0, q.placement != 0
+    matching = ((P == q.placement) & occupied).sum(axis=1)
+    total = (occupied | q_occupied).sum(axis=1)
+    pieces = matching / np.maximum(1, total)
+
+    pawns = (P == chess.PAWN) | (P == chess.PAWN + 6)
+    q_pawns = (q.placement == chess.PAWN) | (q.placement == chess.PAWN + 6)
+    common = (pawns & q_pawns).sum(axis=1)
+    pawn_total = (pawns | q_pawns).sum(axis=1)
+    pawn_structure = common / np.maximum(1, pawn_total)
+
+    space = np.maximum(0.0, 1.0 - np.abs(F[:, SPACE] - q.features[SPACE])).sum(axis=1) / 2.0
+    return pieces * 0.4 + pawn_structure * 0.3 + space * 0.3
+
+
+def structural_similarity(F: np.ndarray, q: BoardEncoding) -> np.ndarray:
+    """Vector form of ``AdvancedPatternMatcher._calculate_structural_similarity``."""
+    count = _ratio_similarity(F[:, PIECE_COUNT], q.features[PIECE_COUNT])
+    material = _ratio_similarity(F[:, MATERIAL], q.features[MATERIAL])
+    return count * 0.3 + material.sum(axis=1) / material.shape[1] * 0.7
+
+
+def strategy_scores(strategy: str, arrays: Dict[str, np.ndarray], exact: np.ndarray,
+                    query: BoardEncoding, positional_weight: float,
+                    tactical_weight: float) -> Tuple[np.ndarray, np.ndarray]:
+    """Score the rows in ``arrays`` for one ``MatchingStrategy`` value.
+
+    ``exact`` flags rows whose FEN equals the query's.  Returns the
+    positions that were scored and their scores (before any threshold).
+    """
+    F, valid, featured, tactical = arrays['features'], arrays['valid'], arrays['featured'], arrays['tactical']
+    if strategy == 'exact_fen':
+        positions = np.flatnonzero(exact)
+        return positions, np.ones(len(positions))
+    if strategy == 'positional_similarity':
+        positions = np.flatnonzero(featured)
+        return positions, feature_similarity(F[positions], query)
+    if strategy == 'tactical_features':
+        positions = np.flatnonzero(featured & tactical)
+        return positions, tactical_similarity(F[positions], query)
+    if strategy == 'structural_patterns':
+        return np.arange(len(F)), np.where(valid, structural_similarity(F, query), 0.0)
+    if strategy == 'hybrid_approach':
+        positional = np.where(valid, positional_similarity(F, arrays['placement'], query), 0.0)
+        tactical_score = np.where(
+            tactical,
+            np.where(featured, tactical_similarity(F, query), 0.0),
+            0.3,  # Default for non-tactical patterns
+        )
+        structural = np.where(valid, structural_similarity(F, query), 0.0)
+        combined = (
+            exact * 0.3
+            + positional * positional_weight
+            + tactical_score * tactical_weight
+            + structural * 0.1
+        )
+        return np.arange(len(F)), combined
+    return np.empty(0, dtype=np.intp), np.empty(0)
+
+
+def best_scores(strategies: Iterable[str], arrays: Dict[str, np.ndarray], exact: np.ndarray,
+                query: BoardEncoding, positional_weight: float, tactical_weight: float,
+                threshold: float, k: Optional[int]) -> Tuple[np.ndarray, np.ndarray]:
+    """Best score per row over ``strategies``, thresholded and cut to top-k.
+
+    Returns ``(positions, scores)`` into the rows of ``arrays``.
+    """
+    best = np.full(len(arrays['features']), -np.inf)
+    for strategy in strategies:
+        positions, scores = strategy_scores(strategy, arrays, exact, query, positional_weight, tactical_weight)
+        passed = scores >= threshold
+        positions, scores = positions[passed], scores[passed]
+        best[positions] = np.maximum(best[positions], scores)
+    positions = np.flatnonzero(best > -np.inf)
+    scores = best[positions]
+    keep = top_k(scores, k)
+    return positions[keep], scores[keep]
+
+
+def top_k(scores: np.ndarray, k: Optional[int]) -> np.ndarray:
+    """Positions of the ``k`` highest ``scores`` (all positions if ``k`` is None)."""
+    if k is None or k >= len(scores):
+        return np.arange(len(scores))
+    return np.argpartition(-scores, k - 1)[:k]
+
+
+class _LSHIndex:
+    """Random-hyperplane LSH over the balanced feature columns."""
+
+    def __init__(self, features: np.ndarray, n_bits: int, seed: int = 0):
+        rng = np.random.default_rng(seed)
+        scaled = features / _LSH_SCALE
+        self.center = scaled.mean(axis=0)
+        self.planes = rng.standard_normal((N_FEATURES, n_bits))
+        self.weights = 1 << np.arange(n_bits, dtype=np.int64)
+        keys = self._keys(scaled)
+        order = np.argsort(keys, kind='stable')
+        uniq, starts = np.unique(keys[order], return_index=True)
+        bounds = np.append(starts, len(order))
+        self.buckets = {int(key): order[bounds[i]:bounds[i + 1]] for i, key in enumerate(uniq)}
+        self.n_bits = n_bits
+
+    def _keys(self, scaled: np.ndarray) -> np.ndarray:
+        return ((scaled - self.center) @ self.planes > 0).astype(np.int64) @ self.weights
+
+    def query(self, vec: np.ndarray) -> np.ndarray:
+        """Rows in the query's bucket and every bucket one bit away."""
+        key = int(self._keys((vec / _LSH_SCALE)[None, :])[0])
+        probes = [key] + [key ^ (1 << bit) for bit in range(self.n_bits)]
+        hits = [self.buckets[p] for p in probes if p in self.buckets]
+        return np.concatenate(hits) if hits else np.empty(0, dtype=np.intp)
+
+
+class PatternFeatureIndex:
+    """Feature matrix for a pattern catalogue, keyed by pattern id.
+
+    Rows are appended when a pattern is first seen (or when its FEN
+    changes) and never recomputed otherwise.  Arrays grow by doubling, so
+    the views handed out by :meth:`arrays` stay valid while new patterns
+    are added.
+    """
+
+    def __init__(self, extractor, capacity: int = 64):
+        self.extractor = extractor
+        self._lock = threading.RLock()
+        self._n = 0
+        self._features = np.zeros((capacity, N_FEATURES), dtype=np.float64)
+        self._placement = np.zeros((capacity, 64), dtype=np.int8)
+        self._valid = np.zeros(capacity, dtype=bool)      # FEN parsed
+        self._featured = np.zeros(capacity, dtype=bool)   # feature extraction succeeded
+        self._tactical = np.zeros(capacity, dtype=bool)
+        self._ids: List[str] = []
+        self._fens: List[str] = []
+        self._row_of: Dict[str, int] = {}
+        self._rows_by_fen: Dict[str, List[int]] = {}
+        self._lsh: Optional[_LSHIndex] = None
+        self._query_memo: Optional[tuple] = None
+        self.dirty = False
+        # Bumped on every row change so copies (e.g. worker shards) can resync
+        self.version = 0
+        self._journal: Deque[Tuple[int, int]] = deque(maxlen=JOURNAL_LIMIT)  # (version, row)
+
+    def __len__(self) -> int:
+        return self._n
+
+    def __contains__(self, pattern_id: str) -> bool:
+        return pattern_id in self._row_of
+
+    # ------------------------------------------------------------------
+    def add_patterns(self, patterns: Iterable[ChessPatternEnhanced]) -> np.ndarray:
+        """Make sure every pattern has an up-to-date row; return the rows in order."""
+        rows = []
+        with self._lock:
+            for pattern in patterns:
+                row = self._row_of.get(pattern.id)
+                tactical = pattern.category == PatternCategory.TACTICAL
+                if row is None or self._fens[row] != pattern.fen:
+                    row = self._encode_row(pattern, row)
+                elif self._tactical[row] != tactical:
+                    self._tactical[row] = tactical
+                    self._touch(row)
+                rows.append(row)
+        return np.asarray(rows, dtype=np.intp)
+
+    def add(self, pattern: ChessPatternEnhanced) -> int:
+        return int(self.add_patterns([pattern])[0])
+
+    def _encode_row(self, pattern: ChessPatternEnhanced, row: Optional[int]) -> int:
+        if row is None:
+            row = self._n
+            self._reserve(row + 1)
+            self._ids.append(pattern.id)
+            self._fens.append(pattern.fen)
+            self._row_of[pattern.id] = row
+            self._n += 1
+        else:
+            self._rows_by_fen[self._fens[row]].remove(row)
+            self._fens[row] = pattern.fen
+        self._rows_by_fen.setdefault(pattern.fen, []).append(row)
+        self._features[row] = 0.0
+        self._placement[row] = 0
+        self._valid[row] = self._featured[row] = False
+        self._tactical[row] = pattern.category == PatternCategory.TACTICAL
+        try:
+            board = chess.Board(pattern.fen)
+            self._placement[row] = _placement(board)
+            _fill_structure(self._features[row], board)
+            self._valid[row] = True
+            _fill_extracted(self._features[row], self.extractor.extract_features(board))
+            self._featured[row] = True
+        except Exception as e:
+            logger.debug(f"Could not encode pattern {pattern.id}: {e}")
+        self._lsh = None
+        self._touch(row)
+        return row
+
+    def _touch(self, row: int) -> None:
+        self.dirty = True
+        self.version += 1
+        self._journal.append((self.version, row))
+
+    def changed_rows(self, since: int) -> Optional[np.ndarray]:
+        """Sorted rows changed or appended after version ``since``.
+
+        Returns ``None`` when the journal no longer reaches back to ``since``;
+        the caller must then copy the whole index.
+        """
+        with self._lock:
+            if since == self.version:
+                return np.empty(0, dtype=np.intp)
+            if since > self.version or not self._journal or self._journal[0][0] > since + 1:
+                return None
+            changed = set()
+            for version, row in reversed(self._journal):
+                if version <= since:
+                    break
+                changed.add(row)
+        return np.array(sorted(changed), dtype=np.intp)
+
+    def rows(self, rows: np.ndarray) -> Tuple[Dict[str, np.ndarray], List[str]]:
+        """Copies of the array rows and the FENs at ``rows``."""
+        with self._lock:
+            arrays = {
+                'features': self._features[rows],
+                'placement': self._placement[rows],
+                'valid': self._valid[rows],
+                'featured': self._featured[rows],
+                'tactical': self._tactical[rows],
+            }
+            return arrays, [self._fens[row] for row in rows]
+
+    def _reserve(self, size: int) -> None:
+        capacity = len(self._valid)
+        if size <= capacity:
+            return
+        new_capacity = max(size, capacity * 2)
+        for name in ('_features', '_placement', '_valid', '_featured', '_tactical'):
+            old = getattr(self, name)
+            new = np.zeros((new_capacity,) + old.shape[1:], dtype=old.dtype)
+            new[:capacity] = old
+            setattr(self, name, new)
+
+    # ------------------------------------------------------------------
+    def arrays(self) -> Dict[str, np.ndarray]:
+        """Views of the populated rows."""
+        with self._lock:
+            n = self._n
+            return {
+                'features': self._features[:n],
+                'placement': self._placement[:n],
+                'valid': self._valid[:n],
+                'featured': self._featured[:n],
+                'tactical': self._tactical[:n],
+            }
+
+    def fens(self) -> List[str]:
+        with self._lock:
+            return list(self._fens)
+
+    def exact_mask(self, rows: np.ndarray, fen: str) -> np.ndarray:
+        """Flags over ``rows`` whose pattern FEN equals ``fen``."""
+        matches = self._rows_by_fen.get(fen)
+        if not matches:
+            return np.zeros(len(rows), dtype=bool)
+        return np.isin(rows, matches)
+
+    def encode_query(self, board: chess.Board) -> BoardEncoding:
+        """Encode a query board, reusing the last encoding for the same position."""
+        fen = board.fen()
+        memo = self._query_memo
+        if memo is not None and memo[0] == fen:
+            return memo[1]
+        encoding = encode_board(board, self.extractor)
+        self._query_memo = (fen, encoding)
+        return encoding
+
+    def candidates(self, query: BoardEncoding, k: int) -> Optional[np.ndarray]:
+        """Rows likely to hold the ``k`` best matches, or ``None`` to scan everything."""
+        with self._lock:
+            n = self._n
+            if self._lsh is None:
+                n_bits = int(np.clip(int(np.log2(max(n, 1))) - 4, 4, 16))
+                self._lsh = _LSHIndex(self._features[:n], n_bits)
+            lsh = self._lsh
+        rows = lsh.query(query.features)
+        return rows if len(rows) >= k else None
+
+    # ------------------------------------------------------------------
+    @staticmethod
+    def path_for(catalogue: Union[str, Path]) -> Path:
+        """Default index file stored next to a pattern catalogue directory."""
+        catalogue = Path(catalogue)
+        return catalogue.with_name(catalogue.name + INDEX_SUFFIX)
+
+    def save(self, path: Union[str, Path]) -> None:
+        path = Path(path)
+        with self._lock:
+            n = self._n
+            tmp = path.with_name(path.name + '.tmp.npz')
+            np.savez(
+                tmp,
+                version=np.array(FORMAT_VERSION),
+                columns=np.array(FEATURE_COLUMNS),
+                features=self._features[:n],
+                placement=self._placement[:n],
+                valid=self._valid[:n],
+                featured=self._featured[:n],
+                tactical=self._tactical[:n],
+                ids=np.array(self._ids, dtype=str),
+                fens=np.array(self._fens, dtype=str),
+            )
+            tmp.replace(path)
+            self.dirty = False
+        logger.info(f"Saved {n} pattern feature vectors to {path}")
+
+    @classmethod
+    def load(cls, path: Union[str, Path], extractor) -> 'PatternFeatureIndex':
+        """Load an index saved by :meth:`save`.
+
+        Raises ``ValueError`` when the file was written with a different
+        format version or column layout.
+        """
+        with np.load(Path(path), allow_pickle=False) as data:
+            if int(data['version']) != FORMAT_VERSION or list(data['columns']) != FEATURE_COLUMNS:
+                raise ValueError(f"{path}: incompatible pattern feature index")
+            n = len(data['ids'])
+            index = cls(extractor, capacity=max(64, n))
+            index._features[:n] = data['features']
+            index._placement[:n] = data['placement']
+            index._valid[:n] = data['valid']
+            index._featured[:n] = data['featured']
+            index._tactical[:n] = data['tactical']
+            index._ids = [str(x) for x in data['ids']]
+            index._fens = [str(x) for x in data['fens']]
+        index._row_of = {pid: row for row, pid in enumerate(index._ids)}
+        for row, fen in enumerate(index._fens):
+            index._rows_by_fen.setdefault(fen, []).append(row)
+        index._n = n
+        return index
+
+
+__all__ = [
+    "BoardEncoding",
+    "FEATURE_COLUMNS",
+    "PatternFeatureIndex",
+    "best_scores",
+    "encode_board",
+    "feature_similarity",
+    "positional_similarity",
+    "strategy_scores",
+    "structural_similarity",
+    "tactical_similarity",
+    "top_k",
+]
@@ -20,9 +20,8 @@ import json
 import hashlib
 import time
 import numpy as np
-from collections import defaultdict, deque
+from collections import OrderedDict, defaultdict, deque
 import threading
-from concurrent.futures import ThreadPoolExecutor, as_completed
 import pickle
 import sqlite3
 from pathlib import Path
@@ -31,6 +30,9 @@ from chess_ai.enhanced_chess_pattern_detector import (
     EnhancedPatternDetector, PatternMatch, ChessPatternEnhanced, 
     PatternCategory, PatternPiece, ExchangeSequence
 )
+from chess_ai import pattern_feature_index as pfi
+from chess_ai.pattern_feature_index import PatternFeatureIndex
+from chess_ai.pattern_shards import PatternShardPool
 
 logger = logging.getLogger(__name__)
 
@@ -68,6 +70,30 @@ class MatchingConfig:
     strategic_weight: float = 0.3
     positional_weight: float = 0.2
     material_weight: float = 0.1
+    # Keep only the best ``top_k`` matches per strategy (None keeps all)
+    top_k: Optional[int] = None
+    # Catalogue size from which top-k queries are pre-filtered by the LSH index
+    ann_min_patterns: int = 20000
+    # Where precomputed pattern feature vectors are loaded from / saved to
+    feature_index_path: Optional[str] = None
+    # Parallel matching: shard processes and the catalogue size that warrants them
+    shard_workers: int = 4
+    shard_min_patterns: int = 5000
+
+
+# Catalogue lists whose index rows are remembered between queries
+CATALOGUE_MEMO_SIZE = 8
+
+
+@dataclass
+class _CatalogueRows:
+    """Index rows of one catalogue list, registered once and reused by every query"""
+    patterns: List[ChessPatternEnhanced]
+    length: int
+    rows: np.ndarray
+    ids_hash: Optional[str] = None
+    # (index size, list position of each index row or -1, list covers the whole index)
+    lookup: Optional[Tuple[int, np.ndarray, bool]] = None
 
 
 @dataclass
@@ -625,7 +651,10 @@ class AdvancedPatternMatcher:
         self.config = config or MatchingConfig()
         self.feature_extractor = TacticalFeatureExtractor()
         self.cache = PatternCache(self.config.cache_size_limit) if self.config.enable_caching else None
-        self.executor = ThreadPoolExecutor(max_workers=self.config.max_worker_threads)
+        self.feature_index = self._load_feature_index()
+        self.shard_pool: Optional[PatternShardPool] = None
+        self._catalogues: "OrderedDict[int, _CatalogueRows]" = OrderedDict()
+        self._catalogue_lock = threading.Lock()
         
         # Strategy-specific matchers
         self.strategies = {
@@ -649,7 +678,7 @@ class AdvancedPatternMatcher:
                 return cached_result
         
         # Perform matching
-        if self.config.enable_parallel_processing and len(patterns) > 10:
+        if self.config.enable_parallel_processing and len(patterns) >= self.config.shard_min_patterns:
             matches = self._parallel_match(board, patterns)
         else:
             matches = self._sequential_match(board, patterns)
@@ -681,36 +710,24 @@ class AdvancedPatternMatcher:
         return list(unique_matches.values())
     
     def _parallel_match(self, board: chess.Board, patterns: List[ChessPatternEnhanced]) -> List[Tuple[ChessPatternEnhanced, float]]:
-        """Parallel pattern matching"""
-        matches = []
-        
-        # Split patterns by strategy
-        strategy_patterns = defaultdict(list)
-        for pattern in patterns:
-            strategy_patterns[pattern.category].append(pattern)
-        
-        # Execute matching in parallel
-        futures = []
-        for strategy in self.config.strategies:
-            if strategy in self.strategies and strategy_patterns.get(strategy):
-                future = self.executor.submit(self.strategies[strategy], board, strategy_patterns[strategy])
-                futures.append(future)
-        
-        # Collect results
-        for future in as_completed(futures):
-            try:
-                strategy_matches = future.result(timeout=5.0)
-                matches.extend(strategy_matches)
-            except Exception as e:
-                logger.error(f"Parallel matching error: {e}")
-        
-        # Remove duplicates and keep best score
-        unique_matches = {}
-        for pattern, score in matches:
-            if pattern.id not in unique_matches or score > unique_matches[pattern.id][1]:
-                unique_matches[pattern.id] = (pattern, score)
+        """Parallel pattern matching across shard processes"""
+        catalogue = self._catalogue_rows(patterns)
+        query = self.feature_index.encode_query(board)
+        position_of_row, covers_index = self._row_lookup(catalogue)
+        strategies = [s.value for s in self.config.strategies if s in self.strategies]
+        params = (self.config.positional_weight, self.config.tactical_weight,
+                  self.config.min_confidence_threshold, self.config.top_k)
+        
+        if self.shard_pool is None:
+            self.shard_pool = PatternShardPool(self.feature_index, self.config.shard_workers)
+        try:
+            hit_rows, scores = self.shard_pool.match(
+                query, board.fen(), None if covers_index else catalogue.rows, strategies, params)
+        except Exception as e:
+            logger.error(f"Parallel matching error: {e}")
+            return self._sequential_match(board, patterns)
         
-        return list(unique_matches.values())
+        return [(patterns[position_of_row[row]], float(score)) for row, score in zip(hit_rows, scores)]
     
     def _exact_fen_match(self, board: chess.Board, patterns: List[ChessPatternEnhanced]) -> List[Tuple[ChessPatternEnhanced, float]]:
         """Exact FEN matching strategy"""
@@ -725,86 +742,110 @@ class AdvancedPatternMatcher:
     
     def _positional_similarity_match(self, board: chess.Board, patterns: List[ChessPatternEnhanced]) -> List[Tuple[ChessPatternEnhanced, float]]:
         """Positional similarity matching strategy"""
-        matches = []
-        board_features = self.feature_extractor.extract_features(board)
-        
-        for pattern in patterns:
-            try:
-                pattern_board = chess.Board(pattern.fen)
-                pattern_features = self.feature_extractor.extract_features(pattern_board)
-                
-                similarity = self._calculate_feature_similarity(board_features, pattern_features)
-                
-                if similarity >= self.config.min_confidence_threshold:
-                    matches.append((pattern, similarity))
-            
-            except Exception as e:
-                logger.debug(f"Error in positional similarity matching for pattern {pattern.id}: {e}")
-                continue
-        
-        return matches
+        return self._vectorised_match(MatchingStrategy.POSITIONAL_SIMILARITY, board, patterns)
     
     def _tactical_features_match(self, board: chess.Board, patterns: List[ChessPatternEnhanced]) -> List[Tuple[ChessPatternEnhanced, float]]:
         """Tactical features matching strategy"""
-        matches = []
-        board_tactical = self.feature_extractor.extract_features(board)
-        
-        for pattern in patterns:
-            if pattern.category == PatternCategory.TACTICAL:
-                # Extract tactical features from pattern position
-                try:
-                    pattern_board = chess.Board(pattern.fen)
-                    pattern_tactical = self.feature_extractor.extract_features(pattern_board)
-                    
-                    # Focus on tactical features
-                    tactical_similarity = self._calculate_tactical_similarity(board_tactical, pattern_tactical)
-                    
-                    if tactical_similarity >= self.config.min_confidence_threshold:
-                        matches.append((pattern, tactical_similarity))
-                
-                except Exception as e:
-                    logger.debug(f"Error in tactical features matching for pattern {pattern.id}: {e}")
-                    continue
-        
-        return matches
+        return self._vectorised_match(MatchingStrategy.TACTICAL_FEATURES, board, patterns)
     
     def _structural_patterns_match(self, board: chess.Board, patterns: List[ChessPatternEnhanced]) -> List[Tuple[ChessPatternEnhanced, float]]:
         """Structural patterns matching strategy"""
-        matches = []
-        
-        for pattern in patterns:
-            # Check pawn structure, piece placement, etc.
-            structural_similarity = self._calculate_structural_similarity(board, pattern)
-            
-            if structural_similarity >= self.config.min_confidence_threshold:
-                matches.append((pattern, structural_similarity))
-        
-        return matches
+        return self._vectorised_match(MatchingStrategy.STRUCTURAL_PATTERNS, board, patterns)
     
     def _hybrid_match(self, board: chess.Board, patterns: List[ChessPatternEnhanced]) -> List[Tuple[ChessPatternEnhanced, float]]:
         """Hybrid matching combining multiple strategies"""
-        matches = []
-        
-        for pattern in patterns:
-            # Calculate weighted combination of different similarities
-            exact_score = 1.0 if pattern.fen == board.fen() else 0.0
-            
-            positional_score = self._calculate_positional_similarity(board, pattern)
-            tactical_score = self._calculate_tactical_similarity_score(board, pattern)
-            structural_score = self._calculate_structural_similarity(board, pattern)
-            
-            # Weighted combination
-            combined_score = (
-                exact_score * 0.3 +
-                positional_score * self.config.positional_weight +
-                tactical_score * self.config.tactical_weight +
-                structural_score * 0.1
-            )
-            
-            if combined_score >= self.config.min_confidence_threshold:
-                matches.append((pattern, combined_score))
-        
-        return matches
+        return self._vectorised_match(MatchingStrategy.HYBRID_APPROACH, board, patterns)
+    
+    def _vectorised_match(self, strategy: MatchingStrategy, board: chess.Board,
+                          patterns: List[ChessPatternEnhanced]) -> List[Tuple[ChessPatternEnhanced, float]]:
+        """Score ``patterns`` for one strategy over their precomputed feature rows"""
+        rows, query, data = self._prepare_query(board, patterns)
+        positions = np.flatnonzero(self._candidate_mask(rows, query))
+        rows = rows[positions]
+        arrays = {name: column[rows] for name, column in data.items()}
+        exact = self.feature_index.exact_mask(rows, board.fen())
+        scored, scores = pfi.strategy_scores(
+            strategy.value, arrays, exact, query,
+            self.config.positional_weight, self.config.tactical_weight,
+        )
+        return self._select(patterns, positions[scored], scores)
+    
+    def add_patterns(self, patterns: List[ChessPatternEnhanced]):
+        """Precompute feature vectors for patterns added to the catalogue
+
+        Queries reuse the rows registered for a list until its length
+        changes, so call this again after editing patterns in place.
+        """
+        self._register_catalogue(patterns)
+    
+    def _register_catalogue(self, patterns: List[ChessPatternEnhanced]) -> _CatalogueRows:
+        """Encode new or changed patterns and remember the list's index rows"""
+        catalogue = _CatalogueRows(patterns, len(patterns), self.feature_index.add_patterns(patterns))
+        with self._catalogue_lock:
+            self._catalogues[id(patterns)] = catalogue
+            self._catalogues.move_to_end(id(patterns))
+            while len(self._catalogues) > CATALOGUE_MEMO_SIZE:
+                self._catalogues.popitem(last=False)
+        return catalogue
+    
+    def _catalogue_rows(self, patterns: List[ChessPatternEnhanced]) -> _CatalogueRows:
+        """Registered rows of ``patterns``; a list is registered on first use or when its length changes"""
+        with self._catalogue_lock:
+            catalogue = self._catalogues.get(id(patterns))
+            if catalogue is not None and catalogue.patterns is patterns and catalogue.length == len(patterns):
+                self._catalogues.move_to_end(id(patterns))
+                return catalogue
+        return self._register_catalogue(patterns)
+    
+    def _row_lookup(self, catalogue: _CatalogueRows) -> Tuple[np.ndarray, bool]:
+        """List position of every index row and whether the list covers the whole index"""
+        n = len(self.feature_index)
+        lookup = catalogue.lookup
+        if lookup is None or lookup[0] != n:
+            position_of_row = np.full(n, -1, dtype=np.intp)
+            position_of_row[catalogue.rows] = np.arange(len(catalogue.rows))
+            lookup = (n, position_of_row, bool((position_of_row >= 0).all()))
+            catalogue.lookup = lookup
+        return lookup[1], lookup[2]
+    
+    def save_feature_index(self, path: Optional[str] = None):
+        """Persist precomputed feature vectors (defaults to config.feature_index_path)"""
+        path = path or self.config.feature_index_path
+        if path:
+            self.feature_index.save(path)
+    
+    def _load_feature_index(self) -> PatternFeatureIndex:
+        path = self.config.feature_index_path
+        if path and Path(path).exists():
+            try:
+                return PatternFeatureIndex.load(path, self.feature_extractor)
+            except Exception as e:
+                logger.warning(f"Ignoring pattern feature index {path}: {e}")
+        return PatternFeatureIndex(self.feature_extractor)
+    
+    def _prepare_query(self, board: chess.Board, patterns: List[ChessPatternEnhanced]):
+        """Rows for ``patterns`` (registering a new list), the query encoding and index arrays"""
+        rows = self._catalogue_rows(patterns).rows
+        query = self.feature_index.encode_query(board)
+        return rows, query, self.feature_index.arrays()
+    
+    def _candidate_mask(self, rows: np.ndarray, query: pfi.BoardEncoding) -> np.ndarray:
+        """Mask over ``rows`` worth scoring; narrowed by LSH for large top-k queries"""
+        k = self.config.top_k
+        if k is None or len(self.feature_index) < self.config.ann_min_patterns:
+            return np.ones(len(rows), dtype=bool)
+        candidates = self.feature_index.candidates(query, k)
+        if candidates is None:
+            return np.ones(len(rows), dtype=bool)
+        mask = np.isin(rows, candidates)
+        return mask if mask.sum() >= k else np.ones(len(rows), dtype=bool)
+    
+    def _select(self, patterns: List[ChessPatternEnhanced], positions: np.ndarray,
+                scores: np.ndarray) -> List[Tuple[ChessPatternEnhanced, float]]:
+        """Apply the confidence threshold and top-k to vectorised scores"""
+        passed = np.flatnonzero(scores >= self.config.min_confidence_threshold)
+        passed = passed[pfi.top_k(scores[passed], self.config.top_k)]
+        return [(patterns[positions[i]], float(scores[i])) for i in passed]
     
     def _calculate_feature_similarity(self, features1: Dict[str, Any], features2: Dict[str, Any]) -> float:
         """Calculate similarity between feature dictionaries"""
@@ -994,9 +1035,11 @@ class AdvancedPatternMatcher:
     def _generate_cache_key(self, board: chess.Board, patterns: List[ChessPatternEnhanced]) -> str:
         """Generate cache key for board and patterns"""
         board_hash = hashlib.md5(board.fen().encode()).hexdigest()[:8]
-        pattern_ids = sorted(p.id for p in patterns)
-        patterns_hash = hashlib.md5(','.join(pattern_ids).encode()).hexdigest()[:8]
-        return f"{board_hash}_{patterns_hash}"
+        catalogue = self._catalogue_rows(patterns)
+        if catalogue.ids_hash is None:
+            pattern_ids = sorted(p.id for p in patterns)
+            catalogue.ids_hash = hashlib.md5(','.join(pattern_ids).encode()).hexdigest()[:8]
+        return f"{board_hash}_{catalogue.ids_hash}"
     
     def clear_cache(self):
         """Clear pattern matching cache"""
@@ -1013,9 +1056,17 @@ class AdvancedPatternMatcher:
             }
         return {'enabled': False}
     
+    def get_shard_stats(self) -> List[Dict[str, Any]]:
+        """Per-shard row counts and latency of parallel matching"""
+        return self.shard_pool.stats() if self.shard_pool is not None else []
+    
     def shutdown(self):
         """Shutdown the pattern matcher"""
-        self.executor.shutdown(wait=True)
+        if self.config.feature_index_path and self.feature_index.dirty:
+            self.save_feature_index()
+        if self.shard_pool is not None:
+            self.shard_pool.close()
+            self.shard_pool = None
 
 
 class PatternValidator:
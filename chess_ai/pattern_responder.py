@@ -7,14 +7,22 @@ integrating with WFC and BSP engines for comprehensive pattern analysis.
 
 import chess
 import json
+import os
 from typing import List, Dict, Optional, Tuple, Any
 from pathlib import Path
-from dataclasses import dataclass
+from dataclasses import asdict, dataclass
 from pathlib import Path
 import logging
 
 logger = logging.getLogger(__name__)
 
+# Compiled pattern cache (plain JSON, never unpickled) written next to the
+# patterns file; bump the version whenever PatternTemplate or the cache
+# layout changes.
+CACHE_SUFFIX = ".cache"
+CACHE_VERSION = 2
+USE_PATTERN_CACHE = os.getenv("PATTERN_RESPONDER_CACHE", "1") != "0"
+
 
 @dataclass
 class PatternTemplate:
@@ -47,13 +55,43 @@ class PatternResponder:
     A pattern is a mapping with two keys:
     ``situation`` – the piece placement portion of a FEN string,
     and ``action`` – an arbitrary response (usually a move in UCI format).
+
+    Patterns are indexed by ``situation`` so :meth:`match` is a dictionary
+    lookup on ``board.board_fen()``.  Use :meth:`add_pattern` /
+    :meth:`remove_pattern` (or assign ``patterns``) to keep the index in sync.
     """
     
-    def __init__(self, patterns_file: Optional[str] = None):
-        self.patterns: List[PatternTemplate] = []
+    def __init__(self, patterns_file: Optional[str] = None, use_cache: bool = USE_PATTERN_CACHE):
+        self._patterns: List[PatternTemplate] = []
+        self._index: Dict[str, List[PatternTemplate]] = {}
+        self._indexed_count = 0
         # Allow passing either a file or a directory aggregator via configs/patterns.json
         self.patterns_file = patterns_file or "patterns.json"
+        self.use_cache = use_cache
         self._load_patterns()
+    
+    @property
+    def patterns(self) -> List[PatternTemplate]:
+        return self._patterns
+    
+    @patterns.setter
+    def patterns(self, patterns: List[PatternTemplate]) -> None:
+        self._patterns = list(patterns)
+        self._rebuild_index()
+    
+    def _rebuild_index(self) -> None:
+        """Rebuild the situation -> patterns index from ``self.patterns``."""
+        self._index = {}
+        for pattern in self._patterns:
+            self._index.setdefault(pattern.situation, []).append(pattern)
+        self._indexed_count = len(self._patterns)
+    
+    def _candidates(self, layout: str) -> List[PatternTemplate]:
+        """Patterns whose situation equals ``layout``, in load order."""
+        if self._indexed_count != len(self._patterns):
+            # ``patterns`` was appended to or trimmed in place
+            self._rebuild_index()
+        return self._index.get(layout, [])
         
     def _load_patterns(self):
         """Load patterns from file(s) or create defaults.
@@ -71,6 +109,10 @@ class PatternResponder:
         try:
             p = Path(self.patterns_file)
             if p.exists() and p.is_file():
+                if self.use_cache and self._load_cache(p):
+                    logger.info(f"Loaded {len(self.patterns)} patterns from {self._cache_path(p)}")
+                    return
+                sources = [p]
                 with p.open('r', encoding='utf-8') as f:
                     data = json.load(f)
 
@@ -96,10 +138,16 @@ class PatternResponder:
                 for inc in includes:
                     inc_path = (p.parent / inc).resolve()
                     if inc_path.is_dir():
+                        sources.append(inc_path)
                         for child in sorted(inc_path.glob('*.json')):
+                            sources.append(child)
                             self._ingest_from_file(child)
                     elif inc_path.is_file():
+                        sources.append(inc_path)
                         self._ingest_from_file(inc_path)
+                    else:
+                        # Tracked so the cache notices when it appears
+                        sources.append(inc_path)
 
                 # Apply filters
                 if enabled_types:
@@ -112,13 +160,68 @@ class PatternResponder:
                     dis_set = set(disabled_names)
                     self.patterns = [pt for pt in self.patterns if (pt.name or pt.description) not in dis_set]
 
+                self._rebuild_index()
                 logger.info(f"Loaded {len(self.patterns)} patterns from {self.patterns_file}")
+                if self.use_cache:
+                    self._write_cache(p, sources)
             else:
                 self._create_default_patterns()
                 self._save_patterns()
         except Exception as e:
             logger.warning(f"Failed to load patterns: {e}")
             self._create_default_patterns()
+        self._rebuild_index()
+
+    @staticmethod
+    def _cache_path(patterns_path: Path) -> Path:
+        return patterns_path.with_name(patterns_path.name + CACHE_SUFFIX)
+
+    @staticmethod
+    def _source_signature(paths: List[Path]) -> List[Tuple[str, int, int]]:
+        """(path, mtime_ns, size) per source; a directory's mtime covers added/removed files."""
+        signature = []
+        for path in paths:
+            try:
+                st = path.stat()
+                signature.append((str(path), st.st_mtime_ns, st.st_size))
+            except FileNotFoundError:
+                signature.append((str(path), -1, -1))
+        return signature
+
+    def _load_cache(self, patterns_path: Path) -> bool:
+        """Load the compiled patterns if every source file is unchanged."""
+        cache_path = self._cache_path(patterns_path)
+        try:
+            cached = json.loads(cache_path.read_text(encoding='utf-8'))
+            if cached.get('version') != CACHE_VERSION:
+                return False
+            signature = [tuple(entry) for entry in cached['sources']]
+            if self._source_signature([Path(src) for src, _, _ in signature]) != signature:
+                return False
+            patterns = [PatternTemplate(**entry) for entry in cached['patterns']]
+        except FileNotFoundError:
+            return False
+        except Exception as exc:
+            logger.debug(f"Ignoring pattern cache {cache_path}: {exc}")
+            return False
+        self._patterns = patterns
+        self._rebuild_index()
+        return True
+
+    def _write_cache(self, patterns_path: Path, sources: List[Path]) -> None:
+        cache_path = self._cache_path(patterns_path)
+        tmp_path = cache_path.with_name(cache_path.name + '.tmp')
+        try:
+            data = {
+                'version': CACHE_VERSION,
+                'sources': self._source_signature(sources),
+                'patterns': [asdict(pattern) for pattern in self._patterns],
+            }
+            with tmp_path.open('w', encoding='utf-8') as fh:
+                json.dump(data, fh)
+            tmp_path.replace(cache_path)
+        except Exception as exc:
+            logger.debug(f"Could not write pattern cache {cache_path}: {exc}")
 
     def _ingest_from_file(self, inc_path: Path) -> None:
         try:
@@ -447,7 +550,7 @@ class PatternResponder:
         best_match = None
         best_confidence = 0.0
         
-        for pattern in self.patterns:
+        for pattern in self._candidates(layout):
             if self._pattern_matches(pattern, layout):
                 if pattern.confidence > best_confidence:
                     best_match = pattern
@@ -464,10 +567,28 @@ class PatternResponder:
     
     def add_pattern(self, pattern: PatternTemplate):
         """Add a new pattern to the collection."""
-        self.patterns.append(pattern)
+        self._patterns.append(pattern)
+        self._index.setdefault(pattern.situation, []).append(pattern)
+        self._indexed_count += 1
         self._save_patterns()
         logger.info(f"Added pattern: {pattern.description}")
     
+    def remove_pattern(self, pattern: PatternTemplate) -> bool:
+        """Remove a pattern from the collection; return False if it was not present."""
+        try:
+            self._patterns.remove(pattern)
+        except ValueError:
+            return False
+        bucket = self._index.get(pattern.situation, [])
+        if pattern in bucket:
+            bucket.remove(pattern)
+            if not bucket:
+                del self._index[pattern.situation]
+        self._indexed_count -= 1
+        self._save_patterns()
+        logger.info(f"Removed pattern: {pattern.description}")
+        return True
+    
     def get_patterns_by_type(self, pattern_type: str) -> List[PatternTemplate]:
         """Get all patterns of a specific type."""
         return [p for p in self.patterns if p.pattern_type == pattern_type]
@@ -489,7 +610,7 @@ class PatternResponder:
         layout = board.board_fen()
         matches = []
         
-        for pattern in self.patterns:
+        for pattern in self._candidates(layout):
             if self._pattern_matches(pattern, layout):
                 matches.append({
                     "pattern_type": pattern.pattern_type,
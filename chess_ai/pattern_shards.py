@@ -0,0 +1,303 @@
+"""Score a pattern catalogue across a pool of shard-owning processes.
+
+Pattern scoring in :class:`~chess_ai.pattern_matching_engine.AdvancedPatternMatcher`
+is CPU work that a thread pool cannot spread over cores.  A
+:class:`PatternShardPool` instead owns one child process per shard.  Each
+child keeps its slice of the :class:`~chess_ai.pattern_feature_index.PatternFeatureIndex`
+arrays, so a query ships only the board's compact encoding (feature vector,
+64 piece codes and FEN) plus the matching parameters.  When the index
+changes, only the changed rows are sent, each to the shard that owns it;
+appended rows extend the last shard until it outgrows its share and the
+pool rebalances with a full reload.
+
+Protocol (tuples pickled over a :func:`multiprocessing.Pipe`)::
+
+    parent -> child   ("load", offset, arrays, fens)
+                      ("update", positions, arrays, fens)
+                      ("match", features, placement, fen, positions | None,
+                       strategies, params)
+                      ("quit",)
+    child -> parent   ("ok", (rows, scores, compute_s))
+                      ("error", "ExcType: message")
+
+Every call records the round-trip and in-worker compute time of each shard;
+:meth:`PatternShardPool.stats` summarises them for sizing the pool.
+"""
+
+from __future__ import annotations
+
+import logging
+logger = logging.getLogger(__name__)
+
+import multiprocessing as mp
+import threading
+import time
+from collections import deque
+from multiprocessing.connection import wait
+from typing import Any, Deque, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from chess_ai import pattern_feature_index as pfi
+
+_ARRAYS = ('features', 'placement', 'valid', 'featured', 'tactical')
+LATENCY_WINDOW = 256
+
+
+def _shard_main(conn) -> None:
+    """Child process loop: hold one shard and score queries against it."""
+    offset = 0
+    n = 0
+    store: Dict[str, np.ndarray] = {}
+    arrays: Dict[str, np.ndarray] = {}
+    fens: List[str] = []
+    rows_by_fen: Dict[str, List[int]] = {}
+    while True:
+        try:
+            msg = conn.recv()
+        except EOFError:
+            return
+        kind = msg[0]
+        if kind == "quit":
+            return
+        try:
+            if kind == "load":
+                _, offset, store, fens = msg
+                n = len(fens)
+                arrays = store
+                rows_by_fen = {}
+                for row, fen in enumerate(fens):
+                    rows_by_fen.setdefault(fen, []).append(row)
+                conn.send(("ok", None))
+            elif kind == "update":
+                _, positions, changed, changed_fens = msg
+                size = max(n, int(positions.max()) + 1) if len(positions) else n
+                if size > len(store['valid']):
+                    capacity = max(size, 2 * len(store['valid']))
+                    for name, old in store.items():
+                        new = np.zeros((capacity,) + old.shape[1:], dtype=old.dtype)
+                        new[:n] = old[:n]
+                        store[name] = new
+                for name in store:
+                    store[name][positions] = changed[name]
+                fens.extend([None] * (size - n))
+                n = size
+                arrays = {name: column[:n] for name, column in store.items()}
+                for pos, fen in zip(positions.tolist(), changed_fens):
+                    if fens[pos] is not None:
+                        rows_by_fen[fens[pos]].remove(pos)
+                    fens[pos] = fen
+                    rows_by_fen.setdefault(fen, []).append(pos)
+                conn.send(("ok", None))
+            elif kind == "match":
+                _, features, placement, fen, positions, strategies, params = msg
+                t0 = time.perf_counter()
+                query = pfi.BoardEncoding(features, placement)
+                local = arrays if positions is None else {k: v[positions] for k, v in arrays.items()}
+                n_local = len(local['features'])
+                exact_rows = rows_by_fen.get(fen)
+                if not exact_rows:
+                    exact = np.zeros(n_local, dtype=bool)
+                elif positions is None:
+                    exact = np.zeros(n_local, dtype=bool)
+                    exact[exact_rows] = True
+                else:
+                    exact = np.isin(positions, exact_rows)
+                scored, scores = pfi.best_scores(strategies, local, exact, query, *params)
+                rows = scored if positions is None else positions[scored]
+                conn.send(("ok", (rows + offset, scores, time.perf_counter() - t0)))
+            else:
+                conn.send(("error", f"ValueError: unknown message {kind!r}"))
+        except Exception as exc:  # report and keep serving
+            conn.send(("error", f"{type(exc).__name__}: {exc}"))
+
+
+class _Shard:
+    def __init__(self, index: int) -> None:
+        ctx = mp.get_context()
+        self.conn, child_conn = ctx.Pipe()
+        self.proc = ctx.Process(target=_shard_main, args=(child_conn,), daemon=True,
+                                name=f"pattern-shard-{index}")
+        self.proc.start()
+        child_conn.close()
+        self.start = 0
+        self.stop = 0
+        self.round_trip: Deque[float] = deque(maxlen=LATENCY_WINDOW)
+        self.compute: Deque[float] = deque(maxlen=LATENCY_WINDOW)
+
+    def close(self) -> None:
+        try:
+            self.conn.send(("quit",))
+        except (BrokenPipeError, OSError):
+            pass
+        self.proc.join(timeout=1.0)
+        if self.proc.is_alive():
+            self.proc.kill()
+            self.proc.join(timeout=1.0)
+        self.conn.close()
+
+
+class PatternShardPool:
+    """Persistent worker processes, each owning a contiguous shard of rows.
+
+    Parameters
+    ----------
+    index:
+        The feature index to serve.  Rows changed since the last call are
+        sent to their shards before each query.
+    workers:
+        Number of shard processes.
+    """
+
+    def __init__(self, index: "pfi.PatternFeatureIndex", workers: int) -> None:
+        self.index = index
+        self.workers = max(1, workers)
+        self._shards: List[_Shard] = []
+        self._version: Optional[int] = None
+        self._lock = threading.Lock()
+
+    # ------------------------------------------------------------------
+    def _sync(self) -> None:
+        version = self.index.version
+        if self._version == version and self._shards:
+            return
+        n = len(self.index)
+        changed = None
+        if self._shards and self._version is not None:
+            changed = self.index.changed_rows(self._version)
+        if changed is not None:
+            # Rows appended since ``n`` was read go out on the next call
+            changed = changed[changed < n]
+        if changed is None or self._unbalanced(n):
+            self._load(n)
+        else:
+            self._update(changed, n)
+        self._version = version
+
+    def _unbalanced(self, n: int) -> bool:
+        """True once appended rows would leave the last shard over twice its share."""
+        last = self._shards[-1]
+        return n - last.start > max(1, 2 * n // len(self._shards))
+
+    def _load(self, n: int) -> None:
+        """Split the whole index evenly over the shards."""
+        if not self._shards:
+            self._shards = [_Shard(i) for i in range(self.workers)]
+        data = self.index.arrays()
+        fens = self.index.fens()
+        bounds = np.linspace(0, n, len(self._shards) + 1).astype(int)
+        for shard, start, stop in zip(self._shards, bounds[:-1], bounds[1:]):
+            shard.start, shard.stop = int(start), int(stop)
+            arrays = {name: np.ascontiguousarray(data[name][start:stop]) for name in _ARRAYS}
+            shard.conn.send(("load", shard.start, arrays, fens[start:stop]))
+        for shard in self._shards:
+            self._expect(shard)
+        logger.info("Loaded %d pattern rows into %d shard process(es)", n, len(self._shards))
+
+    def _update(self, changed: np.ndarray, n: int) -> None:
+        """Send changed rows to their owning shards; appended rows go to the last shard."""
+        self._shards[-1].stop = n
+        stops = np.array([shard.stop for shard in self._shards])
+        owners = np.searchsorted(stops, changed, side='right')
+        sent = []
+        for i in np.unique(owners):
+            shard = self._shards[i]
+            rows = changed[owners == i]
+            arrays, fens = self.index.rows(rows)
+            shard.conn.send(("update", rows - shard.start, arrays, fens))
+            sent.append(shard)
+        for shard in sent:
+            self._expect(shard)
+        logger.debug("Sent %d changed pattern rows to %d shard(s)", len(changed), len(sent))
+
+    @staticmethod
+    def _expect(shard: _Shard) -> Any:
+        status, payload = shard.conn.recv()
+        if status != "ok":
+            raise RuntimeError(f"pattern shard {shard.proc.name} failed: {payload}")
+        return payload
+
+    def match(
+        self,
+        query: "pfi.BoardEncoding",
+        fen: str,
+        rows: Optional[np.ndarray],
+        strategies: Sequence[str],
+        params: Tuple[float, float, float, Optional[int]],
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """Best score per row across all shards.
+
+        ``rows`` restricts scoring to those index rows (``None`` scores the
+        whole index).  ``params`` is ``(positional_weight, tactical_weight,
+        threshold, top_k)``; top-k is applied per shard and again over the
+        merged result.  Returns ``(rows, scores)``.
+        """
+        with self._lock:
+            try:
+                self._sync()
+                pending: Dict[Any, Tuple[_Shard, float]] = {}
+                for shard in self._shards:
+                    if rows is None:
+                        positions = None
+                    else:
+                        positions = rows[(rows >= shard.start) & (rows < shard.stop)] - shard.start
+                    shard.conn.send(("match", query.features, query.placement, fen,
+                                     positions, tuple(strategies), params))
+                    pending[shard.conn] = (shard, time.perf_counter())
+                found_rows, found_scores = [], []
+                while pending:
+                    for conn in wait(list(pending)):
+                        shard, t0 = pending.pop(conn)
+                        shard_rows, scores, compute_s = self._expect(shard)
+                        shard.round_trip.append(time.perf_counter() - t0)
+                        shard.compute.append(compute_s)
+                        found_rows.append(shard_rows)
+                        found_scores.append(scores)
+            except (EOFError, BrokenPipeError, OSError, RuntimeError):
+                # A dead or confused worker leaves the pipes out of step;
+                # start from fresh processes on the next call.
+                self._close_locked()
+                raise
+        all_rows = np.concatenate(found_rows) if found_rows else np.empty(0, dtype=np.intp)
+        all_scores = np.concatenate(found_scores) if found_scores else np.empty(0)
+        keep = pfi.top_k(all_scores, params[3])
+        return all_rows[keep], all_scores[keep]
+
+    # ------------------------------------------------------------------
+    def stats(self) -> List[Dict[str, Any]]:
+        """Per-shard row counts and latency (ms) over the recent window."""
+        summary = []
+        with self._lock:
+            for i, shard in enumerate(self._shards):
+                rt = np.array(shard.round_trip) * 1000.0
+                cpu = np.array(shard.compute) * 1000.0
+                summary.append({
+                    'shard': i,
+                    'rows': shard.stop - shard.start,
+                    'calls': len(rt),
+                    'last_ms': float(rt[-1]) if len(rt) else None,
+                    'mean_ms': float(rt.mean()) if len(rt) else None,
+                    'p95_ms': float(np.percentile(rt, 95)) if len(rt) else None,
+                    'compute_mean_ms': float(cpu.mean()) if len(cpu) else None,
+                })
+        return summary
+
+    def close(self) -> None:
+        """Stop all shard processes."""
+        with self._lock:
+            self._close_locked()
+
+    def _close_locked(self) -> None:
+        for shard in self._shards:
+            shard.close()
+        self._shards = []
+        self._version = None
+
+    def __enter__(self) -> "PatternShardPool":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+
+__all__ = ["PatternShardPool"]
@@ -1,7 +1,12 @@
 import logging
 logger = logging.getLogger(__name__)
 
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Dict, Hashable, Tuple
+
 import chess
+import chess.polyglot
 
 # Base piece values in centipawns
 PIECE_VALUES = {
@@ -14,45 +19,123 @@ PIECE_VALUES = {
 }
 
 CENTER_SQUARES = [chess.E4, chess.D4, chess.E5, chess.D5]
+_CENTER_MASK = chess.SquareSet(CENTER_SQUARES).mask
 
+_MATERIAL_TYPES = (chess.PAWN, chess.KNIGHT, chess.BISHOP, chess.ROOK, chess.QUEEN)
 
-def dynamic_piece_value(piece: chess.Piece, board: chess.Board) -> int:
-    """Return a context aware value for ``piece`` on ``board``.
+
+@dataclass(frozen=True)
+class PositionContext:
+    """Per-position terms shared by every piece's dynamic value.
+
+    All tuples are indexed by colour (``chess.BLACK`` / ``chess.WHITE``).
+    ``material`` includes the side's dynamic king value.
+    """
+
+    material: Tuple[int, int]
+    has_queen: Tuple[bool, bool]
+    king_value: Tuple[int, int]
+
+
+# Bounded LRU cache of contexts keyed by the board's transposition key.
+_CONTEXT_CACHE_CAP = 20000
+_CONTEXT_CACHE: "OrderedDict[Hashable, PositionContext]" = OrderedDict()
+
+
+def _context_key(board: chess.Board) -> Hashable:
+    key_fn = getattr(board, "_transposition_key", None)
+    if key_fn is not None:
+        return key_fn()
+    return chess.polyglot.zobrist_hash(board)
+
+
+def _build_context(board: chess.Board) -> PositionContext:
+    from .chess_bot import calculate_king_value
+
+    king_value = (
+        calculate_king_value(board, chess.BLACK),
+        calculate_king_value(board, chess.WHITE),
+    )
+    material = [king_value[chess.BLACK], king_value[chess.WHITE]]
+    for color in (chess.BLACK, chess.WHITE):
+        for pt in _MATERIAL_TYPES:
+            material[color] += PIECE_VALUES[pt] * chess.popcount(board.pieces_mask(pt, color))
+    has_queen = (
+        bool(board.pieces_mask(chess.QUEEN, chess.BLACK)),
+        bool(board.pieces_mask(chess.QUEEN, chess.WHITE)),
+    )
+    return PositionContext(tuple(material), has_queen, king_value)
+
+
+def position_context(board: chess.Board) -> PositionContext:
+    """Return the (cached) :class:`PositionContext` for ``board``."""
+    key = _context_key(board)
+    ctx = _CONTEXT_CACHE.get(key)
+    if ctx is not None:
+        _CONTEXT_CACHE.move_to_end(key)
+        return ctx
+    ctx = _build_context(board)
+    _CONTEXT_CACHE[key] = ctx
+    if len(_CONTEXT_CACHE) > _CONTEXT_CACHE_CAP:
+        _CONTEXT_CACHE.popitem(last=False)
+    return ctx
+
+
+def dynamic_piece_value_at(
+    square: chess.Square,
+    piece: chess.Piece,
+    board: chess.Board,
+    ctx: PositionContext | None = None,
+) -> int:
+    """Return a context aware value for ``piece`` standing on ``square``.
 
     The base material value is adjusted by:
       * mobility (number of squares the piece attacks)
       * control of central squares
       * opponent material (pieces become slightly more valuable as the
         opponent loses major material such as the queen)
-    """
-    from .chess_bot import calculate_king_value
 
-    base = (
-        calculate_king_value(board, piece.color)
-        if piece.piece_type == chess.KING
-        else PIECE_VALUES[piece.piece_type]
-    )
+    ``ctx`` defaults to :func:`position_context` of ``board``.
+    """
+    if ctx is None:
+        ctx = position_context(board)
 
-    # Locate the piece's square
-    square = next((sq for sq, p in board.piece_map().items() if p == piece), None)
-    if square is None:
-        return base
+    if piece.piece_type == chess.KING:
+        base = ctx.king_value[piece.color]
+    else:
+        base = PIECE_VALUES[piece.piece_type]
 
-    attacks = board.attacks(square)
-    mobility_bonus = len(attacks)
-    center_bonus = sum(10 for sq in attacks if sq in CENTER_SQUARES)
+    attacks = board.attacks_mask(square)
+    mobility_bonus = chess.popcount(attacks)
+    center_bonus = 10 * chess.popcount(attacks & _CENTER_MASK)
 
     enemy_color = not piece.color
-    enemy_material = 0
-    for p in board.piece_map().values():
-        if p.color != enemy_color:
-            continue
-        if p.piece_type == chess.KING:
-            enemy_material += calculate_king_value(board, enemy_color)
-        else:
-            enemy_material += PIECE_VALUES[p.piece_type]
     # Boost value if the opponent has lost their queen
-    material_factor = 1.1 if not board.pieces(chess.QUEEN, enemy_color) else 1.0
-    material_factor += (3900 - enemy_material) / 3900 * 0.05
+    material_factor = 1.0 if ctx.has_queen[enemy_color] else 1.1
+    material_factor += (3900 - ctx.material[enemy_color]) / 3900 * 0.05
 
-    return int((base + mobility_bonus + center_bonus) * material_factor)
\ No newline at end of file
+    return int((base + mobility_bonus + center_bonus) * material_factor)
+
+
+def dynamic_piece_values(board: chess.Board) -> Dict[chess.Square, int]:
+    """Return :func:`dynamic_piece_value_at` for every piece on ``board``."""
+    ctx = position_context(board)
+    return {
+        sq: dynamic_piece_value_at(sq, piece, board, ctx)
+        for sq, piece in board.piece_map().items()
+    }
+
+
+def dynamic_piece_value(piece: chess.Piece, board: chess.Board) -> int:
+    """Return a context aware value for ``piece`` on ``board``.
+
+    Kept for callers that do not know the piece's square; the first square
+    holding such a piece (in ``board.piece_map()`` order) is used.  Prefer :func:`dynamic_piece_value_at`.
+    """
+    ctx = position_context(board)
+    squares = board.pieces_mask(piece.piece_type, piece.color)
+    if not squares:
+        if piece.piece_type == chess.KING:
+            return ctx.king_value[piece.color]
+        return PIECE_VALUES[piece.piece_type]
+    return dynamic_piece_value_at(chess.msb(squares), piece, board, ctx)
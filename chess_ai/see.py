@@ -27,6 +27,9 @@ def static_exchange_eval(board: chess.Board, move: chess.Move) -> int:
 
     gain = [piece_value(captured)]
     side = board.turn
+    on_square = tmp.piece_at(move.from_square)
+    if move.promotion:
+        on_square = chess.Piece(move.promotion, side)
     tmp.push(move)
     side = not side
 
@@ -35,12 +38,15 @@ def static_exchange_eval(board: chess.Board, move: chess.Move) -> int:
         if not attackers:
             break
         least_sq = min(attackers, key=lambda sq: piece_value(tmp.piece_at(sq)))
-        least_piece = tmp.piece_at(least_sq)
-        gain.append(piece_value(least_piece) - gain[-1])
+        # Speculative gain if this recapture is made, from the recapturing
+        # side's point of view: the piece on the square minus what it cost.
+        gain.append(piece_value(on_square) - gain[-1])
+        on_square = tmp.piece_at(least_sq)
         tmp.push(chess.Move(least_sq, to_sq))
         side = not side
 
+    # Either side may stop recapturing when continuing would lose material.
     for i in range(len(gain) - 2, -1, -1):
-        gain[i] = max(-gain[i + 1], gain[i])
+        gain[i] = min(gain[i], -gain[i + 1])
 
     return gain[0]
\ No newline at end of file
@@ -1,11 +1,31 @@
+"""Search profiling counters and a lightweight sink for per-search records.
+
+Searches fill the shared :data:`STATS` object and hand it to
+:data:`SINK` when they finish.  The sink only keeps a bounded in-memory ring
+buffer by default, so the search path performs no file I/O and imports
+nothing heavy.  Exporters can be attached explicitly or through environment
+variables:
+
+``CHESS_PROFILE_JSONL``
+    append every record as one JSON line to this path;
+``CHESS_PROFILE_PROM``
+    keep a Prometheus text-format file with the latest record per engine.
+
+Plots are produced on demand via :func:`plot_profile_stats`.
+"""
+
 from __future__ import annotations
 
 import logging
 logger = logging.getLogger(__name__)
 
-from dataclasses import dataclass
+from collections import deque
+from dataclasses import asdict, dataclass, field, replace
+import json
+import os
+import threading
 import time
-from typing import Optional
+from typing import Callable, Deque, Dict, List, Optional
 
 
 @dataclass
@@ -15,7 +35,13 @@ class ProfileStats:
     nodes: int = 0
     cutoffs: int = 0
     tt_hits: int = 0
+    tt_probes: int = 0
+    tt_collisions: int = 0
+    tt_fill: float = 0.0
     lmr_reductions: int = 0
+    depth_reached: int = 0
+    aspiration_fails: int = 0
+    worker_nodes: List[int] = field(default_factory=list)
     start_time: float = 0.0
     elapsed: float = 0.0
 
@@ -23,7 +49,13 @@ class ProfileStats:
         self.nodes = 0
         self.cutoffs = 0
         self.tt_hits = 0
+        self.tt_probes = 0
+        self.tt_collisions = 0
+        self.tt_fill = 0.0
         self.lmr_reductions = 0
+        self.depth_reached = 0
+        self.aspiration_fails = 0
+        self.worker_nodes = []
         self.start_time = 0.0
         self.elapsed = 0.0
 
@@ -46,23 +78,176 @@ class ProfileStats:
     def cutoff_pct(self) -> float:
         return (self.cutoffs / self.nodes * 100) if self.nodes else 0.0
 
+    @property
+    def tt_hit_pct(self) -> float:
+        return (self.tt_hits / self.tt_probes * 100) if self.tt_probes else 0.0
+
     @property
     def lmr_pct(self) -> float:
         return (self.lmr_reductions / self.nodes * 100) if self.nodes else 0.0
 
     def summary(self) -> str:
-        return (
+        text = (
             f"nodes={self.nodes} ({self.nodes_per_sec:.1f}/s), "
             f"cutoffs={self.cutoffs} ({self.cutoff_pct:.1f}%), "
-            f"tt_hits={self.tt_hits}, "
+            f"tt_hits={self.tt_hits} ({self.tt_hit_pct:.1f}%), "
+            f"tt_collisions={self.tt_collisions}, "
+            f"tt_fill={self.tt_fill * 100:.1f}%, "
             f"lmr={self.lmr_reductions} ({self.lmr_pct:.1f}%), "
+            f"depth={self.depth_reached}, "
             f"time={self.elapsed:.3f}s"
         )
+        if self.worker_nodes:
+            text += f", worker_nodes={self.worker_nodes}"
+        return text
 
 
 STATS = ProfileStats()
 
 
+@dataclass
+class SearchRecord:
+    """Snapshot of :class:`ProfileStats` taken at the end of one search."""
+
+    engine: str
+    timestamp: float
+    stats: ProfileStats = field(default_factory=ProfileStats)
+
+    def as_dict(self) -> Dict[str, object]:
+        data: Dict[str, object] = {"engine": self.engine, "timestamp": self.timestamp}
+        data.update(asdict(self.stats))
+        data["nodes_per_sec"] = self.stats.nodes_per_sec
+        return data
+
+
+Exporter = Callable[[SearchRecord], None]
+
+
+class StatsSink:
+    """Bounded ring buffer of :class:`SearchRecord` plus optional exporters."""
+
+    def __init__(self, capacity: int = 256) -> None:
+        self.records: Deque[SearchRecord] = deque(maxlen=capacity)
+        self.exporters: List[Exporter] = []
+        self._lock = threading.Lock()
+
+    def add_exporter(self, exporter: Exporter) -> Exporter:
+        self.exporters.append(exporter)
+        return exporter
+
+    def remove_exporter(self, exporter: Exporter) -> None:
+        if exporter in self.exporters:
+            self.exporters.remove(exporter)
+
+    def record(self, stats: ProfileStats, engine: str) -> SearchRecord:
+        """Store a copy of ``stats`` and forward it to the exporters."""
+        rec = SearchRecord(engine, time.time(), replace(stats))
+        with self._lock:
+            self.records.append(rec)
+        for exporter in list(self.exporters):
+            try:
+                exporter(rec)
+            except Exception as exc:  # exporters must never break a search
+                logger.warning("Profile exporter %r failed: %s", exporter, exc)
+        return rec
+
+    def latest(self, engine: Optional[str] = None) -> Optional[SearchRecord]:
+        with self._lock:
+            for rec in reversed(self.records):
+                if engine is None or rec.engine == engine:
+                    return rec
+        return None
+
+    def snapshot(self) -> List[SearchRecord]:
+        with self._lock:
+            return list(self.records)
+
+    def clear(self) -> None:
+        with self._lock:
+            self.records.clear()
+
+
+class JsonlExporter:
+    """Append each record as a JSON line to ``path``."""
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+
+    def __call__(self, rec: SearchRecord) -> None:
+        with open(self.path, "a", encoding="utf-8") as fh:
+            fh.write(json.dumps(rec.as_dict()) + "\n")
+
+
+class PrometheusExporter:
+    """Maintain a Prometheus text-format file with the latest record per engine.
+
+    The file is rewritten atomically so that a node-exporter textfile
+    collector never observes a partial write.
+    """
+
+    _METRICS = (
+        ("nodes", "gauge", "Nodes visited in the last search"),
+        ("cutoffs", "gauge", "Beta cutoffs in the last search"),
+        ("tt_probes", "gauge", "Transposition table probes in the last search"),
+        ("tt_hits", "gauge", "Transposition table hits in the last search"),
+        ("tt_collisions", "gauge", "Transposition table collisions in the last search"),
+        ("tt_fill", "gauge", "Transposition table fill ratio"),
+        ("lmr_reductions", "gauge", "Late move reductions in the last search"),
+        ("depth_reached", "gauge", "Deepest completed iteration"),
+        ("elapsed", "gauge", "Search wall time in seconds"),
+        ("nodes_per_sec", "gauge", "Search speed in nodes per second"),
+    )
+
+    def __init__(self, path: str, prefix: str = "chess_search") -> None:
+        self.path = path
+        self.prefix = prefix
+        self._latest: Dict[str, SearchRecord] = {}
+
+    def __call__(self, rec: SearchRecord) -> None:
+        self._latest[rec.engine] = rec
+        lines: List[str] = []
+        for name, kind, help_text in self._METRICS:
+            metric = f"{self.prefix}_{name}"
+            lines.append(f"# HELP {metric} {help_text}")
+            lines.append(f"# TYPE {metric} {kind}")
+            for engine, latest in sorted(self._latest.items()):
+                value = latest.as_dict()[name]
+                lines.append(f'{metric}{{engine="{engine}"}} {value}')
+        tmp = f"{self.path}.tmp"
+        with open(tmp, "w", encoding="utf-8") as fh:
+            fh.write("\n".join(lines) + "\n")
+        os.replace(tmp, self.path)
+
+
+class PngExporter:
+    """Plot every record to ``filename`` (slow; meant for debugging only)."""
+
+    def __init__(self, filename: str) -> None:
+        self.filename = filename
+
+    def __call__(self, rec: SearchRecord) -> None:
+        plot_profile_stats(rec.stats, filename=self.filename)
+
+
+def _default_sink() -> StatsSink:
+    sink = StatsSink(int(os.getenv("CHESS_PROFILE_HISTORY", "256")))
+    jsonl = os.getenv("CHESS_PROFILE_JSONL")
+    if jsonl:
+        sink.add_exporter(JsonlExporter(jsonl))
+    prom = os.getenv("CHESS_PROFILE_PROM")
+    if prom:
+        sink.add_exporter(PrometheusExporter(prom))
+    return sink
+
+
+SINK = _default_sink()
+
+
+def record_search(stats: ProfileStats, engine: str) -> SearchRecord:
+    """Record ``stats`` for ``engine`` in the shared :data:`SINK`."""
+    return SINK.record(stats, engine)
+
+
 def plot_profile_stats(stats: ProfileStats, filename: Optional[str] = None) -> None:
     """Visualise key metrics using matplotlib.
 
@@ -92,4 +277,15 @@ def plot_profile_stats(stats: ProfileStats, filename: Optional[str] = None) -> N
     plt.close(fig)
 
 
-__all__ = ["ProfileStats", "STATS", "plot_profile_stats"]
\ No newline at end of file
+__all__ = [
+    "ProfileStats",
+    "STATS",
+    "SearchRecord",
+    "StatsSink",
+    "JsonlExporter",
+    "PrometheusExporter",
+    "PngExporter",
+    "SINK",
+    "record_search",
+    "plot_profile_stats",
+]
\ No newline at end of file
@@ -0,0 +1,379 @@
+"""Evaluation cache for :class:`core.evaluator.Evaluator`.
+
+Scores are stored under a single 64-bit key that mixes the position, the
+colour the score is computed for and a *fingerprint* of every tuning
+parameter feeding :meth:`Evaluator.evaluate` (pawn-structure knobs, phase
+weights, the ``CHESS_KS_*`` environment tunables and the PST contents).
+Changing any of them therefore selects a different set of entries instead
+of returning stale scores.
+
+Two backends share the same interface (``get`` / ``put`` / ``clear`` /
+``stats``):
+
+* :class:`LocalEvalCache` – per-process LRU over an :class:`OrderedDict`.
+* :class:`SharedEvalCache` – fixed-size, direct-mapped table in a
+  :class:`multiprocessing.shared_memory.SharedMemory` block, so pool workers
+  of a tournament or tuning run reuse each other's evaluations.  Writes are
+  lock-free: the slot's key is stored XOR-ed with its value, so a torn write
+  simply fails verification and counts as a miss.
+
+The process-wide cache returned by :func:`get_eval_cache` is configured from
+the environment:
+
+* ``CHESS_EVAL_CACHE_SHM`` – name of a shared table to attach to (set by
+  :func:`create_shared_eval_cache`, inherited by child processes);
+* ``CHESS_EVAL_CACHE_SIZE`` – entries of the local LRU (``0`` disables it).
+"""
+
+from __future__ import annotations
+
+import logging
+logger = logging.getLogger(__name__)
+
+import hashlib
+import os
+from collections import OrderedDict
+from multiprocessing import shared_memory
+from typing import Dict, Optional, Union
+
+import chess
+
+DEFAULT_CACHE_SIZE = 65536
+SHM_ENV = "CHESS_EVAL_CACHE_SHM"
+SIZE_ENV = "CHESS_EVAL_CACHE_SIZE"
+
+_MASK = (1 << 64) - 1
+_GOLDEN = 0x9E3779B97F4A7C15
+_MAGIC = 0x45564143  # "EVAC"
+# magic, slot count, shared hits, shared misses
+_HEADER_WORDS = 4
+SLOT_BYTES = 8 + 8  # key ^ value (Q) + value (q)
+
+
+def _digest(data: bytes) -> int:
+    return int.from_bytes(hashlib.blake2b(data, digest_size=8).digest(), "little")
+
+
+def _coerce_key(value) -> int:
+    """Coerce ``transposition_key`` results to a process-stable integer."""
+    if isinstance(value, int):
+        return value
+    if isinstance(value, str):
+        # ``hash(str)`` is randomised per process (PYTHONHASHSEED).
+        return _digest(value.encode("utf-8"))
+    if isinstance(value, (bytes, bytearray)):
+        return _digest(bytes(value))
+    try:
+        # ``hash(None)`` is address based before Python 3.12.
+        items = tuple(-1 if v is None else v for v in value)
+    except TypeError:
+        return _digest(repr(value).encode("utf-8"))
+    if all(isinstance(v, int) for v in items):
+        # Integer hashes are not randomised, so neither is the tuple's.
+        return hash(items)
+    return _digest(repr(items).encode("utf-8"))
+
+
+def position_key(board: chess.Board) -> int:
+    """Return a 64-bit key for ``board`` that is identical in every process."""
+    tk = getattr(board, "transposition_key", None)
+    if tk is not None:
+        key = _coerce_key(tk() if callable(tk) else tk)
+    else:
+        priv = getattr(board, "_transposition_key", None)
+        key = _coerce_key(priv()) if priv is not None else _digest(board.fen().encode("utf-8"))
+    return key & _MASK
+
+
+_FINGERPRINTS: Dict[tuple, int] = {}
+
+
+def fingerprint(params: tuple) -> int:
+    """Return a stable 64-bit digest of the hashable ``params`` tuple."""
+    fp = _FINGERPRINTS.get(params)
+    if fp is None:
+        digest = hashlib.blake2b(repr(params).encode("utf-8"), digest_size=8).digest()
+        fp = int.from_bytes(digest, "little")
+        if len(_FINGERPRINTS) >= 256:
+            _FINGERPRINTS.clear()
+        _FINGERPRINTS[params] = fp
+    return fp
+
+
+def make_key(pos_key: int, color: bool, params_fp: int) -> int:
+    """Combine position, colour and parameter fingerprint (never ``0``)."""
+    key = ((pos_key * _GOLDEN) & _MASK) ^ params_fp ^ (1 if color else 2)
+    return key or 1
+
+
+class LocalEvalCache:
+    """Per-process LRU of ``maxsize`` evaluations."""
+
+    backend = "local"
+
+    def __init__(self, maxsize: int = DEFAULT_CACHE_SIZE) -> None:
+        self.maxsize = max(0, int(maxsize))
+        self._data: "OrderedDict[int, int]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.stores = 0
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def get(self, key: int) -> Optional[int]:
+        val = self._data.get(key)
+        if val is None:
+            self.misses += 1
+            return None
+        self._data.move_to_end(key)
+        self.hits += 1
+        return val
+
+    def put(self, key: int, value: int) -> None:
+        if not self.maxsize:
+            return
+        self.stores += 1
+        self._data[key] = value
+        self._data.move_to_end(key)
+        if len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+
+    def clear(self) -> None:
+        self._data.clear()
+        self.reset_counters()
+
+    def reset_counters(self) -> None:
+        self.hits = 0
+        self.misses = 0
+        self.stores = 0
+
+    def stats(self) -> Dict[str, object]:
+        probes = self.hits + self.misses
+        return {
+            "backend": self.backend,
+            "size": self.maxsize,
+            "entries": len(self._data),
+            "hits": self.hits,
+            "misses": self.misses,
+            "stores": self.stores,
+            "hit_rate": self.hits / probes if probes else 0.0,
+        }
+
+    def close(self) -> None:
+        pass
+
+
+def buffer_size(entries: int) -> int:
+    """Number of bytes needed for a shared table of ``entries`` slots."""
+    return 8 * _HEADER_WORDS + entries * SLOT_BYTES
+
+
+class SharedEvalCache:
+    """Direct-mapped evaluation table in shared memory.
+
+    Parameters
+    ----------
+    entries:
+        Number of slots when creating a table (ignored when attaching).
+    name:
+        Name of an existing block to attach to.  When omitted a new block
+        is created and owned by this instance; call :meth:`unlink` when the
+        last user is done with it.
+
+    ``hits``/``misses`` count this process only; :meth:`stats` also reports
+    the table-wide totals kept in the block header (updated without locks,
+    so approximate).
+    """
+
+    backend = "shared"
+
+    def __init__(self, entries: int = DEFAULT_CACHE_SIZE, *, name: Optional[str] = None) -> None:
+        if name is None:
+            entries = max(1, int(entries))
+            self._shm = shared_memory.SharedMemory(create=True, size=buffer_size(entries))
+            self._shm.buf[:] = bytes(self._shm.size)
+            self.owner = True
+        else:
+            self._shm = shared_memory.SharedMemory(name=name)
+            self.owner = False
+        self.name = self._shm.name
+
+        mv = memoryview(self._shm.buf).cast("B")
+        header = mv[:8 * _HEADER_WORDS].cast("Q")
+        if self.owner:
+            header[0] = _MAGIC
+            header[1] = entries
+        elif header[0] != _MAGIC:
+            header.release()
+            mv.release()
+            self._shm.close()
+            raise ValueError(f"shared memory block {name!r} is not an evaluation cache")
+        self.entries = int(header[1])
+        off = 8 * _HEADER_WORDS
+        n = self.entries
+        self._mv = mv
+        self._header = header
+        self._checks = mv[off:off + 8 * n].cast("Q")
+        off += 8 * n
+        self._values = mv[off:off + 8 * n].cast("q")
+
+        self.hits = 0
+        self.misses = 0
+        self.stores = 0
+        self._closed = False
+
+    def get(self, key: int) -> Optional[int]:
+        idx = key % self.entries
+        value = self._values[idx]
+        if self._checks[idx] ^ (value & _MASK) != key:
+            self.misses += 1
+            self._header[3] = (self._header[3] + 1) & _MASK
+            return None
+        self.hits += 1
+        self._header[2] = (self._header[2] + 1) & _MASK
+        return value
+
+    def put(self, key: int, value: int) -> None:
+        idx = key % self.entries
+        value = int(value)
+        self.stores += 1
+        self._values[idx] = value
+        self._checks[idx] = key ^ (value & _MASK)
+
+    def clear(self) -> None:
+        """Drop all entries (for every attached process) and reset counters."""
+        off = 8 * _HEADER_WORDS
+        self._mv[off:] = bytes(len(self._mv) - off)
+        self._header[2] = 0
+        self._header[3] = 0
+        self.reset_counters()
+
+    def reset_counters(self) -> None:
+        self.hits = 0
+        self.misses = 0
+        self.stores = 0
+
+    def fill(self, n: int = 1000) -> float:
+        """Estimate the fraction of used slots from the first ``n``."""
+        n = min(n, self.entries)
+        checks = self._checks
+        return sum(1 for i in range(n) if checks[i]) / n if n else 0.0
+
+    def stats(self) -> Dict[str, object]:
+        probes = self.hits + self.misses
+        shared_hits, shared_misses = int(self._header[2]), int(self._header[3])
+        shared_probes = shared_hits + shared_misses
+        return {
+            "backend": self.backend,
+            "name": self.name,
+            "size": self.entries,
+            "fill": self.fill(),
+            "hits": self.hits,
+            "misses": self.misses,
+            "stores": self.stores,
+            "hit_rate": self.hits / probes if probes else 0.0,
+            "shared_hits": shared_hits,
+            "shared_misses": shared_misses,
+            "shared_hit_rate": shared_hits / shared_probes if shared_probes else 0.0,
+        }
+
+    def close(self) -> None:
+        """Detach from the block (it stays alive for other processes)."""
+        if self._closed:
+            return
+        self._closed = True
+        for view in (self._checks, self._values, self._header, self._mv):
+            view.release()
+        self._shm.close()
+
+    def unlink(self) -> None:
+        """Close and destroy the block; only meaningful for the owner."""
+        self.close()
+        try:
+            self._shm.unlink()
+        except FileNotFoundError:
+            pass
+
+
+EvalCache = Union[LocalEvalCache, SharedEvalCache]
+
+_CACHE: Optional[EvalCache] = None
+
+
+def _env_size() -> int:
+    try:
+        return int(os.getenv(SIZE_ENV, DEFAULT_CACHE_SIZE))
+    except ValueError:
+        return DEFAULT_CACHE_SIZE
+
+
+def get_eval_cache() -> EvalCache:
+    """Return the process-wide cache, creating it from the environment."""
+    global _CACHE
+    if _CACHE is None:
+        name = os.getenv(SHM_ENV)
+        if name:
+            try:
+                _CACHE = SharedEvalCache(name=name)
+            except (FileNotFoundError, ValueError) as exc:
+                logger.warning("Cannot attach evaluation cache %r (%s); using a local one", name, exc)
+        if _CACHE is None:
+            _CACHE = LocalEvalCache(_env_size())
+    return _CACHE
+
+
+def set_eval_cache(cache: Optional[EvalCache]) -> Optional[EvalCache]:
+    """Install ``cache`` as the process-wide cache and return the previous one.
+
+    ``None`` makes the next :func:`get_eval_cache` call rebuild it from the
+    environment.
+    """
+    global _CACHE
+    previous, _CACHE = _CACHE, cache
+    return previous
+
+
+def create_shared_eval_cache(entries: int = DEFAULT_CACHE_SIZE) -> SharedEvalCache:
+    """Create a shared table, install it here and advertise it to children.
+
+    The block name is exported via ``CHESS_EVAL_CACHE_SHM`` so processes
+    started afterwards (pool workers, agent hosts) attach to it on their
+    first evaluation.  The caller owns the block and should call
+    :func:`release_shared_eval_cache` when done.
+    """
+    cache = SharedEvalCache(entries)
+    os.environ[SHM_ENV] = cache.name
+    set_eval_cache(cache)
+    logger.info("Shared evaluation cache %s: %d entries (%.1f MB)",
+                cache.name, cache.entries, buffer_size(cache.entries) / (1024 * 1024))
+    return cache
+
+
+def release_shared_eval_cache(cache: SharedEvalCache) -> None:
+    """Undo :func:`create_shared_eval_cache` and free the block."""
+    if os.environ.get(SHM_ENV) == cache.name:
+        del os.environ[SHM_ENV]
+    if _CACHE is cache:
+        set_eval_cache(None)
+    cache.unlink()
+
+
+def eval_cache_stats() -> Dict[str, object]:
+    """Counters of the process-wide cache."""
+    return get_eval_cache().stats()
+
+
+__all__ = [
+    "DEFAULT_CACHE_SIZE",
+    "LocalEvalCache",
+    "SharedEvalCache",
+    "position_key",
+    "fingerprint",
+    "make_key",
+    "get_eval_cache",
+    "set_eval_cache",
+    "create_shared_eval_cache",
+    "release_shared_eval_cache",
+    "eval_cache_stats",
+]
@@ -2,10 +2,12 @@ import logging
 import os
 logger = logging.getLogger(__name__)
 
-from collections import OrderedDict
-from typing import Dict
+from types import MappingProxyType
+from typing import Dict, Mapping
 
 import chess
+from . import eval_cache
+from . import pst_trainer
 from .pst_trainer import PST
 from .phase import GamePhaseDetector
 from metrics.attack_map import attack_count_per_square
@@ -83,6 +85,56 @@ def is_piece_mated(board: chess.Board, square: int) -> bool:
     )
     return len(escapes) == 0
 
+# Env tunables of Evaluator.king_safety and their defaults.  They are read
+# once into KING_SAFETY_PARAMS; call reload_king_safety_env() after changing
+# them in a running process.
+KING_SAFETY_ENV = {
+    "CHESS_KS_MISSING_PAWN_PENALTY": 2,
+    "CHESS_KS_SEMI_OPEN_FILE_PENALTY": 2,
+    "CHESS_KS_OPEN_FILE_PENALTY": 3,
+    "CHESS_KS_FILE_ROOKQ_PRESSURE": 2,
+    "CHESS_KS_ATTACK_RADIUS": 2,
+    "CHESS_KS_ATTACKER_NEAR_WEIGHT": 1,
+    "CHESS_KS_PAWN_STORM_BASE": 2,
+    "CHESS_KS_PAWN_STORM_CLOSE": 1,
+    "CHESS_KS_PROX_RADIUS": 3,
+    "CHESS_KS_PROX_KNIGHT": 2,
+    "CHESS_KS_PROX_BISHOP": 1,
+    "CHESS_KS_PROX_ROOK": 2,
+    "CHESS_KS_PROX_QUEEN": 3,
+}
+_KS_RADII = ("CHESS_KS_ATTACK_RADIUS", "CHESS_KS_PROX_RADIUS")
+
+
+def _read_king_safety_env() -> Dict[str, int]:
+    params = {}
+    for name, default in KING_SAFETY_ENV.items():
+        try:
+            v = os.getenv(name)
+            params[name] = int(v) if v is not None else default
+        except Exception:
+            params[name] = default
+    for name in _KS_RADII:
+        params[name] = max(1, params[name])
+    return params
+
+
+KING_SAFETY_PARAMS: Dict[str, int] = _read_king_safety_env()
+# Bumped whenever KING_SAFETY_PARAMS changes; part of the cache fingerprint.
+KING_SAFETY_REVISION = 0
+
+
+def reload_king_safety_env() -> bool:
+    """Re-read the ``CHESS_KS_*`` tunables; return ``True`` if any changed."""
+    global KING_SAFETY_PARAMS, KING_SAFETY_REVISION
+    params = _read_king_safety_env()
+    if params == KING_SAFETY_PARAMS:
+        return False
+    KING_SAFETY_PARAMS = params
+    KING_SAFETY_REVISION += 1
+    return True
+
+
 class Evaluator:
     def __init__(
         self,
@@ -130,8 +182,13 @@ class Evaluator:
             "score": 0,
         }
 
+        # Memoised parameter_fingerprint() and the inputs it was computed from.
+        self._params_version = 0
+        self._fingerprint_state: tuple | None = None
+        self._fingerprint = 0
+
         # Phase-aware weights for composite evaluation
-        self.phase_weights: Dict[str, Dict[str, int]] = {
+        self.phase_weights = {
             "opening": {
                 "material": 100,
                 "pst": 12,
@@ -164,6 +221,16 @@ class Evaluator:
             },
         }
 
+    @property
+    def phase_weights(self) -> Mapping[str, Mapping[str, int]]:
+        """Per-phase term weights (read-only; assign a new dict to change)."""
+        return MappingProxyType({phase: MappingProxyType(w) for phase, w in self._phase_weights.items()})
+
+    @phase_weights.setter
+    def phase_weights(self, weights: Mapping[str, Mapping[str, int]]) -> None:
+        self._phase_weights = {phase: dict(w) for phase, w in weights.items()}
+        self._params_version += 1
+
     @staticmethod
     def piece_zone(board: chess.Board, square: int, radius: int) -> set[int]:
         """Return squares around ``square`` relevant for piece safety.
@@ -287,43 +354,45 @@ class Evaluator:
         return white_total, black_total
 
     # --- Attack maps, pins/skewers, SEE and FEN/TT caching ------------------
-    @staticmethod
-    def _coerce_key(value) -> int:
-        if isinstance(value, int):
-            return value
-        if isinstance(value, (str, bytes, bytearray)):
-            return hash(value)
-        try:
-            return hash(tuple(value))
-        except TypeError:
-            return hash(repr(value))
+    def parameter_fingerprint(self) -> int:
+        """Digest of every tuning input of :meth:`evaluate`.
+
+        Covers the pawn-structure knobs, ``phase_weights``, the
+        ``CHESS_KS_*`` tunables and the PST contents, so the evaluation cache
+        never serves a score computed under other settings.  The digest is
+        recomputed only when one of them changes.
+        """
+        state = (
+            self.isolated_penalty,
+            self.doubled_penalty,
+            self.passed_bonus,
+            self._params_version,
+            KING_SAFETY_REVISION,
+            pst_trainer.PST_REVISION,
+        )
+        if state != self._fingerprint_state:
+            self._fingerprint = eval_cache.fingerprint((
+                self.isolated_penalty,
+                self.doubled_penalty,
+                self.passed_bonus,
+                tuple((phase, tuple(w.items())) for phase, w in self._phase_weights.items()),
+                tuple(KING_SAFETY_PARAMS.items()),
+                pst_trainer.pst_digest(),
+            ))
+            self._fingerprint_state = state
+        return self._fingerprint
+
+    def _cache_key(self, board: chess.Board, color: bool) -> int:
+        pos = eval_cache.position_key(board)
+        if board is not self.board:
+            # Material, PST and pawn terms are read from ``self.board``.
+            pos ^= eval_cache.position_key(self.board) * 0x2545F4914F6CDD1D
+        return eval_cache.make_key(pos, color, self.parameter_fingerprint())
 
     @staticmethod
-    def _position_key(board: chess.Board) -> int:
-        if hasattr(board, "transposition_key"):
-            tk = board.transposition_key
-            if callable(tk):
-                return Evaluator._coerce_key(tk())
-            return Evaluator._coerce_key(tk)
-        if hasattr(board, "_transposition_key"):
-            return Evaluator._coerce_key(board._transposition_key())
-        return hash(board.fen())
-
-    _EVAL_CACHE: "OrderedDict[tuple[int, bool], int]" = OrderedDict()
-    _EVAL_CACHE_MAXSIZE: int = 4096
-
-    def _cached_get(self, board: chess.Board, color: bool) -> int | None:
-        key = (self._position_key(board), color)
-        val = self._EVAL_CACHE.get(key)
-        if val is not None:
-            self._EVAL_CACHE.move_to_end(key)
-        return val
-
-    def _cached_set(self, board: chess.Board, color: bool, value: int) -> None:
-        key = (self._position_key(board), color)
-        self._EVAL_CACHE[key] = value
-        if len(self._EVAL_CACHE) > self._EVAL_CACHE_MAXSIZE:
-            self._EVAL_CACHE.popitem(last=False)
+    def cache_stats() -> Dict[str, object]:
+        """Hit/miss counters of the process-wide evaluation cache."""
+        return eval_cache.eval_cache_stats()
 
     @staticmethod
     def _directions_for_slider(piece_type: int) -> list[tuple[int, int]]:
@@ -424,12 +493,14 @@ class Evaluator:
         color = board.turn if color is None else color
 
         if use_cache:
-            cached = self._cached_get(board, color)
+            cache = eval_cache.get_eval_cache()
+            cache_key = self._cache_key(board, color)
+            cached = cache.get(cache_key)
             if cached is not None:
                 return cached
 
         phase = GamePhaseDetector.detect(board)
-        weights = self.phase_weights.get(phase, self.phase_weights["middlegame"])
+        weights = self._phase_weights.get(phase, self._phase_weights["middlegame"])
 
         material = self.material_diff(color)
         psq_white = self.piece_square_score()
@@ -467,7 +538,7 @@ class Evaluator:
         )
 
         if use_cache:
-            self._cached_set(board, color, total)
+            cache.put(cache_key, total)
         return total
 
     def score_move(self, move: chess.Move, color: bool) -> int:
@@ -770,7 +841,8 @@ class Evaluator:
         - Pawn storm presence and proximity on adjacent files
         - Short-range proximity of enemy minor/major pieces
 
-        Weights can be tuned via environment variables:
+        Weights can be tuned via environment variables (read once, see
+        :func:`reload_king_safety_env`):
         CHESS_KS_MISSING_PAWN_PENALTY, CHESS_KS_SEMI_OPEN_FILE_PENALTY,
         CHESS_KS_OPEN_FILE_PENALTY, CHESS_KS_FILE_ROOKQ_PRESSURE,
         CHESS_KS_ATTACK_RADIUS, CHESS_KS_ATTACKER_NEAR_WEIGHT,
@@ -787,28 +859,22 @@ class Evaluator:
         kf = chess.square_file(king_sq)
         kr = chess.square_rank(king_sq)
 
-        # Tunables (env overrides)
-        def _env_int(name: str, default: int) -> int:
-            try:
-                v = os.getenv(name)
-                return int(v) if v is not None else default
-            except Exception:
-                return default
-
-        W_MISSING = _env_int("CHESS_KS_MISSING_PAWN_PENALTY", 2)
-        W_SEMI_OPEN = _env_int("CHESS_KS_SEMI_OPEN_FILE_PENALTY", 2)
-        W_OPEN = _env_int("CHESS_KS_OPEN_FILE_PENALTY", 3)
-        W_FILE_PRESSURE = _env_int("CHESS_KS_FILE_ROOKQ_PRESSURE", 2)
-        ATTACK_RADIUS = max(1, _env_int("CHESS_KS_ATTACK_RADIUS", 2))
-        W_ATTACKER_NEAR = _env_int("CHESS_KS_ATTACKER_NEAR_WEIGHT", 1)
-        W_STORM_BASE = _env_int("CHESS_KS_PAWN_STORM_BASE", 2)
-        W_STORM_CLOSE = _env_int("CHESS_KS_PAWN_STORM_CLOSE", 1)
-        PROX_RADIUS = max(1, _env_int("CHESS_KS_PROX_RADIUS", 3))
+        # Tunables (env overrides, see KING_SAFETY_ENV)
+        params = KING_SAFETY_PARAMS
+        W_MISSING = params["CHESS_KS_MISSING_PAWN_PENALTY"]
+        W_SEMI_OPEN = params["CHESS_KS_SEMI_OPEN_FILE_PENALTY"]
+        W_OPEN = params["CHESS_KS_OPEN_FILE_PENALTY"]
+        W_FILE_PRESSURE = params["CHESS_KS_FILE_ROOKQ_PRESSURE"]
+        ATTACK_RADIUS = params["CHESS_KS_ATTACK_RADIUS"]
+        W_ATTACKER_NEAR = params["CHESS_KS_ATTACKER_NEAR_WEIGHT"]
+        W_STORM_BASE = params["CHESS_KS_PAWN_STORM_BASE"]
+        W_STORM_CLOSE = params["CHESS_KS_PAWN_STORM_CLOSE"]
+        PROX_RADIUS = params["CHESS_KS_PROX_RADIUS"]
         W_PROX = {
-            chess.KNIGHT: _env_int("CHESS_KS_PROX_KNIGHT", 2),
-            chess.BISHOP: _env_int("CHESS_KS_PROX_BISHOP", 1),
-            chess.ROOK: _env_int("CHESS_KS_PROX_ROOK", 2),
-            chess.QUEEN: _env_int("CHESS_KS_PROX_QUEEN", 3),
+            chess.KNIGHT: params["CHESS_KS_PROX_KNIGHT"],
+            chess.BISHOP: params["CHESS_KS_PROX_BISHOP"],
+            chess.ROOK: params["CHESS_KS_PROX_ROOK"],
+            chess.QUEEN: params["CHESS_KS_PROX_QUEEN"],
         }
 
         total_penalty = 0
@@ -15,6 +15,7 @@ Combines the best features from both implementations:
 
 from __future__ import annotations
 
+import os
 import time
 import logging
 logger = logging.getLogger(__name__)
@@ -40,6 +41,18 @@ class MovePhase(Enum):
     VISUALIZATION = "visualization"
 
 
+class TrackingLevel(Enum):
+    """How much move-evaluation bookkeeping a bot performs.
+
+    ``OFF`` records nothing, ``COUNTERS`` only feeds the aggregate counters
+    of :class:`MoveEvaluationManager` and ``FULL`` builds a
+    :class:`MoveObject` with evaluation steps for every move.
+    """
+    OFF = "off"
+    COUNTERS = "counters"
+    FULL = "full"
+
+
 class MoveStatus(Enum):
     """Status of move evaluation."""
     PENDING = "pending"
@@ -466,12 +479,37 @@ class MoveObject:
 
 
 class MoveEvaluationManager:
-    """Manages move evaluations throughout the game."""
+    """Manages move evaluations throughout the game.
+
+    Only the most recent ``max_history`` move objects are kept
+    (``CHESS_MOVE_HISTORY``, default 500); :attr:`evaluation_stats` holds
+    running aggregates over every move.  Viewers call :meth:`attach_viewer`
+    / :meth:`detach_viewer` so bots in automatic tracking mode know whether
+    full tracking is worth paying for.
+    """
     
-    def __init__(self):
+    def __init__(self, max_history: Optional[int] = None):
         self.current_move: Optional[MoveObject] = None
         self.move_history: List[MoveObject] = []
         self.evaluation_stats: Dict[str, Any] = {}
+        self.max_history = (
+            int(os.getenv("CHESS_MOVE_HISTORY", "500"))
+            if max_history is None else int(max_history)
+        )
+        self._viewers = 0
+
+    @property
+    def viewer_attached(self) -> bool:
+        """``True`` while at least one viewer is attached."""
+        return self._viewers > 0
+
+    def attach_viewer(self) -> None:
+        """Register a viewer interested in full move evaluations."""
+        self._viewers += 1
+
+    def detach_viewer(self) -> None:
+        """Unregister a viewer added with :meth:`attach_viewer`."""
+        self._viewers = max(0, self._viewers - 1)
     
     def create_move_evaluation(self, move: Move, board: Board, bot_name: str = "") -> MoveObject:
         """Create a new move evaluation."""
@@ -491,11 +529,25 @@ class MoveEvaluationManager:
         """Finalize the current move and add it to history."""
         if self.current_move:
             self.move_history.append(self.current_move)
+            overflow = len(self.move_history) - self.max_history
+            if overflow > 0:
+                del self.move_history[:overflow]
             self._update_stats(self.current_move)
             self.current_move = None
-    
-    def _update_stats(self, move_eval: MoveObject) -> None:
-        """Update evaluation statistics."""
+
+    def count_move(self, bot_names: List[str], duration_ms: float) -> None:
+        """Update the aggregate counters without building a :class:`MoveObject`.
+
+        Used by bots in :attr:`TrackingLevel.COUNTERS` mode.
+        """
+        stats = self._ensure_stats()
+        stats['total_moves'] += 1
+        total_duration = stats['avg_duration_ms'] * (stats['total_moves'] - 1) + duration_ms
+        stats['avg_duration_ms'] = total_duration / stats['total_moves']
+        for bot_name in bot_names:
+            stats['bot_usage'][bot_name] = stats['bot_usage'].get(bot_name, 0) + 1
+
+    def _ensure_stats(self) -> Dict[str, Any]:
         if not self.evaluation_stats:
             self.evaluation_stats = {
                 'total_moves': 0,
@@ -507,8 +559,11 @@ class MoveEvaluationManager:
                 'method_usage': {},
                 'tactical_motifs': 0
             }
-        
-        stats = self.evaluation_stats
+        return self.evaluation_stats
+
+    def _update_stats(self, move_eval: MoveObject) -> None:
+        """Update evaluation statistics."""
+        stats = self._ensure_stats()
         stats['total_moves'] += 1
         
         # Update average duration
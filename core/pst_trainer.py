@@ -3,6 +3,7 @@ logger = logging.getLogger(__name__)
 
 import os
 import json
+import hashlib
 from typing import Sequence
 
 import chess
@@ -70,6 +71,25 @@ def load_pst(path: str = PST_FILE):
 
 # Global PST loaded at import time
 PST = load_pst()
+# Bumped on every in-place update of PST (see pst_digest()).
+PST_REVISION = 0
+_PST_DIGEST = (None, "")
+
+
+def pst_digest() -> str:
+    """Return a short content digest of :data:`PST`.
+
+    The digest is recomputed only after :data:`PST_REVISION` changes, so it
+    is cheap to call per evaluation and identical in every process that
+    loaded the same tables.
+    """
+    global _PST_DIGEST
+    revision, digest = _PST_DIGEST
+    if revision != PST_REVISION:
+        payload = json.dumps(PST, sort_keys=True).encode("utf-8")
+        digest = hashlib.blake2b(payload, digest_size=8).hexdigest()
+        _PST_DIGEST = (PST_REVISION, digest)
+    return digest
 
 
 def _apply_board_to_table(board: chess.Board, winner_color: bool, table):
@@ -83,6 +103,8 @@ def _apply_board_to_table(board: chess.Board, winner_color: bool, table):
 
 def update_from_board(board: chess.Board, winner_color: bool):
     """Update phase tables from the final board of a decisive game."""
+    global PST_REVISION
+    PST_REVISION += 1
     phase = GamePhaseDetector.detect(board)
     _apply_board_to_table(board, winner_color, PST["phases"][phase])
     save_pst(PST)
@@ -90,6 +112,8 @@ def update_from_board(board: chess.Board, winner_color: bool):
 
 def update_from_history(moves: Sequence[chess.Move], winner_color: bool, steps: Sequence[int]):
     """Replay move history and update PST at specified ply numbers."""
+    global PST_REVISION
+    PST_REVISION += 1
     temp = chess.Board()
     for i, mv in enumerate(moves, start=1):
         temp.push(mv)
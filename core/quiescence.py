@@ -1,10 +1,42 @@
+"""Bounded quiescence search shared by the search engines.
+
+:class:`chess_ai.decision_engine.DecisionEngine`,
+:class:`core.shallow_search.ShallowSearch` and the hybrid alpha-beta search
+all resolve their leaves with :func:`quiescence`.  Compared with a plain
+capture search it
+
+* stops after ``max_ply`` quiescence plies (``CHESS_QS_MAX_PLY``),
+* generates captures with ``board.generate_legal_captures()`` instead of
+  filtering every legal move,
+* tries quiet checking moves only in the first quiescence ply, generating
+  just the moves that land on a square attacking the enemy king (direct
+  checks; discovered checks are left to the main search),
+* skips captures that cannot lift the score to ``alpha`` even when the
+  captured piece is won for free (delta pruning), and
+* skips captures that lose material according to static exchange
+  evaluation (:func:`chess_ai.see.static_exchange_eval`).
+
+When the side to move is in check in one of the first
+:data:`QS_CHECK_PLIES` plies (on entry, or after one of the quiet checks)
+all evasions are searched and no stand-pat score is taken; a position
+without evasions scores as mate (:data:`MATE_SCORE`, shorter mates
+preferred).  Checks arising deeper inside the quiescence search are scored
+statically, which keeps check sequences from blowing up the search.  The
+search is fail-soft.
+"""
+
 from __future__ import annotations
 
 import logging
 logger = logging.getLogger(__name__)
 
+import os
+from typing import Callable, Optional
+
 import chess
 
+from chess_ai.see import static_exchange_eval
+
 
 # Basic material evaluation reused by quiescence search.
 # Evaluates from side to move perspective (positive is good for side to move).
@@ -17,6 +49,14 @@ _values = {
     chess.KING: 0,
 }
 
+QS_MAX_PLY = int(os.getenv("CHESS_QS_MAX_PLY", "6"))
+DELTA_MARGIN = 200  # centipawns of positional slack allowed by delta pruning
+# Plies in which a check is answered by searching evasions; 2 covers the
+# reply to the quiet checks generated at ply 0.
+QS_CHECK_PLIES = 2
+MATE_SCORE = 100_000  # score of being mated at quiescence ply 0
+
+
 def _evaluate(board: chess.Board) -> int:
     """Return a simple material evaluation of ``board``.
 
@@ -32,8 +72,100 @@ def _evaluate(board: chess.Board) -> int:
     return score
 
 
-def quiescence(board: chess.Board, alpha: int, beta: int) -> int:
-    """Perform a quiescence search on ``board``.
+def _capture_gain(board: chess.Board, move: chess.Move) -> int:
+    """Material won outright by capture ``move`` (victim plus promotion)."""
+    if board.is_en_passant(move):
+        gain = _values[chess.PAWN]
+    else:
+        gain = _values.get(board.piece_type_at(move.to_square), 0)
+    if move.promotion:
+        gain += _values[move.promotion] - _values[chess.PAWN]
+    return gain
+
+
+def _losing_capture(board: chess.Board, move: chess.Move) -> bool:
+    """Return ``True`` if SEE says ``move`` loses material."""
+    if move.promotion or board.is_en_passant(move):
+        return False
+    attacker = _values.get(board.piece_type_at(move.from_square), 0)
+    victim = _values.get(board.piece_type_at(move.to_square), 0)
+    # Taking a piece worth at least the attacker can never lose material.
+    if victim >= attacker:
+        return False
+    return static_exchange_eval(board, move) < 0
+
+
+def _board_push(board: chess.Board, move: chess.Move) -> None:
+    board.push(move)
+
+
+def _board_pop(board: chess.Board) -> None:
+    board.pop()
+
+
+def ordered_captures(board: chess.Board) -> list:
+    """Legal captures, most valuable victim / least valuable attacker first."""
+    def mvv_lva(move: chess.Move) -> int:
+        return _capture_gain(board, move) * 10 - _values.get(board.piece_type_at(move.from_square), 0)
+
+    return sorted(board.generate_legal_captures(), key=mvv_lva, reverse=True)
+
+
+def _quiet_checks(board: chess.Board) -> list:
+    """Non-capturing moves that give direct check.
+
+    Only pieces moving onto a square that attacks the enemy king are
+    generated, so this stays cheap compared with testing ``gives_check`` on
+    every legal move.
+    """
+    king = board.king(not board.turn)
+    if king is None:
+        return []
+    occupied = board.occupied
+    empty = ~occupied & chess.BB_ALL
+    diag = chess.BB_DIAG_ATTACKS[king][chess.BB_DIAG_MASKS[king] & occupied]
+    line = (
+        chess.BB_RANK_ATTACKS[king][chess.BB_RANK_MASKS[king] & occupied]
+        | chess.BB_FILE_ATTACKS[king][chess.BB_FILE_MASKS[king] & occupied]
+    )
+    targets = (
+        (chess.PAWN, chess.BB_PAWN_ATTACKS[not board.turn][king]),
+        (chess.KNIGHT, chess.BB_KNIGHT_ATTACKS[king]),
+        (chess.BISHOP, diag),
+        (chess.ROOK, line),
+        (chess.QUEEN, diag | line),
+    )
+    checks = []
+    for piece_type, mask in targets:
+        to_mask = mask & empty
+        if not to_mask:
+            continue
+        from_mask = board.pieces_mask(piece_type, board.turn)
+        for move in board.generate_legal_moves(from_mask, to_mask):
+            if not move.promotion and not board.is_en_passant(move):
+                checks.append(move)
+    # A promotion checks as the new piece; test those few moves exactly.
+    last_rank = chess.BB_RANK_8 if board.turn == chess.WHITE else chess.BB_RANK_1
+    pawns = board.pieces_mask(chess.PAWN, board.turn)
+    for move in board.generate_legal_moves(pawns, last_rank & empty):
+        if board.gives_check(move):
+            checks.append(move)
+    return checks
+
+
+def quiescence(
+    board: chess.Board,
+    alpha: float,
+    beta: float,
+    *,
+    evaluate: Callable[[chess.Board], float] = _evaluate,
+    push: Optional[Callable[[chess.Board, chess.Move], None]] = None,
+    pop: Optional[Callable[[chess.Board], None]] = None,
+    stop: Optional[Callable[[], bool]] = None,
+    max_ply: int | None = None,
+    ply: int = 0,
+) -> float:
+    """Perform a bounded quiescence search on ``board``.
 
     Parameters
     ----------
@@ -41,26 +173,69 @@ def quiescence(board: chess.Board, alpha: int, beta: int) -> int:
         The current board state.
     alpha, beta:
         Alpha--beta window.
-
-    The search only explores capture and checking moves and keeps
-    recursing until a quiet position is reached.  The evaluation is a
-    simple material count from the point of view of the side to move.
+    evaluate:
+        Static evaluation from the side to move's point of view.  Defaults
+        to a plain material count.
+    push, pop:
+        Make/unmake hooks, e.g. those of an incremental evaluator.  Default
+        to ``board.push`` / ``board.pop``.
+    stop:
+        Optional callback; when it returns ``True`` the static evaluation is
+        returned immediately.
+    max_ply:
+        Maximum quiescence depth (defaults to :data:`QS_MAX_PLY`).
+    ply:
+        Current quiescence ply; callers leave it at ``0``.
     """
-    stand_pat = _evaluate(board)
-    if stand_pat >= beta:
-        return beta
-    if alpha < stand_pat:
-        alpha = stand_pat
-
-    for move in board.legal_moves:
-        if not (board.is_capture(move) or board.gives_check(move)):
-            continue
-        board.push(move)
-        score = -quiescence(board, -beta, -alpha)
-        board.pop()
+    if max_ply is None:
+        max_ply = QS_MAX_PLY
+    if stop is not None and stop():
+        return evaluate(board)
+
+    if ply >= max_ply:
+        return evaluate(board)
 
+    if ply < QS_CHECK_PLIES and board.is_check():
+        moves = list(board.legal_moves)
+        if not moves:
+            return -(MATE_SCORE - ply)
+        best = -float("inf")
+        stand_pat = None
+    else:
+        stand_pat = evaluate(board)
+        if stand_pat >= beta:
+            return stand_pat
+        # Even winning a queen for free would not reach alpha.
+        if stand_pat + _values[chess.QUEEN] + DELTA_MARGIN < alpha:
+            return stand_pat
+        if alpha < stand_pat:
+            alpha = stand_pat
+        best = stand_pat
+        moves = ordered_captures(board)
+        if ply == 0:
+            moves += _quiet_checks(board)
+
+    _push = push or _board_push
+    _pop = pop or _board_pop
+    for move in moves:
+        if stand_pat is not None and board.is_capture(move):
+            if stand_pat + _capture_gain(board, move) + DELTA_MARGIN <= alpha:
+                continue
+            if _losing_capture(board, move):
+                continue
+        _push(board, move)
+        score = -quiescence(
+            board, -beta, -alpha,
+            evaluate=evaluate, push=push, pop=pop, stop=stop, max_ply=max_ply, ply=ply + 1,
+        )
+        _pop(board)
+        if score > best:
+            best = score
         if score >= beta:
-            return beta
+            return score
         if score > alpha:
             alpha = score
-    return alpha
\ No newline at end of file
+    return best
+
+
+__all__ = ["quiescence", "ordered_captures", "QS_MAX_PLY", "QS_CHECK_PLIES", "DELTA_MARGIN", "MATE_SCORE"]
@@ -4,9 +4,11 @@ import chess
 from dataclasses import dataclass
 from typing import Dict, Iterable, List, Optional, Tuple
 
+from core.quiescence import quiescence
+
 # Lightweight, dependency-free shallow search (2–3 ply) with:
 # - Negamax with alpha–beta pruning
-# - Quiescence (captures and checks)
+# - Bounded quiescence (see core.quiescence)
 # - Basic move ordering (hash move, MVV-LVA, killer, history)
 # - Small transposition table
 
@@ -91,23 +93,7 @@ def _order_moves(
 
 
 def _quiescence(board: chess.Board, alpha: int, beta: int) -> int:
-	stand_pat = _material_eval(board)
-	if stand_pat >= beta:
-		return stand_pat
-	if alpha < stand_pat:
-		alpha = stand_pat
-
-	for move in board.legal_moves:
-		if not (board.is_capture(move) or board.gives_check(move)):
-			continue
-		board.push(move)
-		score = -_quiescence(board, -beta, -alpha)
-		board.pop()
-		if score >= beta:
-			return score
-		if score > alpha:
-			alpha = score
-	return alpha
+	return quiescence(board, alpha, beta, evaluate=_material_eval)
 
 
 EXACT, LOWERBOUND, UPPERBOUND = 0, 1, 2
@@ -1,4 +1,4 @@
-1"""
+"""
 Centralized Timing Configuration for Chess AI.
 
 This module provides centralized timing configuration that can be easily
@@ -146,8 +146,9 @@ class TimingManager:
                 logger.error(f"Failed to load timing configuration: {e}")
                 logger.info("Using default timing configuration")
         else:
+            # Defaults are only written once a setter changes them, so importing
+            # this module does not drop a file into the working directory.
             logger.info(f"No timing configuration file found at {self.config_file}, using defaults")
-            self.save_config()  # Save default config
     
     def save_config(self) -> None:
         """Save timing configuration to file."""
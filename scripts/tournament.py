@@ -1,6 +1,6 @@
 #!/usr/bin/env python3
 """
-Headless sequential tournament runner (no threading).
+Headless tournament runner.
 
 - Prints each pairing and per-game result as they happen
 - Maintains and prints a live standings table in the terminal
@@ -10,11 +10,17 @@ Headless sequential tournament runner (no threading).
 Examples:
   python scripts/tournament.py --agents DynamicBot,FortifyBot,AggressiveBot --bo 3
   python scripts/tournament.py --agents NeuralBot,FortifyBot,AggressiveBot,EndgameBot --games 2
+  python scripts/tournament.py --workers 0 --games 2          # round-robin on all CPU cores
+  python scripts/tournament.py --workers 0 --resume output/tournaments/20250101_120000
 
 Notes:
 - Scoring: win=1.0, draw=0.5, loss=0.0
 - Colors alternate by game within a series
+- Games run sequentially by default; with --workers the round-robin plays individual
+  games on a process pool while the main process alone updates standings and output
 - Technical loss on illegal move/agent error/returned None
+- Timed games run each player in its own subprocess (chess_ai.agent_host), which is
+  killed and respawned on timeout; --isolation thread keeps the old daemon-thread mode
 """
 from __future__ import annotations
 
@@ -47,6 +53,7 @@ if ROOT not in sys.path:
 
 import chess
 
+from chess_ai.agent_host import AgentHost
 from chess_ai.bot_agent import make_agent, get_agent_names
 from chess_ai.pattern_detector import PatternDetector as _PatternDetector, ChessPattern as _DetectedPattern
 from evaluation import evaluate
@@ -70,6 +77,10 @@ LAST_MOVE_STATUS: Optional[Dict[str, object]] = None
 #   }
 LAST_GAME_META: Optional[Dict[str, object]] = None
 
+# How timed games run the agents: "process" hosts each player in a killable
+# AgentHost subprocess, "thread" keeps the legacy daemon-thread timeout.
+AGENT_ISOLATION = "process"
+
 
 class TournamentProgress:
     """Tracks and prints tournament-level progress and elapsed time."""
@@ -259,6 +270,37 @@ def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
         default="on",
         help="Tie-breaks on tie: two 1|0 blitz games, then Armageddon (W 60s vs B 45s, draw → Black)",
     )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=1,
+        help="Round-robin: play games in parallel on this many worker processes (0 = one per CPU core, 1 = sequential)",
+    )
+    parser.add_argument(
+        "--resume",
+        type=str,
+        default=None,
+        help="Round-robin: continue the tournament in this output directory, skipping games already in match_logs.jsonl",
+    )
+    parser.add_argument(
+        "--isolation",
+        type=str,
+        choices=["process", "thread"],
+        default="process",
+        help="Timed games: run each player in a subprocess that is killed on timeout (process) or on a daemon thread (thread)",
+    )
+    parser.add_argument(
+        "--shared-eval-cache",
+        type=int,
+        default=0,
+        metavar="ENTRIES",
+        help="Share an Evaluator cache of this many entries between all worker and agent processes (0 = per-process caches)",
+    )
+    parser.add_argument(
+        "--import-profile",
+        action="store_true",
+        help="Print the import cost of each selected agent (measured in a fresh interpreter, as a worker pays it) and exit",
+    )
     parser.add_argument(
         "--out-root",
         type=str,
@@ -331,9 +373,12 @@ def print_standings(standings: Dict[str, PlayerStats]) -> None:
 class TournamentOutputWriter:
     """Manages writing live bracket and per-game logs to a timestamped directory."""
 
-    def __init__(self, out_root: Path, tag: Optional[str] = None) -> None:
-        timestamp = datetime.now(timezone.utc).strftime("%Y%m%d_%H%M%S")
-        self.outdir = out_root / timestamp
+    def __init__(self, out_root: Path, tag: Optional[str] = None, *, resume_dir: Optional[Path] = None) -> None:
+        if resume_dir is not None:
+            self.outdir = Path(resume_dir)
+        else:
+            timestamp = datetime.now(timezone.utc).strftime("%Y%m%d_%H%M%S")
+            self.outdir = out_root / timestamp
         self.outdir.mkdir(parents=True, exist_ok=True)
         self.bracket_path = self.outdir / "bracket.json"
         self.logs_path = self.outdir / "match_logs.jsonl"
@@ -356,9 +401,36 @@ class TournamentOutputWriter:
             "seeds": [],
             "rounds": [],
         }
+        if resume_dir is not None and self.bracket_path.exists():
+            try:
+                with open(self.bracket_path, "r", encoding="utf-8") as f:
+                    self.bracket.update(json.load(f))
+                for pair in self.bracket.get("pairs", []):
+                    self._pairs[f"{pair['a']}__vs__{pair['b']}"] = dict(pair)
+            except Exception:
+                print(f"Не вдалося прочитати {self.bracket_path}; починаємо заново")
         # Initialize on disk
         self._write_bracket()
 
+    def load_games(self) -> List[Dict[str, object]]:
+        """Return the games already logged to ``match_logs.jsonl``.
+
+        Lines that cannot be parsed (e.g. a partial write before a crash) are
+        skipped.
+        """
+        games: List[Dict[str, object]] = []
+        if not self.logs_path.exists():
+            return games
+        with open(self.logs_path, "r", encoding="utf-8") as f:
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                except ValueError:
+                    continue
+                if isinstance(entry, dict) and "pair" in entry and "result" in entry:
+                    games.append(entry)
+        return games
+
     def set_round_robin_metadata(
         self,
         *,
@@ -565,6 +637,11 @@ def _choose_move_with_timeout(agent, board: chess.Board, timeout_s: Optional[int
     Returns a chess.Move or None on timeout/error. Uses a daemon thread to avoid blocking.
     """
     global LAST_MOVE_STATUS
+    if isinstance(agent, AgentHost):
+        mv, _, kind, err = agent.choose_move(board, timeout_s if timeout_s and timeout_s > 0 else None)
+        LAST_MOVE_STATUS = {"kind": kind, "error": err}
+        return mv
+
     if not timeout_s or timeout_s <= 0:
         try:
             mv = agent.choose_move(board)
@@ -616,6 +693,11 @@ def _choose_move_with_budget(agent, board: chess.Board, budget_s: float) -> Tupl
         LAST_MOVE_STATUS = {"kind": "timeout", "error": None}
         return None, 0.0, False
 
+    if isinstance(agent, AgentHost):
+        mv, elapsed, kind, err = agent.choose_move(board, budget_s)
+        LAST_MOVE_STATUS = {"kind": kind, "error": err}
+        return mv, elapsed, kind != "timeout"
+
     result: Dict[str, Optional[chess.Move]] = {"move": None}
     done = threading.Event()
     board_copy = board.copy(stack=False)
@@ -666,8 +748,15 @@ def play_single_game(
     Technical loss is applied if an agent returns None or makes illegal move.
     """
     board = chess.Board()
-    white_agent = make_agent(white_agent_name, chess.WHITE)
-    black_agent = make_agent(black_agent_name, chess.BLACK)
+    timed = bool(time_per_move) or any(
+        c is not None and c > 0 for c in (clock_initial, clock_initial_white, clock_initial_black)
+    )
+    if timed and AGENT_ISOLATION == "process":
+        white_agent = AgentHost(white_agent_name, chess.WHITE)
+        black_agent = AgentHost(black_agent_name, chess.BLACK)
+    else:
+        white_agent = make_agent(white_agent_name, chess.WHITE)
+        black_agent = make_agent(black_agent_name, chess.BLACK)
     # Reset last game diagnostics at start
     global LAST_GAME_META
     LAST_GAME_META = None
@@ -898,6 +987,10 @@ def play_single_game(
             "error": exc_str.strip(),
         }
         return "0-1" if mover_is_white else "1-0"
+    finally:
+        for hosted in (white_agent, black_agent):
+            if isinstance(hosted, AgentHost):
+                hosted.close()
 
     if board.is_game_over():
         LAST_GAME_META = None
@@ -1114,6 +1207,248 @@ def run_round_robin(
     return standings
 
 
+@dataclass(frozen=True)
+class GameTask:
+    """One game of a round-robin pairing, as shipped to a worker process."""
+
+    a: str
+    b: str
+    game_index: int
+    white: str
+    black: str
+    tiebreak: bool
+    time_per_move: Optional[int]
+    clock_initial: Optional[float]
+    clock_increment: float
+    clock_initial_white: Optional[float] = None
+    clock_initial_black: Optional[float] = None
+
+
+class _PatternCollector:
+    """Stands in for TournamentPatternsWriter inside workers."""
+
+    def __init__(self) -> None:
+        self.records: List[Dict[str, object]] = []
+
+    def log_patterns(self, **kwargs) -> None:
+        self.records.append(kwargs)
+
+
+_WORKER_DETECTOR: Optional[_PatternDetector] = None
+
+
+def _init_game_worker(isolation: str) -> None:
+    global AGENT_ISOLATION, _WORKER_DETECTOR
+    AGENT_ISOLATION = isolation
+    _WORKER_DETECTOR = _PatternDetector()
+
+
+def _play_game_task(task: GameTask, max_plies: int):
+    """Worker entry point: return ``(task, result, meta, pattern_records)``."""
+    collector = _PatternCollector()
+    res = play_single_game(
+        task.white,
+        task.black,
+        max_plies=max_plies,
+        time_per_move=task.time_per_move,
+        clock_initial=task.clock_initial,
+        clock_increment=task.clock_increment,
+        clock_initial_white=task.clock_initial_white,
+        clock_initial_black=task.clock_initial_black,
+        detector=_WORKER_DETECTOR,
+        patterns_writer=collector,
+        pair_a=task.a,
+        pair_b=task.b,
+        game_index=task.game_index,
+    )
+    if isinstance(res, tuple):  # clock mode returns (result, moves, time, reason)
+        res = res[0]
+    return task, res, LAST_GAME_META, collector.records
+
+
+def _series_points(a: str, b: str, games_per_pair: int, results: Dict[int, str]) -> Tuple[float, float]:
+    """Points of ``a`` and ``b`` over the completed games of a series."""
+    pts_a = pts_b = 0.0
+    for idx in sorted(results):
+        res = results[idx]
+        a_white = (idx - 1) % 2 == 0
+        if res == "1-0":
+            a_wins = a_white
+        elif res == "0-1":
+            a_wins = not a_white
+        elif idx == games_per_pair + 3:
+            # Armageddon: a draw counts as a win for Black
+            a_wins = not a_white
+        else:
+            pts_a += 0.5
+            pts_b += 0.5
+            continue
+        if a_wins:
+            pts_a += 1.0
+        else:
+            pts_b += 1.0
+    return pts_a, pts_b
+
+
+def _series_next_games(
+    a: str,
+    b: str,
+    games_per_pair: int,
+    tiebreaks: bool,
+    results: Dict[int, str],
+    inflight: set,
+) -> Tuple[List[int], bool]:
+    """Return ``(game indices to start now, series finished)``.
+
+    Mirrors :func:`play_series`: a best-of-N series stops once one side has a
+    majority, the first ``needed`` games are independent and start together,
+    and a tied series goes to two 1|0 blitz games and then Armageddon.
+    """
+    n = games_per_pair
+    needed = (n // 2) + 1 if n % 2 == 1 else None
+    main = {i: r for i, r in results.items() if i <= n}
+    pts_a, pts_b = _series_points(a, b, n, main)
+    if needed is not None and max(pts_a, pts_b) >= needed:
+        return [], not inflight
+
+    def missing(indices) -> List[int]:
+        return [i for i in indices if i not in results and i not in inflight]
+
+    if len(main) < n:
+        target = max(needed or n, len(main) + 1)
+        started = len(main) + sum(1 for i in inflight if i <= n)
+        return missing(range(1, n + 1))[: max(0, target - started)], False
+
+    if not tiebreaks or abs(pts_a - pts_b) > 1e-9:
+        return [], not inflight
+    blitz = missing((n + 1, n + 2))
+    if any(i not in results for i in (n + 1, n + 2)):
+        return blitz, False
+    pts_a, pts_b = _series_points(a, b, n, {i: r for i, r in results.items() if i <= n + 2})
+    if abs(pts_a - pts_b) > 1e-9:
+        return [], not inflight
+    if n + 3 not in results:
+        return missing((n + 3,)), False
+    return [], not inflight
+
+
+def _game_task(
+    a: str,
+    b: str,
+    idx: int,
+    games_per_pair: int,
+    time_per_move: Optional[int],
+    clock_initial: Optional[float],
+    clock_increment: float,
+) -> GameTask:
+    white, black = (a, b) if (idx - 1) % 2 == 0 else (b, a)
+    if idx <= games_per_pair:
+        return GameTask(a, b, idx, white, black, False, time_per_move, clock_initial, clock_increment)
+    if idx <= games_per_pair + 2:
+        return GameTask(a, b, idx, white, black, True, None, 60.0, 0.0)
+    return GameTask(a, b, idx, white, black, True, None, None, 0.0, 60.0, 45.0)
+
+
+def run_round_robin_parallel(
+    agent_names: List[str],
+    games_per_pair: int,
+    *,
+    max_plies: int,
+    time_per_move: Optional[int] = None,
+    clock_initial: Optional[float] = None,
+    clock_increment: float = 0.0,
+    tiebreaks: bool = False,
+    writer: Optional["TournamentOutputWriter"] = None,
+    workers: int = 0,
+) -> Dict[str, PlayerStats]:
+    """Round-robin that plays individual games on a pool of worker processes.
+
+    Workers only play games; results stream back to this process, which
+    alone updates the standings and writes through ``writer``.  Games
+    already present in the writer's ``match_logs.jsonl`` (see
+    ``TournamentOutputWriter(resume_dir=...)``) are counted and not replayed.
+    ``workers=0`` uses one worker per CPU core.
+    """
+    from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+
+    workers = workers or (os.cpu_count() or 1)
+    standings: Dict[str, PlayerStats] = {name: PlayerStats(name) for name in agent_names}
+    pairs = list(itertools.combinations(agent_names, 2))
+    results: Dict[Tuple[str, str], Dict[int, str]] = {pair: {} for pair in pairs}
+    inflight: Dict[Tuple[str, str], set] = {pair: set() for pair in pairs}
+
+    patterns_writer = TournamentPatternsWriter(writer.outdir) if writer is not None else None
+    if writer is not None:
+        for pair in pairs:
+            writer.ensure_pair(*pair)
+        resumed = 0
+        for entry in writer.load_games():
+            pair = (entry["pair"].get("a"), entry["pair"].get("b"))
+            idx = int(entry.get("game_index", 0))
+            if pair not in results or idx <= 0 or idx in results[pair]:
+                continue
+            results[pair][idx] = str(entry["result"])
+            standings[entry["white"]].record(entry["result"], as_white=True)
+            standings[entry["black"]].record(entry["result"], as_white=False)
+            resumed += 1
+        if resumed:
+            print(f"Відновлено {resumed} зіграних ігор з {writer.logs_path}")
+
+    total_estimate = len(pairs) * games_per_pair
+    progress = TournamentProgress(total_games_estimate=total_estimate)
+    print(f"Паралельний режим: {workers} процесів")
+
+    with ProcessPoolExecutor(
+        max_workers=workers,
+        initializer=_init_game_worker,
+        initargs=(AGENT_ISOLATION,),
+    ) as pool:
+        pending = {}
+
+        def schedule() -> None:
+            for (a, b) in pairs:
+                wanted, _ = _series_next_games(
+                    a, b, games_per_pair, tiebreaks, results[(a, b)], inflight[(a, b)]
+                )
+                for idx in wanted:
+                    task = _game_task(a, b, idx, games_per_pair, time_per_move, clock_initial, clock_increment)
+                    inflight[(a, b)].add(idx)
+                    pending[pool.submit(_play_game_task, task, max_plies)] = task
+
+        schedule()
+        while pending:
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for fut in done:
+                task = pending.pop(fut)
+                _, res, meta, pattern_records = fut.result()
+                pair = (task.a, task.b)
+                inflight[pair].discard(task.game_index)
+                results[pair][task.game_index] = res
+
+                print_game_header(task.game_index, task.white, task.black)
+                print_game_result(res)
+                progress.increment()
+                standings[task.white].record(res, as_white=True)
+                standings[task.black].record(res, as_white=False)
+
+                if writer is not None:
+                    writer.log_game(
+                        a=task.a, b=task.b, white=task.white, black=task.black,
+                        game_index=task.game_index, result=res, tiebreak=task.tiebreak, meta=meta,
+                    )
+                    pts_a, pts_b = _series_points(task.a, task.b, games_per_pair, results[pair])
+                    writer.update_pair(
+                        task.a, task.b, [results[pair][i] for i in sorted(results[pair])], pts_a, pts_b
+                    )
+                if patterns_writer is not None:
+                    for record in pattern_records:
+                        patterns_writer.log_patterns(**record)
+                print_standings(standings)
+            schedule()
+
+    return standings
+
+
 def _find_latest_selfplay_elo_file(search_dir: Path) -> Optional[Path]:
     """Return the newest selfplay Elo JSON file in search_dir, if any.
 
@@ -1305,6 +1640,8 @@ def run_single_elimination(
 
 def main(argv: Optional[List[str]] = None) -> int:
     args = parse_args(argv)
+    global AGENT_ISOLATION
+    AGENT_ISOLATION = args.isolation
 
     all_known = set(get_agent_names())
     requested = [a.strip() for a in args.agents.split(",") if a.strip()]
@@ -1321,6 +1658,12 @@ def main(argv: Optional[List[str]] = None) -> int:
         print("Доступні:", ", ".join(sorted(all_known)))
         return 2
 
+    if args.import_profile:
+        from chess_ai.bot_agent import format_import_profile, import_profile
+
+        print(format_import_profile(import_profile(requested)))
+        return 0
+
     # Determine series length
     if args.games is not None:
         games_per_pair = int(args.games)
@@ -1353,49 +1696,72 @@ def main(argv: Optional[List[str]] = None) -> int:
     else:
         time_label = f"{args.time}s" if args.time and args.time > 0 else "без ліміту"
     tb_label = "ON" if args.tiebreaks == "on" else "OFF"
-    print(f"Формат: {fmt_label} | Без потоків | Макс. пліїв: {args.max_plies} | Ліміт на хід: {time_label} | Тай-брейки: {tb_label}")
+    workers_label = "Без потоків" if args.workers == 1 else f"Процесів: {args.workers or os.cpu_count()}"
+    print(f"Формат: {fmt_label} | {workers_label} | Макс. пліїв: {args.max_plies} | Ліміт на хід: {time_label} | Тай-брейки: {tb_label}")
 
     out_root = Path(ROOT) / args.out_root
-    writer = TournamentOutputWriter(out_root=out_root, tag=args.tag)
+    resume_dir = Path(args.resume) if args.resume else None
+    if resume_dir is not None and args.mode != "rr":
+        print("--resume підтримується лише для --mode rr")
+        return 2
+    writer = TournamentOutputWriter(out_root=out_root, tag=args.tag, resume_dir=resume_dir)
 
-    if args.mode == "rr":
-        writer.set_round_robin_metadata(
-            agents=requested,
-            format_label=fmt_label,
-            games_per_pair=games_per_pair,
-            tiebreaks=(args.tiebreaks == "on"),
-            max_plies=args.max_plies,
-            time_per_move=(None if clock_initial is not None else (args.time if args.time and args.time > 0 else None)),
-            clock_initial=clock_initial,
-            clock_increment=clock_increment,
-        )
-        standings = run_round_robin(
-            requested,
-            games_per_pair,
-            max_plies=args.max_plies,
-            time_per_move=(None if clock_initial is not None else (args.time if args.time and args.time > 0 else None)),
-            clock_initial=clock_initial,
-            clock_increment=clock_increment,
-            tiebreaks=(args.tiebreaks == "on"),
-            writer=writer,
-        )
-        print("\nФінальна таблиця:")
-        print_standings(standings)
-        writer.write_summary(standings)
-        return 0
-    else:
-        champion = run_single_elimination(
-            requested,
-            games_per_match=games_per_pair,
-            max_plies=args.max_plies,
-            time_per_move=(None if clock_initial is not None else (args.time if args.time and args.time > 0 else None)),
-            clock_initial=clock_initial,
-            clock_increment=clock_increment,
-            tiebreaks=(args.tiebreaks == "on"),
-            writer=writer,
-        )
-        print(f"Переможець турніру: {champion}")
-        return 0
+    shared_cache = None
+    if args.shared_eval_cache > 0:
+        from core.eval_cache import create_shared_eval_cache
+
+        shared_cache = create_shared_eval_cache(args.shared_eval_cache)
+    try:
+        if args.mode == "rr":
+            writer.set_round_robin_metadata(
+                agents=requested,
+                format_label=fmt_label,
+                games_per_pair=games_per_pair,
+                tiebreaks=(args.tiebreaks == "on"),
+                max_plies=args.max_plies,
+                time_per_move=(None if clock_initial is not None else (args.time if args.time and args.time > 0 else None)),
+                clock_initial=clock_initial,
+                clock_increment=clock_increment,
+            )
+            rr_kwargs = dict(
+                max_plies=args.max_plies,
+                time_per_move=(None if clock_initial is not None else (args.time if args.time and args.time > 0 else None)),
+                clock_initial=clock_initial,
+                clock_increment=clock_increment,
+                tiebreaks=(args.tiebreaks == "on"),
+                writer=writer,
+            )
+            if args.workers != 1 or resume_dir is not None:
+                standings = run_round_robin_parallel(requested, games_per_pair, workers=args.workers, **rr_kwargs)
+            else:
+                standings = run_round_robin(requested, games_per_pair, **rr_kwargs)
+            print("\nФінальна таблиця:")
+            print_standings(standings)
+            writer.write_summary(standings)
+            return 0
+        else:
+            champion = run_single_elimination(
+                requested,
+                games_per_match=games_per_pair,
+                max_plies=args.max_plies,
+                time_per_move=(None if clock_initial is not None else (args.time if args.time and args.time > 0 else None)),
+                clock_initial=clock_initial,
+                clock_increment=clock_increment,
+                tiebreaks=(args.tiebreaks == "on"),
+                writer=writer,
+            )
+            print(f"Переможець турніру: {champion}")
+            return 0
+    finally:
+        if shared_cache is not None:
+            from core.eval_cache import release_shared_eval_cache
+
+            st = shared_cache.stats()
+            print(
+                f"Кеш оцінок: {st['shared_hits']} влучань / {st['shared_misses']} промахів "
+                f"({st['shared_hit_rate']:.1%}), заповнення {st['fill']:.1%}"
+            )
+            release_shared_eval_cache(shared_cache)
 
 
 if __name__ == "__main__":
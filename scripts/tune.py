@@ -47,6 +47,8 @@ import chess  # noqa: F401
 
 from scripts.bench import run_ladder, run_suites  # type: ignore
 from chess_ai.bot_agent import get_agent_names  # type: ignore
+from core.eval_cache import DEFAULT_CACHE_SIZE, LocalEvalCache, set_eval_cache  # type: ignore
+from core.evaluator import reload_king_safety_env  # type: ignore
 
 
 def _set_seed(seed: int) -> None:
@@ -116,6 +118,8 @@ def _evaluate_objective(objective: str, agents: List[str], suites: List[Path], l
 def _apply_env(env_overrides: Dict[str, str]):
     for k, v in env_overrides.items():
         os.environ[str(k)] = str(v)
+    # Evaluator.king_safety reads its CHESS_KS_* tunables once.
+    reload_king_safety_env()
 
 
 def _strategy_grid(params: Dict[str, tuple], agents: List[str], suites: List[Path], limit: int, objective: str, seed: int):
@@ -253,6 +257,8 @@ def _parse_args() -> argparse.Namespace:
     p.add_argument("--limit", type=int, default=100)
     p.add_argument("--runs", default="output")
     p.add_argument("--seed", type=int, default=42)
+    p.add_argument("--eval-cache-size", type=int, default=DEFAULT_CACHE_SIZE,
+                   help="Evaluator cache entries (keys include the tuned parameters, so candidates never share scores)")
     return p.parse_args()
 
 
@@ -271,6 +277,9 @@ def main() -> int:
     params = {k: v for k, v in params_list}
     suites = [Path(s.strip()) for s in args.suites.split(",") if s.strip()]
 
+    cache = LocalEvalCache(args.eval_cache_size)
+    set_eval_cache(cache)
+
     center: Dict[str, str] = {}
     for c in args.center:
         k, v = c.split("=", 1)
@@ -294,6 +303,7 @@ def main() -> int:
         "agents": agents,
         "best_score": score,
         "best_env": env,
+        "eval_cache": cache.stats(),
     }
     out_path = Path(args.runs) / f"tune_{ts}.json"
     out_path.write_text(json.dumps(out, ensure_ascii=False, indent=2), encoding="utf-8")
@@ -302,6 +312,8 @@ def main() -> int:
     for k, v in sorted(env.items()):
         print(f"  {k}={v}")
     print(f"Score={score}")
+    st = cache.stats()
+    print(f"Eval cache: {st['hits']} hits / {st['misses']} misses ({st['hit_rate']:.1%})")
     return 0
 
 
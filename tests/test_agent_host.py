@@ -0,0 +1,98 @@
+import multiprocessing as mp
+import os
+import time
+
+import chess
+import pytest
+
+from chess_ai import bot_agent
+from chess_ai.agent_host import AgentHost
+
+
+class _CountingAgent:
+    """Plays the first legal move and remembers how often it was asked."""
+
+    def __init__(self):
+        self.calls = 0
+
+    def choose_move(self, board):
+        self.calls += 1
+        if self.calls == 3:
+            raise RuntimeError(f"called {self.calls} times")
+        return next(iter(board.legal_moves))
+
+
+class _SlowAgent:
+    def choose_move(self, board):
+        time.sleep(30)
+
+
+class _ForkingAgent:
+    """Starts a helper process per move, like Lazy-SMP or DynamicBot's pool."""
+
+    def __init__(self, pid_file, hang):
+        self.pid_file = pid_file
+        self.hang = hang
+
+    def choose_move(self, board):
+        helper = mp.get_context().Process(target=time.sleep, args=(60,))
+        helper.start()
+        self.pid_file.write_text(str(helper.pid))
+        if self.hang:
+            time.sleep(30)
+        return next(iter(board.legal_moves))
+
+
+def _running(pid):
+    try:
+        with open(f"/proc/{pid}/status") as fh:
+            return "\nState:\tZ" not in fh.read()
+    except FileNotFoundError:
+        return False
+
+
+@pytest.mark.skipif(not os.path.isdir("/proc"), reason="needs /proc")
+def test_host_agents_may_start_processes_that_die_with_the_host(monkeypatch, tmp_path):
+    pid_file = tmp_path / "helper.pid"
+    monkeypatch.setattr(bot_agent, "make_agent",
+                        lambda name, color: _ForkingAgent(pid_file, hang=name == "Hang"))
+    board = chess.Board()
+    with AgentHost("Fork", chess.WHITE) as host:
+        move, _, kind, error = host.choose_move(board, 10)
+        assert kind == "ok" and move in board.legal_moves, error
+    with AgentHost("Hang", chess.WHITE) as host:
+        _, _, kind, _ = host.choose_move(board, 1.0)
+        assert kind == "timeout"
+    helper = int(pid_file.read_text())
+    deadline = time.monotonic() + 5
+    while _running(helper) and time.monotonic() < deadline:
+        time.sleep(0.1)
+    assert not _running(helper)
+
+
+def test_host_keeps_agent_state_across_moves(monkeypatch):
+    monkeypatch.setattr(bot_agent, "make_agent", lambda name, color: _CountingAgent())
+    board = chess.Board()
+    with AgentHost("Counting", chess.WHITE) as host:
+        for _ in range(2):
+            move, _, kind, _ = host.choose_move(board, 10)
+            assert kind == "ok" and move in board.legal_moves
+            board.push(move)
+            board.push(next(iter(board.legal_moves)))
+        # Third call on the same agent instance raises inside the child.
+        move, _, kind, error = host.choose_move(board, 10)
+        assert move is None and kind == "agent_error" and "called 3 times" in error
+
+
+def test_host_is_killed_and_respawned_on_timeout(monkeypatch):
+    monkeypatch.setattr(bot_agent, "make_agent", lambda name, color: _SlowAgent())
+    board = chess.Board()
+    with AgentHost("Slow", chess.WHITE) as host:
+        start = time.monotonic()
+        move, elapsed, kind, _ = host.choose_move(board, 0.5)
+        assert move is None and kind == "timeout"
+        assert time.monotonic() - start < 5
+        assert host.restarts == 1
+        monkeypatch.setattr(bot_agent, "make_agent", lambda name, color: _CountingAgent())
+        move, _, kind, _ = host.choose_move(board, 10)
+        assert kind == "ok" and move in board.legal_moves
@@ -1,6 +1,7 @@
 import chess
 import math
 
+import numpy as np
 import pytest
 
 from chess_ai.batched_mcts import BatchedMCTS, Node, choose_move_one_shot
@@ -80,6 +81,35 @@ def test_search_batch_reuse_root_does_not_reexpand():
     assert net.calls - first_calls == math.ceil(n_simulations / batch_size)
 
 
+def test_reused_and_advanced_roots_get_fresh_dirichlet_noise():
+    mcts = BatchedMCTS(DummyNet())
+    root = Node(chess.Board())
+    tree = root.tree
+
+    def root_priors():
+        start, end = tree.child_range(0)
+        return tree.prior[start:end].copy(), tree.prior_raw[start:end].copy()
+
+    mcts.search_batch(root, n_simulations=16, batch_size=4, temperature=0.0)
+    first, clean = root_priors()
+    assert not np.allclose(first, clean) and first.sum() == pytest.approx(1.0)
+
+    mcts.search_batch(root, n_simulations=4, batch_size=4, temperature=0.0)
+    second, clean_again = root_priors()
+    assert np.allclose(clean_again, clean)
+    assert not np.allclose(second, first) and second.sum() == pytest.approx(1.0)
+
+    mcts.search_batch(root, n_simulations=4, batch_size=4, add_dirichlet=False, temperature=0.0)
+    assert np.allclose(*root_priors())
+
+    start, _ = tree.child_range(0)
+    move = tree.move(start)
+    root = mcts.advance(root, move)
+    mcts.search_batch(root, n_simulations=4, batch_size=4, temperature=0.0)
+    noisy, clean = root_priors()
+    assert not np.allclose(noisy, clean)
+
+
 def test_choose_move_one_shot_uses_policy():
     class PrefNet(DummyNet):
         def predict_many(self, boards):
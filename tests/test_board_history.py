@@ -0,0 +1,71 @@
+import chess
+
+from utils.board_history import BoardHistory
+
+
+def _replay_san(board):
+    temp = board.root()
+    out = []
+    for mv in board.move_stack:
+        out.append(temp.san(mv))
+        temp.push(mv)
+    return out
+
+
+def test_push_and_pop_keep_san_and_pgn_in_step():
+    history = BoardHistory()
+    for san in ["e4", "e5", "Nf3", "Nc6", "Bb5"]:
+        history.push(history.board.parse_san(san))
+
+    assert history.san_list == ["e4", "e5", "Nf3", "Nc6", "Bb5"]
+    assert history.san_text == "1. e4 e5 2. Nf3 Nc6 3. Bb5"
+    assert history.pgn().endswith("\n1. e4 e5 2. Nf3 Nc6 3. Bb5 *\n")
+
+    history.pop()
+    history.pop()
+    assert history.san_text == "1. e4 e5 2. Nf3"
+    assert len(history.board.move_stack) == 3
+
+
+def test_version_and_derived_cache():
+    history = BoardHistory()
+    calls = []
+
+    def build():
+        calls.append(history.version)
+        return len(list(history.board.legal_moves))
+
+    v0, tag0 = history.version, history.etag
+    assert history.derived("legal", build) == 20
+    assert history.derived("legal", build) == 20
+    assert calls == [v0]
+    assert history.etag == tag0
+
+    history.push(chess.Move.from_uci("d2d4"))
+    assert history.version == v0 + 1 and history.etag != tag0
+    history.derived("legal", build)
+    assert calls == [v0, v0 + 1]
+
+
+def test_sync_picks_up_external_changes():
+    board = chess.Board()
+    history = BoardHistory(board)
+    v = history.version
+
+    board.push_san("e4")
+    board.push_san("c5")
+    assert history.san_list == ["e4", "c5"]
+    assert history.version == v + 1
+
+    board.pop()
+    board.push_san("e5")
+    assert history.san_list == ["e4", "e5"]
+
+    fen = "r3k2r/8/8/8/8/8/8/R3K2R b KQkq - 0 20"
+    custom = chess.Board(fen)
+    history.set_board(custom)
+    custom.push_san("O-O")
+    custom.push_san("O-O-O")
+    assert history.san_list == _replay_san(custom) == ["O-O", "O-O-O"]
+    assert history.san_text == "20... O-O 21. O-O-O"
+    assert f'[FEN "{fen}"]' in history.pgn()
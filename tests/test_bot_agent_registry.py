@@ -0,0 +1,38 @@
+import subprocess
+import sys
+from pathlib import Path
+
+import chess
+
+from chess_ai import bot_agent
+
+ROOT = Path(__file__).resolve().parents[1]
+
+
+def test_import_does_not_load_bot_modules():
+    code = (
+        "import sys, chess_ai.bot_agent\n"
+        "heavy = ['chess_ai.hybrid_bot', 'chess_ai.enhanced_dynamic_bot', 'chess_ai.dynamic_bot',\n"
+        "         'chess_ai.piece_mate_bot', 'numpy', 'matplotlib', 'core.evaluator']\n"
+        "print(','.join(m for m in heavy if m in sys.modules))\n"
+    )
+    out = subprocess.run([sys.executable, "-c", code], cwd=ROOT, capture_output=True, text=True, check=True)
+    assert out.stdout.strip() == ""
+
+
+def test_every_registered_agent_is_constructed_lazily():
+    assert set(bot_agent.AGENT_REGISTRY) == set(bot_agent.get_agent_names())
+    assert bot_agent.AGENT_FACTORY_BY_EXPORT is bot_agent.AGENT_REGISTRY
+    board = chess.Board()
+    for name in ("RandomBot", "ChessBot", "FortifyBot", "BotAgentRandom"):
+        agent = bot_agent.make_agent(name, chess.WHITE)
+        assert agent.choose_move(board.copy()) in board.legal_moves
+    assert "RandomBot" in bot_agent.IMPORT_TIMES
+    # Module attribute access resolves the same lazily imported class.
+    from chess_ai.random_bot import RandomBot
+    assert bot_agent.RandomBot is RandomBot
+
+
+def test_unknown_name_falls_back_to_dynamic_bot():
+    agent = bot_agent.make_agent("NoSuchBot", chess.BLACK)
+    assert isinstance(agent.impl, bot_agent.DynamicBot)
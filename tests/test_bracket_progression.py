@@ -11,3 +11,29 @@ def test_round_robin_4_agents_progresses_and_populates_standings():
         assert s.played == 3
         # points should be in [0,3] with 0.5 increments
         assert 0.0 <= s.points <= 3.0
+
+
+def test_parallel_round_robin_streams_results_and_resumes(tmp_path):
+    agents = ["RandomBot", "FortifyBot", "AggressiveBot"]
+    writer = T.TournamentOutputWriter(out_root=tmp_path)
+    standings = T.run_round_robin_parallel(agents, 1, max_plies=2, writer=writer, workers=2)
+    assert all(s.played == 2 for s in standings.values())
+    assert len(writer.load_games()) == 3
+
+    # Resuming a finished tournament replays nothing.
+    resumed = T.TournamentOutputWriter(out_root=tmp_path, resume_dir=writer.outdir)
+    again = T.run_round_robin_parallel(agents, 1, max_plies=2, writer=resumed, workers=2)
+    assert {n: s.points for n, s in again.items()} == {n: s.points for n, s in standings.items()}
+    assert len(resumed.load_games()) == 3
+
+
+def test_series_scheduler_starts_independent_games_together():
+    # Bo3: the first two games start at once; the third only if still open.
+    assert T._series_next_games("a", "b", 3, False, {}, set()) == ([1, 2], False)
+    assert T._series_next_games("a", "b", 3, False, {1: "1-0", 2: "0-1"}, set()) == ([], True)
+    assert T._series_next_games("a", "b", 3, False, {1: "1-0", 2: "1/2-1/2"}, set()) == ([3], False)
+    # A tied series goes to two blitz games, then Armageddon.
+    drawn = {1: "1/2-1/2", 2: "1/2-1/2", 3: "1/2-1/2"}
+    assert T._series_next_games("a", "b", 3, True, drawn, set()) == ([4, 5], False)
+    drawn.update({4: "1/2-1/2", 5: "1/2-1/2"})
+    assert T._series_next_games("a", "b", 3, True, drawn, set()) == ([6], False)
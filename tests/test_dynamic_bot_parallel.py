@@ -0,0 +1,100 @@
+import time
+
+import chess
+
+from chess_ai.agent_pool import AgentPool
+from chess_ai.dynamic_bot import DynamicBot
+
+
+class _FixedAgent:
+    def __init__(self, uci, conf, delay=0.0):
+        self.uci = uci
+        self.conf = conf
+        self.delay = delay
+
+    def choose_move(self, board, context=None, evaluator=None, debug=False):
+        time.sleep(self.delay)
+        return chess.Move.from_uci(self.uci), self.conf
+
+
+def _bot(**kwargs):
+    bot = DynamicBot(
+        chess.WHITE,
+        enable_diversity=False,
+        enable_bandit=False,
+        enable_move_tracking=False,
+        **kwargs,
+    )
+    bot.agents = []
+    return bot
+
+
+def test_parallel_agents_vote_and_late_agent_is_dropped():
+    bot = _bot(parallel_agents=2, agent_timeout_s=5.0, agent_timeouts={"slow": 0.3})
+    bot.register_agent(_FixedAgent("e2e4", 1.0), "fast", weight=1.0)
+    bot.register_agent(_FixedAgent("d2d4", 10.0, delay=3.0), "slow", weight=1.0)
+    try:
+        start = time.monotonic()
+        move, _ = bot.choose_move(chess.Board())
+        elapsed = time.monotonic() - start
+    finally:
+        bot.close()
+    assert move == chess.Move.from_uci("e2e4")
+    assert elapsed < 2.5
+    assert set(bot.agent_latency_ms) == {"fast", "slow"}
+
+
+def test_pool_deadlines_run_from_task_start_and_late_workers_are_replaced():
+    agents = [(_FixedAgent(uci, 1.0, delay=0.6), name)
+              for uci, name in [("e2e4", "a"), ("d2d4", "b"), ("c2c4", "c")]]
+    agents.append((_FixedAgent("g1f3", 1.0, delay=60.0), "stuck"))
+    with AgentPool(agents) as pool:
+        assert pool.workers == 4
+        stuck_pid = pool._workers[3].proc.pid
+        results = pool.run(chess.Board(), timeouts={"stuck": 0.3}, default_timeout=1.5)
+        # Nothing queues behind another agent, so 3 x 0.6 s all fit in 1.5 s.
+        assert all(results[n].move is not None for n in "abc")
+        assert results["stuck"].late and pool.restarts == 1
+        assert pool._workers[3].proc.pid != stuck_pid
+
+        start = time.monotonic()
+        results = pool.run(chess.Board(), timeouts={"stuck": 0.3}, default_timeout=1.5)
+        assert time.monotonic() - start < 1.5
+        assert results["a"].move == chess.Move.from_uci("e2e4")
+
+
+def test_pool_size_follows_parallel_agents_and_groups_share_a_worker():
+    agents = [(_FixedAgent("e2e4", 1.0, delay=0.2), "a"),
+              (_FixedAgent("d2d4", 1.0, delay=60.0), "stuck"),
+              (_FixedAgent("c2c4", 1.0), "b"),
+              (_FixedAgent("g1f3", 1.0), "after_stuck")]
+    with AgentPool(agents, workers=2) as pool:
+        assert pool.workers == 2
+        assert [w.names for w in pool._workers] == [["a", "b"], ["stuck", "after_stuck"]]
+        start = time.monotonic()
+        results = pool.run(chess.Board(), timeouts={"stuck": 0.3}, default_timeout=1.0)
+        assert time.monotonic() - start < 2.0
+        assert results["stuck"].late and pool.restarts == 1
+        # The replacement worker carries on with the agent queued behind.
+        assert results["after_stuck"].move == chess.Move.from_uci("g1f3")
+        assert results["a"].move == chess.Move.from_uci("e2e4")
+        assert results["b"].move == chess.Move.from_uci("c2c4")
+
+    bot = _bot(parallel_agents=2)
+    for uci, name in [("e2e4", "x"), ("d2d4", "y"), ("c2c4", "z")]:
+        bot.register_agent(_FixedAgent(uci, 1.0), name, weight=1.0)
+    try:
+        bot.choose_move(chess.Board())
+        assert bot._agent_pool.workers == 2
+        assert set(bot.agent_latency_ms) == {"x", "y", "z"}
+    finally:
+        bot.close()
+
+
+def test_sequential_mode_records_latency():
+    bot = _bot(parallel_agents=0)
+    bot.register_agent(_FixedAgent("e2e4", 1.0), "fast", weight=1.0)
+    bot.register_agent(_FixedAgent("d2d4", 2.0), "other", weight=1.0)
+    move, _ = bot.choose_move(chess.Board())
+    assert move == chess.Move.from_uci("d2d4")
+    assert set(bot.agent_latency_ms) == {"fast", "other"}
@@ -0,0 +1,117 @@
+import multiprocessing as mp
+import os
+import subprocess
+import sys
+
+import chess
+import pytest
+
+from core import eval_cache, evaluator, pst_trainer
+from core.evaluator import Evaluator
+
+FEN = "r1bqk2r/pppp1ppp/2n2n2/2b1p3/2B1P3/3P1N2/PPP2PPP/RNBQK2R w KQkq - 0 5"
+
+
+@pytest.fixture
+def local_cache():
+    cache = eval_cache.LocalEvalCache(128)
+    previous = eval_cache.set_eval_cache(cache)
+    yield cache
+    eval_cache.set_eval_cache(previous)
+
+
+def test_tuning_changes_never_return_stale_scores(local_cache, monkeypatch):
+    board = chess.Board(FEN)
+    ev = Evaluator(board)
+    base = ev.evaluate()
+    assert ev.evaluate() == base
+    assert (local_cache.hits, local_cache.misses) == (1, 1)
+
+    ev.phase_weights = {phase: {**w, "king_safety": 40} for phase, w in ev.phase_weights.items()}
+    assert ev.evaluate() == ev.evaluate(use_cache=False)
+
+    with monkeypatch.context() as m:
+        m.setenv("CHESS_KS_MISSING_PAWN_PENALTY", "50")
+        assert evaluator.reload_king_safety_env()
+        try:
+            assert ev.evaluate() == ev.evaluate(use_cache=False)
+        finally:
+            m.delenv("CHESS_KS_MISSING_PAWN_PENALTY")
+            evaluator.reload_king_safety_env()
+
+    monkeypatch.setenv("CHESS_EVAL_PASSED_BONUS", "90")
+    assert Evaluator(board).evaluate() == Evaluator(board).evaluate(use_cache=False)
+    assert local_cache.misses == 4
+
+    stats = Evaluator.cache_stats()
+    assert stats["backend"] == "local" and stats["hits"] == 1 and stats["entries"] == 4
+
+
+def test_fingerprint_is_memoised_until_an_input_changes(monkeypatch):
+    ev = Evaluator(chess.Board(FEN))
+    calls = []
+    real = eval_cache.fingerprint
+    monkeypatch.setattr(eval_cache, "fingerprint", lambda params: calls.append(params) or real(params))
+    fp = ev.parameter_fingerprint()
+    assert ev.parameter_fingerprint() == fp and len(calls) == 1
+
+    with pytest.raises(TypeError):
+        ev.phase_weights["opening"]["pst"] = 1  # read-only: would bypass the version
+    ev.passed_bonus += 1
+    assert ev.parameter_fingerprint() != fp and len(calls) == 2
+    ev.passed_bonus -= 1
+    monkeypatch.setattr(pst_trainer, "PST_REVISION", pst_trainer.PST_REVISION + 1)
+    assert ev.parameter_fingerprint() == fp and len(calls) == 3
+
+
+def test_fallback_keys_do_not_depend_on_hash_seed():
+    code = ("from core.eval_cache import _coerce_key; "
+            "print(_coerce_key('8/8/8/8/8/8/8/K6k w'), _coerce_key(('a', 1, None)))")
+    outputs = {
+        subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True,
+                       cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__))), env={**os.environ, "PYTHONHASHSEED": seed}).stdout
+        for seed in ("1", "2")
+    }
+    assert len(outputs) == 1
+
+
+def test_local_cache_is_bounded_lru():
+    cache = eval_cache.LocalEvalCache(2)
+    cache.put(1, 10)
+    cache.put(2, 20)
+    assert cache.get(1) == 10
+    cache.put(3, 30)
+    assert cache.get(2) is None and cache.get(1) == 10 and len(cache) == 2
+
+
+def _child_evaluate(fen, results):
+    # Attaches through CHESS_EVAL_CACHE_SHM like a tournament worker.
+    eval_cache.set_eval_cache(None)
+    score = Evaluator(chess.Board(fen)).evaluate()
+    cache = eval_cache.get_eval_cache()
+    results.put((cache.backend, cache.hits, score))
+    cache.close()
+
+
+def test_shared_cache_serves_hits_across_processes(local_cache):
+    shared = eval_cache.create_shared_eval_cache(1024)
+    try:
+        assert eval_cache.get_eval_cache() is shared
+        score = Evaluator(chess.Board(FEN)).evaluate()
+        results = mp.get_context().Queue()
+        proc = mp.get_context().Process(target=_child_evaluate, args=(FEN, results))
+        proc.start()
+        backend, hits, child_score = results.get(timeout=30)
+        proc.join(timeout=30)
+        assert (backend, hits, child_score) == ("shared", 1, score)
+        stats = shared.stats()
+        assert stats["shared_hits"] == 1 and stats["shared_misses"] == 1
+
+        # A torn or foreign slot fails verification instead of returning junk.
+        key = next(k for k in range(1, 10**6) if k % shared.entries == 5)
+        shared.put(key, 123)
+        shared._values[5] = 124
+        assert shared.get(key) is None
+    finally:
+        eval_cache.release_shared_eval_cache(shared)
+    assert eval_cache.SHM_ENV not in os.environ
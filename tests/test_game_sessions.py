@@ -0,0 +1,98 @@
+import threading
+import time
+
+from utils.game_sessions import DEFAULT_SESSION, SessionRegistry
+
+
+class _Manager:
+    def __init__(self):
+        self.moves = []
+
+
+def _wait(job, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while job.status in ("pending", "running"):
+        assert time.monotonic() < deadline, "job did not finish"
+        time.sleep(0.01)
+    return job
+
+
+def test_sessions_are_isolated_and_default_is_shared():
+    reg = SessionRegistry(_Manager, workers=2)
+    try:
+        assert reg.get() is reg.get(DEFAULT_SESSION)
+        a, b = reg.create(), reg.create()
+        assert a.id != b.id and a.manager is not b.manager
+        assert reg.get(a.id) is a
+        assert reg.drop(a.id) and not reg.drop(a.id)
+        assert a.id not in reg and b.id in reg
+    finally:
+        reg.close()
+
+
+def test_jobs_run_in_parallel_across_sessions_and_serialise_within_one():
+    reg = SessionRegistry(_Manager, workers=4)
+    gate = threading.Event()
+    try:
+        s1, s2 = reg.create(), reg.create()
+
+        def slow(gm):
+            gate.wait(5.0)
+            gm.moves.append("slow")
+            return {"n": len(gm.moves)}, 200
+
+        def fast(gm):
+            gm.moves.append("fast")
+            return {"n": len(gm.moves)}, 200
+
+        j1 = reg.submit(s1, slow)
+        j2 = reg.submit(s1, fast)  # same session: waits for j1
+        j3 = reg.submit(s2, fast)  # other session: not blocked
+        assert _wait(j3).result == {"n": 1}
+        assert j2.status in ("pending", "running")
+
+        gate.set()
+        _wait(j1), _wait(j2)
+        assert s1.manager.moves == ["slow", "fast"]
+        assert j2.to_dict()["result"] == {"n": 2}
+        assert reg.job(j2.id) is j2
+    finally:
+        reg.close()
+
+
+def test_failed_job_reports_error():
+    reg = SessionRegistry(_Manager, workers=1)
+    try:
+        def boom(gm):
+            raise ValueError("no legal moves")
+
+        job = _wait(reg.submit(reg.get(), boom))
+        assert job.to_dict() == {
+            "job_id": job.id,
+            "session": DEFAULT_SESSION,
+            "status": "error",
+            "error": "no legal moves",
+        }
+    finally:
+        reg.close()
+
+
+def test_idle_sessions_are_evicted():
+    reg = SessionRegistry(_Manager, ttl_s=0.05, max_sessions=3, workers=1)
+    try:
+        old = reg.create()
+        reg.get()
+        time.sleep(0.1)
+        fresh = reg.create()  # creating a session also sweeps idle ones
+        reg.evict_idle()
+        assert old.id not in reg
+        assert fresh.id in reg and DEFAULT_SESSION in reg
+
+        # Over the cap the least recently used idle session goes first.
+        reg.ttl_s = 60
+        second = reg.create()
+        third = reg.create()
+        assert len(reg) == 3
+        assert fresh.id not in reg and second.id in reg and third.id in reg
+    finally:
+        reg.close()
@@ -0,0 +1,80 @@
+import random
+
+import chess
+
+from chess_ai.chess_bot import calculate_king_value
+from chess_ai.hybrid_bot.evaluation import PIECE_VALUES, IncrementalEvaluator, evaluate_position
+from chess_ai.hybrid_bot.mcts import BatchMCTS
+
+
+def _fresh_score(board):
+    """Reference score built from the board alone, not from the evaluator."""
+    score = 0
+    for piece in board.piece_map().values():
+        value = PIECE_VALUES[piece.piece_type]
+        score += value if piece.color == chess.WHITE else -value
+    score += calculate_king_value(board, chess.WHITE) - calculate_king_value(board, chess.BLACK)
+    return float(score if board.turn == chess.WHITE else -score)
+
+
+def test_push_pop_matches_full_evaluation_on_random_games():
+    rng = random.Random(7)
+    for _ in range(20):
+        board = chess.Board()
+        ev = IncrementalEvaluator(board)
+        for _ in range(120):
+            moves = list(board.legal_moves)
+            if not moves:
+                break
+            ev.push(board, rng.choice(moves))
+            assert ev.evaluate(board) == _fresh_score(board)
+        while board.move_stack:
+            ev.pop(board)
+            assert ev.evaluate(board) == _fresh_score(board)
+
+
+def test_special_moves_update_material():
+    # En passant capture
+    board = chess.Board("4k3/8/8/3pP3/8/8/8/4K3 w - d6 0 1")
+    ev = IncrementalEvaluator(board)
+    ev.push(board, chess.Move.from_uci("e5d6"))
+    assert ev.counts[chess.BLACK][chess.PAWN] == 0
+    assert ev.evaluate(board) == _fresh_score(board)
+
+    # Capture with promotion
+    board = chess.Board("1r2k3/P7/8/8/8/8/8/4K3 w - - 0 1")
+    ev = IncrementalEvaluator(board)
+    ev.push(board, chess.Move.from_uci("a7b8q"))
+    assert ev.counts[chess.WHITE][chess.QUEEN] == 1
+    assert ev.counts[chess.WHITE][chess.PAWN] == 0
+    assert ev.counts[chess.BLACK][chess.ROOK] == 0
+    assert ev.evaluate(board) == _fresh_score(board)
+
+    # Castling and null moves leave material untouched
+    board = chess.Board("r3k2r/8/8/8/8/8/8/R3K2R w KQkq - 0 1")
+    ev = IncrementalEvaluator(board)
+    before = ev.material
+    ev.push(board, chess.Move.from_uci("e1g1"))
+    ev.push(board, chess.Move.null())
+    assert ev.material == before
+    ev.pop(board)
+    ev.pop(board)
+    assert board.fen() == chess.Board("r3k2r/8/8/8/8/8/8/R3K2R w KQkq - 0 1").fen()
+
+
+def test_evaluate_position_uses_same_terms():
+    board = chess.Board("r1bqkb1r/pppp1ppp/2n2n2/4p3/2B1P3/5N2/PPPP1PPP/RNBQK2R w KQkq - 4 4")
+    assert evaluate_position(board) == _fresh_score(board)
+
+
+def test_mcts_accepts_batch_evaluator():
+    calls = []
+
+    def evaluate_fn(boards):
+        calls.append(len(boards))
+        return [0.0 for _ in boards]
+
+    board = chess.Board()
+    move, _ = BatchMCTS(evaluate_fn=evaluate_fn).search(board, n_simulations=6, batch_size=3)
+    assert move in board.legal_moves
+    assert calls == [3, 3]
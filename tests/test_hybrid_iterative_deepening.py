@@ -0,0 +1,49 @@
+import time
+
+import chess
+
+from chess_ai.hybrid_bot import alpha_beta
+from chess_ai.utils.profile_stats import STATS
+
+
+def test_completes_all_iterations_without_deadline():
+    board = chess.Board()
+    _, move = alpha_beta.search(board, 3)
+    assert move in board.legal_moves
+    assert STATS.depth_reached == 3
+
+
+def test_expired_deadline_still_returns_legal_move():
+    board = chess.Board()
+    _, move = alpha_beta.search(board, 4, deadline=time.monotonic() - 1)
+    assert move in board.legal_moves
+    assert STATS.depth_reached == 0
+
+
+def test_discards_interrupted_iteration(monkeypatch):
+    board = chess.Board("4k3/8/8/3q4/8/8/3R4/4K3 w - - 0 1")
+    calls = {"n": 0}
+    real_search_root = alpha_beta._search_root
+
+    def fake_search_root(b, moves, depth, alpha, beta, deadline, ev=None):
+        calls["n"] += 1
+        if depth == 3:
+            # Simulate the deadline hitting half-way with a bogus best move.
+            return 10_000, chess.Move.from_uci("e1f1"), False
+        return real_search_root(b, moves, depth, alpha, beta, deadline, ev)
+
+    monkeypatch.setattr(alpha_beta, "_search_root", fake_search_root)
+    _, move = alpha_beta.search(board, 4)
+    assert move == chess.Move.from_uci("d2d5")
+    assert STATS.depth_reached == 2
+
+
+def test_aspiration_window_result_matches_full_window(monkeypatch):
+    board = chess.Board("r1bqkbnr/pppp1ppp/2n5/4p3/3P4/5N2/PPP1PPPP/RNBQKB1R w KQkq - 0 3")
+    alpha_beta.clear_tt()
+    with_window = alpha_beta.search(board, 3)
+
+    monkeypatch.setattr(alpha_beta, "ASPIRATION_MIN_DEPTH", 99)
+    alpha_beta.clear_tt()
+    full_window = alpha_beta.search(board, 3)
+    assert with_window[0] == full_window[0]
@@ -0,0 +1,23 @@
+import chess
+
+from chess_ai.hybrid_bot.lazy_smp import LazySMPPool
+from chess_ai.utils.profile_stats import STATS
+
+
+def test_lazy_smp_pool_returns_legal_move_and_reports_workers():
+    board = chess.Board()
+    board.push_san("e4")
+    with LazySMPPool(2, tt_mb=1) as pool:
+        _, move = pool.search(board, 2)
+        assert move in board.legal_moves
+        assert len(STATS.worker_nodes) == 2
+        assert all(n > 0 for n in STATS.worker_nodes)
+        assert STATS.nodes == sum(STATS.worker_nodes)
+        assert STATS.depth_reached >= 2
+
+        # Workers wrote into the shared table that the parent can see.
+        assert any(pool.tt._keys[i] for i in range(pool.tt.n_slots))
+
+        board.push(move)
+        _, reply = pool.search(board, 2)
+        assert reply in board.legal_moves
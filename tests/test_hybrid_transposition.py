@@ -0,0 +1,90 @@
+import os
+import subprocess
+import sys
+
+import chess
+
+from chess_ai.hybrid_bot import alpha_beta
+from chess_ai.hybrid_bot.transposition import (
+    EXACT,
+    LOWERBOUND,
+    TranspositionTable,
+    decode_move,
+    encode_move,
+    position_key,
+)
+from chess_ai.utils.profile_stats import STATS
+
+
+def test_move_codes_round_trip():
+    for uci in ("e2e4", "a7a8q", "h2h1n", "e1g1"):
+        move = chess.Move.from_uci(uci)
+        assert decode_move(encode_move(move)) == move
+    assert encode_move(None) == 0
+    assert decode_move(0) is None
+
+
+def test_position_key_is_stable_and_nonzero():
+    a = chess.Board()
+    b = chess.Board()
+    assert position_key(a) == position_key(b)
+    assert position_key(a) != 0
+    b.push_san("e4")
+    assert position_key(a) != position_key(b)
+
+
+def test_position_key_does_not_depend_on_hash_seed():
+    # Lazy-SMP helpers share the table, so a FEN-style key must hash alike everywhere.
+    code = ("import chess; from chess_ai.hybrid_bot.transposition import position_key; "
+            "Board = type('Board', (chess.Board,), {'transposition_key': lambda self: self.fen()}); "
+            "print(position_key(Board()))")
+    outputs = {
+        subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True,
+                       cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                       env={**os.environ, "PYTHONHASHSEED": seed}).stdout
+        for seed in ("1", "2")
+    }
+    assert len(outputs) == 1
+
+
+def test_depth_preferred_slot_survives_shallow_stores():
+    tt = TranspositionTable(n_buckets=1)
+    move = chess.Move.from_uci("g1f3")
+    tt.store(11, 6, EXACT, 42.0, move)
+    # Two shallower positions hitting the same bucket only use slot 1.
+    assert tt.store(22, 1, LOWERBOUND, 1.0, None) is False
+    assert tt.store(33, 1, LOWERBOUND, 2.0, None) is True
+    assert tt.probe(11) == (6, EXACT, 42.0, move)
+    assert tt.probe(22) is None
+    assert tt.probe(33)[2] == 2.0
+    assert tt.collisions == 1
+    assert tt.fill() == 1.0
+
+
+def test_stale_entries_are_replaced_after_new_search():
+    tt = TranspositionTable(n_buckets=1)
+    tt.store(11, 6, EXACT, 42.0, None)
+    tt.new_search()
+    tt.store(22, 1, EXACT, 1.0, None)
+    assert tt.probe(22) is not None
+    assert tt.probe(11) is None
+
+
+def test_table_size_is_fixed_and_persists_across_searches():
+    tt = alpha_beta.configure_tt(1)
+    size = tt.size_bytes
+    assert size <= 1024 * 1024
+
+    board = chess.Board()
+    alpha_beta.search(board, 2)
+    used_after_first = tt.used
+    assert used_after_first > 0
+    board.push_san("e4")
+    alpha_beta.search(board, 2)
+
+    assert tt.size_bytes == size
+    assert tt.used >= used_after_first
+    assert STATS.tt_probes > 0
+    assert 0.0 < STATS.tt_fill <= 1.0
+    alpha_beta.clear_tt()
+    assert tt.used == 0
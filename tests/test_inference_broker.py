@@ -0,0 +1,109 @@
+import threading
+from multiprocessing import AuthenticationError
+
+import chess
+import pytest
+
+from chess_ai.batched_mcts import BatchedMCTS, Node
+from chess_ai.inference_broker import InferenceBroker, RemoteNet
+
+
+class CountingNet:
+    def __init__(self):
+        self.batch_sizes = []
+
+    def predict_many(self, boards):
+        self.batch_sizes.append(len(boards))
+        return [({m: 1.0 for m in b.legal_moves}, float(len(b.move_stack))) for b in boards]
+
+
+def _boards(n):
+    boards = []
+    for i in range(n):
+        b = chess.Board()
+        for move in list(b.legal_moves)[: i % 3]:
+            b.push(move)
+            break
+        boards.append(b)
+    return boards
+
+
+def test_concurrent_requests_are_coalesced_and_returned_in_order():
+    net = CountingNet()
+    results = {}
+    with InferenceBroker(net, max_batch=64, max_latency_ms=200) as broker:
+        barrier = threading.Barrier(8)
+
+        def worker(i):
+            boards = _boards(4)
+            barrier.wait()
+            results[i] = (boards, broker.predict_many(boards))
+
+        threads = [threading.Thread(target=worker, args=(i,)) for i in range(8)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+
+    assert sum(net.batch_sizes) == 32
+    assert len(net.batch_sizes) < 8
+    for boards, preds in results.values():
+        assert [v for _, v in preds] == [float(len(b.move_stack)) for b in boards]
+
+
+def test_flushes_partial_batch_after_latency():
+    net = CountingNet()
+    with InferenceBroker(net, max_batch=1000, max_latency_ms=1) as broker:
+        fut = broker.submit(_boards(2))
+        assert len(fut.result(timeout=5)) == 2
+    assert net.batch_sizes == [2]
+
+
+def test_cancelled_requests_are_skipped_and_worker_survives():
+    net = CountingNet()
+    with InferenceBroker(net, max_batch=1000, max_latency_ms=100) as broker:
+        cancelled = broker.submit(_boards(3))
+        kept = broker.submit(_boards(2))
+        assert cancelled.cancel()
+        assert len(kept.result(timeout=5)) == 2
+        assert cancelled.cancelled()
+
+        # A batch of only cancelled requests is dropped and later ones still run.
+        alone = broker.submit(_boards(4))
+        assert alone.cancel()
+        assert len(broker.predict_many(_boards(1))) == 1
+    assert net.batch_sizes == [2, 1]
+
+
+def test_errors_reach_every_caller():
+    class Broken:
+        def predict_many(self, boards):
+            raise ValueError("bad weights")
+
+    with InferenceBroker(Broken(), max_latency_ms=1) as broker:
+        with pytest.raises(ValueError):
+            broker.predict_many(_boards(1))
+
+
+def test_remote_client_and_mcts_share_broker():
+    net = CountingNet()
+    with InferenceBroker(net, max_latency_ms=1) as broker:
+        address, authkey = broker.serve()
+        client = RemoteNet(address, authkey=authkey)
+        try:
+            policy, value = client.predict_many([chess.Board()])[0]
+            assert len(policy) == 20 and value == 0.0
+            move, _ = BatchedMCTS(client).search_batch(Node(chess.Board()), n_simulations=8, batch_size=4)
+            assert move in chess.Board().legal_moves
+        finally:
+            client.close()
+
+
+def test_serve_refuses_clients_without_the_key():
+    with InferenceBroker(CountingNet(), max_latency_ms=1) as broker:
+        with pytest.raises(ValueError):
+            broker.serve(authkey=b"")
+        address, authkey = broker.serve(authkey=b"secret")
+        assert authkey == b"secret"
+        with pytest.raises(AuthenticationError):
+            RemoteNet(address, authkey=b"wrong")
@@ -0,0 +1,126 @@
+import chess
+
+from chess_ai.batched_mcts import BatchedMCTS, Node
+from chess_ai.hybrid_bot.mcts import BatchMCTS
+from chess_ai.mcts_tree import MCTSTree
+
+
+class UniformNet:
+    def predict_many(self, boards):
+        out = []
+        for b in boards:
+            legal = list(b.legal_moves)
+            out.append(({m: 1.0 / len(legal) for m in legal} if legal else {}, 0.1))
+        return out
+
+
+def test_children_are_contiguous_and_boards_are_replayed():
+    board = chess.Board()
+    tree = MCTSTree(board, capacity=4)
+    moves = list(board.legal_moves)
+    start = tree.expand(0, moves, [1.0 / len(moves)] * len(moves))
+    assert tree.child_range(0) == (start, start + len(moves))
+    assert [m for m, _ in tree.children(0)] == moves
+
+    e4 = start + moves.index(chess.Move.from_uci("e2e4"))
+    replies = list(tree.board_at(e4).legal_moves)
+    tree.expand(e4, replies, [0.05] * len(replies))
+    leaf = tree.child_range(e4)[0]
+    expected = board.copy()
+    expected.push_san("e4")
+    expected.push(replies[0])
+    assert tree.board_at(leaf).fen() == expected.fen()
+    assert tree.capacity >= tree.size
+
+
+def test_select_child_matches_puct_formula():
+    tree = MCTSTree(chess.Board())
+    moves = list(tree.board.legal_moves)[:3]
+    start = tree.expand(0, moves, [0.2, 0.5, 0.3])
+    tree.visits[0] = 10
+    tree.visits[start:start + 3] = [5, 1, 0]
+    tree.value_sum[start:start + 3] = [4.0, -0.5, 0.0]
+    best = tree.select_child(0, 1.4)
+    # child 0: 0.8 + 1.4*0.2*sqrt(10)/6, child 1: -0.5 + 1.4*0.5*sqrt(10)/2,
+    # child 2: 0 + 1.4*0.3*sqrt(10)/1 -> child 2 wins
+    assert best == start + 2
+
+
+def test_reroot_keeps_played_subtree_statistics():
+    board = chess.Board()
+    mcts = BatchedMCTS(UniformNet())
+    root = Node(board)
+    mcts.search_batch(root, n_simulations=60, batch_size=4, add_dirichlet=False, temperature=0.0)
+    e4 = chess.Move.from_uci("e2e4")
+    child = root.children[e4]
+    child_visits, child_moves = child.n, set(child.children)
+    size_before = root.tree.size
+
+    new_root = mcts.advance(root, e4)
+    assert new_root.n == child_visits
+    assert set(new_root.children) == child_moves
+    assert new_root.board.fen() == chess.Board("rnbqkbnr/pppppppp/8/8/4P3/8/PPPP1PPP/RNBQKBNR b KQkq - 0 1").fen()
+    assert root.tree.size < size_before
+    assert all(c.parent.idx == 0 for c in new_root.children.values())
+
+
+def test_advance_resets_on_unrelated_position():
+    tree = MCTSTree(chess.Board())
+    tree.expand(0, list(tree.board.legal_moves), [0.05] * 20)
+    other = chess.Board("8/8/8/8/8/8/8/K6k w - - 0 1")
+    assert tree.advance(other) is False
+    assert tree.size == 1
+    assert tree.board.fen() == other.fen()
+
+
+def test_hybrid_mcts_reuses_tree_between_moves():
+    board = chess.Board()
+    mcts = BatchMCTS()
+    move, root = mcts.search(board, n_simulations=40, temperature=0.0)
+    reply = chess.Move.from_uci("e7e5") if move != chess.Move.from_uci("e7e5") else chess.Move.from_uci("d7d5")
+    visits_after_move = root.children[move].children
+    board.push(move)
+    board.push(reply)
+    kept = visits_after_move[reply].n if reply in visits_after_move else 0
+
+    _, new_root = mcts.search(board, n_simulations=10, temperature=0.0)
+    assert new_root.n == kept + 10
+
+
+def test_virtual_loss_spreads_a_batch_over_distinct_children():
+    board = chess.Board()
+    net = UniformNet()
+    root = Node(board)
+    BatchedMCTS(net).search_batch(root, n_simulations=1, batch_size=1, add_dirichlet=False)
+    tree = root.tree
+    before = tree.visits[slice(*tree.child_range(0))].copy()
+
+    BatchedMCTS(net).search_batch(root, n_simulations=8, batch_size=8, add_dirichlet=False)
+    after = tree.visits[slice(*tree.child_range(0))]
+    assert int(((after - before) > 0).sum()) == 8
+    assert not tree.pending[: tree.size].any()
+
+
+def test_backup_alternates_sign_from_the_leaf():
+    tree = MCTSTree(chess.Board())
+    start = tree.expand(0, list(tree.board.legal_moves)[:1], [1.0])
+    tree.expand(start, list(tree.board_at(start).legal_moves)[:1], [1.0])
+    leaf = tree.child_range(start)[0]
+    tree.backup([0, start, leaf], 0.5)
+    assert list(tree.value_sum[[0, start, leaf]]) == [0.5, -0.5, 0.5]
+    assert list(tree.visits[[0, start, leaf]]) == [1, 1, 1]
+
+
+def test_root_noise_is_remixed_from_clean_priors():
+    board = chess.Board()
+    mcts = BatchMCTS()
+    for _ in range(3):
+        mcts.search(board, n_simulations=4, epsilon=0.5)
+    tree = mcts._tree
+    start, end = tree.child_range(0)
+    uniform = 1 / (end - start)
+    assert (tree.prior_raw[start:end] == uniform).all()
+    assert (tree.prior[start:end] >= 0.5 * uniform - 1e-12).all()
+
+    mcts.search(board, n_simulations=4, epsilon=0.0)
+    assert (tree.prior[start:end] == tree.prior_raw[start:end]).all()
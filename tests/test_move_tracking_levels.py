@@ -0,0 +1,59 @@
+import chess
+
+from chess_ai import dynamic_bot
+from chess_ai.dynamic_bot import DynamicBot
+from core.move_object import MoveEvaluationManager, TrackingLevel, move_evaluation_manager
+
+
+class _FixedAgent:
+    def choose_move(self, board, context=None, evaluator=None, debug=False):
+        return chess.Move.from_uci("e2e4"), 1.0
+
+
+def _bot(**kwargs):
+    bot = DynamicBot(chess.WHITE, enable_diversity=False, enable_bandit=False, **kwargs)
+    bot.agents = []
+    bot.register_agent(_FixedAgent(), "fixed", weight=1.0)
+    return bot
+
+
+def test_manager_history_is_bounded():
+    manager = MoveEvaluationManager(max_history=3)
+    board = chess.Board()
+    for _ in range(10):
+        manager.create_move_evaluation(chess.Move.from_uci("e2e4"), board, "Bot")
+        manager.finalize_current_move()
+    assert len(manager.move_history) == 3
+    assert manager.evaluation_stats["total_moves"] == 10
+
+
+def test_counters_level_builds_no_move_object():
+    bot = _bot(tracking_level="counters")
+    before = len(move_evaluation_manager.move_history)
+    total = move_evaluation_manager.evaluation_stats.get("total_moves", 0)
+    bot.choose_move(chess.Board())
+    assert bot.current_move_object is None
+    assert len(move_evaluation_manager.move_history) == before
+    assert move_evaluation_manager.evaluation_stats["total_moves"] == total + 1
+
+
+def test_automatic_level_follows_attached_viewer():
+    bot = _bot()
+    assert bot.tracking_level is None
+    assert not bot.enable_move_tracking
+    move_evaluation_manager.attach_viewer()
+    try:
+        assert bot.enable_move_tracking
+        bot.choose_move(chess.Board())
+        assert bot.current_move_object is not None
+    finally:
+        move_evaluation_manager.detach_viewer()
+    assert _bot(enable_move_tracking=False).tracking_level is TrackingLevel.OFF
+
+
+def test_unknown_env_tracking_level_falls_back_to_counters(monkeypatch, caplog):
+    monkeypatch.setenv("CHESS_MOVE_TRACKING", "ful")
+    assert dynamic_bot._env_tracking_level() is TrackingLevel.COUNTERS
+    assert "CHESS_MOVE_TRACKING" in caplog.text
+    monkeypatch.setenv("CHESS_MOVE_TRACKING", " Full ")
+    assert dynamic_bot._env_tracking_level() is TrackingLevel.FULL
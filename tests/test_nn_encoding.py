@@ -0,0 +1,66 @@
+import random
+import threading
+
+import chess
+import pytest
+
+torch = pytest.importorskip("torch")
+pytest.importorskip("torch.nn")  # vendors/ only ships an empty torch stub
+pytest.importorskip("yaml")
+
+from chess_ai.nn.simple_model import INPUT_DIM, BatchEncoder, encode_boards
+
+
+def _reference(board):
+    row = [0.0] * INPUT_DIM
+    for square, piece in board.piece_map().items():
+        row[(piece.piece_type - 1 + (0 if piece.color == chess.WHITE else 6)) * 64 + square] = 1.0
+    row[768:] = [
+        float(board.turn == chess.WHITE),
+        float(board.has_kingside_castling_rights(chess.WHITE)),
+        float(board.has_queenside_castling_rights(chess.WHITE)),
+        float(board.has_kingside_castling_rights(chess.BLACK)),
+        float(board.has_queenside_castling_rights(chess.BLACK)),
+    ]
+    return row
+
+
+def _random_boards(n, seed=0):
+    rng = random.Random(seed)
+    boards = []
+    for _ in range(n):
+        board = chess.Board()
+        for _ in range(rng.randint(0, 40)):
+            moves = list(board.legal_moves)
+            if not moves:
+                break
+            board.push(rng.choice(moves))
+        boards.append(board)
+    return boards
+
+
+def test_batch_encoding_matches_piece_map():
+    boards = _random_boards(16)
+    encoded = encode_boards(boards)
+    assert encoded.shape == (16, INPUT_DIM)
+    for board, row in zip(boards, encoded):
+        assert row.tolist() == _reference(board)
+
+
+def test_encoder_reuses_and_grows_buffer():
+    enc = BatchEncoder(capacity=4)
+    first = enc.encode(_random_boards(3))
+    second = enc.encode(_random_boards(2, seed=1))
+    assert first.data_ptr() == second.data_ptr()
+    big = enc.encode(_random_boards(10))
+    assert big.shape == (10, INPUT_DIM)
+
+
+def test_encoder_gives_each_thread_its_own_buffer():
+    enc = BatchEncoder(capacity=4)
+    main = enc.encode(_random_boards(2))
+    ptrs = []
+    t = threading.Thread(target=lambda: ptrs.append(enc.encode(_random_boards(2, seed=2)).data_ptr()))
+    t.start()
+    t.join()
+    assert ptrs and ptrs[0] != main.data_ptr()
@@ -246,6 +246,16 @@ class TestDecisionEngine(TestOptimalMoveSelection):
         assert white_board.is_legal(move)
         assert (end_time - start_time) <= 1.0  # Allow some tolerance
     
+    def test_decision_engine_terminates_on_sharp_middlegame(self):
+        """Capture/check extensions are capped, so forcing lines cannot run away."""
+        board = chess.Board("2rq1rk1/pp1bppbp/3p1np1/4n3/3NP3/1BN1BP2/PPPQ2PP/2KR3R w - - 0 12")
+        engine = DecisionEngine(base_depth=2)
+        start_time = time.time()
+        move = engine.choose_best_move(board)
+
+        assert board.is_legal(move)
+        assert time.time() - start_time < 60.0
+
     def test_decision_engine_risk_analysis(self, tactical_board):
         """Test DecisionEngine incorporates risk analysis."""
         engine = DecisionEngine(base_depth=2)
@@ -0,0 +1,245 @@
+import chess
+import numpy as np
+import pytest
+
+from chess_ai.enhanced_chess_pattern_detector import ChessPatternEnhanced, PatternCategory
+from chess_ai.pattern_feature_index import PatternFeatureIndex
+from chess_ai.pattern_matching_engine import AdvancedPatternMatcher, MatchingConfig, MatchingStrategy
+
+FENS = [
+    chess.STARTING_FEN,
+    "r1bqkbnr/pppp1ppp/2n5/4p3/4P3/5N2/PPPP1PPP/RNBQKB1R w KQkq - 2 3",
+    "r1bqkb1r/pppp1ppp/2n2n2/4p2Q/2B1P3/8/PPPP1PPP/RNB1K1NR w KQkq - 4 4",
+    "4k3/8/8/3N4/8/8/8/4K3 w - - 0 1",
+    "6k1/5ppp/8/8/8/8/5PPP/3R2K1 w - - 0 1",
+]
+
+
+def _patterns():
+    patterns = [
+        ChessPatternEnhanced(
+            id=f"p{i}",
+            name=f"Pattern {i}",
+            description="test",
+            category=PatternCategory.TACTICAL if i % 2 else PatternCategory.POSITIONAL,
+            fen=fen,
+            key_move="e2e4",
+        )
+        for i, fen in enumerate(FENS)
+    ]
+    patterns.append(ChessPatternEnhanced(
+        id="broken", name="Broken", description="bad fen",
+        category=PatternCategory.TACTICAL, fen="not a fen", key_move="e2e4",
+    ))
+    return patterns
+
+
+def _scalar_hybrid(matcher, board, pattern):
+    cfg = matcher.config
+    return (
+        (1.0 if pattern.fen == board.fen() else 0.0) * 0.3
+        + matcher._calculate_positional_similarity(board, pattern) * cfg.positional_weight
+        + matcher._calculate_tactical_similarity_score(board, pattern) * cfg.tactical_weight
+        + matcher._calculate_structural_similarity(board, pattern) * 0.1
+    )
+
+
+@pytest.mark.parametrize("query_fen", FENS[1:4])
+def test_vectorised_scores_match_per_pattern_formulas(query_fen):
+    matcher = AdvancedPatternMatcher(MatchingConfig(min_confidence_threshold=0.0, enable_caching=False))
+    board = chess.Board(query_fen)
+    patterns = _patterns()
+    extract = matcher.feature_extractor.extract_features
+    board_features = extract(board)
+    try:
+        hybrid = dict((p.id, s) for p, s in matcher._hybrid_match(board, patterns))
+        positional = dict((p.id, s) for p, s in matcher._positional_similarity_match(board, patterns))
+        tactical = dict((p.id, s) for p, s in matcher._tactical_features_match(board, patterns))
+        structural = dict((p.id, s) for p, s in matcher._structural_patterns_match(board, patterns))
+
+        assert "broken" not in positional and "broken" not in tactical
+        assert structural["broken"] == 0.0
+        for pattern in patterns:
+            assert hybrid[pattern.id] == pytest.approx(_scalar_hybrid(matcher, board, pattern))
+            if pattern.id == "broken":
+                continue
+            pattern_features = extract(chess.Board(pattern.fen))
+            assert positional[pattern.id] == pytest.approx(
+                matcher._calculate_feature_similarity(board_features, pattern_features))
+            assert structural[pattern.id] == pytest.approx(
+                matcher._calculate_structural_similarity(board, pattern))
+            if pattern.category == PatternCategory.TACTICAL:
+                assert tactical[pattern.id] == pytest.approx(
+                    matcher._calculate_tactical_similarity(board_features, pattern_features))
+            else:
+                assert pattern.id not in tactical
+    finally:
+        matcher.shutdown()
+
+
+def test_features_computed_once_and_refreshed_on_fen_change():
+    matcher = AdvancedPatternMatcher(MatchingConfig(enable_caching=False))
+    calls = []
+    original = matcher.feature_extractor.extract_features
+    matcher.feature_extractor.extract_features = lambda b: calls.append(b.fen()) or original(b)
+    patterns = _patterns()[:3]
+    try:
+        matcher.add_patterns(patterns)
+        assert len(calls) == 3
+        for fen in FENS[:3]:
+            matcher._positional_similarity_match(chess.Board(fen), patterns)
+        assert len(calls) == 6  # one per distinct query board only
+
+        patterns[0].fen = FENS[4]
+        matcher.add_patterns(patterns)
+        matcher._positional_similarity_match(chess.Board(FENS[2]), patterns)
+        assert len(calls) == 7
+        assert len(matcher.feature_index) == 3
+    finally:
+        matcher.shutdown()
+
+
+def test_catalogue_registered_once_across_queries(monkeypatch):
+    config = MatchingConfig(enable_caching=True, min_confidence_threshold=0.0,
+                            strategies=[MatchingStrategy.POSITIONAL_SIMILARITY,
+                                        MatchingStrategy.HYBRID_APPROACH],
+                            shard_workers=2, shard_min_patterns=1)
+    matcher = AdvancedPatternMatcher(config)
+    registrations = []
+    original = matcher.feature_index.add_patterns
+    monkeypatch.setattr(matcher.feature_index, "add_patterns",
+                        lambda patterns: registrations.append(len(patterns)) or original(patterns))
+    patterns = _patterns()
+    try:
+        matcher.add_patterns(patterns)
+        for fen in FENS:
+            matcher.match_patterns(chess.Board(fen), patterns)
+            matcher._sequential_match(chess.Board(fen), patterns)
+        assert registrations == [len(patterns)]
+
+        # Growing the list registers it again; the new pattern is scored.
+        patterns.append(ChessPatternEnhanced(id="late", name="Late", description="late",
+                                             category=PatternCategory.POSITIONAL, fen=FENS[2],
+                                             key_move="e2e4"))
+        found = {p.id for p, _ in matcher.match_patterns(chess.Board(FENS[2]), patterns)}
+        assert "late" in found
+        assert registrations == [len(patterns) - 1, len(patterns)]
+    finally:
+        matcher.shutdown()
+
+
+def test_index_round_trips_through_disk(tmp_path):
+    path = tmp_path / "patterns.features.npz"
+    config = MatchingConfig(enable_caching=False, feature_index_path=str(path), min_confidence_threshold=0.0)
+    board = chess.Board(FENS[2])
+    matcher = AdvancedPatternMatcher(config)
+    matcher.add_patterns(_patterns())
+    before = sorted((p.id, s) for p, s in matcher._hybrid_match(board, _patterns()))
+    matcher.shutdown()
+    assert path == PatternFeatureIndex.path_for(tmp_path / "patterns") and path.exists()
+
+    reloaded = AdvancedPatternMatcher(config)
+    calls = []
+    original = reloaded.feature_extractor.extract_features
+    reloaded.feature_extractor.extract_features = lambda b: calls.append(b.fen()) or original(b)
+    try:
+        assert len(reloaded.feature_index) == len(_patterns())
+        after = sorted((p.id, s) for p, s in reloaded._hybrid_match(board, _patterns()))
+        assert calls == [board.fen()]  # only the query board is extracted
+        assert [i for i, _ in after] == [i for i, _ in before]
+        assert np.allclose([s for _, s in after], [s for _, s in before])
+    finally:
+        reloaded.shutdown()
+
+
+def test_top_k_with_lsh_prefilter_keeps_best_match():
+    config = MatchingConfig(enable_caching=False, top_k=3, ann_min_patterns=1,
+                            strategies=[MatchingStrategy.POSITIONAL_SIMILARITY],
+                            min_confidence_threshold=0.0)
+    matcher = AdvancedPatternMatcher(config)
+    try:
+        matches = matcher.match_patterns(chess.Board(FENS[3]), _patterns())
+        assert len(matches) == 3
+        assert matches[0][0].id == "p3" and matches[0][1] == pytest.approx(1.0)
+    finally:
+        matcher.shutdown()
+
+
+def test_sharded_processes_match_sequential_results():
+    strategies = [MatchingStrategy.EXACT_FEN, MatchingStrategy.POSITIONAL_SIMILARITY,
+                  MatchingStrategy.TACTICAL_FEATURES, MatchingStrategy.HYBRID_APPROACH]
+    config = MatchingConfig(enable_caching=False, strategies=strategies, min_confidence_threshold=0.2,
+                            shard_workers=3, shard_min_patterns=1)
+    matcher = AdvancedPatternMatcher(config)
+    patterns = _patterns()
+    board = chess.Board(FENS[1])
+    try:
+        sequential = sorted((p.id, s) for p, s in matcher._sequential_match(board, patterns))
+        parallel = sorted((p.id, s) for p, s in matcher._parallel_match(board, patterns))
+        assert [i for i, _ in parallel] == [i for i, _ in sequential]
+        assert np.allclose([s for _, s in parallel], [s for _, s in sequential])
+        assert dict(parallel)["p1"] == pytest.approx(1.0)  # exact FEN hit
+
+        # A subset of the catalogue only scores those rows.
+        subset = sorted(p.id for p, _ in matcher._parallel_match(board, patterns[2:4]))
+        assert subset == ["p2", "p3"]
+
+        # New patterns reach the shards.
+        extra = ChessPatternEnhanced(id="extra", name="Extra", description="late",
+                                     category=PatternCategory.POSITIONAL, fen=FENS[1], key_move="e2e4")
+        assert "extra" in {p.id for p, _ in matcher.match_patterns(board, patterns + [extra])}
+
+        stats = matcher.get_shard_stats()
+        assert [s["shard"] for s in stats] == [0, 1, 2]
+        assert sum(s["rows"] for s in stats) == len(patterns) + 1
+        assert all(s["calls"] >= 1 and s["mean_ms"] >= 0 for s in stats)
+    finally:
+        matcher.shutdown()
+    assert matcher.get_shard_stats() == []
+
+
+def test_shards_receive_only_changed_rows():
+    config = MatchingConfig(enable_caching=False, min_confidence_threshold=0.0,
+                            strategies=[MatchingStrategy.HYBRID_APPROACH],
+                            shard_workers=3, shard_min_patterns=1)
+    matcher = AdvancedPatternMatcher(config)
+    patterns = _patterns()  # six rows: shards own [0, 2), [2, 4) and [4, 6)
+    board = chess.Board(FENS[1])
+    try:
+        matcher.match_patterns(board, patterns)
+        sent = {i: [] for i in range(3)}
+        for i, shard in enumerate(matcher.shard_pool._shards):
+            send = shard.conn.send
+            shard.conn.send = lambda msg, i=i, send=send: sent[i].append(msg[0]) or send(msg)
+
+        patterns[0].fen = FENS[3]
+        matcher.add_patterns(patterns)
+        patterns.append(ChessPatternEnhanced(id="extra", name="Extra", description="late",
+                                             category=PatternCategory.TACTICAL, fen=FENS[1],
+                                             key_move="e2e4"))
+        parallel = dict((p.id, s) for p, s in matcher.match_patterns(board, patterns))
+        assert sent == {0: ["update", "match"], 1: ["match"], 2: ["update", "match"]}
+
+        sequential = dict((p.id, s) for p, s in matcher._sequential_match(board, patterns))
+        assert sorted(parallel) == sorted(sequential)
+        assert all(parallel[i] == pytest.approx(sequential[i]) for i in sequential)
+        assert parallel["extra"] == parallel["p1"]
+        assert [s["rows"] for s in matcher.get_shard_stats()] == [2, 2, 3]
+    finally:
+        matcher.shutdown()
+
+
+def test_changed_rows_falls_back_when_journal_is_exhausted(monkeypatch):
+    monkeypatch.setattr("chess_ai.pattern_feature_index.JOURNAL_LIMIT", 2)
+    matcher = AdvancedPatternMatcher(MatchingConfig(enable_caching=False))
+    index = matcher.feature_index
+    try:
+        matcher.add_patterns(_patterns()[:1])
+        since = index.version
+        assert list(index.changed_rows(since)) == []
+        matcher.add_patterns(_patterns()[:3])
+        assert list(index.changed_rows(since)) == [1, 2]
+        matcher.add_patterns(_patterns()[:4])
+        assert index.changed_rows(since) is None
+    finally:
+        matcher.shutdown()
@@ -0,0 +1,85 @@
+import json
+import pickle
+
+import chess
+
+import chess_ai.pattern_responder as pr
+from chess_ai.pattern_responder import PatternResponder, PatternTemplate
+
+START = chess.Board().board_fen()
+AFTER_E4 = "rnbqkbnr/pppppppp/8/8/4P3/8/PPPP1PPP/RNBQKBNR"
+
+
+def _write(path, data):
+    path.write_text(json.dumps(data), encoding="utf-8")
+
+
+def _aggregator(tmp_path):
+    inc = tmp_path / "patterns"
+    inc.mkdir()
+    _write(inc / "a.json", {"patterns": [
+        {"situation": START, "action": "e2e4", "pattern_type": "opening", "confidence": 0.6},
+        {"situation": START, "action": "d2d4", "pattern_type": "opening", "confidence": 0.9},
+    ]})
+    _write(inc / "b.json", {"patterns": [
+        {"situation": AFTER_E4, "action": "e7e5", "pattern_type": "opening", "confidence": 0.8},
+        {"situation": AFTER_E4, "action": "c7c5", "pattern_type": "opening", "enabled": False},
+    ]})
+    main = tmp_path / "patterns.json"
+    _write(main, {"patterns": [], "includes": ["patterns"]})
+    return main, inc
+
+
+def test_lookup_picks_best_enabled_pattern(tmp_path):
+    main, _ = _aggregator(tmp_path)
+    responder = PatternResponder(str(main), use_cache=False)
+    board = chess.Board()
+    assert responder.match(board) == "d2d4"
+    board.push_uci("e2e4")
+    assert responder.match(board) == "e7e5"
+    assert responder.analyze_position(board)["matching_patterns"] == 1
+    assert responder.match(chess.Board("8/8/8/8/8/8/8/K6k w - - 0 1")) is None
+
+
+def test_index_follows_add_remove_and_in_place_edits(tmp_path):
+    main, _ = _aggregator(tmp_path)
+    responder = PatternResponder(str(main), use_cache=False)
+    responder.patterns_file = str(tmp_path / "saved.json")
+    best = PatternTemplate(situation=START, action="c2c4", pattern_type="opening", confidence=0.95)
+    responder.add_pattern(best)
+    assert responder.match(chess.Board()) == "c2c4"
+    assert responder.remove_pattern(best) and not responder.remove_pattern(best)
+    assert responder.match(chess.Board()) == "d2d4"
+
+    responder.patterns.append(PatternTemplate(situation=START, action="g1f3", pattern_type="opening",
+                                              confidence=0.99))
+    assert responder.match(chess.Board()) == "g1f3"
+    responder.patterns = [p for p in responder.patterns if p.action != "g1f3"]
+    assert responder.match(chess.Board()) == "d2d4"
+
+
+def test_compiled_cache_skips_json_and_tracks_sources(tmp_path, monkeypatch):
+    main, inc = _aggregator(tmp_path)
+    PatternResponder(str(main))
+    assert (tmp_path / "patterns.json.cache").exists()
+
+    def no_parse(*args, **kwargs):
+        raise AssertionError("pattern files parsed despite a valid cache")
+
+    with monkeypatch.context() as m:
+        m.setattr(PatternResponder, "_ingest_patterns", no_parse)
+        cached = PatternResponder(str(main))
+    assert cached.match(chess.Board()) == "d2d4"
+    assert len(cached.patterns) == 3
+    assert all(isinstance(p, PatternTemplate) for p in cached.patterns)
+
+    # The cache is plain data: anything else is ignored, never executed.
+    (tmp_path / "patterns.json.cache").write_bytes(pickle.dumps({"version": pr.CACHE_VERSION}))
+    assert len(PatternResponder(str(main)).patterns) == 3
+    assert json.loads((tmp_path / "patterns.json.cache").read_text())["version"] == pr.CACHE_VERSION
+
+    # A new file in an included directory invalidates the cache.
+    _write(inc / "c.json", {"patterns": [{"situation": START, "action": "b1c3", "pattern_type": "opening",
+                                          "confidence": 1.0}]})
+    refreshed = PatternResponder(str(main))
+    assert refreshed.match(chess.Board()) == "b1c3"
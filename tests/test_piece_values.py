@@ -0,0 +1,24 @@
+import chess
+
+from chess_ai import piece_values as pv
+
+
+def test_values_use_each_piece_own_square():
+    # Two white rooks with very different mobility.
+    board = chess.Board("k7/8/8/8/3R4/8/8/K6R w - - 0 1")
+    values = pv.dynamic_piece_values(board)
+    assert values[chess.D4] != values[chess.H1]
+    assert values[chess.D4] == pv.dynamic_piece_value_at(chess.D4, board.piece_at(chess.D4), board)
+
+
+def test_position_context_is_cached_per_position():
+    board = chess.Board()
+    ctx = pv.position_context(board)
+    assert pv.position_context(board.copy()) is ctx
+    assert ctx.has_queen == (True, True)
+    assert ctx.material[chess.WHITE] == ctx.material[chess.BLACK]
+    board.push_san("e4")
+    board.push_san("d5")
+    board.push_san("exd5")
+    after = pv.position_context(board)
+    assert after.material[chess.BLACK] < ctx.material[chess.BLACK]
@@ -0,0 +1,63 @@
+import json
+
+import chess
+
+from chess_ai.utils.profile_stats import (
+    JsonlExporter,
+    ProfileStats,
+    PrometheusExporter,
+    SINK,
+    StatsSink,
+)
+
+
+def test_ring_buffer_is_bounded_and_copies_stats():
+    sink = StatsSink(capacity=3)
+    stats = ProfileStats()
+    for n in range(5):
+        stats.nodes = n
+        sink.record(stats, "alpha_beta")
+    assert [r.stats.nodes for r in sink.snapshot()] == [2, 3, 4]
+    stats.nodes = 99
+    assert sink.latest("alpha_beta").stats.nodes == 4
+    assert sink.latest("mcts") is None
+
+
+def test_exporters_write_jsonl_and_prometheus(tmp_path):
+    sink = StatsSink()
+    jsonl = tmp_path / "profile.jsonl"
+    prom = tmp_path / "profile.prom"
+    sink.add_exporter(JsonlExporter(str(jsonl)))
+    sink.add_exporter(PrometheusExporter(str(prom)))
+
+    sink.record(ProfileStats(nodes=10, elapsed=0.5), "alpha_beta")
+    sink.record(ProfileStats(nodes=7, elapsed=0.1), "mcts")
+
+    lines = [json.loads(line) for line in jsonl.read_text().splitlines()]
+    assert [(r["engine"], r["nodes"]) for r in lines] == [("alpha_beta", 10), ("mcts", 7)]
+    text = prom.read_text()
+    assert 'chess_search_nodes{engine="alpha_beta"} 10' in text
+    assert 'chess_search_nodes{engine="mcts"} 7' in text
+
+
+def test_failing_exporter_does_not_break_recording():
+    sink = StatsSink()
+
+    def boom(_rec):
+        raise RuntimeError("disk full")
+
+    sink.add_exporter(boom)
+    sink.record(ProfileStats(nodes=1), "mcts")
+    assert sink.latest().stats.nodes == 1
+
+
+def test_searches_record_without_plotting(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    from chess_ai.hybrid_bot.alpha_beta import search
+    from chess_ai.hybrid_bot.mcts import BatchMCTS
+
+    SINK.clear()
+    search(chess.Board(), 1)
+    BatchMCTS().search(chess.Board(), n_simulations=4)
+    assert [r.engine for r in SINK.snapshot()] == ["alpha_beta", "mcts"]
+    assert list(tmp_path.iterdir()) == []
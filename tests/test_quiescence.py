@@ -0,0 +1,94 @@
+import chess
+
+from core import quiescence as qs
+
+
+def test_finds_winning_capture_and_avoids_losing_one():
+    # Queen can take a defended pawn (loses the queen) or a free rook.
+    board = chess.Board("4k3/8/1p6/p7/Q3r3/8/8/7K w - - 0 1")
+    assert qs.quiescence(board, -10_000, 10_000) == 900 - 200
+
+
+def test_losing_capture_is_pruned_by_see(monkeypatch):
+    board = chess.Board("r5k1/8/8/p7/Q7/8/8/6K1 w - - 0 1")
+    searched = []
+    real_push = qs._board_push
+
+    def spy(b, m):
+        searched.append(m)
+        real_push(b, m)
+
+    monkeypatch.setattr(qs, "_board_push", spy)
+    assert qs.quiescence(board, -10_000, 10_000) == 900 - 600
+    assert chess.Move.from_uci("a4a5") not in searched
+
+
+def test_ply_cap_bounds_the_search():
+    board = chess.Board("r1bq1rk1/pp2bppp/2n1pn2/2pp4/3P4/2PBPN2/PP1N1PPP/R1BQ1RK1 w - - 0 8")
+    calls = []
+
+    def evaluate(b):
+        calls.append(b.ply())
+        return qs._evaluate(b)
+
+    qs.quiescence(board, -10_000, 10_000, evaluate=evaluate, max_ply=2)
+    assert max(calls) - board.ply() <= 2
+
+
+def test_hybrid_and_shallow_search_use_shared_quiescence(monkeypatch):
+    from chess_ai.hybrid_bot import alpha_beta
+    from core import shallow_search
+
+    seen = []
+    real = qs.quiescence
+
+    def spy(board, alpha, beta, **kwargs):
+        seen.append(kwargs.get("evaluate"))
+        return real(board, alpha, beta, **kwargs)
+
+    monkeypatch.setattr(alpha_beta, "_qsearch", spy)
+    monkeypatch.setattr(shallow_search, "quiescence", spy)
+    board = chess.Board("4k3/8/8/3q4/8/8/3R4/4K3 w - - 0 1")
+    alpha_beta.quiescence(board, -10_000, 10_000)
+    shallow_search._quiescence(board, -10_000, 10_000)
+    assert len(seen) == 2
+
+
+def test_see_scores_defended_and_free_captures():
+    from chess_ai.see import static_exchange_eval
+
+    board = chess.Board("r5k1/8/8/p7/Q7/8/8/6K1 w - - 0 1")
+    assert static_exchange_eval(board, chess.Move.from_uci("a4a5")) == -8
+    board = chess.Board("4k3/3r4/8/3p4/8/3R4/3R4/4K3 w - - 0 1")
+    assert static_exchange_eval(board, chess.Move.from_uci("d3d5")) == 1
+
+
+def test_quiet_checks_are_the_direct_non_capturing_checks():
+    fens = [
+        "r1bqkb1r/pppp1ppp/2n2n2/4p3/2B1P3/5N2/PPPP1PPP/RNBQK2R w KQkq - 0 4",
+        "2b1kbr1/p2p1ppp/1r3n1R/1P2p2P/1P2Pq2/NP3R2/2p1QPP1/4KBN1 b - - 1 19",  # checking promotion
+        "r1b3nr/1pppk1p1/7Q/p3ppP1/P2bP3/2N4R/2nP1P2/R1BK1Bq1 w - f6 0 16",  # en passant available
+        "4k3/8/8/8/8/8/4N3/4R1K1 w - - 0 1",  # knight moves give discovered checks only
+    ]
+    for fen in fens:
+        board = chess.Board(fen)
+        expected = set()
+        for m in board.legal_moves:
+            if board.is_capture(m) or not board.gives_check(m):
+                continue
+            board.push(m)
+            direct = bool(board.checkers() & chess.BB_SQUARES[m.to_square])
+            board.pop()
+            if direct:
+                expected.add(m)
+        assert set(qs._quiet_checks(board)) == expected, fen
+
+
+def test_quiet_check_finds_back_rank_mate(monkeypatch):
+    board = chess.Board("6k1/5ppp/8/8/8/8/5PPP/4R1K1 w - - 0 1")
+    assert qs.quiescence(board, -10_000, 10_000) == qs.MATE_SCORE - 1
+    # Without the quiet checks only the material balance is seen.
+    monkeypatch.setattr(qs, "_quiet_checks", lambda b: [])
+    assert qs.quiescence(board, -10_000, 10_000) == 500
+    mated = chess.Board("4R1k1/5ppp/8/8/8/8/5PPP/6K1 b - - 1 1")
+    assert qs.quiescence(mated, -10_000, 10_000) == -qs.MATE_SCORE
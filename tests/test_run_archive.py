@@ -0,0 +1,140 @@
+import json
+
+import chess
+import pytest
+
+from utils.run_archive import (
+    RunArchiveReader,
+    RunArchiveWriter,
+    convert_runs,
+    decode_move,
+    encode_move,
+)
+
+
+def _play(sans, fen=None):
+    board = chess.Board(fen) if fen else chess.Board()
+    for san in sans:
+        board.push_san(san)
+    return board
+
+
+def test_move_codes_round_trip():
+    moves = [
+        chess.Move.from_uci("e2e4"),
+        chess.Move.from_uci("a7a8q"),
+        chess.Move.from_uci("h2h1n"),
+        chess.Move.from_uci("e1g1"),
+        chess.Move.null(),
+    ]
+    for move in moves:
+        code = encode_move(move)
+        assert 0 <= code < 1 << 16
+        assert decode_move(code) == move
+
+
+def test_write_append_and_read(tmp_path):
+    path = tmp_path / "games.crun"
+    g1 = _play(["e4", "e5", "Nf3", "Nc6"])
+    g2 = _play(["d4", "d5"])
+    fen = "4k3/P7/8/8/8/8/8/4K3 w - - 0 1"
+    g3 = _play(["a8=Q+"], fen)
+
+    with RunArchiveWriter(path, chunk_games=1) as w:
+        w.append_game(g1.move_stack, ["OPENING", "TACTIC"], ["DEFENSE", "DEFENSE"], "1-0",
+                      game_id="g1", duration_ms=1234)
+        w.append_game(g2.move_stack, ["OPENING"], ["OPENING"], "*", game_id="g2")
+    # Reopening appends and keeps the string dictionary.
+    with RunArchiveWriter(path) as w:
+        w.append_game(g3.move_stack, ["PROMO"], [], "1/2-1/2", game_id="g3", start_fen=fen)
+
+    with RunArchiveReader(path) as r:
+        assert len(r) == 3
+        assert len(r.chunks()) == 3
+        assert r.strings.count("OPENING") == 1
+        games = list(r.iter_games(san=True, fens=True))
+        assert list(r.chunks()[0].moves) == [encode_move(m) for m in g1.move_stack]
+
+    first, second, third = games
+    assert first["game_id"] == "g1"
+    assert first["moves"] == ["e4", "e5", "Nf3", "Nc6"]
+    assert first["moves_uci"] == [m.uci() for m in g1.move_stack]
+    assert first["fens"][-1] == g1.fen()
+    assert first["modules_w"] == ["OPENING", "TACTIC"]
+    assert first["modules_b"] == ["DEFENSE", "DEFENSE"]
+    assert (first["result"], first["duration_ms"]) == ("1-0", 1234)
+    assert second["result"] == "*" and second["moves"] == ["d4", "d5"]
+    assert third["start_fen"] == fen
+    assert third["moves"] == ["a8=Q+"]
+    assert third["result"] == "1/2-1/2"
+
+
+def test_torn_chunk_is_ignored_and_truncated(tmp_path):
+    path = tmp_path / "games.crun"
+    with RunArchiveWriter(path) as w:
+        w.append_game(_play(["e4"]).move_stack, ["A"], [], "*", game_id="ok")
+    good_size = path.stat().st_size
+    with RunArchiveWriter(path) as w:
+        w.append_game(_play(["d4"]).move_stack, ["B"], [], "*", game_id="torn")
+    with open(path, "r+b") as fh:
+        fh.truncate(path.stat().st_size - 3)
+
+    with RunArchiveReader(path) as r:
+        assert [g["game_id"] for g in r.iter_games()] == ["ok"]
+        assert r.valid_size == good_size
+
+    with RunArchiveWriter(path) as w:
+        w.append_game(_play(["c4"]).move_stack, ["C"], [], "*", game_id="next")
+    with RunArchiveReader(path) as r:
+        assert [g["game_id"] for g in r.iter_games()] == ["ok", "next"]
+        assert [g["modules_w"] for g in r.iter_games(indices={1})] == [["C"]]
+
+
+def test_convert_runs_matches_json(tmp_path):
+    runs = tmp_path / "runs"
+    runs.mkdir()
+    board = _play(["e4", "c5", "Nf3"])
+    data = {
+        "moves": ["e4", "c5", "Nf3"],
+        "fens": [],
+        "modules_w": ["W1", "W2"],
+        "modules_b": ["B1"],
+        "result": "*",
+    }
+    (runs / "20240101_000000.json").write_text(json.dumps(data), encoding="utf-8")
+    (runs / "broken.json").write_text("{", encoding="utf-8")
+
+    assert convert_runs(runs, runs / "games.crun") == 1
+    with RunArchiveReader(runs / "games.crun") as r:
+        (game,) = r.iter_games(san=True, fens=True)
+    assert game["game_id"] == "20240101_000000"
+    assert game["moves"] == data["moves"]
+    assert game["fens"][-1] == board.fen()
+    assert game["modules_w"] == ["W1", "W2"] and game["modules_b"] == ["B1"]
+
+
+def test_converted_directory_loads_each_game_once(tmp_path):
+    from analysis.loader import stream_runs
+    from utils.load_runs import load_runs
+
+    runs = tmp_path / "runs"
+    runs.mkdir()
+    data = {"moves": ["e4", "e5"], "fens": [], "modules_w": ["W"], "modules_b": ["B"], "result": "*"}
+    (runs / "a.json").write_text(json.dumps(data), encoding="utf-8")
+
+    assert convert_runs(runs, runs / "games.crun") == 1
+    assert not (runs / "a.json").exists() and (runs / "converted" / "a.json").exists()
+    assert [r["game_id"] for r in load_runs(str(runs))] == ["a"]
+    assert len(list(stream_runs(str(runs)))) == 1
+
+    # Converting again (e.g. after the file is restored) adds nothing.
+    (runs / "a.json").write_text(json.dumps(data), encoding="utf-8")
+    assert convert_runs(runs, runs / "games.crun") == 0
+    assert [r["game_id"] for r in load_runs(str(runs))] == ["a"]
+
+
+def test_reader_rejects_other_files(tmp_path):
+    path = tmp_path / "x.crun"
+    path.write_bytes(b"not an archive")
+    with pytest.raises(ValueError):
+        RunArchiveReader(path)
@@ -0,0 +1,85 @@
+import json
+import os
+
+from utils.run_index import RunIndex, parse_page_args
+
+
+def _write(path, moves, white, black, result="1-0", **extra):
+    data = {
+        "moves": moves,
+        "fens": [],
+        "modules_w": white,
+        "modules_b": black,
+        "result": result,
+        **extra,
+    }
+    path.write_text(json.dumps(data), encoding="utf-8")
+
+
+def test_index_summarises_games_and_modules(tmp_path):
+    runs = tmp_path / "runs"
+    runs.mkdir()
+    _write(runs / "a.json", ["e4", "e5"], ["Aggressive"], ["Fortify"], duration_ms=1500)
+    _write(runs / "b.json", ["d4"], ["Fortify"], [], result="0-1")
+
+    index = RunIndex(runs, min_interval=0)
+    assert index.index_path == tmp_path / "runs.index.sqlite"
+    assert index.count_games() == 2
+
+    newest, oldest = index.games()
+    assert newest["id"] == 2 and newest["result"] == "0-1"
+    assert newest["modules"] == {"white": "Fortify", "black": "Unknown"}
+    assert oldest == {
+        "id": 1,
+        "result": "1-0",
+        "moves": 2,
+        "duration": 1500,
+        "modules": {"white": "Aggressive", "black": "Fortify"},
+        "movesList": ["e4", "e5"],
+    }
+    assert index.module_counts() == {"Aggressive": 1, "Fortify": 2}
+
+
+def test_index_updates_incrementally(tmp_path):
+    runs = tmp_path / "runs"
+    runs.mkdir()
+    _write(runs / "a.json", ["e4"], ["Aggressive"], ["Fortify"])
+    _write(runs / "b.json", ["d4"], ["Fortify"], ["Fortify"])
+
+    index = RunIndex(runs, min_interval=0)
+    assert index.refresh() == 2
+    assert index.refresh() == 0
+
+    _write(runs / "a.json", ["e4", "c5", "Nf3"], ["Endgame"], ["Endgame"])
+    st = os.stat(runs / "a.json")
+    os.utime(runs / "a.json", ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000))
+    os.remove(runs / "b.json")
+    (runs / "c.json").write_text(json.dumps({"games": [
+        {"moves": ["e4"], "modules_w": ["X"], "modules_b": ["Y"], "result": "*"},
+        {"moves": [], "modules_w": ["X"], "modules_b": [], "result": "1/2-1/2"},
+    ]}), encoding="utf-8")
+
+    assert index.refresh() == 2
+    assert index.count_games() == 3
+    assert index.module_counts() == {"Endgame": 2, "X": 2, "Y": 1}
+
+    # Reopening the same file reuses the stored index.
+    reopened = RunIndex(runs, min_interval=0)
+    assert reopened.refresh() == 0
+    assert reopened.module_counts() == index.module_counts()
+
+
+def test_pagination(tmp_path):
+    runs = tmp_path / "runs"
+    runs.mkdir()
+    for i in range(5):
+        _write(runs / f"g{i}.json", ["e4"] * i, ["M"], ["N"])
+
+    index = RunIndex(runs, min_interval=0)
+    offset, limit = parse_page_args({"page": "2", "per_page": "2"})
+    assert (offset, limit) == (2, 2)
+    page = index.games(offset, limit)
+    assert [g["id"] for g in page] == [3, 2]
+    assert [g["moves"] for g in page] == [2, 1]
+
+    assert parse_page_args({"page": "x", "per_page": "100000"}) == (0, 1000)
@@ -50,3 +50,24 @@ def test_stream_runs_missing_key():
 def test_stream_runs_missing_directory():
     with pytest.raises(FileNotFoundError):
         list(stream_runs("missing/path"))
+
+
+def test_stream_runs_reads_archives(tmp_path):
+    import chess
+    from utils.run_archive import RunArchiveWriter
+
+    _create_runs(str(tmp_path), 2)
+    with RunArchiveWriter(tmp_path / "games.crun") as writer:
+        for i in range(4):
+            board = chess.Board()
+            board.push_san("d4")
+            writer.append_game(board.move_stack, ["m3"], [], "*", game_id=f"arch{i}")
+
+    runs = list(stream_runs(str(tmp_path)))
+    assert [r["game_id"] for r in runs] == ["game0", "game1", "arch0", "arch1", "arch2", "arch3"]
+    assert runs[-1]["moves"] == ["d4"]
+    assert runs[-1]["fens"] == ["rnbqkbnr/pppppppp/8/8/3P4/8/PPP1PPPP/RNBQKBNR b KQkq - 0 1"]
+
+    sampled = list(stream_runs(str(tmp_path), sample_size=3, seed=7))
+    assert len(sampled) == 3
+    assert [r["game_id"] for r in sampled] == [r["game_id"] for r in stream_runs(str(tmp_path), sample_size=3, seed=7)]
@@ -57,6 +57,8 @@ def test_illegal_move_forfeits_with_reason(monkeypatch):
     def make_agent(name: str, color: bool):
         return _stub_factory(name)(color)
     monkeypatch.setattr(T, "make_agent", make_agent)
+    # Stub factories live in this process; AgentHost children cannot see them.
+    monkeypatch.setattr(T, "AGENT_ISOLATION", "thread")
 
     res = T.play_single_game("IllegalBot", "LegalBot", max_plies=2)
     assert res == "0-1"
@@ -70,6 +72,8 @@ def test_crash_counts_as_loss_and_captures_error(monkeypatch):
     def make_agent(name: str, color: bool):
         return _stub_factory(name)(color)
     monkeypatch.setattr(T, "make_agent", make_agent)
+    # Stub factories live in this process; AgentHost children cannot see them.
+    monkeypatch.setattr(T, "AGENT_ISOLATION", "thread")
 
     res = T.play_single_game("CrashBot", "LegalBot", max_plies=2, time_per_move=1)
     assert res == "0-1"
@@ -85,6 +89,8 @@ def test_timeout_flag_fall_forfeits_with_metadata(monkeypatch):
     def make_agent(name: str, color: bool):
         return _stub_factory(name)(color)
     monkeypatch.setattr(T, "make_agent", make_agent)
+    # Stub factories live in this process; AgentHost children cannot see them.
+    monkeypatch.setattr(T, "AGENT_ISOLATION", "thread")
 
     res = T.play_single_game(
         "TimeoutBot", "LegalBot", max_plies=2, clock_initial=0.0001, clock_increment=0.0
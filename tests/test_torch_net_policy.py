@@ -0,0 +1,41 @@
+import math
+
+import chess
+import pytest
+
+pytest.importorskip("torch.nn")  # vendors/ only ships an empty torch stub
+pytest.importorskip("yaml")
+
+from chess_ai.nn.torch_net import TorchNet, _LRUCache
+
+
+def _promotion_board():
+    return chess.Board("8/1P6/8/8/8/8/6k1/K7 w - - 0 1")
+
+
+def test_policy_covers_each_legal_move_and_sums_to_one():
+    net = TorchNet(device="cpu")
+    net.load_dummy_weights()
+    boards = [chess.Board(), _promotion_board(), chess.Board("7k/5Q2/6K1/8/8/8/8/8 b - - 0 1")]
+    results = net.predict_many(boards)
+    for board, (policy, value) in zip(boards, results):
+        legal = list(board.legal_moves)
+        assert set(policy) == set(legal)
+        if legal:
+            assert math.isclose(sum(policy.values()), 1.0, rel_tol=1e-5)
+            # Dummy weights give equal logits, promotions included.
+            assert all(math.isclose(p, 1 / len(legal), rel_tol=1e-5) for p in policy.values())
+        assert value == 0.0
+
+
+def test_cache_is_keyed_by_position_and_returns_same_policy():
+    net = TorchNet(device="cpu")
+    net._cache = _LRUCache(8)
+    board = chess.Board()
+    first = net.predict_many([board])[0]
+    assert len(net._cache) == 1
+    transposed = chess.Board()
+    for uci in ("g1f3", "g8f6", "f3g1", "f6g8"):
+        transposed.push_uci(uci)
+    assert net.predict_many([transposed])[0] == first
+    assert len(net._cache) == 1
@@ -374,12 +374,19 @@ class BotUsageTracker(QWidget):
     
     def _start_monitoring(self) -> None:
         """Start monitoring move evaluations."""
-        # This would connect to the move evaluation manager
-        # For now, we'll simulate with a timer
+        # Bots in automatic tracking mode record full evaluations only while
+        # a viewer is attached.
+        move_evaluation_manager.attach_viewer()
         self.monitoring_timer = QTimer()
         self.monitoring_timer.timeout.connect(self._check_for_new_evaluations)
         self.monitoring_timer.start(500)  # Check every 500ms
     
+    def closeEvent(self, event) -> None:
+        """Stop monitoring when the widget is closed."""
+        self.monitoring_timer.stop()
+        move_evaluation_manager.detach_viewer()
+        super().closeEvent(event)
+
     def _check_for_new_evaluations(self) -> None:
         """Check for new move evaluations."""
         # Get recent evaluations from the move evaluation manager
@@ -25,6 +25,7 @@ try:
 except ImportError:
     GUI_AVAILABLE = False
 
+from core.move_object import move_evaluation_manager
 from ui.decision_roadmap import decision_roadmap
 
 
@@ -73,6 +74,7 @@ class DecisionViewer(QWidget):
         self._setup_ui()
         self._setup_timer()
         self._connect_signals()
+        move_evaluation_manager.attach_viewer()
         
         # Update initial state
         self._update_display()
@@ -515,6 +517,7 @@ class DecisionViewer(QWidget):
     def closeEvent(self, event):
         """Handle window close event."""
         self.update_timer.stop()
+        move_evaluation_manager.detach_viewer()
         super().closeEvent(event)
 
 
@@ -20,15 +20,18 @@ from datetime import datetime
 current_dir = Path(__file__).parent
 sys.path.insert(0, str(current_dir))
 
-from flask import Flask, render_template, jsonify, request, send_from_directory
+from flask import Flask, render_template, jsonify, request, send_from_directory, g, has_request_context
 from flask_cors import CORS
 import chess
 import chess.engine
 from werkzeug.serving import WSGIRequestHandler
+from werkzeug.local import LocalProxy
 
 # Імпортуємо існуючі компоненти
 from chess_ai.bot_agent import make_agent
-from utils.load_runs import load_runs
+from utils.run_index import get_run_index, parse_page_args
+from utils.game_sessions import SessionRegistry, session_id_from
+from utils.board_history import BoardHistory
 from utils.module_usage import aggregate_module_usage
 from utils.module_colors import MODULE_COLORS, REASON_PRIORITY
 from chess_ai.elo_sync_manager import ELOSyncManager
@@ -96,36 +99,6 @@ def board_to_array(board):
         board_array.append(row)
     return board_array
 
-def _moves_san_list(board: chess.Board):
-    """Return list of SAN moves for the current game."""
-    temp = chess.Board()
-    san_list = []
-    for mv in board.move_stack:
-        san_list.append(temp.san(mv))
-        temp.push(mv)
-    return san_list
-
-def _moves_san_string(board: chess.Board) -> str:
-    """Return SAN string with move numbers like '1. e4 e5 2. Nf3 ...'."""
-    parts = _moves_san_list(board)
-    out = []
-    for i, san in enumerate(parts, start=1):
-        if i % 2 == 1:
-            move_no = (i + 1) // 2
-            out.append(f"{move_no}. {san}")
-        else:
-            out.append(san)
-    return " ".join(out)
-
-def _game_pgn_string(board: chess.Board) -> str:
-    """Return a minimal PGN string for the current game."""
-    res = board.result() if board.is_game_over() else "*"
-    return (
-        f"[Event \"WebViewer\"]\n[Site \"Local\"]\n"
-        f"[White \"Web\"]\n[Black \"Web\"]\n"
-        f"[Result \"{res}\"]\n\n{_moves_san_string(board)} {res}\n"
-    )
-
 def log_connection_stats():
     """Логування статистики з'єднань"""
     if connection_stats['total_requests'] > 0:
@@ -148,7 +121,6 @@ stats_thread = threading.Thread(target=stats_logger, daemon=True)
 game_data = {
     'current_game': None,
     'game_history': [],
-    'is_playing': False,
     'agents': {},
     'elo_manager': None
 }
@@ -254,12 +226,25 @@ class GameManager:
     """Менеджер для управління іграми та ботами"""
     
     def __init__(self):
-        self.current_board = chess.Board()
+        self.history = BoardHistory()
         self.game_moves = []
         self.game_modules = {'white': [], 'black': []}
         self.start_time = None
+        self.is_playing = False
         self.white_agent = None
         self.black_agent = None
+
+    @property
+    def current_board(self) -> chess.Board:
+        return self.history.board
+
+    @current_board.setter
+    def current_board(self, board: chess.Board) -> None:
+        self.history.set_board(board)
+
+    def push_move(self, move: chess.Move) -> str:
+        """Виконати хід з інкрементальним оновленням SAN/PGN; повертає SAN"""
+        return self.history.push(move)
         
     def initialize_agents(self, white_bot: str, black_bot: str):
         """Ініціалізація ботів"""
@@ -297,7 +282,7 @@ class GameManager:
                 logger.error("Недійсний стан дошки")
                 return None
                 
-            move = agent.choose_move(self.current_board)
+            move = agent.choose_move(self.current_board.copy())
             if not move:
                 logger.warning("Агент не зміг зробити хід")
                 return None
@@ -329,7 +314,7 @@ class GameManager:
             
             # Виконуємо хід
             try:
-                self.current_board.push(move)
+                self.push_move(move)
             except Exception as e:
                 logger.error(f"Помилка виконання ходу: {e}")
                 return None
@@ -378,8 +363,40 @@ class GameManager:
             'turn': 'white' if self.current_board.turn == chess.WHITE else 'black'
         }
 
-# Ініціалізація менеджера ігор
-game_manager = GameManager()
+# Реєстр сесій: кожен клієнт (X-Session-Id / ?session=) має власну гру
+sessions = SessionRegistry(GameManager)
+
+def current_session():
+    """Сесія поточного запиту (або 'default' поза запитом)"""
+    if not has_request_context():
+        return sessions.get()
+    session = g.get('game_session')
+    if session is None:
+        session = g.game_session = sessions.get(session_id_from(request))
+    return session
+
+# Менеджер гри поточної сесії
+game_manager = LocalProxy(lambda: current_session().manager)
+
+def session_locked(f):
+    """Виконати обробник під локом сесії (зміни однієї гри йдуть по черзі)"""
+    def wrapper(*args, **kwargs):
+        with current_session().lock:
+            return f(*args, **kwargs)
+    wrapper.__name__ = f.__name__
+    return wrapper
+
+def wants_async(data: Dict[str, Any]) -> bool:
+    flag = data.get('async', request.args.get('async'))
+    return str(flag).lower() in ('1', 'true', 'yes')
+
+def submit_job(fn):
+    """Поставити хід бота в пул і відповісти 202 з ідентифікатором задачі"""
+    job = sessions.submit(current_session(), fn)
+    response = jsonify(job.to_dict())
+    response.status_code = 202
+    response.headers['Location'] = f'/api/jobs/{job.id}'
+    return response
 
 # ==================== ROUTES ====================
 
@@ -440,7 +457,7 @@ def get_status():
         'status': 'running',
         'timestamp': datetime.now().isoformat(),
         'game_data': {
-            'is_playing': game_data['is_playing'],
+            'is_playing': game_manager.is_playing,
             'current_game': game_manager.get_board_state() if game_manager.current_board else None
         }
     })
@@ -462,6 +479,7 @@ def get_board():
 
 @app.route('/api/move', methods=['POST'])
 @handle_api_errors
+@session_locked
 def make_move():
     """Зробити хід"""
     try:
@@ -485,7 +503,7 @@ def make_move():
             return jsonify({'error': 'Недопустимий хід'}), 400
         
         # Виконуємо хід
-        game_manager.current_board.push(move)
+        game_manager.push_move(move)
         
         return jsonify({
             'success': True,
@@ -508,20 +526,15 @@ def make_move():
 def get_legal_moves():
     """Отримати список можливих ходів"""
     try:
-        moves = []
-        for move in game_manager.current_board.legal_moves:
-            moves.append({
-                'san': game_manager.current_board.san(move),
-                'uci': move.uci(),
-                'from': chess.square_name(move.from_square),
-                'to': chess.square_name(move.to_square)
-            })
+        board = game_manager.current_board
+        moves = game_manager.history.derived('legal_moves', lambda: _legal_moves_payload(board))
         return jsonify({'moves': moves})
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
 @app.route('/api/reset', methods=['POST'])
 @handle_api_errors
+@session_locked
 def reset_board():
     """Скинути дошку до початкової позиції"""
     game_manager.reset_game()
@@ -531,46 +544,49 @@ def reset_board():
         'fen': game_manager.current_board.fen()
     })
 
+def bot_move_payload(gm, bot_name: str):
+    """Хід ботом ``bot_name`` у грі ``gm``; повертає (payload, HTTP статус)"""
+    bot = make_agent(bot_name, gm.current_board.turn)
+    move = bot.choose_move(gm.current_board.copy())
+
+    if not move or not gm.current_board.is_legal(move):
+        return {'error': 'Бот не смог сделать ход'}, 400
+
+    san_move = gm.push_move(move)
+    board = gm.current_board
+    return {
+        'success': True,
+        'move': san_move,
+        'bot': bot_name,
+        'board': board_to_array(board),
+        'fen': board.fen(),
+        'turn': 'white' if board.turn == chess.WHITE else 'black',
+        'is_check': board.is_check(),
+        'is_checkmate': board.is_checkmate(),
+        'is_stalemate': board.is_stalemate(),
+        'is_game_over': board.is_game_over(),
+        'result': board.result() if board.is_game_over() else None
+    }, 200
+
 @app.route('/api/bot_move', methods=['POST'])
 @handle_api_errors
 def make_bot_move():
-    """Зробити хід ботом"""
+    """Зробити хід ботом (``async: true`` — через пул, результат у /api/jobs/<id>)"""
     try:
-        data = request.get_json() or {}
+        data = request.get_json(silent=True) or {}
         bot_name = data.get('bot', 'RandomBot')
-        
-        # Створюємо бота
-        bot = make_agent(bot_name, game_manager.current_board.turn)
-        
-        # Получаємо хід от бота
-        move = bot.choose_move(game_manager.current_board)
-        
-        if not move or not game_manager.current_board.is_legal(move):
-            return jsonify({'error': 'Бот не смог сделать ход'}), 400
-        
-        # Выполняем ход
-        san_move = game_manager.current_board.san(move)
-        game_manager.current_board.push(move)
-        
-        return jsonify({
-            'success': True,
-            'move': san_move,
-            'bot': bot_name,
-            'board': board_to_array(game_manager.current_board),
-            'fen': game_manager.current_board.fen(),
-            'turn': 'white' if game_manager.current_board.turn == chess.WHITE else 'black',
-            'is_check': game_manager.current_board.is_check(),
-            'is_checkmate': game_manager.current_board.is_checkmate(),
-            'is_stalemate': game_manager.current_board.is_stalemate(),
-            'is_game_over': game_manager.current_board.is_game_over(),
-            'result': game_manager.current_board.result() if game_manager.current_board.is_game_over() else None
-        })
+        if wants_async(data):
+            return submit_job(lambda gm: bot_move_payload(gm, bot_name))
+        with current_session().lock:
+            payload, status = bot_move_payload(game_manager._get_current_object(), bot_name)
+        return jsonify(payload), status
         
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
 @app.route('/api/load_fen', methods=['POST'])
 @handle_api_errors
+@session_locked
 def load_fen():
     """Завантажити позицію з FEN"""
     try:
@@ -596,55 +612,76 @@ def load_fen():
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
+def _legal_moves_payload(board: chess.Board) -> List[Dict[str, str]]:
+    """SAN + UCI для всіх легальних ходів позиції"""
+    return [
+        {
+            'san': board.san(mv),
+            'uci': mv.uci(),
+            'from': chess.square_name(mv.from_square),
+            'to': chess.square_name(mv.to_square),
+        }
+        for mv in board.legal_moves
+    ]
+
+def _stats_payload(history: BoardHistory) -> Dict[str, Any]:
+    """Побудувати відповідь /api/stats для поточної позиції (раз на версію)"""
+    board = history.board
+
+    # High-level text metrics (ThreatMap, Attacks, Leaders, King coeff)
+    metrics_lines = build_sidebar_metrics(board)
+
+    # Phase heuristic similar to PySide viewer
+    non_king_count = sum(1 for pc in board.piece_map().values() if pc.piece_type != chess.KING)
+    if non_king_count <= 12:
+        phase = 'endgame'
+    elif non_king_count <= 20:
+        phase = 'midgame'
+    else:
+        phase = 'opening'
+
+    # Legal moves count and list preview (SAN + UCI for current side)
+    legal = history.derived('legal_moves', lambda: _legal_moves_payload(board))
+
+    is_game_over = board.is_game_over()
+    return {
+        'fen': board.fen(),
+        'turn': 'white' if board.turn == chess.WHITE else 'black',
+        'is_check': board.is_check(),
+        'is_checkmate': board.is_checkmate(),
+        'is_stalemate': board.is_stalemate(),
+        'is_game_over': is_game_over,
+        'result': board.result() if is_game_over else None,
+        'phase': phase,
+        'metrics': metrics_lines,
+        'legal_moves_count': len(legal),
+        'legal_moves': legal,
+        'moves_san_list': history.san_list,
+        'moves_san': history.san_text,
+        'pgn': history.pgn(),
+        'move_count': len(board.move_stack),
+        'position_version': history.version,
+    }
+
 @app.route('/api/stats')
 @handle_api_errors
 def get_stats():
-    """Повернути розширені статистики та текстові метрики як у PySide в'ювері."""
+    """Повернути розширені статистики та текстові метрики як у PySide в'ювері.
+
+    Відповідь кешується на версію позиції; незмінні опитування з
+    ``If-None-Match`` отримують ``304 Not Modified``.
+    """
     try:
-        # High-level text metrics (ThreatMap, Attacks, Leaders, King coeff)
-        metrics_lines = build_sidebar_metrics(game_manager.current_board)
-
-        # Phase heuristic similar to PySide viewer
-        non_king_count = sum(1 for pc in game_manager.current_board.piece_map().values() if pc.piece_type != chess.KING)
-        if non_king_count <= 12:
-            phase = 'endgame'
-        elif non_king_count <= 20:
-            phase = 'midgame'
+        history = game_manager.history
+        etag = history.etag
+        if request.if_none_match.contains(etag):
+            response = app.response_class(status=304)
         else:
-            phase = 'opening'
-
-        # Legal moves count and list preview (SAN + UCI for current side)
-        legal = []
-        for mv in game_manager.current_board.legal_moves:
-            legal.append({
-                'san': game_manager.current_board.san(mv),
-                'uci': mv.uci(),
-                'from': chess.square_name(mv.from_square),
-                'to': chess.square_name(mv.to_square),
-            })
-
-        # Moves and PGN
-        san_list = _moves_san_list(game_manager.current_board)
-        san_text = _moves_san_string(game_manager.current_board)
-        pgn_text = _game_pgn_string(game_manager.current_board)
-
-        return jsonify({
-            'fen': game_manager.current_board.fen(),
-            'turn': 'white' if game_manager.current_board.turn == chess.WHITE else 'black',
-            'is_check': game_manager.current_board.is_check(),
-            'is_checkmate': game_manager.current_board.is_checkmate(),
-            'is_stalemate': game_manager.current_board.is_stalemate(),
-            'is_game_over': game_manager.current_board.is_game_over(),
-            'result': game_manager.current_board.result() if game_manager.current_board.is_game_over() else None,
-            'phase': phase,
-            'metrics': metrics_lines,
-            'legal_moves_count': len(legal),
-            'legal_moves': legal,
-            'moves_san_list': san_list,
-            'moves_san': san_text,
-            'pgn': pgn_text,
-            'move_count': len(game_manager.current_board.move_stack),
-        })
+            response = jsonify(history.derived('stats', lambda: _stats_payload(history)))
+        response.set_etag(etag)
+        response.headers['Cache-Control'] = 'no-cache'
+        response.headers['X-Position-Version'] = str(history.version)
+        return response
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
@@ -653,27 +690,14 @@ def get_stats():
 @app.route('/api/games', methods=['GET'])
 @handle_api_errors
 def get_games():
-    """Отримати список ігор"""
+    """Отримати список ігор (сторінками, найновіші першими)"""
     try:
-        # Завантажуємо існуючі ігри з файлів
-        runs = load_runs(RUNS_DIR)
-        games = []
-        
-        for run in runs:
-            for game in run.get('games', []):
-                games.append({
-                    'id': len(games) + 1,
-                    'result': game.get('result', '*'),
-                    'moves': len(game.get('moves', [])),
-                    'duration': game.get('duration_ms', 0),
-                    'modules': {
-                        'white': game.get('modules_w', [])[0] if game.get('modules_w') else 'Unknown',
-                        'black': game.get('modules_b', [])[0] if game.get('modules_b') else 'Unknown'
-                    },
-                    'movesList': game.get('moves', [])[:20]  # Перші 20 ходів
-                })
-        
-        return jsonify(games)
+        index = get_run_index(RUNS_DIR)
+        offset, limit = parse_page_args(request.args)
+        games = index.games(offset, limit)
+        response = jsonify(games)
+        response.headers['X-Total-Count'] = str(index.count_games())
+        return response
     except Exception as e:
         logger.error(f"Помилка завантаження ігор: {e}")
         return jsonify([])
@@ -683,21 +707,14 @@ def get_games():
 def get_modules():
     """Отримати статистику модулів"""
     try:
-        runs = load_runs(RUNS_DIR)
-        module_stats = {}
-        
-        for run in runs:
-            for game in run.get('games', []):
-                for module in game.get('modules_w', []) + game.get('modules_b', []):
-                    module_stats[module] = module_stats.get(module, 0) + 1
-        
-        return jsonify(module_stats)
+        return jsonify(get_run_index(RUNS_DIR).module_counts())
     except Exception as e:
         logger.error(f"Помилка завантаження модулів: {e}")
         return jsonify({})
 
 @app.route('/api/game/start', methods=['POST'])
 @handle_api_errors
+@session_locked
 def start_game():
     """Почати нову гру"""
     try:
@@ -711,7 +728,7 @@ def start_game():
         
         # Скидаємо гру
         game_manager.reset_game()
-        game_data['is_playing'] = True
+        game_manager.is_playing = True
         game_manager.start_time = time.time()
         
         return jsonify({
@@ -724,75 +741,110 @@ def start_game():
         logger.error(f"Помилка початку гри: {e}")
         return jsonify({'error': str(e)}), 500
 
+def game_move_payload(gm, fen: Optional[str] = None):
+    """Наступний хід агента гри ``gm`` (або позиції ``fen``); повертає (payload, HTTP статус)"""
+    # Якщо передано FEN, використовуємо його замість поточної гри
+    if fen is not None:
+        temp_board = chess.Board(fen)
+        if not temp_board.is_game_over():
+            # Виконуємо хід ботом
+            mover_color = temp_board.turn
+            agent = gm.white_agent if mover_color == chess.WHITE else gm.black_agent
+            
+            if agent:
+                move = agent.choose_move(temp_board)
+                if move and temp_board.is_legal(move):
+                    san_move = temp_board.san(move)
+                    temp_board.push(move)
+                    
+                    return {
+                        'success': True,
+                        'move': san_move,
+                        'fen': temp_board.fen(),
+                        'is_game_over': temp_board.is_game_over(),
+                        'result': temp_board.result() if temp_board.is_game_over() else None,
+                        'bot': 'WhiteBot' if mover_color == chess.WHITE else 'BlackBot',
+                        'confidence': 0.85  # Приклад значення
+                    }, 200
+        
+        return {'error': 'Не вдалося зробити хід'}, 400
+    
+    # Стандартна логіка для активної гри
+    if not gm.is_playing:
+        return {'error': 'Гра не активна'}, 400
+    
+    move_result = gm.make_move()
+    if not move_result:
+        return {'error': 'Не вдалося зробити хід'}, 400
+    
+    # Якщо гра закінчена, зберігаємо результат
+    if move_result['is_game_over']:
+        gm.is_playing = False
+        game_data['game_history'].append({
+            'id': len(game_data['game_history']) + 1,
+            'result': move_result['result'],
+            'moves': gm.game_moves,
+            'modules': gm.game_modules,
+            'duration': int((time.time() - gm.start_time) * 1000) if gm.start_time else 0,
+            'timestamp': datetime.now().isoformat()
+        })
+    
+    return {
+        'success': True,
+        'move_result': move_result,
+        'board_state': gm.get_board_state()
+    }, 200
+
 @app.route('/api/game/move', methods=['POST'])
 @handle_api_errors
 def make_game_move():
-    """Зробити хід в грі"""
+    """Зробити хід в грі (``async: true`` — через пул, результат у /api/jobs/<id>)"""
     try:
-        data = request.get_json() or {}
-        
-        # Якщо передано FEN, використовуємо його замість поточної гри
-        if 'fen' in data:
-            temp_board = chess.Board(data['fen'])
-            if not temp_board.is_game_over():
-                # Виконуємо хід ботом
-                mover_color = temp_board.turn
-                agent = game_manager.white_agent if mover_color == chess.WHITE else game_manager.black_agent
-                
-                if agent:
-                    move = agent.choose_move(temp_board)
-                    if move and temp_board.is_legal(move):
-                        san_move = temp_board.san(move)
-                        temp_board.push(move)
-                        
-                        return jsonify({
-                            'success': True,
-                            'move': san_move,
-                            'fen': temp_board.fen(),
-                            'is_game_over': temp_board.is_game_over(),
-                            'result': temp_board.result() if temp_board.is_game_over() else None,
-                            'bot': 'WhiteBot' if mover_color == chess.WHITE else 'BlackBot',
-                            'confidence': 0.85  # Приклад значення
-                        })
-            
-            return jsonify({'error': 'Не вдалося зробити хід'}), 400
-        
-        # Стандартна логіка для активної гри
-        if not game_data['is_playing']:
-            return jsonify({'error': 'Гра не активна'}), 400
-        
-        move_result = game_manager.make_move()
-        if not move_result:
-            return jsonify({'error': 'Не вдалося зробити хід'}), 400
-        
-        # Якщо гра закінчена, зберігаємо результат
-        if move_result['is_game_over']:
-            game_data['is_playing'] = False
-            game_data['game_history'].append({
-                'id': len(game_data['game_history']) + 1,
-                'result': move_result['result'],
-                'moves': game_manager.game_moves,
-                'modules': game_manager.game_modules,
-                'duration': int((time.time() - game_manager.start_time) * 1000) if game_manager.start_time else 0,
-                'timestamp': datetime.now().isoformat()
-            })
-        
-        return jsonify({
-            'success': True,
-            'move_result': move_result,
-            'board_state': game_manager.get_board_state()
-        })
+        data = request.get_json(silent=True) or {}
+        fen = data.get('fen')
+        if wants_async(data):
+            return submit_job(lambda gm: game_move_payload(gm, fen))
+        with current_session().lock:
+            payload, status = game_move_payload(game_manager._get_current_object(), fen)
+        return jsonify(payload), status
         
     except Exception as e:
         logger.error(f"Помилка виконання ходу: {e}")
         return jsonify({'error': str(e)}), 500
 
+# ==================== SESSIONS & JOBS API ====================
+
+@app.route('/api/sessions', methods=['POST'])
+@handle_api_errors
+def create_session():
+    """Створити нову ігрову сесію"""
+    session = sessions.create()
+    return jsonify({'session': session.id, 'active_sessions': len(sessions)}), 201
+
+@app.route('/api/sessions/<session_id>', methods=['DELETE'])
+@handle_api_errors
+def delete_session(session_id):
+    """Видалити ігрову сесію"""
+    if not sessions.drop(session_id):
+        return jsonify({'error': 'Сесію не знайдено'}), 404
+    return jsonify({'success': True})
+
+@app.route('/api/jobs/<job_id>', methods=['GET'])
+@handle_api_errors
+def get_job(job_id):
+    """Стан фонового ходу бота: pending | running | done | error"""
+    job = sessions.job(job_id)
+    if job is None:
+        return jsonify({'error': 'Задачу не знайдено'}), 404
+    return jsonify(job.to_dict())
+
 @app.route('/api/game/stop', methods=['POST'])
 @handle_api_errors
+@session_locked
 def stop_game():
     """Зупинити гру"""
     try:
-        game_data['is_playing'] = False
+        game_manager.is_playing = False
         return jsonify({'success': True, 'message': 'Гра зупинена'})
     except Exception as e:
         logger.error(f"Помилка зупинки гри: {e}")
@@ -800,10 +852,11 @@ def stop_game():
 
 @app.route('/api/game/reset', methods=['POST'])
 @handle_api_errors
+@session_locked
 def reset_game():
     """Скинути гру"""
     try:
-        game_data['is_playing'] = False
+        game_manager.is_playing = False
         game_manager.reset_game()
         return jsonify({'success': True, 'message': 'Гра скинута'})
     except Exception as e:
@@ -1184,6 +1237,7 @@ def signal_handler(signum, frame):
     """Обробник сигналів для graceful shutdown"""
     logger.info(f"Отримано сигнал {signum}, закриваємо сервер...")
     server_shutdown.set()
+    sessions.close()
     
     # Логуємо фінальну статистику
     log_connection_stats()
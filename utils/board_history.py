@@ -0,0 +1,167 @@
+"""Incrementally maintained SAN/PGN history for a live board.
+
+The web dashboard polls the current game about once a second.  Replaying
+``move_stack`` to rebuild the SAN list and PGN on every poll costs O(moves)
+per request, so :class:`BoardHistory` keeps that text up to date as moves
+are pushed and bumps a :attr:`~BoardHistory.version` counter on every
+change.  Data derived from the position (legal move lists, sidebar metrics,
+whole API payloads) can be memoised per version with
+:meth:`~BoardHistory.derived`, and :attr:`~BoardHistory.etag` lets HTTP
+handlers answer unchanged polls with ``304 Not Modified``.
+
+Code that pushes onto the board directly is tolerated: :meth:`sync` notices
+new moves and records only those, and falls back to a full rebuild when
+moves were popped or the board was replaced.
+"""
+
+from __future__ import annotations
+
+import logging
+logger = logging.getLogger(__name__)
+
+import itertools
+import os
+import threading
+from typing import Any, Callable, Dict, List, Optional
+
+import chess
+
+_EPOCH = f"{os.getpid():x}{id(object()):x}"
+_IDS = itertools.count(1)
+
+
+def _pgn_result(board: chess.Board) -> str:
+    return board.result() if board.is_game_over() else "*"
+
+
+class BoardHistory:
+    """SAN history, PGN text and per-position caches for one game."""
+
+    def __init__(self, board: Optional[chess.Board] = None) -> None:
+        self._lock = threading.RLock()
+        self._tag = f"{_EPOCH}-{next(_IDS)}"
+        self.version = 0
+        self.set_board(board if board is not None else chess.Board())
+
+    # ------------------------------------------------------------------
+    @property
+    def board(self) -> chess.Board:
+        return self._board
+
+    def set_board(self, board: chess.Board) -> None:
+        """Track ``board`` from now on, rebuilding the history once."""
+        with self._lock:
+            self._board = board
+            self._rebuild()
+
+    def _rebuild(self) -> None:
+        board = self._board
+        self._shadow = board.root()
+        self._root_fen = self._shadow.fen()
+        self._san: List[str] = []
+        self._text = ""
+        self._text_lens: List[int] = []
+        for move in board.move_stack:
+            self._record(move)
+        self._bump()
+
+    def _bump(self) -> None:
+        self.version += 1
+        self._derived: Dict[str, Any] = {}
+
+    def _record(self, move: chess.Move) -> str:
+        shadow = self._shadow
+        san = shadow.san(move)
+        if shadow.turn == chess.WHITE:
+            token = f"{shadow.fullmove_number}. {san}"
+        elif not self._san:
+            token = f"{shadow.fullmove_number}... {san}"
+        else:
+            token = san
+        shadow.push(move)
+        self._san.append(san)
+        self._text_lens.append(len(self._text))
+        self._text = f"{self._text} {token}" if self._text else token
+        return san
+
+    def sync(self) -> bool:
+        """Catch up with moves pushed on the board behind our back.
+
+        Returns ``True`` when the history changed.
+        """
+        with self._lock:
+            stack = self._board.move_stack
+            n = len(self._san)
+            if len(stack) == n and (n == 0 or stack[-1] == self._shadow.peek()):
+                return False
+            if len(stack) > n and (n == 0 or stack[n - 1] == self._shadow.peek()):
+                for move in stack[n:]:
+                    self._record(move)
+                self._bump()
+            else:
+                self._rebuild()
+            return True
+
+    # ------------------------------------------------------------------
+    def push(self, move: chess.Move) -> str:
+        """Push ``move`` on the board and return its SAN."""
+        with self._lock:
+            self.sync()
+            san = self._record(move)
+            self._board.push(move)
+            self._bump()
+            return san
+
+    def pop(self) -> chess.Move:
+        """Undo the last move on the board."""
+        with self._lock:
+            self.sync()
+            move = self._board.pop()
+            self._shadow.pop()
+            self._san.pop()
+            self._text = self._text[: self._text_lens.pop()]
+            self._bump()
+            return move
+
+    # ------------------------------------------------------------------
+    @property
+    def san_list(self) -> List[str]:
+        self.sync()
+        return list(self._san)
+
+    @property
+    def san_text(self) -> str:
+        """SAN with move numbers, e.g. ``'1. e4 e5 2. Nf3'``."""
+        self.sync()
+        return self._text
+
+    def pgn(self) -> str:
+        """Minimal PGN for the game, memoised per position version."""
+        def build() -> str:
+            res = _pgn_result(self._board)
+            headers = (
+                f"[Event \"WebViewer\"]\n[Site \"Local\"]\n"
+                f"[White \"Web\"]\n[Black \"Web\"]\n"
+                f"[Result \"{res}\"]\n"
+            )
+            if self._root_fen != chess.STARTING_FEN:
+                headers += f"[SetUp \"1\"]\n[FEN \"{self._root_fen}\"]\n"
+            return f"{headers}\n{self._text} {res}\n"
+        return self.derived("pgn", build)
+
+    def derived(self, key: str, build: Callable[[], Any]) -> Any:
+        """Return ``build()`` computed at most once per position version."""
+        with self._lock:
+            self.sync()
+            if key not in self._derived:
+                self._derived[key] = build()
+            return self._derived[key]
+
+    @property
+    def etag(self) -> str:
+        """Entity tag identifying this game at its current version."""
+        self.sync()
+        return f"{self._tag}-{self.version}"
+
+
+__all__ = ["BoardHistory"]
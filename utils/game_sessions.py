@@ -0,0 +1,241 @@
+"""Session-keyed game registry and bot-move worker pool for the web servers.
+
+Each browser (or API client) gets its own :class:`GameSession` holding a
+game manager and a lock that serialises changes to that game.  Clients name
+their session with an ``X-Session-Id`` header, a ``session`` query argument
+or a ``session`` field in the JSON body; requests without one share the
+``default`` session, which keeps single-viewer setups working unchanged.
+
+Bot moves can run on the registry's worker pool instead of inside the HTTP
+request: :meth:`SessionRegistry.submit` returns a :class:`BotJob` that the
+client polls until it is ``done`` or ``error``.  The job holds the session
+lock while it thinks, so moves within one game stay ordered while different
+games proceed in parallel.
+
+Sessions idle for longer than ``ttl_s`` (and without a running job) are
+evicted, as are finished jobs older than :data:`JOB_TTL_S`.
+"""
+
+from __future__ import annotations
+
+import logging
+logger = logging.getLogger(__name__)
+
+import os
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Optional, Tuple
+
+DEFAULT_SESSION = "default"
+SESSION_TTL_S = float(os.getenv("CHESS_WEB_SESSION_TTL_S", "1800"))
+MAX_SESSIONS = int(os.getenv("CHESS_WEB_MAX_SESSIONS", "64"))
+BOT_WORKERS = int(os.getenv("CHESS_WEB_BOT_WORKERS", "8"))
+JOB_TTL_S = float(os.getenv("CHESS_WEB_JOB_TTL_S", "300"))
+
+# A job body receives the session's game manager and returns the JSON
+# payload plus the HTTP status it would have produced synchronously.
+JobFn = Callable[[Any], Tuple[Dict[str, Any], int]]
+
+
+@dataclass
+class GameSession:
+    """One game served to one client."""
+
+    id: str
+    manager: Any
+    lock: threading.RLock = field(default_factory=threading.RLock)
+    last_used: float = field(default_factory=time.monotonic)
+    running_jobs: int = 0
+
+
+@dataclass
+class BotJob:
+    """A bot move computed in the background for one session."""
+
+    id: str
+    session_id: str
+    status: str = "pending"  # pending | running | done | error
+    result: Optional[Dict[str, Any]] = None
+    http_status: int = 200
+    error: Optional[str] = None
+    created: float = field(default_factory=time.monotonic)
+    finished: Optional[float] = None
+
+    def to_dict(self) -> Dict[str, Any]:
+        data: Dict[str, Any] = {"job_id": self.id, "session": self.session_id, "status": self.status}
+        if self.status == "done":
+            data["result"] = self.result
+            data["http_status"] = self.http_status
+        elif self.status == "error":
+            data["error"] = self.error
+        return data
+
+
+class SessionRegistry:
+    """Thread-safe map of session id -> :class:`GameSession`.
+
+    Parameters
+    ----------
+    factory:
+        Zero-argument callable creating a fresh game manager.
+    ttl_s:
+        Idle time after which a session is evicted.
+    max_sessions:
+        Soft cap; creating a session beyond it evicts the least recently
+        used idle sessions first.
+    workers:
+        Size of the bot-move thread pool.
+    """
+
+    def __init__(
+        self,
+        factory: Callable[[], Any],
+        *,
+        ttl_s: float = SESSION_TTL_S,
+        max_sessions: int = MAX_SESSIONS,
+        workers: int = BOT_WORKERS,
+    ) -> None:
+        self._factory = factory
+        self.ttl_s = ttl_s
+        self.max_sessions = max_sessions
+        self._sessions: Dict[str, GameSession] = {}
+        self._jobs: Dict[str, BotJob] = {}
+        self._lock = threading.Lock()
+        self._last_sweep = time.monotonic()
+        self._executor = ThreadPoolExecutor(max_workers=max(1, workers), thread_name_prefix="bot-move")
+
+    # ------------------------------------------------------------------
+    def get(self, session_id: Optional[str] = None) -> GameSession:
+        """Return the session ``session_id``, creating it if needed."""
+        sid = session_id or DEFAULT_SESSION
+        now = time.monotonic()
+        with self._lock:
+            if now - self._last_sweep > min(60.0, self.ttl_s / 4):
+                self._sweep_locked(now)
+            session = self._sessions.get(sid)
+            if session is None:
+                if len(self._sessions) >= self.max_sessions:
+                    self._evict_lru_locked()
+                session = self._sessions[sid] = GameSession(sid, self._factory())
+                logger.info("Created game session %s (%d active)", sid, len(self._sessions))
+            session.last_used = now
+            return session
+
+    def create(self) -> GameSession:
+        """Create a session with a fresh random id."""
+        return self.get(uuid.uuid4().hex)
+
+    def drop(self, session_id: str) -> bool:
+        """Forget ``session_id``; return ``False`` if it did not exist."""
+        with self._lock:
+            session = self._sessions.pop(session_id, None)
+            if session is not None:
+                self._drop_jobs_locked({session_id})
+            return session is not None
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._sessions)
+
+    def __contains__(self, session_id: str) -> bool:
+        with self._lock:
+            return session_id in self._sessions
+
+    # ------------------------------------------------------------------
+    def submit(self, session: GameSession, fn: JobFn) -> BotJob:
+        """Run ``fn(session.manager)`` on the worker pool under the session lock."""
+        job = BotJob(uuid.uuid4().hex, session.id)
+        with self._lock:
+            self._jobs[job.id] = job
+            session.running_jobs += 1
+        self._executor.submit(self._run_job, session, job, fn)
+        return job
+
+    def _run_job(self, session: GameSession, job: BotJob, fn: JobFn) -> None:
+        try:
+            with session.lock:
+                job.status = "running"
+                payload, status = fn(session.manager)
+            job.result, job.http_status = payload, status
+            job.status = "done"
+        except Exception as exc:
+            logger.error("Bot job %s for session %s failed: %s", job.id, session.id, exc, exc_info=True)
+            job.error = str(exc)
+            job.status = "error"
+        finally:
+            job.finished = time.monotonic()
+            with self._lock:
+                session.running_jobs -= 1
+                session.last_used = job.finished
+
+    def job(self, job_id: str) -> Optional[BotJob]:
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    # ------------------------------------------------------------------
+    def evict_idle(self) -> int:
+        """Evict idle sessions and stale jobs now; return sessions evicted."""
+        with self._lock:
+            return self._sweep_locked(time.monotonic())
+
+    def _sweep_locked(self, now: float) -> int:
+        self._last_sweep = now
+        expired = {
+            sid for sid, s in self._sessions.items()
+            if sid != DEFAULT_SESSION and not s.running_jobs and now - s.last_used > self.ttl_s
+        }
+        for sid in expired:
+            del self._sessions[sid]
+        self._drop_jobs_locked(expired)
+        for jid, job in list(self._jobs.items()):
+            if job.finished is not None and now - job.finished > JOB_TTL_S:
+                del self._jobs[jid]
+        if expired:
+            logger.info("Evicted %d idle game session(s)", len(expired))
+        return len(expired)
+
+    def _evict_lru_locked(self) -> None:
+        idle = sorted(
+            (s for sid, s in self._sessions.items() if sid != DEFAULT_SESSION and not s.running_jobs),
+            key=lambda s: s.last_used,
+        )
+        excess = len(self._sessions) - self.max_sessions + 1
+        victims = {s.id for s in idle[:max(0, excess)]}
+        for sid in victims:
+            del self._sessions[sid]
+        self._drop_jobs_locked(victims)
+        if len(self._sessions) >= self.max_sessions:
+            logger.warning("Session limit %d exceeded; all sessions are busy", self.max_sessions)
+
+    def _drop_jobs_locked(self, session_ids) -> None:
+        if not session_ids:
+            return
+        for jid, job in list(self._jobs.items()):
+            if job.session_id in session_ids and job.finished is not None:
+                del self._jobs[jid]
+
+    def close(self) -> None:
+        """Stop accepting jobs; running jobs finish in the background."""
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+
+def session_id_from(request) -> Optional[str]:
+    """Extract the session id from a Flask ``request``."""
+    sid = request.headers.get("X-Session-Id") or request.args.get("session")
+    if not sid and request.is_json:
+        body = request.get_json(silent=True)
+        if isinstance(body, dict):
+            sid = body.get("session")
+    return str(sid) if sid else None
+
+
+__all__ = [
+    "BotJob",
+    "DEFAULT_SESSION",
+    "GameSession",
+    "SessionRegistry",
+    "session_id_from",
+]
@@ -7,6 +7,8 @@ import json
 from pathlib import Path
 from typing import Any, Dict, List
 
+from utils.run_archive import ARCHIVE_SUFFIX, iter_archive_runs
+
 REQUIRED_KEYS = {"moves", "fens", "modules_w", "modules_b"}
 DEFAULT_RESULT = "*"
 
@@ -16,7 +18,9 @@ def load_runs(path: str) -> List[Dict[str, Any]]:
 
     Each JSON file must contain the keys defined in :data:`REQUIRED_KEYS`.
     The returned list contains dictionaries with those values plus a
-    ``game_id`` derived from the file name (without extension).
+    ``game_id`` derived from the file name (without extension).  Games stored
+    in run archives (``*.crun``, see :mod:`utils.run_archive`) are appended
+    after the JSON runs.
 
     Parameters
     ----------
@@ -61,4 +65,8 @@ def load_runs(path: str) -> List[Dict[str, Any]]:
             }
         )
 
+    for archive in sorted(base_path.glob(f"*{ARCHIVE_SUFFIX}")):
+        for game in iter_archive_runs(archive):
+            runs.append({key: game[key] for key in ("game_id", "moves", "fens", "modules_w", "modules_b", "result")})
+
     return runs
\ No newline at end of file
@@ -0,0 +1,467 @@
+"""Compact columnar archive for game runs.
+
+Run JSON files store every game as pretty-printed SAN moves plus a FEN per
+ply, which makes large ``runs/`` directories slow to parse.  A run archive
+(``*.crun``) stores the same games column-wise:
+
+* every ply is a 16-bit move code (see :func:`encode_move`);
+* module/reason strings and game ids are dictionary-encoded into 32-bit ids;
+* games are written in chunks, each self-describing, so the file is
+  append-only and a torn final chunk (from a crash) is simply ignored.
+
+Layout (integers in native byte order, little-endian on supported platforms)::
+
+    file   := MAGIC chunk*
+    chunk  := "CRCK" u32 body_len u32 n_games u32 n_plies u32 n_mw u32 n_mb
+              u32 n_strings u32 strings_len body
+    body   := u32 str_len[n_strings]  bytes strings[strings_len]  pad4
+              u32 game_id[n_games]  u32 start_fen[n_games]
+              u32 duration_ms[n_games]  u8 result[n_games]  pad4
+              u32 ply_off[n_games+1]  u32 mw_off[n_games+1]  u32 mb_off[n_games+1]
+              u32 modules_w[n_mw]  u32 modules_b[n_mb]  u16 moves[n_plies]  pad4
+
+``start_fen`` is a string id or ``NO_STRING`` for the standard start
+position.  Strings introduced by a chunk extend one archive-wide dictionary.
+
+:class:`RunArchiveReader` memory-maps the file; :meth:`~RunArchiveReader.chunks`
+exposes the columns as zero-copy :class:`memoryview` arrays and
+:meth:`~RunArchiveReader.iter_games` streams decoded games.  Existing JSON runs
+can be converted with::
+
+    python -m utils.run_archive runs/ runs/games.crun
+
+The run loaders read ``*.json`` and ``*.crun`` from the same directory, so
+when the archive is written into the runs directory every converted JSON
+file is moved to ``<runs>/converted/`` (outside the loaders' glob) and each
+game is counted once.  Games whose ``game_id`` is already in the archive are
+skipped, so converting again is a no-op.
+"""
+
+from __future__ import annotations
+
+import logging
+logger = logging.getLogger(__name__)
+
+import argparse
+import json
+import mmap
+import os
+import struct
+from array import array
+from dataclasses import dataclass
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Container, Dict, Iterator, List, Mapping, Optional, Sequence, Union
+
+import chess
+
+MAGIC = b"CRUN\x00\x01\r\n"
+CHUNK_MAGIC = b"CRCK"
+ARCHIVE_SUFFIX = ".crun"
+ARCHIVE_NAME = "games.crun"
+# Subdirectory of the runs directory receiving JSON files already archived.
+CONVERTED_DIR = "converted"
+NO_STRING = 0xFFFFFFFF
+# Games buffered by :class:`RunArchiveWriter` before a chunk is written.
+CHUNK_GAMES = int(os.getenv("CHESS_ARCHIVE_CHUNK_GAMES", "256"))
+
+_CHUNK_HEADER = struct.Struct("<4sIIIIIII")
+_RESULTS = ["*", "1-0", "0-1", "1/2-1/2"]
+_RESULT_CODES = {r: i for i, r in enumerate(_RESULTS)}
+_PROMOTIONS = (None, chess.KNIGHT, chess.BISHOP, chess.ROOK, chess.QUEEN)
+
+
+def encode_move(move: chess.Move) -> int:
+    """Pack ``move`` into 15 bits: from | to << 6 | promotion << 12.
+
+    The null move encodes as ``0`` (``a1a1`` is never a legal move).
+    """
+    if not move:
+        return 0
+    promo = _PROMOTIONS.index(move.promotion) if move.promotion else 0
+    return move.from_square | (move.to_square << 6) | (promo << 12)
+
+
+def decode_move(code: int) -> chess.Move:
+    """Inverse of :func:`encode_move`."""
+    if code == 0:
+        return chess.Move.null()
+    return chess.Move(code & 63, (code >> 6) & 63, _PROMOTIONS[(code >> 12) & 7])
+
+
+def _pad4(buf: bytearray) -> None:
+    buf.extend(b"\x00" * (-len(buf) % 4))
+
+
+def _u32(values) -> bytes:
+    return array("I", values).tobytes()
+
+
+class RunArchiveWriter:
+    """Append games to a run archive in chunks.
+
+    Games are buffered and written ``chunk_games`` at a time; call
+    :meth:`flush` (or use the writer as a context manager) to write the
+    remainder.  Opening an existing archive continues its string dictionary.
+    """
+
+    def __init__(self, path: Union[str, os.PathLike], *, chunk_games: int = CHUNK_GAMES) -> None:
+        self.path = Path(path)
+        self.chunk_games = max(1, chunk_games)
+        self._strings: Dict[str, int] = {}
+        self._new_strings: List[str] = []
+        self._pending: List[tuple] = []
+        if self.path.exists() and self.path.stat().st_size > 0:
+            with RunArchiveReader(self.path) as reader:
+                for i, s in enumerate(reader.strings):
+                    self._strings[s] = i
+                end = reader.valid_size
+            if end < self.path.stat().st_size:
+                logger.warning("Truncating torn chunk at end of %s", self.path)
+                os.truncate(self.path, end)
+            self._fh = open(self.path, "ab")
+        else:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            self._fh = open(self.path, "wb")
+            self._fh.write(MAGIC)
+            self._fh.flush()
+
+    def _sid(self, s: Any) -> int:
+        s = s if isinstance(s, str) else str(s)
+        sid = self._strings.get(s)
+        if sid is None:
+            sid = self._strings[s] = len(self._strings)
+            self._new_strings.append(s)
+        return sid
+
+    def append_game(
+        self,
+        moves: Sequence[chess.Move],
+        modules_w: Sequence[Any] = (),
+        modules_b: Sequence[Any] = (),
+        result: str = "*",
+        *,
+        game_id: str = "",
+        start_fen: Optional[str] = None,
+        duration_ms: int = 0,
+    ) -> None:
+        """Buffer one game; ``moves`` are :class:`chess.Move` objects."""
+        fen_id = NO_STRING if start_fen in (None, chess.STARTING_FEN) else self._sid(start_fen)
+        self._pending.append((
+            self._sid(game_id),
+            fen_id,
+            max(0, int(duration_ms or 0)),
+            _RESULT_CODES.get(result, 0),
+            [encode_move(m) for m in moves],
+            [self._sid(m) for m in modules_w],
+            [self._sid(m) for m in modules_b],
+        ))
+        if len(self._pending) >= self.chunk_games:
+            self.flush()
+
+    def append_run(self, data: Mapping[str, Any], *, game_id: str = "") -> None:
+        """Buffer a game given as a run JSON object (SAN or UCI moves)."""
+        board = chess.Board(data["start_fen"]) if data.get("start_fen") else chess.Board()
+        start_fen = board.fen()
+        moves: List[chess.Move] = []
+        for text in data.get("moves", []):
+            try:
+                move = board.parse_san(text)
+            except ValueError:
+                move = chess.Move.from_uci(text)
+            board.push(move)
+            moves.append(move)
+        self.append_game(
+            moves,
+            data.get("modules_w", []),
+            data.get("modules_b", []),
+            data.get("result") or "*",
+            game_id=game_id,
+            start_fen=start_fen,
+            duration_ms=data.get("duration_ms", 0),
+        )
+
+    def flush(self) -> None:
+        """Write buffered games as one chunk."""
+        if not self._pending:
+            return
+        games = self._pending
+        strings = [s.encode("utf-8") for s in self._new_strings]
+        body = bytearray()
+        body += _u32([len(s) for s in strings])
+        for s in strings:
+            body += s
+        _pad4(body)
+        body += _u32([g[0] for g in games])
+        body += _u32([g[1] for g in games])
+        body += _u32([g[2] for g in games])
+        body += bytes(g[3] for g in games)
+        _pad4(body)
+        offsets = {4: [0], 5: [0], 6: [0]}
+        for g in games:
+            for col in (4, 5, 6):
+                offsets[col].append(offsets[col][-1] + len(g[col]))
+        for col in (4, 5, 6):
+            body += _u32(offsets[col])
+        body += _u32([sid for g in games for sid in g[5]])
+        body += _u32([sid for g in games for sid in g[6]])
+        body += array("H", [code for g in games for code in g[4]]).tobytes()
+        _pad4(body)
+        header = _CHUNK_HEADER.pack(
+            CHUNK_MAGIC, len(body), len(games), offsets[4][-1], offsets[5][-1],
+            offsets[6][-1], len(strings), sum(len(s) for s in strings),
+        )
+        self._fh.write(header + body)
+        self._fh.flush()
+        self._pending = []
+        self._new_strings = []
+
+    def close(self) -> None:
+        if self._fh.closed:
+            return
+        self.flush()
+        self._fh.close()
+
+    def __enter__(self) -> "RunArchiveWriter":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+
+@dataclass
+class ArchiveChunk:
+    """Zero-copy column views of one chunk."""
+
+    n_games: int
+    game_id: memoryview
+    start_fen: memoryview
+    duration_ms: memoryview
+    result: memoryview
+    ply_off: memoryview
+    mw_off: memoryview
+    mb_off: memoryview
+    modules_w: memoryview
+    modules_b: memoryview
+    moves: memoryview  # uint16 move codes
+
+
+class RunArchiveReader:
+    """Memory-mapped reader for run archives."""
+
+    def __init__(self, path: Union[str, os.PathLike]) -> None:
+        self.path = Path(path)
+        self._fh = open(self.path, "rb")
+        size = os.fstat(self._fh.fileno()).st_size
+        self._mm = mmap.mmap(self._fh.fileno(), 0, access=mmap.ACCESS_READ) if size else None
+        self._view = memoryview(self._mm) if self._mm is not None else memoryview(b"")
+        if bytes(self._view[: len(MAGIC)]) != MAGIC:
+            self.close()
+            raise ValueError(f"{self.path} is not a run archive")
+        self.strings: List[str] = []
+        self._chunks: List[ArchiveChunk] = []
+        self.valid_size = self._index()
+
+    def _index(self) -> int:
+        view, pos, size = self._view, len(MAGIC), len(self._view)
+        hsize = _CHUNK_HEADER.size
+        while pos + hsize <= size:
+            magic, body_len, n, n_plies, n_mw, n_mb, n_str, str_len = _CHUNK_HEADER.unpack_from(view, pos)
+            if magic != CHUNK_MAGIC or pos + hsize + body_len > size:
+                break
+            off = pos + hsize
+
+            def take(count: int, fmt: str, width: int):
+                nonlocal off
+                col = view[off: off + count * width].cast(fmt)
+                off += count * width
+                return col
+
+            lens = take(n_str, "I", 4)
+            for ln in lens:
+                self.strings.append(bytes(view[off: off + ln]).decode("utf-8"))
+                off += ln
+            off += -(off - pos - hsize) % 4
+            chunk_cols = [take(n, "I", 4), take(n, "I", 4), take(n, "I", 4), take(n, "B", 1)]
+            off += -(off - pos - hsize) % 4
+            chunk_cols += [take(n + 1, "I", 4), take(n + 1, "I", 4), take(n + 1, "I", 4)]
+            chunk_cols += [take(n_mw, "I", 4), take(n_mb, "I", 4), take(n_plies, "H", 2)]
+            self._chunks.append(ArchiveChunk(n, *chunk_cols))
+            pos += hsize + body_len
+        if pos < size:
+            logger.warning("Ignoring %d trailing bytes in %s", size - pos, self.path)
+        return pos
+
+    def __len__(self) -> int:
+        return sum(c.n_games for c in self._chunks)
+
+    def game_ids(self) -> List[str]:
+        """``game_id`` of every game, in archive order."""
+        strings = self.strings
+        return [strings[sid] for chunk in self._chunks for sid in chunk.game_id]
+
+    def chunks(self) -> List[ArchiveChunk]:
+        """Column views of every chunk, valid until :meth:`close`."""
+        return list(self._chunks)
+
+    def iter_games(
+        self,
+        *,
+        san: bool = False,
+        fens: bool = False,
+        indices: Optional[Container[int]] = None,
+    ) -> Iterator[Dict[str, Any]]:
+        """Yield games as dictionaries.
+
+        Every game has ``game_id``, ``moves_uci``, ``modules_w``,
+        ``modules_b``, ``result``, ``duration_ms`` and ``start_fen``.  With
+        ``san=True`` the game is replayed to add ``moves`` (SAN); with
+        ``fens=True`` a ``fens`` list (position after each ply) is added.
+        ``indices`` restricts the output to those archive-wide game numbers.
+        """
+        strings = self.strings
+        base = 0
+        for chunk in self._chunks:
+            first = base
+            base += chunk.n_games
+            for i in range(chunk.n_games):
+                if indices is not None and first + i not in indices:
+                    continue
+                fen_id = chunk.start_fen[i]
+                start_fen = chess.STARTING_FEN if fen_id == NO_STRING else strings[fen_id]
+                codes = chunk.moves[chunk.ply_off[i]: chunk.ply_off[i + 1]]
+                moves = [decode_move(c) for c in codes]
+                game: Dict[str, Any] = {
+                    "game_id": strings[chunk.game_id[i]],
+                    "moves_uci": [m.uci() for m in moves],
+                    "modules_w": [strings[s] for s in chunk.modules_w[chunk.mw_off[i]: chunk.mw_off[i + 1]]],
+                    "modules_b": [strings[s] for s in chunk.modules_b[chunk.mb_off[i]: chunk.mb_off[i + 1]]],
+                    "result": _RESULTS[chunk.result[i]],
+                    "duration_ms": chunk.duration_ms[i],
+                    "start_fen": start_fen,
+                }
+                if san or fens:
+                    board = chess.Board(start_fen)
+                    san_list: List[str] = []
+                    fen_list: List[str] = []
+                    for move in moves:
+                        if san:
+                            san_list.append(board.san(move))
+                        board.push(move)
+                        if fens:
+                            fen_list.append(board.fen())
+                    if san:
+                        game["moves"] = san_list
+                    if fens:
+                        game["fens"] = fen_list
+                yield game
+
+    def close(self) -> None:
+        for chunk in getattr(self, "_chunks", ()):
+            for col in vars(chunk).values():
+                if isinstance(col, memoryview):
+                    col.release()
+        self._chunks = []
+        view = getattr(self, "_view", None)
+        if view is not None:
+            view.release()
+            self._view = None
+        if self._mm is not None:
+            self._mm.close()
+            self._mm = None
+        self._fh.close()
+
+    def __enter__(self) -> "RunArchiveReader":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+
+def iter_archive_runs(
+    path: Union[str, os.PathLike], indices: Optional[Container[int]] = None
+) -> Iterator[Dict[str, Any]]:
+    """Yield run dictionaries in the JSON run schema from an archive."""
+    date = datetime.fromtimestamp(Path(path).stat().st_mtime).isoformat()
+    with RunArchiveReader(path) as reader:
+        for game in reader.iter_games(san=True, fens=True, indices=indices):
+            game["date"] = date
+            yield game
+
+
+def convert_runs(runs_dir: Union[str, os.PathLike], archive_path: Union[str, os.PathLike],
+                 *, chunk_games: int = CHUNK_GAMES) -> int:
+    """Append every run JSON in ``runs_dir`` to ``archive_path``.
+
+    Returns the number of games written.  Games whose ``game_id`` is
+    already archived are skipped.  When the archive lives in ``runs_dir``
+    the converted files are moved to ``runs_dir/converted`` so the loaders
+    do not read them twice.  Files that cannot be parsed or replayed are
+    skipped with a warning and left in place.
+    """
+    runs_path = Path(runs_dir)
+    archive_path = Path(archive_path)
+    existing = set()
+    if archive_path.exists() and archive_path.stat().st_size > 0:
+        with RunArchiveReader(archive_path) as reader:
+            existing.update(reader.game_ids())
+    move_converted = archive_path.resolve().parent == runs_path.resolve()
+    converted: List[Path] = []
+    count = 0
+    with RunArchiveWriter(archive_path, chunk_games=chunk_games) as writer:
+        for file in sorted(runs_path.glob("*.json")):
+            try:
+                with file.open("r", encoding="utf-8") as fh:
+                    data = json.load(fh)
+                games = data.get("games") if isinstance(data.get("games"), list) else [data]
+                for n, game in enumerate(games):
+                    gid = file.stem if len(games) == 1 else f"{file.stem}#{n}"
+                    if gid in existing:
+                        continue
+                    writer.append_run(game, game_id=gid)
+                    existing.add(gid)
+                    count += 1
+            except (OSError, ValueError, KeyError, AttributeError) as exc:
+                logger.warning("Skipping %s: %s", file.name, exc)
+                continue
+            converted.append(file)
+    if move_converted and converted:
+        done_dir = runs_path / CONVERTED_DIR
+        done_dir.mkdir(exist_ok=True)
+        for file in converted:
+            file.replace(done_dir / file.name)
+        logger.info("Moved %d converted files to %s", len(converted), done_dir)
+    return count
+
+
+__all__ = [
+    "ARCHIVE_NAME",
+    "ARCHIVE_SUFFIX",
+    "CONVERTED_DIR",
+    "ArchiveChunk",
+    "RunArchiveReader",
+    "RunArchiveWriter",
+    "convert_runs",
+    "decode_move",
+    "encode_move",
+    "iter_archive_runs",
+]
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Convert run JSON files into a run archive")
+    parser.add_argument("runs", help="Directory containing run JSON files")
+    parser.add_argument("archive", nargs="?", help=f"Output archive (default: <runs>/{ARCHIVE_NAME})")
+    parser.add_argument("--chunk-games", type=int, default=CHUNK_GAMES)
+    args = parser.parse_args(argv)
+
+    archive = args.archive or os.path.join(args.runs, ARCHIVE_NAME)
+    n = convert_runs(args.runs, archive, chunk_games=args.chunk_games)
+    logger.info("Wrote %d games to %s", n, archive)
+    return 0
+
+
+if __name__ == "__main__":  # pragma: no cover - manual execution
+    logging.basicConfig(level=logging.INFO)
+    raise SystemExit(main())
+
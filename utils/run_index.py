@@ -0,0 +1,294 @@
+"""Persistent SQLite index of the run JSON files in ``runs/``.
+
+The web servers list games and module usage on every dashboard refresh.
+Parsing every run file for that does not scale, so :class:`RunIndex` keeps a
+small SQLite database next to the runs directory (``runs.index.sqlite`` for
+``runs/``) holding one summary row per game and pre-aggregated module counts.
+
+:meth:`RunIndex.refresh` scans the directory and re-parses only files whose
+modification time or size changed since the last scan; deleted files are
+dropped from the index.  Refreshes are throttled to one every
+``min_interval`` seconds, so a burst of requests costs a single ``scandir``.
+
+A run file is either one game (``moves``, ``modules_w``, ``modules_b``,
+``result`` and optionally ``duration_ms``) or a wrapper with a ``games``
+list of such objects.
+"""
+
+from __future__ import annotations
+
+import logging
+logger = logging.getLogger(__name__)
+
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import Counter
+from pathlib import Path
+from typing import Any, Dict, List, Mapping, Optional, Tuple
+
+# Number of moves stored per game for the dashboard preview.
+MOVES_PREVIEW = 20
+# Minimum number of seconds between two directory scans.
+REFRESH_INTERVAL_S = float(os.getenv("CHESS_RUN_INDEX_REFRESH_S", "2.0"))
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS files (
+    name     TEXT PRIMARY KEY,
+    mtime_ns INTEGER NOT NULL,
+    size     INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS games (
+    file        TEXT NOT NULL,
+    game_no     INTEGER NOT NULL,
+    result      TEXT NOT NULL,
+    moves       INTEGER NOT NULL,
+    duration_ms INTEGER NOT NULL,
+    white       TEXT NOT NULL,
+    black       TEXT NOT NULL,
+    preview     TEXT NOT NULL,
+    PRIMARY KEY (file, game_no)
+);
+CREATE TABLE IF NOT EXISTS file_modules (
+    file   TEXT NOT NULL,
+    module TEXT NOT NULL,
+    n      INTEGER NOT NULL,
+    PRIMARY KEY (file, module)
+);
+CREATE TABLE IF NOT EXISTS module_counts (
+    module TEXT PRIMARY KEY,
+    n      INTEGER NOT NULL
+);
+"""
+
+
+def default_index_path(runs_dir: str | os.PathLike) -> Path:
+    """Return the index location used for ``runs_dir`` (a sibling file)."""
+    runs = Path(runs_dir)
+    return runs.parent / f"{runs.name}.index.sqlite"
+
+
+def _game_objects(data: Any) -> List[Mapping[str, Any]]:
+    if isinstance(data, Mapping):
+        games = data.get("games")
+        if isinstance(games, list):
+            return [g for g in games if isinstance(g, Mapping)]
+        if "moves" in data:
+            return [data]
+    return []
+
+
+def _first_module(modules: Any) -> str:
+    if isinstance(modules, list) and modules:
+        return str(modules[0])
+    return "Unknown"
+
+
+def summarize_game(game: Mapping[str, Any]) -> Tuple[Tuple, Counter]:
+    """Return the ``games`` row values and module counter for ``game``."""
+    moves = game.get("moves") or []
+    modules: Counter[str] = Counter()
+    for key in ("modules_w", "modules_b"):
+        modules.update(m for m in (game.get(key) or []) if isinstance(m, str))
+    row = (
+        str(game.get("result", "*")),
+        len(moves),
+        int(game.get("duration_ms") or 0),
+        _first_module(game.get("modules_w")),
+        _first_module(game.get("modules_b")),
+        json.dumps(list(moves[:MOVES_PREVIEW])),
+    )
+    return row, modules
+
+
+class RunIndex:
+    """Incrementally maintained summary index for a runs directory.
+
+    Parameters
+    ----------
+    runs_dir:
+        Directory holding run ``.json`` files.
+    index_path:
+        SQLite file to use; defaults to :func:`default_index_path`.
+    min_interval:
+        Minimum seconds between directory scans triggered by the query
+        methods.  ``0`` rescans on every query.
+    """
+
+    def __init__(
+        self,
+        runs_dir: str | os.PathLike,
+        index_path: str | os.PathLike | None = None,
+        *,
+        min_interval: float = REFRESH_INTERVAL_S,
+    ) -> None:
+        self.runs_dir = Path(runs_dir)
+        self.index_path = Path(index_path) if index_path else default_index_path(runs_dir)
+        self.min_interval = min_interval
+        self._lock = threading.Lock()
+        self._last_refresh = 0.0
+        self._conn = sqlite3.connect(str(self.index_path), check_same_thread=False)
+        self._conn.executescript(_SCHEMA)
+        self._conn.commit()
+
+    # ------------------------------------------------------------------
+    def refresh(self, force: bool = False) -> int:
+        """Bring the index up to date; return the number of files re-read."""
+        with self._lock:
+            now = time.monotonic()
+            if not force and now - self._last_refresh < self.min_interval:
+                return 0
+            self._last_refresh = now
+            return self._refresh_locked()
+
+    def _refresh_locked(self) -> int:
+        seen: Dict[str, Tuple[int, int]] = {}
+        if self.runs_dir.is_dir():
+            with os.scandir(self.runs_dir) as it:
+                for entry in it:
+                    if entry.name.endswith(".json") and entry.is_file():
+                        st = entry.stat()
+                        seen[entry.name] = (st.st_mtime_ns, st.st_size)
+
+        known = {
+            name: (mtime, size)
+            for name, mtime, size in self._conn.execute("SELECT name, mtime_ns, size FROM files")
+        }
+        stale = [name for name in known if known[name] != seen.get(name)]
+        fresh = [name for name, sig in seen.items() if known.get(name) != sig]
+        if not stale and not fresh:
+            return 0
+
+        with self._conn:
+            for name in stale:
+                self._remove_file(name)
+            for name in fresh:
+                self._add_file(name, *seen[name])
+        if fresh:
+            logger.debug("Indexed %d run file(s) from %s", len(fresh), self.runs_dir)
+        return len(fresh)
+
+    def _remove_file(self, name: str) -> None:
+        c = self._conn
+        c.execute(
+            "UPDATE module_counts SET n = n - COALESCE("
+            "(SELECT fm.n FROM file_modules fm WHERE fm.file = ? AND fm.module = module_counts.module), 0)",
+            (name,),
+        )
+        c.execute("DELETE FROM module_counts WHERE n <= 0")
+        c.execute("DELETE FROM file_modules WHERE file = ?", (name,))
+        c.execute("DELETE FROM games WHERE file = ?", (name,))
+        c.execute("DELETE FROM files WHERE name = ?", (name,))
+
+    def _add_file(self, name: str, mtime_ns: int, size: int) -> None:
+        c = self._conn
+        try:
+            with open(self.runs_dir / name, "r", encoding="utf-8") as fh:
+                data = json.load(fh)
+        except (OSError, ValueError) as exc:
+            # Possibly still being written; record it so we retry only once
+            # its mtime or size changes.
+            logger.warning("Skipping unreadable run file %s: %s", name, exc)
+            data = None
+        modules: Counter[str] = Counter()
+        for game_no, game in enumerate(_game_objects(data)):
+            row, counts = summarize_game(game)
+            modules.update(counts)
+            c.execute(
+                "INSERT INTO games VALUES (?, ?, ?, ?, ?, ?, ?, ?)", (name, game_no) + row
+            )
+        for module, n in modules.items():
+            c.execute("INSERT INTO file_modules VALUES (?, ?, ?)", (name, module, n))
+            c.execute(
+                "INSERT INTO module_counts VALUES (?, ?) "
+                "ON CONFLICT(module) DO UPDATE SET n = n + excluded.n",
+                (module, n),
+            )
+        c.execute("INSERT INTO files VALUES (?, ?, ?)", (name, mtime_ns, size))
+
+    # ------------------------------------------------------------------
+    def count_games(self) -> int:
+        """Total number of indexed games."""
+        self.refresh()
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM games").fetchone()[0]
+
+    def games(self, offset: int = 0, limit: Optional[int] = None) -> List[Dict[str, Any]]:
+        """Return game summaries, newest file first.
+
+        ``id`` is the 1-based position of the game in file-name order, so it
+        stays stable while new runs are appended.
+        """
+        self.refresh()
+        with self._lock:
+            total = self._conn.execute("SELECT COUNT(*) FROM games").fetchone()[0]
+            rows = self._conn.execute(
+                "SELECT result, moves, duration_ms, white, black, preview FROM games "
+                "ORDER BY file DESC, game_no DESC LIMIT ? OFFSET ?",
+                (-1 if limit is None else max(0, limit), max(0, offset)),
+            ).fetchall()
+        return [
+            {
+                "id": total - max(0, offset) - i,
+                "result": result,
+                "moves": moves,
+                "duration": duration,
+                "modules": {"white": white, "black": black},
+                "movesList": json.loads(preview),
+            }
+            for i, (result, moves, duration, white, black, preview) in enumerate(rows)
+        ]
+
+    def module_counts(self) -> Dict[str, int]:
+        """Return module name -> occurrence count across all indexed games."""
+        self.refresh()
+        with self._lock:
+            return dict(self._conn.execute("SELECT module, n FROM module_counts"))
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+_INDEXES: Dict[Tuple[str, str], RunIndex] = {}
+_INDEXES_LOCK = threading.Lock()
+
+
+def get_run_index(runs_dir: str | os.PathLike, index_path: str | os.PathLike | None = None) -> RunIndex:
+    """Return the shared :class:`RunIndex` for ``runs_dir``.
+
+    ``index_path`` defaults to ``$RUN_INDEX_PATH`` or
+    :func:`default_index_path`.
+    """
+    path = index_path or os.getenv("RUN_INDEX_PATH") or default_index_path(runs_dir)
+    key = (str(Path(runs_dir).resolve()), str(Path(path).resolve()))
+    with _INDEXES_LOCK:
+        index = _INDEXES.get(key)
+        if index is None:
+            index = _INDEXES[key] = RunIndex(runs_dir, path)
+        return index
+
+
+def parse_page_args(args: Mapping[str, Any], *, default_per_page: int = 100,
+                    max_per_page: int = 1000) -> Tuple[int, int]:
+    """Return ``(offset, limit)`` from ``page``/``per_page`` query arguments."""
+    def _int(name: str, default: int) -> int:
+        try:
+            return int(args.get(name, default))
+        except (TypeError, ValueError):
+            return default
+
+    per_page = min(max(1, _int("per_page", default_per_page)), max_per_page)
+    page = max(1, _int("page", 1))
+    return (page - 1) * per_page, per_page
+
+
+__all__ = [
+    "RunIndex",
+    "default_index_path",
+    "get_run_index",
+    "parse_page_args",
+    "summarize_game",
+]
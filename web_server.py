@@ -20,15 +20,17 @@ from datetime import datetime
 current_dir = Path(__file__).parent
 sys.path.insert(0, str(current_dir))
 
-from flask import Flask, render_template, jsonify, request, send_from_directory
+from flask import Flask, render_template, jsonify, request, send_from_directory, g, has_request_context
 from flask_cors import CORS
 import chess
 import chess.engine
 from werkzeug.serving import WSGIRequestHandler
+from werkzeug.local import LocalProxy
 
 # Імпортуємо існуючі компоненти
 from chess_ai.bot_agent import make_agent
-from utils.load_runs import load_runs
+from utils.run_index import get_run_index, parse_page_args
+from utils.game_sessions import SessionRegistry, session_id_from
 from utils.module_usage import aggregate_module_usage
 from utils.module_colors import MODULE_COLORS, REASON_PRIORITY
 # Опційно імпортуємо ELOSyncManager (може вимагати aiohttp)
@@ -95,7 +97,6 @@ stats_thread = threading.Thread(target=stats_logger, daemon=True)
 game_data = {
     'current_game': None,
     'game_history': [],
-    'is_playing': False,
     'agents': {},
     'elo_manager': None
 }
@@ -205,6 +206,7 @@ class GameManager:
         self.game_moves = []
         self.game_modules = {'white': [], 'black': []}
         self.start_time = None
+        self.is_playing = False
         self.white_agent = None
         self.black_agent = None
         
@@ -244,7 +246,7 @@ class GameManager:
                 logger.error("Недійсний стан доски")
                 return None
                 
-            move = agent.choose_move(self.current_board)
+            move = agent.choose_move(self.current_board.copy())
             if not move:
                 logger.warning("Агент не зміг зробити хід")
                 return None
@@ -325,8 +327,40 @@ class GameManager:
             'turn': 'white' if self.current_board.turn == chess.WHITE else 'black'
         }
 
-# Ініціалізація менеджера ігор
-game_manager = GameManager()
+# Реєстр сесій: кожен клієнт (X-Session-Id / ?session=) має власну гру
+sessions = SessionRegistry(GameManager)
+
+def current_session():
+    """Сесія поточного запиту (або 'default' поза запитом)"""
+    if not has_request_context():
+        return sessions.get()
+    session = g.get('game_session')
+    if session is None:
+        session = g.game_session = sessions.get(session_id_from(request))
+    return session
+
+# Менеджер гри поточної сесії
+game_manager = LocalProxy(lambda: current_session().manager)
+
+def session_locked(f):
+    """Виконати обробник під локом сесії (зміни однієї гри йдуть по черзі)"""
+    def wrapper(*args, **kwargs):
+        with current_session().lock:
+            return f(*args, **kwargs)
+    wrapper.__name__ = f.__name__
+    return wrapper
+
+def wants_async(data: Dict[str, Any]) -> bool:
+    flag = data.get('async', request.args.get('async'))
+    return str(flag).lower() in ('1', 'true', 'yes')
+
+def submit_job(fn):
+    """Поставити хід бота в пул і відповісти 202 з ідентифікатором задачі"""
+    job = sessions.submit(current_session(), fn)
+    response = jsonify(job.to_dict())
+    response.status_code = 202
+    response.headers['Location'] = f'/api/jobs/{job.id}'
+    return response
 
 @app.route('/')
 @handle_api_errors
@@ -405,7 +439,7 @@ def get_status():
         'status': 'running',
         'timestamp': datetime.now().isoformat(),
         'game_data': {
-            'is_playing': game_data['is_playing'],
+            'is_playing': game_manager.is_playing,
             'current_game': game_manager.get_board_state() if game_manager.current_board else None
         }
     })
@@ -413,27 +447,14 @@ def get_status():
 @app.route('/api/games', methods=['GET'])
 @handle_api_errors
 def get_games():
-    """Отримати список ігор"""
+    """Отримати список ігор (сторінками, найновіші першими)"""
     try:
-        # Завантажуємо існуючі ігри з файлів
-        runs = load_runs(RUNS_DIR)
-        games = []
-        
-        for run in runs:
-            for game in run.get('games', []):
-                games.append({
-                    'id': len(games) + 1,
-                    'result': game.get('result', '*'),
-                    'moves': len(game.get('moves', [])),
-                    'duration': game.get('duration_ms', 0),
-                    'modules': {
-                        'white': game.get('modules_w', [])[0] if game.get('modules_w') else 'Unknown',
-                        'black': game.get('modules_b', [])[0] if game.get('modules_b') else 'Unknown'
-                    },
-                    'movesList': game.get('moves', [])[:20]  # Перші 20 ходів
-                })
-        
-        return jsonify(games)
+        index = get_run_index(RUNS_DIR)
+        offset, limit = parse_page_args(request.args)
+        games = index.games(offset, limit)
+        response = jsonify(games)
+        response.headers['X-Total-Count'] = str(index.count_games())
+        return response
     except Exception as e:
         logger.error(f"Помилка завантаження ігор: {e}")
         return jsonify([])
@@ -443,21 +464,14 @@ def get_games():
 def get_modules():
     """Отримати статистику модулів"""
     try:
-        runs = load_runs(RUNS_DIR)
-        module_stats = {}
-        
-        for run in runs:
-            for game in run.get('games', []):
-                for module in game.get('modules_w', []) + game.get('modules_b', []):
-                    module_stats[module] = module_stats.get(module, 0) + 1
-        
-        return jsonify(module_stats)
+        return jsonify(get_run_index(RUNS_DIR).module_counts())
     except Exception as e:
         logger.error(f"Помилка завантаження модулів: {e}")
         return jsonify({})
 
 @app.route('/api/game/start', methods=['POST'])
 @handle_api_errors
+@session_locked
 def start_game():
     """Почати нову гру"""
     try:
@@ -472,7 +486,7 @@ def start_game():
         
         # Скидаємо гру
         game_manager.reset_game()
-        game_data['is_playing'] = True
+        game_manager.is_playing = True
         game_manager.start_time = time.time()
         
         # Зберігаємо режим гри
@@ -489,75 +503,110 @@ def start_game():
         logger.error(f"Помилка початку гри: {e}")
         return jsonify({'error': str(e)}), 500
 
+def game_move_payload(gm, fen: Optional[str] = None):
+    """Наступний хід агента гри ``gm`` (або позиції ``fen``); повертає (payload, HTTP статус)"""
+    # Якщо передано FEN, використовуємо його замість поточної гри
+    if fen is not None:
+        temp_board = chess.Board(fen)
+        if not temp_board.is_game_over():
+            # Виконуємо хід ботом
+            mover_color = temp_board.turn
+            agent = gm.white_agent if mover_color == chess.WHITE else gm.black_agent
+            
+            if agent:
+                move = agent.choose_move(temp_board)
+                if move and temp_board.is_legal(move):
+                    san_move = temp_board.san(move)
+                    temp_board.push(move)
+                    
+                    return {
+                        'success': True,
+                        'move': san_move,
+                        'fen': temp_board.fen(),
+                        'is_game_over': temp_board.is_game_over(),
+                        'result': temp_board.result() if temp_board.is_game_over() else None,
+                        'bot': 'WhiteBot' if mover_color == chess.WHITE else 'BlackBot',
+                        'confidence': 0.85  # Приклад значення
+                    }, 200
+        
+        return {'error': 'Не вдалося зробити хід'}, 400
+    
+    # Стандартна логіка для активної гри
+    if not gm.is_playing:
+        return {'error': 'Гра не активна'}, 400
+    
+    move_result = gm.make_move()
+    if not move_result:
+        return {'error': 'Не вдалося зробити хід'}, 400
+    
+    # Якщо гра закінчена, зберігаємо результат
+    if move_result['is_game_over']:
+        gm.is_playing = False
+        game_data['game_history'].append({
+            'id': len(game_data['game_history']) + 1,
+            'result': move_result['result'],
+            'moves': gm.game_moves,
+            'modules': gm.game_modules,
+            'duration': int((time.time() - gm.start_time) * 1000) if gm.start_time else 0,
+            'timestamp': datetime.now().isoformat()
+        })
+    
+    return {
+        'success': True,
+        'move_result': move_result,
+        'board_state': gm.get_board_state()
+    }, 200
+
 @app.route('/api/game/move', methods=['POST'])
 @handle_api_errors
 def make_move():
-    """Зробити хід"""
+    """Зробити хід в грі (``async: true`` — через пул, результат у /api/jobs/<id>)"""
     try:
-        data = request.get_json() or {}
-        
-        # Якщо передано FEN, використовуємо його замість поточної гри
-        if 'fen' in data:
-            temp_board = chess.Board(data['fen'])
-            if not temp_board.is_game_over():
-                # Виконуємо хід ботом
-                mover_color = temp_board.turn
-                agent = game_manager.white_agent if mover_color == chess.WHITE else game_manager.black_agent
-                
-                if agent:
-                    move = agent.choose_move(temp_board)
-                    if move and temp_board.is_legal(move):
-                        san_move = temp_board.san(move)
-                        temp_board.push(move)
-                        
-                        return jsonify({
-                            'success': True,
-                            'move': san_move,
-                            'fen': temp_board.fen(),
-                            'is_game_over': temp_board.is_game_over(),
-                            'result': temp_board.result() if temp_board.is_game_over() else None,
-                            'bot': 'WhiteBot' if mover_color == chess.WHITE else 'BlackBot',
-                            'confidence': 0.85  # Приклад значення
-                        })
-            
-            return jsonify({'error': 'Не вдалося зробити хід'}), 400
-        
-        # Стандартна логіка для активної гри
-        if not game_data['is_playing']:
-            return jsonify({'error': 'Гра не активна'}), 400
-        
-        move_result = game_manager.make_move()
-        if not move_result:
-            return jsonify({'error': 'Не вдалося зробити хід'}), 400
-        
-        # Якщо гра закінчена, зберігаємо результат
-        if move_result['is_game_over']:
-            game_data['is_playing'] = False
-            game_data['game_history'].append({
-                'id': len(game_data['game_history']) + 1,
-                'result': move_result['result'],
-                'moves': game_manager.game_moves,
-                'modules': game_manager.game_modules,
-                'duration': int((time.time() - game_manager.start_time) * 1000) if game_manager.start_time else 0,
-                'timestamp': datetime.now().isoformat()
-            })
-        
-        return jsonify({
-            'success': True,
-            'move_result': move_result,
-            'board_state': game_manager.get_board_state()
-        })
+        data = request.get_json(silent=True) or {}
+        fen = data.get('fen')
+        if wants_async(data):
+            return submit_job(lambda gm: game_move_payload(gm, fen))
+        with current_session().lock:
+            payload, status = game_move_payload(game_manager._get_current_object(), fen)
+        return jsonify(payload), status
         
     except Exception as e:
         logger.error(f"Помилка виконання ходу: {e}")
         return jsonify({'error': str(e)}), 500
 
+# ==================== SESSIONS & JOBS API ====================
+
+@app.route('/api/sessions', methods=['POST'])
+@handle_api_errors
+def create_session():
+    """Створити нову ігрову сесію"""
+    session = sessions.create()
+    return jsonify({'session': session.id, 'active_sessions': len(sessions)}), 201
+
+@app.route('/api/sessions/<session_id>', methods=['DELETE'])
+@handle_api_errors
+def delete_session(session_id):
+    """Видалити ігрову сесію"""
+    if not sessions.drop(session_id):
+        return jsonify({'error': 'Сесію не знайдено'}), 404
+    return jsonify({'success': True})
+
+@app.route('/api/jobs/<job_id>', methods=['GET'])
+@handle_api_errors
+def get_job(job_id):
+    """Стан фонового ходу бота: pending | running | done | error"""
+    job = sessions.job(job_id)
+    if job is None:
+        return jsonify({'error': 'Задачу не знайдено'}), 404
+    return jsonify(job.to_dict())
+
 @app.route('/api/game/stop', methods=['POST'])
 @handle_api_errors
+@session_locked
 def stop_game():
     """Зупинити гру"""
     try:
-        game_data['is_playing'] = False
+        game_manager.is_playing = False
         return jsonify({'success': True, 'message': 'Гра зупинена'})
     except Exception as e:
         logger.error(f"Помилка зупинки гри: {e}")
@@ -604,10 +653,11 @@ def end_game():
 
 @app.route('/api/game/reset', methods=['POST'])
 @handle_api_errors
+@session_locked
 def reset_game():
     """Скинути гру"""
     try:
-        game_data['is_playing'] = False
+        game_manager.is_playing = False
         game_manager.reset_game()
         return jsonify({'success': True, 'message': 'Гра скинута'})
     except Exception as e:
@@ -702,6 +752,7 @@ def api_legal_moves():
 
 @app.route('/api/move', methods=['POST'])
 @handle_api_errors
+@session_locked
 def api_make_move():
     data = request.get_json() or {}
     move_notation = data.get('move')
@@ -737,43 +788,41 @@ def api_make_move():
 
 @app.route('/api/reset', methods=['POST'])
 @handle_api_errors
+@session_locked
 def api_reset():
     game_manager.reset_game()
     return jsonify({'success': True, 'board': _board_to_array(game_manager.current_board), 'fen': game_manager.current_board.fen()})
 
-@app.route('/api/bot_move', methods=['POST'])
-@handle_api_errors
-def api_bot_move():
-    data = request.get_json() or {}
-    bot_name = (data.get('bot') or '').strip() or 'RandomBot'
-    bd = game_manager.current_board
+def bot_move_payload(gm, bot_name: str):
+    """Хід ботом ``bot_name`` у грі ``gm``; повертає (payload, HTTP статус)"""
+    bd = gm.current_board
     mover_color = bd.turn
     # Ensure agent exists for current mover
     try:
-        if mover_color == chess.WHITE and game_manager.white_agent is None:
-            game_manager.white_agent = make_agent(bot_name, chess.WHITE)
-        if mover_color == chess.BLACK and game_manager.black_agent is None:
-            game_manager.black_agent = make_agent(bot_name, chess.BLACK)
+        if mover_color == chess.WHITE and gm.white_agent is None:
+            gm.white_agent = make_agent(bot_name, chess.WHITE)
+        if mover_color == chess.BLACK and gm.black_agent is None:
+            gm.black_agent = make_agent(bot_name, chess.BLACK)
     except Exception as e:
         logger.warning(f"Не вдалося ініціалізувати агента {bot_name}: {e}. Використовуємо випадковий хід.")
-    agent = game_manager.white_agent if mover_color == chess.WHITE else game_manager.black_agent
+    agent = gm.white_agent if mover_color == chess.WHITE else gm.black_agent
     if agent is None:
         # Fallback: random legal move
         legal = list(bd.legal_moves)
         if not legal:
-            return jsonify({'error': 'Немає можливих ходів'}), 400
+            return {'error': 'Немає можливих ходів'}, 400
         mv = legal[0]
     else:
-        mv = agent.choose_move(bd)
+        mv = agent.choose_move(bd.copy())
         if mv is None or not bd.is_legal(mv):
             legal = list(bd.legal_moves)
             if not legal:
-                return jsonify({'error': 'Немає можливих ходів'}), 400
+                return {'error': 'Немає можливих ходів'}, 400
             mv = legal[0]
     san_move = bd.san(mv)
     bd.push(mv)
-    game_manager.game_moves.append(san_move)
-    return jsonify({
+    gm.game_moves.append(san_move)
+    return {
         'success': True,
         'move': san_move,
         'bot': bot_name,
@@ -785,7 +834,18 @@ def api_bot_move():
         'is_stalemate': bd.is_stalemate(),
         'is_game_over': bd.is_game_over(),
         'result': bd.result() if bd.is_game_over() else None
-    })
+    }, 200
+
+@app.route('/api/bot_move', methods=['POST'])
+@handle_api_errors
+def api_bot_move():
+    data = request.get_json(silent=True) or {}
+    bot_name = (data.get('bot') or '').strip() or 'RandomBot'
+    if wants_async(data):
+        return submit_job(lambda gm: bot_move_payload(gm, bot_name))
+    with current_session().lock:
+        payload, status = bot_move_payload(game_manager._get_current_object(), bot_name)
+    return jsonify(payload), status
 
 @app.route('/api/stats')
 @handle_api_errors
@@ -1430,6 +1490,7 @@ def signal_handler(signum, frame):
     """Обробник сигналів для graceful shutdown"""
     logger.info(f"Отримано сигнал {signum}, закриваємо сервер...")
     server_shutdown.set()
+    sessions.close()
     
     # Логуємо фінальну статистику
     log_connection_stats()